@@ -0,0 +1,55 @@
+""" Benchmarks for format detection and reading with pyart.io.read. """
+
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+
+import pyart
+
+_SAMPLES = {
+    'sigmet': pyart.testing.SIGMET_PPI_FILE,
+    'cfradial.nc': pyart.testing.CFRADIAL_PPI_FILE,
+    'nexrad_level3': pyart.testing.NEXRAD_LEVEL3_MSG19,
+    'nexrad_archive': pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE,
+    'uf': pyart.testing.UF_FILE,
+    'mdv': pyart.testing.MDV_PPI_FILE,
+    'chl': pyart.testing.CHL_RHI_FILE,
+}
+
+
+class AutoReadMixedDirectory(object):
+    """
+    Reading a directory of files in mixed formats, uncompressed and
+    compressed with bzip2 and gzip.
+    """
+
+    params = ['none', 'bz2', 'gz']
+    param_names = ['compression']
+
+    def setup(self, compression):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filenames = []
+        for name, sample in sorted(_SAMPLES.items()):
+            with open(sample, 'rb') as fh:
+                data = fh.read()
+            if compression == 'bz2':
+                data = bz2.compress(data)
+            elif compression == 'gz':
+                data = gzip.compress(data)
+            filename = os.path.join(self.tmpdir, name)
+            with open(filename, 'wb') as fh:
+                fh.write(data)
+            self.filenames.append(filename)
+
+    def teardown(self, compression):
+        shutil.rmtree(self.tmpdir)
+
+    def time_determine_filetype(self, compression):
+        for filename in self.filenames:
+            pyart.io.auto_read.determine_filetype(filename)
+
+    def time_read(self, compression):
+        for filename in self.filenames:
+            pyart.io.read(filename)
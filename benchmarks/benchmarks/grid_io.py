@@ -0,0 +1,30 @@
+""" Benchmarks for reading a grid time series written with append_grid. """
+
+import os
+import shutil
+import tempfile
+
+import pyart
+
+
+class GridTimeSeries(object):
+    """
+    Reading a single time step and level from a time series file.
+    """
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'series.nc')
+        grid = pyart.testing.make_target_grid()
+        for i in range(24):
+            grid.time['data'][0] = i * 300.
+            pyart.io.append_grid(self.filename, grid)
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def time_read_time_step(self):
+        pyart.io.read_grid(self.filename, time_index=12)
+
+    def time_read_time_step_level(self):
+        pyart.io.read_grid(self.filename, time_index=12, levels=[1])
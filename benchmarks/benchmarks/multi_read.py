@@ -0,0 +1,29 @@
+""" Benchmarks for reading many files with pyart.io.read_many. """
+
+import pyart
+
+_FILENAMES = [
+    pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE,
+    pyart.testing.SIGMET_PPI_FILE,
+    pyart.testing.CFRADIAL_PPI_FILE,
+    pyart.testing.UF_FILE,
+] * 4
+
+
+class ReadMany(object):
+    """
+    Reading a series of files serially and in a pool of worker processes.
+    """
+
+    params = [1, 2, 4]
+    param_names = ['workers']
+
+    def time_read_many(self, workers):
+        for radar in pyart.io.read_many(_FILENAMES, workers=workers):
+            pass
+
+    def time_radar_collection_iter(self, workers):
+        collection = pyart.io.RadarCollection(
+            _FILENAMES, memory_budget=0, workers=workers)
+        for radar in collection:
+            pass
@@ -0,0 +1,37 @@
+""" Benchmarks for reading NEXRAD Level 3 products. """
+
+import pyart
+from pyart.io.nexrad_level3 import NEXRADLevel3File
+
+_SAMPLES = {
+    'msg19': pyart.testing.NEXRAD_LEVEL3_MSG19,    # run length encoded
+    'msg163': pyart.testing.NEXRAD_LEVEL3_MSG163,  # digital radials
+}
+
+
+class NEXRADLevel3Decode(object):
+    """ Decoding of the bundled NEXRAD Level 3 samples. """
+
+    params = sorted(_SAMPLES)
+    param_names = ['sample']
+
+    def time_decode(self, sample):
+        NEXRADLevel3File(_SAMPLES[sample]).get_data()
+
+    def time_read_nexrad_level3(self, sample):
+        pyart.io.read_nexrad_level3(_SAMPLES[sample])
+
+
+class NEXRADLevel3Batch(object):
+    """ Batch reading of many NEXRAD Level 3 products. """
+
+    params = [1, None]
+    param_names = ['processes']
+    timeout = 300
+
+    def setup(self, processes):
+        self.filenames = 100 * sorted(_SAMPLES.values())
+
+    def time_read_nexrad_level3_batch(self, processes):
+        pyart.io.read_nexrad_level3_batch(
+            self.filenames, processes=processes)
@@ -0,0 +1,36 @@
+""" Benchmarks for reading Py-ART radar cache files. """
+
+import os
+import shutil
+import tempfile
+
+import pyart
+
+
+class ReadRadarCache(object):
+    """
+    Reading a NEXRAD Level II volume from the original file and from a
+    radar cache file.
+    """
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE
+        self.cache_file = os.path.join(self.tmpdir, 'radar.pyrc')
+        pyart.io.write_cache(pyart.io.read(self.filename), self.cache_file)
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def time_read_original(self):
+        pyart.io.read(self.filename)
+
+    def time_read_cache(self):
+        pyart.io.read_cache(self.cache_file)
+
+    def time_read_cache_one_sweep(self):
+        radar = pyart.io.read_cache(self.cache_file, sweeps=[0])
+        radar.fields['reflectivity']['data'].sum()
+
+    def time_read_cache_into_memory(self):
+        pyart.io.read_cache(self.cache_file, mmap=False)
@@ -0,0 +1,63 @@
+""" Benchmarks for the region based dealiasing algorithm. """
+
+import numpy as np
+
+import pyart
+from pyart.correct import region_dealias
+
+
+def _make_noisy_velocity_radar(nrays=720, ngates=400, seed=0):
+    """
+    Return a PPI radar with a noisy, aliased velocity field which breaks up
+    into thousands of regions, similar to a convective sweep.
+    """
+    radar = pyart.testing.make_empty_ppi_radar(ngates, nrays, 1)
+    radar.instrument_parameters = {
+        'nyquist_velocity': {'data': np.array([10.0] * nrays)}}
+    random_state = np.random.RandomState(seed)
+    azimuth = np.deg2rad(np.linspace(0, 360, nrays, endpoint=False))
+    vel = 25. * np.cos(azimuth)[:, np.newaxis] * np.ones(ngates)
+    vel += random_state.normal(0, 4., (nrays, ngates))
+    vel = (vel + 10.) % 20. - 10.
+    vel_dict = pyart.config.get_metadata('velocity')
+    vel_dict['data'] = vel.astype('float32')
+    radar.fields = {'velocity': vel_dict}
+    return radar
+
+
+class RegionDealiasNoisy(object):
+    """ Region based dealiasing of a sweep with thousands of regions. """
+
+    timeout = 600
+
+    def setup(self):
+        self.radar = _make_noisy_velocity_radar()
+        vel = self.radar.fields['velocity']['data']
+        gfilter = np.zeros(vel.shape, dtype=bool)
+        labels, self.nfeatures = region_dealias._find_regions(
+            vel, gfilter, np.linspace(-10, 10, 4))
+        bincount = np.bincount(labels.ravel())
+        self.region_sizes = bincount[1:]
+        self.indices, self.edge_count, self.velos = (
+            region_dealias._edge_sum_and_count(
+                labels, bincount[0], vel, True, 100, 100))
+
+    def time_dealias_region_based(self):
+        pyart.correct.dealias_region_based(self.radar)
+
+    def time_find_unwrap_number(self):
+        region_dealias._find_unwrap_number(
+            self.region_sizes, self.indices, self.edge_count, self.velos,
+            20.)
+
+    def time_python_trackers(self):
+        region_tracker = region_dealias._RegionTracker(self.region_sizes)
+        edge_tracker = region_dealias._EdgeTracker(
+            self.indices, self.edge_count, self.velos, 20.,
+            self.nfeatures + 1)
+        while True:
+            if region_dealias._combine_regions(region_tracker, edge_tracker):
+                break
+
+    def track_number_of_regions(self):
+        return self.nfeatures
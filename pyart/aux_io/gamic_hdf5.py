@@ -12,6 +12,12 @@ Utilities for reading gamic hdf5 files.
     _avg_radial_angles
     _prt_mode_from_unfolding
 
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _GAMICStagedField
+
 """
 
 # TODO to move out of aux_io namespace:
@@ -27,6 +33,7 @@ import numpy as np
 from ..config import FileMetadata, get_fillvalue
 from ..io.common import make_time_unit_str, _test_arguments
 from ..core.radar import Radar
+from ..lazydict import LazyLoadDict
 try:
     from .gamicfile import GAMICFile
     _H5PY_AVAILABLE = True
@@ -41,7 +48,8 @@ LIGHT_SPEED = 2.99792458e8  # speed of light in meters per second
 def read_gamic(filename, field_names=None, additional_metadata=None,
                file_field_names=False, exclude_fields=None,
                include_fields=None, valid_range_from_file=True,
-               units_from_file=True, pulse_width=None, **kwargs):
+               units_from_file=True, pulse_width=None,
+               delay_field_loading=False, sweeps=None, **kwargs):
     """
     Read a GAMIC hdf5 file.
 
@@ -79,6 +87,14 @@ def read_gamic(filename, field_names=None, additional_metadata=None,
     pulse_width : list or None,
         Mandatory for gamic radar processors which have pulsewidth enums.
         pulse_width should contain the pulsewidth' in us.
+    delay_field_loading : bool, optional
+        True to delay loading of field data from the file until the 'data'
+        key in a particular field dictionary is accessed. In this case
+        the field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects and the file is kept open.
+    sweeps : list or None, optional
+        Indices of the sweeps (scans) to read. None (the default) will read
+        all sweeps.
 
     Returns
     -------
@@ -100,7 +116,7 @@ def read_gamic(filename, field_names=None, additional_metadata=None,
                                 include_fields)
 
     # Open HDF5 file and get handle
-    gfile = GAMICFile(filename)
+    gfile = GAMICFile(filename, sweeps)
 
     # verify that all scans are present in file
     assert gfile.is_file_complete()
@@ -211,8 +227,12 @@ def read_gamic(filename, field_names=None, additional_metadata=None,
             continue
 
         field_dic = filemetadata(field_name)
-        field_dic['data'] = gfile.moment_data(group, 'float32')
         field_dic['_FillValue'] = get_fillvalue()
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', _GAMICStagedField(gfile, group))
+        else:
+            field_dic['data'] = gfile.moment_data(group, 'float32')
 
         if valid_range_from_file:
             try:
@@ -267,7 +287,9 @@ def read_gamic(filename, field_names=None, additional_metadata=None,
     instrument_parameters = _get_instrument_params(gfile, filemetadata,
                                                    pulse_width)
 
-    gfile.close()
+    # do not close file if field loading is delayed
+    if not delay_field_loading:
+        gfile.close()
 
     return Radar(
         time, _range, fields, metadata, scan_type,
@@ -305,7 +327,7 @@ def _get_instrument_params(gfile, filemetadata, pulse_width):
     pw_names = ['pulse_width_us', 'pulse_width_mks', 'pulse_width']
     pw_name = 'pulse_width_us'
     for pw_name in pw_names:
-        if gfile.is_attr_in_group('/scan0/how', pw_name):
+        if gfile.is_attr_in_scan0_group('how', pw_name):
             break
     if pw_name == 'pulse_width':
         if not pulse_width:
@@ -337,7 +359,7 @@ def _get_instrument_params(gfile, filemetadata, pulse_width):
     dic['data'] = gfile.sweep_expand(gfile.how_attrs('range', 'float32'))
     instrument_params['unambiguous_range'] = dic
 
-    if gfile.is_attr_in_group('/scan0/how/extended', 'nyquist_velocity'):
+    if gfile.is_attr_in_scan0_group('how/extended', 'nyquist_velocity'):
         dic = filemetadata('nyquist_velocity')
         dic['data'] = gfile.sweep_expand(
             gfile.how_ext_attrs('nyquist_velocity'))
@@ -365,3 +387,18 @@ def _prt_mode_from_unfolding(unfolding):
         return 'fixed'
     else:
         return 'staggered'
+
+
+class _GAMICStagedField(object):
+    """
+    A class to facilitate on demand loading of field data from a GAMIC file.
+    """
+
+    def __init__(self, gfile, group):
+        """ initialize. """
+        self.gfile = gfile
+        self.group = group
+
+    def __call__(self):
+        """ Return the array containing the field data. """
+        return self.gfile.moment_data(self.group, 'float32')
@@ -14,6 +14,7 @@ GAMICFile class and utility functions.
     :toctree: generated/
 
     _get_gamic_sweep_data
+    _read_gamic_sweep_data
 
 
 """
@@ -30,6 +31,9 @@ class GAMICFile(object):
     ----------
     filename : str
         Filename of GAMIC HDF5 file.
+    sweeps : list or None, optional
+        Indices of the sweeps (scans) to read. None (the default) will read
+        all sweeps.
 
     Attributes
     ----------
@@ -45,14 +49,21 @@ class GAMICFile(object):
         Open HDF5 file object from which data is read.
     _scans : list
         Name of the HDF5 group for each scan.
+    _scan0 : str
+        Name of the HDF5 group of the first scan read, from which the
+        parameters common to all scans are taken. This is not scan0 when
+        sweeps does not include the first scan in the file.
 
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, sweeps=None):
         """ initialize object. """
         self._hfile = h5py.File(filename, 'r')
-        self.nsweeps = self._hfile['what'].attrs['sets']
-        self._scans = ['scan%i' % (i) for i in range(self.nsweeps)]
+        if sweeps is None:
+            sweeps = range(self._hfile['what'].attrs['sets'])
+        self._scans = ['scan%i' % (i) for i in sweeps]
+        self._scan0 = '/' + self._scans[0]
+        self.nsweeps = len(self._scans)
         self.rays_per_sweep = self.how_attrs('ray_count', 'int32')
         self.total_rays = sum(self.rays_per_sweep)
         # starting and ending ray for each sweep
@@ -75,7 +86,7 @@ class GAMICFile(object):
 
     def is_file_single_scan_type(self):
         """ True is all scans are the same scan type, False otherwise. """
-        scan_type = self._hfile['scan0/what'].attrs['scan_type']
+        scan_type = self._hfile[self._scan0]['what'].attrs['scan_type']
         for scan in self._scans:
             if self._hfile[scan]['what'].attrs['scan_type'] != scan_type:
                 return False
@@ -99,8 +110,18 @@ class GAMICFile(object):
         return self._hfile[group].attrs[attr]
 
     def raw_scan0_group_attr(self, group, attr):
-        """ Return an attribute from the scan0 group with no reformatting. """
-        return self._hfile['/scan0'][group].attrs[attr]
+        """
+        Return an attribute from a group of the first scan read with no
+        reformatting.
+        """
+        return self._hfile[self._scan0][group].attrs[attr]
+
+    def is_attr_in_scan0_group(self, group, attr):
+        """
+        True is attribute is present in a group of the first scan read, False
+        otherwise.
+        """
+        return attr in self._hfile[self._scan0][group].attrs
 
     # scan/sweep based attribute lookup
     def how_attrs(self, attr, dtype):
@@ -122,13 +143,20 @@ class GAMICFile(object):
 
     # misc looping
     def moment_groups(self):
-        """ Return a list of groups under scan0 where moments are stored. """
-        return [k for k in self._hfile['/scan0'] if k.startswith('moment_')]
+        """
+        Return a list of groups under the first scan read where moments are
+        stored.
+        """
+        return [k for k in self._hfile[self._scan0]
+                if k.startswith('moment_')]
 
     def moment_names(self, scan0_groups):
-        """ Return a list of moment names for a list of scan0 groups. """
-        return [self._hfile['/scan0'][k].attrs['moment'].decode('utf-8') for
-                k in scan0_groups]
+        """
+        Return a list of moment names for a list of groups under the first
+        scan read.
+        """
+        return [self._hfile[self._scan0][k].attrs['moment'].decode('utf-8')
+                for k in scan0_groups]
 
     def is_field_in_ray_header(self, field):
         """ True if field is present in ray_header, False otherwise. """
@@ -143,15 +171,16 @@ class GAMICFile(object):
 
     def moment_data(self, group, dtype):
         """ Read in moment data from all sweeps. """
-        ngates = int(self._hfile['/scan0/how'].attrs['bin_count'])
-        data = np.ma.zeros((self.total_rays, ngates), dtype=dtype)
-        data[:] = np.ma.masked      # volume data initially all masked
-        for scan, start, end in zip(self._scans, self.start_ray, self.end_ray):
+        ngates = int(self._hfile[self._scan0]['how'].attrs['bin_count'])
+        data = np.zeros((self.total_rays, ngates), dtype=dtype)
+        # volume data initially all masked
+        mask = np.ones((self.total_rays, ngates), dtype='bool')
+        for scan, start in zip(self._scans, self.start_ray):
             # read in sweep data if field exists in scan.
             if group in self._hfile[scan]:
-                sweep_data = _get_gamic_sweep_data(self._hfile[scan][group])
-                data[start:end+1, :sweep_data.shape[1]] = sweep_data[:]
-        return data
+                _read_gamic_sweep_data(
+                    self._hfile[scan][group], data, mask, start)
+        return np.ma.masked_array(data, mask)
 
     def sweep_expand(self, arr, dtype='float32'):
         """ Expand an sweep indexed array to be ray indexed """
@@ -160,24 +189,38 @@ class GAMICFile(object):
 
 def _get_gamic_sweep_data(group):
     """ Get GAMIC HDF5 sweep data from an HDF5 group. """
+    data = np.empty(group.shape, dtype='float32')
+    mask = np.empty(group.shape, dtype='bool')
+    _read_gamic_sweep_data(group, data, mask, 0)
+    return np.ma.masked_array(data, mask)
+
+
+def _read_gamic_sweep_data(group, data, mask, start):
+    """
+    Read GAMIC HDF5 sweep data from an HDF5 group into rows of an array.
+
+    The raw values are read directly into the array and scaled in place, the
+    corresponding rows of the mask are set where the raw value is 0.
+    """
     dyn_range_min = group.attrs['dyn_range_min']
     dyn_range_max = group.attrs['dyn_range_max']
-    raw_data = group[:]
     fmt = group.attrs['format']
     if fmt == b'UV16':
         # unsigned 16-bit integer data, 0 indicates a masked value
-        assert raw_data.dtype == np.uint16
+        assert group.dtype == np.uint16
         scale = (dyn_range_max - dyn_range_min) / 65535.
-        offset = dyn_range_min
-        sweep_data = np.ma.masked_array(
-            raw_data * scale + offset, mask=(raw_data == 0), dtype='float32')
     elif fmt == b'UV8':
         # unsigned 8-bit integer data, 0 indicates a masked value
-        assert raw_data.dtype == np.uint8
+        assert group.dtype == np.uint8
         scale = (dyn_range_max - dyn_range_min) / 255.
-        offset = dyn_range_min
-        sweep_data = np.ma.masked_array(
-            raw_data * scale + offset, mask=(raw_data == 0), dtype='float32')
     else:
         raise NotImplementedError('GAMIC data format: %s', fmt)
-    return sweep_data
+    offset = dyn_range_min
+
+    nrays, nbins = group.shape
+    selection = np.s_[start:start + nrays, :nbins]
+    group.read_direct(data, dest_sel=selection)
+    sweep_data = data[selection]
+    mask[selection] = sweep_data == 0
+    sweep_data *= scale
+    sweep_data += offset
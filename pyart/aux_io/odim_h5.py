@@ -10,6 +10,14 @@ Routines for reading ODIM_H5 files.
     read_odim_h5
     _to_str
     _get_odim_h5_sweep_data
+    _get_odim_h5_field_data
+    _read_odim_h5_sweep_data
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _ODIMH5StagedField
 
 """
 
@@ -26,6 +34,7 @@ from ..config import FileMetadata, get_fillvalue
 from ..io.common import make_time_unit_str, _test_arguments
 from ..core.radar import Radar
 from ..exceptions import MissingOptionalDependency
+from ..lazydict import LazyLoadDict
 
 
 ODIM_H5_FIELD_NAMES = {
@@ -49,8 +58,9 @@ ODIM_H5_FIELD_NAMES = {
 
 
 def read_odim_h5(filename, field_names=None, additional_metadata=None,
-                 file_field_names=False, exclude_fields=None, 
-                 include_fields=None, **kwargs):
+                 file_field_names=False, exclude_fields=None,
+                 include_fields=None, delay_field_loading=False, sweeps=None,
+                 **kwargs):
     """
     Read a ODIM_H5 file.
 
@@ -83,7 +93,14 @@ def read_odim_h5(filename, field_names=None, additional_metadata=None,
         List of fields to include from the radar object. This is applied
         after the `file_field_names` and `field_names` parameters. Set
         to None to include all fields not specified by exclude_fields.
-
+    delay_field_loading : bool, optional
+        True to delay loading of field data from the file until the 'data'
+        key in a particular field dictionary is accessed. In this case
+        the field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects and the file is kept open.
+    sweeps : list or None, optional
+        Indices of the sweeps (datasets in file order) to read. None (the
+        default) will read all sweeps.
 
     Returns
     -------
@@ -129,6 +146,8 @@ def read_odim_h5(filename, field_names=None, additional_metadata=None,
     # begin with dataset
     datasets = [k for k in hfile if k.startswith('dataset')]
     datasets.sort(key=lambda x: int(x[7:]))
+    if sweeps is not None:
+        datasets = [datasets[i] for i in sweeps]
     nsweeps = len(datasets)
 
     # latitude, longitude and altitude
@@ -218,7 +237,7 @@ def read_odim_h5(filename, field_names=None, additional_metadata=None,
 
     # range
     _range = filemetadata('range')
-    if 'rstart' in hfile['dataset1/where'].attrs:
+    if 'rstart' in hfile[datasets[0]]['where'].attrs:
         # derive range from rstart and rscale attributes if available
 
         # check that the gate spacing is constant between sweeps
@@ -246,11 +265,11 @@ def read_odim_h5(filename, field_names=None, additional_metadata=None,
         if any(max_range != max_range[0]):
             raise ValueError('maximum range changes between sweeps')
         # nbins is required
-        nbins = hfile['dataset1/data1/data'].shape[1]
+        max_nbins = hfile[datasets[0]]['data1/data'].shape[1]
         _range['data'] = np.linspace(
-            0, max_range[0] * 1000., nbins).astype('float32')
+            0, max_range[0] * 1000., max_nbins).astype('float32')
         _range['meters_to_center_of_first_gate'] = 0
-        _range['meters_between_gates'] = max_range[0] * 1000. / nbins
+        _range['meters_between_gates'] = max_range[0] * 1000. / max_nbins
 
     # azimuth
     azimuth = filemetadata('azimuth')
@@ -320,32 +339,32 @@ def read_odim_h5(filename, field_names=None, additional_metadata=None,
 
     # fields
     fields = {}
-    h_field_keys = [k for k in hfile['dataset1'] if k.startswith('data')]
-    odim_fields = [hfile['dataset1'][d]['what'].attrs['quantity'] for d in
+    h_field_keys = [k for k in hfile[datasets[0]] if k.startswith('data')]
+    odim_fields = [hfile[datasets[0]][d]['what'].attrs['quantity'] for d in
                    h_field_keys]
     for odim_field, h_field_key in zip(odim_fields, h_field_keys):
         field_name = filemetadata.get_field_name(_to_str(odim_field))
         if field_name is None:
             continue
-        fdata = np.ma.zeros((total_rays, max_nbins), dtype='float32')
-        start = 0
-        # loop over the sweeps, copy data into correct location in data array
-        for dset, rays_in_sweep in zip(datasets, rays_per_sweep):
-            sweep_data = _get_odim_h5_sweep_data(hfile[dset][h_field_key])
-            sweep_nbins = sweep_data.shape[1]
-            fdata[start:start + rays_in_sweep, :sweep_nbins] = sweep_data[:]
-            # set data to NaN if its beyond the range of this sweep
-            fdata[start:start + rays_in_sweep, sweep_nbins:max_nbins] = np.nan
-            start += rays_in_sweep
-        # create field dictionary
+        # create field dictionary, data beyond the range of a sweep is NaN
         field_dic = filemetadata(field_name)
-        field_dic['data'] = fdata
         field_dic['_FillValue'] = get_fillvalue()
+        data_call = _ODIMH5StagedField(
+            hfile, datasets, h_field_key, rays_per_sweep, max_nbins, np.nan)
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', data_call)
+        else:
+            field_dic['data'] = data_call()
         fields[field_name] = field_dic
 
     # instrument_parameters
     instrument_parameters = None
 
+    # do not close file if field loading is delayed
+    if not delay_field_loading:
+        hfile.close()
+
     return Radar(
         _time, _range, fields, metadata, scan_type,
         latitude, longitude, altitude,
@@ -365,24 +384,79 @@ def _to_str(text):
 
 def _get_odim_h5_sweep_data(group):
     """ Get ODIM_H5 sweet data from an HDF5 group. """
+    nrays, nbins = group['data'].shape
+    data = np.empty((nrays, nbins), dtype='float32')
+    mask = np.zeros((nrays, nbins), dtype='bool')
+    _read_odim_h5_sweep_data(group, data, mask, 0)
+    return np.ma.masked_array(data, mask)
 
-    # mask raw data
-    what = group['what']
-    raw_data = group['data'][:]
 
-    if 'nodata' in what.attrs:
-        nodata = what.attrs.get('nodata')
-        data = np.ma.masked_equal(raw_data, nodata)
-    else:
-        data = np.ma.masked_array(raw_data)
-    if 'undetect' in what.attrs:
-        undetect = what.attrs.get('undetect')
-        data[data == undetect] = np.ma.masked
-
-    offset = 0.0
-    gain = 1.0
-    if 'offset' in what.attrs:
-        offset = what.attrs.get('offset')
-    if 'gain' in what.attrs:
-        gain = what.attrs.get('gain')
-    return data * gain + offset
+def _get_odim_h5_field_data(hfile, datasets, h_field_key, rays_per_sweep,
+                            nbins, fill_value):
+    """
+    Get the data of a field from the ODIM_H5 datasets of all sweeps.
+
+    Gates beyond the number of bins in a sweep are set to fill_value.
+    """
+    total_rays = sum(rays_per_sweep)
+    data = np.empty((total_rays, nbins), dtype='float32')
+    mask = np.zeros((total_rays, nbins), dtype='bool')
+    start = 0
+    for dset, rays_in_sweep in zip(datasets, rays_per_sweep):
+        sweep_nbins = _read_odim_h5_sweep_data(
+            hfile[dset][h_field_key], data, mask, start)
+        data[start:start + rays_in_sweep, sweep_nbins:] = fill_value
+        start += rays_in_sweep
+    return np.ma.masked_array(data, mask)
+
+
+def _read_odim_h5_sweep_data(group, data, mask, start):
+    """
+    Read ODIM_H5 sweep data from an HDF5 group into rows of a float32 array.
+
+    The raw values are read directly into the array and scaled in place, the
+    corresponding rows of the mask are set where the raw value is nodata or
+    undetect. Returns the number of bins in the sweep.
+    """
+    what = group['what'].attrs
+    h_data = group['data']
+    nrays, nbins = h_data.shape
+    selection = np.s_[start:start + nrays, :nbins]
+    h_data.read_direct(data, dest_sel=selection)
+    sweep_data = data[selection]
+    sweep_mask = mask[selection]
+
+    # mask raw data, comparisons are made at the precision of the output
+    if 'nodata' in what:
+        sweep_mask |= sweep_data == np.float32(what['nodata'])
+    if 'undetect' in what:
+        sweep_mask |= sweep_data == np.float32(what['undetect'])
+
+    if 'gain' in what:
+        sweep_data *= what['gain']
+    if 'offset' in what:
+        sweep_data += what['offset']
+    return nbins
+
+
+class _ODIMH5StagedField(object):
+    """
+    A class to facilitate on demand loading of field data from an ODIM_H5
+    file.
+    """
+
+    def __init__(self, hfile, datasets, h_field_key, rays_per_sweep, nbins,
+                 fill_value):
+        """ initialize. """
+        self.hfile = hfile
+        self.datasets = datasets
+        self.h_field_key = h_field_key
+        self.rays_per_sweep = rays_per_sweep
+        self.nbins = nbins
+        self.fill_value = fill_value
+
+    def __call__(self):
+        """ Return the array containing the field data. """
+        return _get_odim_h5_field_data(
+            self.hfile, self.datasets, self.h_field_key, self.rays_per_sweep,
+            self.nbins, self.fill_value)
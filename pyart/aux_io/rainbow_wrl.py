@@ -2,41 +2,41 @@
 pyart.aux_io.rainbow
 ====================
 
-Routines for reading RAINBOW files (Used by SELEX) using the wradlib library
+Routines for reading RAINBOW files (Used by SELEX).
 
 .. autosummary::
     :toctree: generated/
 
     read_rainbow_wrl
+    _read_rainbow_header
+    _index_rainbow_blobs
+    _read_rainbow_blob
+    _unpack_rainbow_bits
+    _get_rainbow_field_data
+    _read_rainbow_sweep_data
     _get_angle
-    _get_data
     _get_time
 
-"""
-
-# specific modules for this function
-import os
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
 
-try:
-    import wradlib
-    _WRADLIB_AVAILABLE = True
-    # `read_rainbow` as of wradlib version 1.0.0
-    try:
-        from wradlib.io import read_Rainbow as read_rainbow
-    except ImportError:
-        from wradlib.io import read_rainbow
-except:
-    _WRADLIB_AVAILABLE = False
+    _RainbowStagedField
 
+"""
 
 import datetime
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+import zlib
 
 import numpy as np
 
 from ..config import FileMetadata, get_fillvalue
 from ..io.common import make_time_unit_str, _test_arguments
 from ..core.radar import Radar
-from ..exceptions import MissingOptionalDependency
+from ..lazydict import LazyLoadDict
 
 RAINBOW_FIELD_NAMES = {
     'W': 'spectrum_width',
@@ -71,10 +71,22 @@ RAINBOW_FIELD_NAMES = {
     'ISO0': 'iso0',  # non standard name
 }
 
+# marker separating the XML header from the binary BLOB section
+_END_XML_MARKER = b'<!-- END XML -->'
+
+# header preceding the data of each BLOB and the attributes in the header,
+# which may appear in any order
+_BLOB_HEADER_RE = re.compile(br'<BLOB\b(?P<attrs>[^>]*)>')
+_BLOB_ATTR_RE = re.compile(br'(\w+)\s*=\s*"([^"]*)"')
+
+# number of bytes read when looking for the next BLOB header
+_BLOB_HEADER_CHUNK = 256
+
 
 def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
                      file_field_names=False, exclude_fields=None,
-                     include_fields=None, **kwargs):
+                     include_fields=None, delay_field_loading=False,
+                     sweeps=None, **kwargs):
     """
     Read a RAINBOW file.
     This routine has been tested to read rainbow5 files version 5.22.3,
@@ -84,6 +96,10 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
     If necessary, the user should adapt to code according to its own
     file version and raise an issue upstream.
 
+    Only the XML header of the file is parsed and the positions of the
+    binary BLOBs are indexed, the compressed data of a sweep is read and
+    decompressed only when it is needed.
+
     Data types read by this routine:
     Reflectivity: dBZ, dBuZ, dBZv, dBuZv
     Velocity: V, Vu, Vv, Vvu
@@ -125,7 +141,15 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
         List of fields to include from the radar object. This is applied
         after the `file_field_names` and `field_names` parameters. Set
         to None to include all fields not specified by exclude_fields.
-
+    delay_field_loading : bool, optional
+        True to delay reading and decompressing the field data until the
+        'data' key in the field dictionary is accessed. In this case the
+        field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects. The file is opened again
+        when the data is loaded.
+    sweeps : list or None, optional
+        Indices of the sweeps (slices in file order) to read. None (the
+        default) will read all sweeps.
 
     Returns
     -------
@@ -133,12 +157,6 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
         Radar object containing data from RAINBOW file.
 
     """
-
-    # check that wradlib is available
-    if not _WRADLIB_AVAILABLE:
-        raise MissingOptionalDependency(
-            "wradlib is required to use read_rainbow_wrl but is not installed")
-
     # test for non empty kwargs
     _test_arguments(kwargs)
 
@@ -157,103 +175,94 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
                                 file_field_names, exclude_fields,
                                 include_fields)
 
-    rbf = read_rainbow(filename, loaddata=True)
-
-    # check the number of slices
-    nslices = int(rbf['volume']['scan']['pargroup']['numele'])
-    if nslices > 1:
-        single_slice = False
-        common_slice_info = rbf['volume']['scan']['slice'][0]
-    else:
-        single_slice = True
-        common_slice_info = rbf['volume']['scan']['slice']
-
-    # check the data type
-    # all slices should have the same data type
-    datatype = common_slice_info['slicedata']['rawdata']['@type']
-    field_name = filemetadata.get_field_name(datatype)
-    if field_name is None:
-        raise ValueError('Field Name Unknown')
-
-    # get definitions from filemetadata class
-    latitude = filemetadata('latitude')
-    longitude = filemetadata('longitude')
-    altitude = filemetadata('altitude')
-    metadata = filemetadata('metadata')
-    sweep_start_ray_index = filemetadata('sweep_start_ray_index')
-    sweep_end_ray_index = filemetadata('sweep_end_ray_index')
-    sweep_number = filemetadata('sweep_number')
-    sweep_mode = filemetadata('sweep_mode')
-    fixed_angle = filemetadata('fixed_angle')
-    elevation = filemetadata('elevation')
-    _range = filemetadata('range')
-    azimuth = filemetadata('azimuth')
-    _time = filemetadata('time')
-    field_dic = filemetadata(field_name)
-
-    # other metadata
-    scan_rate = filemetadata('scan_rate')
-    frequency = filemetadata('frequency')
-
-    # get general file information
-
-    # position and radar frequency
-    if 'sensorinfo' in rbf['volume'].keys():
-        latitude['data'] = np.array(
-            [rbf['volume']['sensorinfo']['lat']], dtype='float64')
-        longitude['data'] = np.array(
-            [rbf['volume']['sensorinfo']['lon']], dtype='float64')
-        altitude['data'] = np.array(
-            [rbf['volume']['sensorinfo']['alt']], dtype='float64')
-        frequency['data'] = np.array(
-            [3e8 / float(rbf['volume']['sensorinfo']['wavelen'])],
-            dtype='float64')
-    elif 'radarinfo' in rbf['volume'].keys():
-        latitude['data'] = np.array(
-            [rbf['volume']['radarinfo']['@lat']], dtype='float64')
-        longitude['data'] = np.array(
-            [rbf['volume']['radarinfo']['@lon']], dtype='float64')
-        altitude['data'] = np.array(
-            [rbf['volume']['radarinfo']['@alt']], dtype='float64')
-        frequency['data'] = np.array(
-            [3e8 / float(rbf['volume']['radarinfo']['wavelen'])],
-            dtype='float64')
-
-    # antenna speed
-    if 'antspeed' in common_slice_info:
-        ant_speed = float(common_slice_info['antspeed'])
-    else:
-        ant_speed = 10.
-        print('WARNING: Unable to read antenna speed. Default value of ' +
-              str(ant_speed) + ' deg/s will be used')
-
-    # angle step
-    angle_step = float(common_slice_info['anglestep'])
+    with open(filename, 'rb') as fh:
+        volume, blob_start = _read_rainbow_header(fh)
+        blobs = _index_rainbow_blobs(fh, blob_start)
+
+        # the first slice holds the parameters common to all slices
+        all_slices = volume.findall('scan/slice')
+        if not all_slices:
+            raise ValueError('No slices found in RAINBOW file')
+        common_slice_info = all_slices[0]
+        if sweeps is None:
+            slices = all_slices
+        else:
+            slices = [all_slices[i] for i in sweeps]
+        nslices = len(slices)
+
+        # check the data type
+        # all slices should have the same data type
+        datatype = common_slice_info.find('slicedata/rawdata').get('type')
+        field_name = filemetadata.get_field_name(datatype)
+        if field_name is None:
+            raise ValueError('Field Name Unknown')
+
+        # get definitions from filemetadata class
+        latitude = filemetadata('latitude')
+        longitude = filemetadata('longitude')
+        altitude = filemetadata('altitude')
+        metadata = filemetadata('metadata')
+        sweep_start_ray_index = filemetadata('sweep_start_ray_index')
+        sweep_end_ray_index = filemetadata('sweep_end_ray_index')
+        sweep_number = filemetadata('sweep_number')
+        sweep_mode = filemetadata('sweep_mode')
+        fixed_angle = filemetadata('fixed_angle')
+        elevation = filemetadata('elevation')
+        _range = filemetadata('range')
+        azimuth = filemetadata('azimuth')
+        _time = filemetadata('time')
+        field_dic = filemetadata(field_name)
+
+        # other metadata
+        frequency = filemetadata('frequency')
+
+        # get general file information
+
+        # position and radar frequency
+        sensorinfo = volume.find('sensorinfo')
+        radarinfo = volume.find('radarinfo')
+        if sensorinfo is not None:
+            latitude['data'] = np.array(
+                [sensorinfo.findtext('lat')], dtype='float64')
+            longitude['data'] = np.array(
+                [sensorinfo.findtext('lon')], dtype='float64')
+            altitude['data'] = np.array(
+                [sensorinfo.findtext('alt')], dtype='float64')
+            frequency['data'] = np.array(
+                [3e8 / float(sensorinfo.findtext('wavelen'))],
+                dtype='float64')
+        elif radarinfo is not None:
+            latitude['data'] = np.array(
+                [radarinfo.get('lat')], dtype='float64')
+            longitude['data'] = np.array(
+                [radarinfo.get('lon')], dtype='float64')
+            altitude['data'] = np.array(
+                [radarinfo.get('alt')], dtype='float64')
+            frequency['data'] = np.array(
+                [3e8 / float(radarinfo.findtext('wavelen'))],
+                dtype='float64')
+
+        # antenna speed
+        if common_slice_info.find('antspeed') is not None:
+            ant_speed = float(common_slice_info.findtext('antspeed'))
+        else:
+            ant_speed = 10.
+            print('WARNING: Unable to read antenna speed. Default value of ' +
+                  str(ant_speed) + ' deg/s will be used')
 
-    # sweep_number (is the sweep index)
-    sweep_number['data'] = np.arange(nslices, dtype='int32')
+        # angle step
+        angle_step = float(common_slice_info.findtext('anglestep'))
 
-    # get number of rays and number of range bins per sweep
-    rays_per_sweep = np.empty(nslices, dtype='int32')
+        # sweep_number (is the sweep index)
+        sweep_number['data'] = np.arange(nslices, dtype='int32')
 
-    if single_slice:
-        rays_per_sweep[0] = int(
-            common_slice_info['slicedata']['rawdata']['@rays'])
-        nbins = int(common_slice_info['slicedata']['rawdata']['@bins'])
-        ssri = np.array([0], dtype='int32')
-        seri = np.array([rays_per_sweep[0] - 1], dtype='int32')
-    else:
-        # number of range bins per ray in sweep
-        nbins_sweep = np.empty(nslices, dtype='int32')
-        for i in range(nslices):
-            slice_info = rbf['volume']['scan']['slice'][i]
-            # number of rays per sweep
-            rays_per_sweep[i] = int(
-                slice_info['slicedata']['rawdata']['@rays'])
-
-            # number of range bins per ray in sweep
-            nbins_sweep[i] = int(
-                slice_info['slicedata']['rawdata']['@bins'])
+        # get number of rays and number of range bins per sweep
+        rawdatas = [slice_info.find('slicedata/rawdata')
+                    for slice_info in slices]
+        rays_per_sweep = np.array(
+            [int(rawdata.get('rays')) for rawdata in rawdatas], dtype='int32')
+        nbins_sweep = np.array(
+            [int(rawdata.get('bins')) for rawdata in rawdatas], dtype='int32')
 
         # all sweeps have to have the same number of range bins
         if any(nbins_sweep != nbins_sweep[0]):
@@ -262,71 +271,74 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
         ssri = np.cumsum(np.append([0], rays_per_sweep[:-1])).astype('int32')
         seri = np.cumsum(rays_per_sweep).astype('int32') - 1
 
-    # total number of rays and sweep start ray index and end
-    total_rays = sum(rays_per_sweep)
-    sweep_start_ray_index['data'] = ssri
-    sweep_end_ray_index['data'] = seri
+        # total number of rays and sweep start ray index and end
+        total_rays = sum(rays_per_sweep)
+        sweep_start_ray_index['data'] = ssri
+        sweep_end_ray_index['data'] = seri
 
-    # range
-    r_res = float(common_slice_info['rangestep']) * 1000.
-    if 'start_range' in common_slice_info.keys():
-        start_range = float(common_slice_info['start_range']) * 1000.
-    else:
-        start_range = 0.
-    _range['data'] = np.linspace(
-        start_range+r_res / 2., float(nbins - 1.) * r_res+r_res / 2.,
-        nbins).astype('float32')
-
-    # containers for data
-    t_fixed_angle = np.empty(nslices, dtype='float64')
-    moving_angle = np.empty(total_rays, dtype='float64')
-    static_angle = np.empty(total_rays, dtype='float64')
-    time_data = np.empty(total_rays, dtype='float64')
-    fdata = np.ma.zeros((total_rays, nbins), dtype='float32',
-                        fill_value=get_fillvalue())
-
-    # read data from file
-    if bfile.endswith('.vol') or bfile.endswith('.azi'):
-        scan_type = 'ppi'
-        sweep_mode['data'] = np.array(nslices * ['azimuth_surveillance'])
-    else:
-        scan_type = 'rhi'
-        sweep_mode['data'] = np.array(['elevation_surveillance'])
-
-    # read data from file:
-    for i in range(nslices):
-        if single_slice:
-            slice_info = common_slice_info
+        # range
+        r_res = float(common_slice_info.findtext('rangestep')) * 1000.
+        if common_slice_info.find('start_range') is not None:
+            start_range = float(
+                common_slice_info.findtext('start_range')) * 1000.
         else:
-            slice_info = rbf['volume']['scan']['slice'][i]
-
-        # fixed angle
-        t_fixed_angle[i] = float(slice_info['posangle'])
-
-        # fixed angle (repeated for each ray)
-        static_angle[ssri[i]: seri[i]+1] = t_fixed_angle[i]
-
-        # moving angle
-        moving_angle[ssri[i]: seri[i]+1], angle_start, angle_stop = (
-            _get_angle(slice_info['slicedata']['rayinfo'],
-                       angle_step=angle_step, scan_type=scan_type))
-
-        # time
-        time_data[ssri[i]:seri[i]+1], sweep_start_epoch = (
-                _get_time(slice_info['slicedata']['@date'],
-                          slice_info['slicedata']['@time'],
+            start_range = 0.
+        _range['data'] = np.linspace(
+            start_range+r_res / 2., float(nbins - 1.) * r_res+r_res / 2.,
+            nbins).astype('float32')
+
+        # containers for data
+        t_fixed_angle = np.empty(nslices, dtype='float64')
+        moving_angle = np.empty(total_rays, dtype='float64')
+        static_angle = np.empty(total_rays, dtype='float64')
+        time_data = np.empty(total_rays, dtype='float64')
+
+        if bfile.endswith('.vol') or bfile.endswith('.azi'):
+            scan_type = 'ppi'
+            sweep_mode['data'] = np.array(nslices * ['azimuth_surveillance'])
+        else:
+            scan_type = 'rhi'
+            sweep_mode['data'] = np.array(['elevation_surveillance'])
+
+        # read angles from file, these are small and always read
+        for i, slice_info in enumerate(slices):
+            # fixed angle
+            t_fixed_angle[i] = float(slice_info.findtext('posangle'))
+
+            # fixed angle (repeated for each ray)
+            static_angle[ssri[i]: seri[i]+1] = t_fixed_angle[i]
+
+            # moving angle, from the start and optionally stop angles
+            angles = [
+                _read_rainbow_blob(fh, blobs, rayinfo)
+                for rayinfo in slice_info.findall('slicedata/rayinfo')]
+            angle_stop_raw = angles[1] if len(angles) > 1 else None
+            moving_angle[ssri[i]: seri[i]+1], angle_start, angle_stop = (
+                _get_angle(angles[0], angle_stop_raw, angle_step=angle_step,
+                           scan_type=scan_type))
+
+            # time
+            slicedata = slice_info.find('slicedata')
+            time_data[ssri[i]:seri[i]+1], sweep_start_epoch = (
+                _get_time(slicedata.get('date'), slicedata.get('time'),
                           angle_start[0], angle_stop[-1], angle_step,
                           rays_per_sweep[i], ant_speed, scan_type=scan_type))
 
-        if i == 0:
-            volume_start_epoch = sweep_start_epoch + 0.
-            start_time = (
-                datetime.datetime.utcfromtimestamp(volume_start_epoch))
-
-        # data
-        fdata[ssri[i]:seri[i]+1, :] = _get_data(
-            slice_info['slicedata']['rawdata'],
-            rays_per_sweep[i], nbins)
+            if i == 0:
+                volume_start_epoch = sweep_start_epoch + 0.
+                start_time = (
+                    datetime.datetime.utcfromtimestamp(volume_start_epoch))
+
+        # field data, decompressed now or when first accessed
+        rawdata_attrs = [dict(rawdata.attrib) for rawdata in rawdatas]
+        data_call = _RainbowStagedField(
+            filename, blobs, rawdata_attrs, nbins, datatype)
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', data_call)
+        else:
+            field_dic['data'] = _get_rainbow_field_data(
+                fh, blobs, rawdata_attrs, nbins, datatype)
 
     if bfile.endswith('.vol') or bfile.endswith('.azi'):
         azimuth['data'] = moving_angle
@@ -344,7 +356,6 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
     fields = {}
     # create field dictionary
     field_dic['_FillValue'] = get_fillvalue()
-    field_dic['data'] = fdata
     fields[field_name] = field_dic
 
     # metadata
@@ -360,14 +371,250 @@ def read_rainbow_wrl(filename, field_names=None, additional_metadata=None,
                  elevation, instrument_parameters=instrument_parameters)
 
 
-def _get_angle(ray_info, angle_step=None, scan_type='ppi'):
+def _read_rainbow_header(fh):
+    """
+    Parse the XML header of a RAINBOW file.
+
+    Parameters
+    ----------
+    fh : file-like
+        RAINBOW file opened in binary mode, positioned at the start.
+
+    Returns
+    -------
+    volume : Element
+        Root element of the XML header.
+    blob_start : int
+        Offset in the file at which the BLOB section starts.
+
+    """
+    header = b''
+    while True:
+        chunk = fh.read(65536)
+        if not chunk:
+            raise ValueError('RAINBOW file header is corrupt')
+        # the marker may straddle two chunks
+        search_start = max(len(header) - len(_END_XML_MARKER), 0)
+        header += chunk
+        end = header.find(_END_XML_MARKER, search_start)
+        if end != -1:
+            break
+    volume = ElementTree.fromstring(header[:end])
+    return volume, end + len(_END_XML_MARKER)
+
+
+def _index_rainbow_blobs(fh, start):
+    """
+    Index the BLOBs in a RAINBOW file without reading their data.
+
+    Parameters
+    ----------
+    fh : file-like
+        RAINBOW file opened in binary mode.
+    start : int
+        Offset in the file at which the BLOB section starts.
+
+    Returns
+    -------
+    blobs : dict
+        Offset of the data, size in bytes and compression of each BLOB
+        keyed by the BLOB id.
+
+    """
+    blobs = {}
+    pos = start
+    while True:
+        fh.seek(pos)
+        chunk = fh.read(_BLOB_HEADER_CHUNK)
+        match = _BLOB_HEADER_RE.search(chunk)
+        if match is None:
+            break
+        # the data starts on the line following the BLOB header
+        data_start = pos + match.end()
+        if chunk[match.end():match.end() + 1] == b'\n':
+            data_start += 1
+        attrs = dict(
+            (key.decode('ascii'), value.decode('ascii'))
+            for key, value in _BLOB_ATTR_RE.findall(match.group('attrs')))
+        if 'blobid' not in attrs or 'size' not in attrs:
+            raise ValueError('RAINBOW BLOB header is corrupt')
+        size = int(attrs['size'])
+        compression = attrs.get('compression')
+        blobs[int(attrs['blobid'])] = (data_start, size, compression)
+        pos = data_start + size
+    return blobs
+
+
+def _read_rainbow_blob(fh, blobs, element):
+    """
+    Read and decompress the BLOB referenced by an XML element.
+
+    Parameters
+    ----------
+    fh : file-like
+        RAINBOW file opened in binary mode.
+    blobs : dict
+        BLOB index as returned by :py:func:`_index_rainbow_blobs`.
+    element : Element or dict
+        XML element, or its attributes, with the blobid and depth
+        attributes and optionally the rays and bins attributes.
+
+    Returns
+    -------
+    data : array
+        Unsigned integer values of the BLOB, with shape (rays, bins) when
+        the number of bins is given. Depths which are not a multiple of 8
+        bits, such as 1 bit flags, are unpacked from the big endian bit
+        stream into uint8 or larger integers.
+
+    """
+    blobid = int(element.get('blobid'))
+    depth = int(element.get('depth'))
+    if blobid not in blobs:
+        raise ValueError('BLOB %d not found in RAINBOW file' % (blobid))
+    offset, size, compression = blobs[blobid]
+    fh.seek(offset)
+    buf = fh.read(size)
+    if compression == 'qt':
+        # Qt compression, a big endian uncompressed size and a zlib stream
+        buf = zlib.decompress(buf[4:])
+    if element.get('bins') is not None:
+        shape = (int(element.get('rays')), int(element.get('bins')))
+    else:
+        shape = (-1, )
+    if depth % 8 == 0:
+        data = np.frombuffer(buf, dtype='>u%d' % (depth // 8))
+    else:
+        data = _unpack_rainbow_bits(buf, depth, np.prod(shape))
+    return data.reshape(shape)
+
+
+def _unpack_rainbow_bits(buf, depth, count=-1):
+    """
+    Unpack unsigned integers of depth bits from a big endian bit stream.
+
+    Parameters
+    ----------
+    buf : bytes
+        Packed data.
+    depth : int
+        Number of bits in each value.
+    count : int, optional
+        Number of values to unpack, -1 unpacks all complete values.
+
+    Returns
+    -------
+    data : array
+        Unpacked values as the smallest unsigned integer type which holds
+        them.
+
+    """
+    bits = np.unpackbits(np.frombuffer(buf, dtype='uint8'))
+    if count < 0:
+        count = len(bits) // depth
+    if count * depth > len(bits):
+        raise ValueError('RAINBOW BLOB is too small for its data')
+    bits = bits[:count * depth].reshape(count, depth)
+    dtype = np.min_scalar_type(2 ** depth - 1)
+    weights = (2 ** np.arange(depth - 1, -1, -1)).astype(dtype)
+    return bits.dot(weights).astype(dtype)
+
+
+def _get_rainbow_field_data(fh, blobs, rawdata_attrs, nbins, datatype):
+    """
+    Get the field data of all sweeps from a RAINBOW file.
+
+    Parameters
+    ----------
+    fh : file-like
+        RAINBOW file opened in binary mode.
+    blobs : dict
+        BLOB index as returned by :py:func:`_index_rainbow_blobs`.
+    rawdata_attrs : list of dict
+        Attributes of the rawdata element of each sweep.
+    nbins : int
+        Number of bins in each ray.
+    datatype : str
+        RAINBOW data type of the field.
+
+    Returns
+    -------
+    data : MaskedArray
+        Field data of all sweeps.
+
+    """
+    fill_value = get_fillvalue()
+    total_rays = sum(int(attrs['rays']) for attrs in rawdata_attrs)
+    data = np.empty((total_rays, nbins), dtype='float32')
+    mask = np.empty((total_rays, nbins), dtype='bool')
+    start = 0
+    for attrs in rawdata_attrs:
+        start += _read_rainbow_sweep_data(
+            fh, blobs, attrs, data, mask, start)
+
+    # put phidp data in the range [-180, 180]
+    if datatype in ('PhiDP', 'uPhiDP', 'uPhiDPu'):
+        data[data > 180.] -= 360.
+
+    # fill invalid data with fill value
+    data[mask] = fill_value
+    return np.ma.array(data, mask=mask, fill_value=fill_value)
+
+
+def _read_rainbow_sweep_data(fh, blobs, attrs, data, mask, start):
+    """
+    Read RAINBOW sweep data into rows of a float32 array.
+
+    The raw values are decompressed, converted into the array and scaled in
+    place, the corresponding rows of the mask are set where the raw value is
+    zero. Returns the number of rays in the sweep.
+    """
+    raw = _read_rainbow_blob(fh, blobs, attrs)
+    nrays = raw.shape[0]
+    sweep_data = data[start:start + nrays]
+    np.equal(raw, 0, out=mask[start:start + nrays])
+
+    datamin = float(attrs['min'])
+    datamax = float(attrs['max'])
+    datadepth = float(attrs['depth'])
+    sweep_data[...] = raw
+    sweep_data *= (datamax - datamin) / 2 ** datadepth
+    sweep_data += datamin
+    return nrays
+
+
+class _RainbowStagedField(object):
+    """
+    A class to facilitate on demand loading of field data from a RAINBOW
+    file.
+    """
+
+    def __init__(self, filename, blobs, rawdata_attrs, nbins, datatype):
+        """ initialize. """
+        self.filename = filename
+        self.blobs = blobs
+        self.rawdata_attrs = rawdata_attrs
+        self.nbins = nbins
+        self.datatype = datatype
+
+    def __call__(self):
+        """ Return the array containing the field data. """
+        with open(self.filename, 'rb') as fh:
+            return _get_rainbow_field_data(
+                fh, self.blobs, self.rawdata_attrs, self.nbins, self.datatype)
+
+
+def _get_angle(start_data, stop_data=None, angle_step=None, scan_type='ppi'):
     """
     obtains the ray angle start, stop and center
 
     Parameters
     ----------
-    ray_info : dictionary of dictionaries
-        contains the ray info
+    start_data : numpy array
+        raw values of the ray start angles
+    stop_data : numpy array
+        Optional. raw values of the ray stop angles. If None the stop angles
+        are computed from the angle step.
     angle_step : float
         Optional. The angle step. Used in case there is no information of
         angle stop. Otherwise ignored.
@@ -393,14 +640,13 @@ def _get_angle(ray_info, angle_step=None, scan_type='ppi'):
             angle[ind] -= 360.
         return angle
 
-    try:
-        angle_start = _extract_angles(ray_info['data'])
+    angle_start = _extract_angles(start_data)
+    if stop_data is None:
         if angle_step is None:
             raise ValueError('Unknown angle step')
         angle_stop = angle_start + angle_step
-    except TypeError:
-        angle_start = _extract_angles(ray_info[0]['data'])
-        angle_stop = _extract_angles(ray_info[1]['data'])
+    else:
+        angle_stop = _extract_angles(stop_data)
 
     moving_angle = np.angle((np.exp(1.j * np.deg2rad(angle_start)) +
                             np.exp(1.j * np.deg2rad(angle_stop))) / 2.,
@@ -410,52 +656,6 @@ def _get_angle(ray_info, angle_step=None, scan_type='ppi'):
     return moving_angle, angle_start, angle_stop
 
 
-def _get_data(rawdata, nrays, nbins):
-    """
-    Obtains the raw data
-
-    Parameters
-    ----------
-    rawdata : dictionary of dictionaries
-        contains the raw data information
-    nrays : int
-        Number of rays in sweep
-    nbins : int
-        Number of bins in ray
-
-    Returns
-    -------
-    data : numpy array
-        the data
-
-    """
-    databin = rawdata['data']
-    datamin = float(rawdata['@min'])
-    datamax = float(rawdata['@max'])
-    datadepth = float(rawdata['@depth'])
-    datatype = rawdata['@type']
-
-    data = np.array(datamin+databin*(datamax-datamin) / 2 ** datadepth,
-                    dtype='float32')
-
-    # fill invalid data with fill value
-    mask = databin == 0
-    data[mask.nonzero()] = get_fillvalue()
-
-    # put phidp data in the range [-180, 180]
-    if (datatype == 'PhiDP') or (datatype == 'uPhiDP') or (
-            datatype == 'uPhiDPu'):
-        is_above_180 = data > 180.
-        data[is_above_180.nonzero()] -= 360.
-
-    data = np.reshape(data, [nrays, nbins])
-    mask = np.reshape(mask, [nrays, nbins])
-
-    masked_data = np.ma.array(data, mask=mask, fill_value=get_fillvalue())
-
-    return masked_data
-
-
 def _get_time(date_sweep, time_sweep, first_angle_start, last_angle_stop,
               angle_step, nrays, ant_speed, scan_type='ppi'):
     """
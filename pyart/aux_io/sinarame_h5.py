@@ -38,6 +38,8 @@ from ..io.common import make_time_unit_str, _test_arguments
 from ..io import write_cfradial
 from ..core.radar import Radar
 from ..exceptions import MissingOptionalDependency
+from ..lazydict import LazyLoadDict
+from .odim_h5 import _ODIMH5StagedField, _read_odim_h5_sweep_data
 
 
 SINARAME_H5_FIELD_NAMES = {
@@ -61,7 +63,8 @@ SINARAME_H5_FIELD_NAMES = {
 
 def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
                      file_field_names=False, exclude_fields=None,
-                     include_fields=None, **kwargs):
+                     include_fields=None, delay_field_loading=False,
+                     sweeps=None, **kwargs):
     """
     Read a SINARAME_H5 file.
 
@@ -94,7 +97,14 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
         List of fields to include from the radar object. This is applied
         after the `file_field_names` and `field_names` parameters. Set
         to None to include all fields not specified by exclude_fields.
-
+    delay_field_loading : bool, optional
+        True to delay loading of field data from the file until the 'data'
+        key in a particular field dictionary is accessed. In this case
+        the field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects and the file is kept open.
+    sweeps : list or None, optional
+        Indices of the sweeps (datasets in file order) to read. None (the
+        default) will read all sweeps.
 
     Returns
     -------
@@ -137,6 +147,8 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
     # begin with dataset
     datasets = [k for k in hfile if k.startswith('dataset')]
     datasets.sort(key=lambda x: int(x[7:]))
+    if sweeps is not None:
+        datasets = [datasets[i] for i in sweeps]
     nsweeps = len(datasets)
 
     # latitude, longitude and altitude
@@ -226,7 +238,7 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
 
     # range
     _range = filemetadata('range')
-    if 'rstart' in hfile['dataset1/where'].attrs:
+    if 'rstart' in hfile[datasets[0]]['where'].attrs:
         # derive range from rstart and rscale attributes if available
 
         # check that the gate spacing is constant between sweeps
@@ -236,7 +248,7 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
         rscale = [hfile[d]['where'].attrs['rscale'] for d in datasets]
         if any(rscale != rscale[0]):
             raise ValueError('range scale changes between sweeps')
-        nbins = int(hfile['dataset1']['where'].attrs['nbins'])
+        nbins = int(hfile[datasets[0]]['where'].attrs['nbins'])
         _range['data'] = (np.arange(nbins, dtype='float32') * rscale[0] +
                           rstart[0])
         _range['meters_to_center_of_first_gate'] = rstart[0]
@@ -252,7 +264,7 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
         if any(max_range != max_range[0]):
             raise ValueError('maximum range changes between sweeps')
         # nbins is required
-        nbins = hfile['dataset1/data1/data'].shape[1]
+        nbins = hfile[datasets[0]]['data1/data'].shape[1]
         _range['data'] = np.linspace(
             0, max_range[0] * 1000., nbins, dtype='float32')
         _range['meters_to_center_of_first_gate'] = 0
@@ -326,25 +338,23 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
 
     # fields
     fields = {}
-    h_field_keys = [k for k in hfile['dataset1'] if k.startswith('data')]
-    SINARAME_fields = [hfile['dataset1'][d]['what'].attrs['quantity'] for d in
-                       h_field_keys]
+    h_field_keys = [k for k in hfile[datasets[0]] if k.startswith('data')]
+    SINARAME_fields = [hfile[datasets[0]][d]['what'].attrs['quantity']
+                       for d in h_field_keys]
     for SINARAME_field, h_field_key in zip(SINARAME_fields, h_field_keys):
         field_name = filemetadata.get_field_name(_to_str(SINARAME_field))
         if field_name is None:
             continue
-        fdata = np.ma.zeros((total_rays, nbins), dtype='float32')
-        start = 0
-        # loop over the sweeps, copy data into correct location in data array
-        for dset, rays_in_sweep in zip(datasets, rays_per_sweep):
-            sweep_data = _get_SINARAME_h5_sweep_data(hfile[dset][h_field_key])
-            sweep_nbins = sweep_data.shape[1]
-            fdata[start:start + rays_in_sweep, :sweep_nbins] = sweep_data[:]
-            start += rays_in_sweep
-        # create field dictionary
+        # create field dictionary, data beyond the range of a sweep is zero
         field_dic = filemetadata(field_name)
-        field_dic['data'] = fdata
         field_dic['_FillValue'] = get_fillvalue()
+        data_call = _ODIMH5StagedField(
+            hfile, datasets, h_field_key, rays_per_sweep, nbins, 0.)
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', data_call)
+        else:
+            field_dic['data'] = data_call()
         fields[field_name] = field_dic
         # Add missing metadata
         if file_field_names:
@@ -354,6 +364,10 @@ def read_sinarame_h5(filename, field_names=None, additional_metadata=None,
     # instrument_parameters
     instrument_parameters = None
 
+    # do not close file if field loading is delayed
+    if not delay_field_loading:
+        hfile.close()
+
     return Radar(
         _time, _range, fields, metadata, scan_type,
         latitude, longitude, altitude,
@@ -473,24 +487,8 @@ def _to_str(text):
 
 def _get_SINARAME_h5_sweep_data(group):
     """ Get SINARAME_H5 sweet data from an HDF5 group. """
-
-    # mask raw data
-    what = group['what']
-    raw_data = group['data'][:]
-
-    if 'nodata' in what.attrs:
-        nodata = what.attrs.get('nodata')
-        data = np.ma.masked_equal(raw_data, nodata)
-    else:
-        data = np.ma.masked_array(raw_data)
-    if 'undetect' in what.attrs:
-        undetect = what.attrs.get('undetect')
-        data[data == undetect] = np.ma.masked
-
-    offset = 0.0
-    gain = 1.0
-    if 'offset' in what.attrs:
-        offset = what.attrs.get('offset')
-    if 'gain' in what.attrs:
-        gain = what.attrs.get('gain')
-    return data * gain + offset
+    nrays, nbins = group['data'].shape
+    data = np.empty((nrays, nbins), dtype='float32')
+    mask = np.zeros((nrays, nbins), dtype='bool')
+    _read_odim_h5_sweep_data(group, data, mask, 0)
+    return np.ma.masked_array(data, mask)
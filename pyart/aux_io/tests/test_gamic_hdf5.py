@@ -0,0 +1,156 @@
+""" Unit Tests for Py-ART's aux_io/gamic_hdf5.py module. """
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+import pytest
+
+import pyart
+from pyart.lazydict import LazyLoadDict
+
+h5py = pytest.importorskip('h5py')
+
+NRAYS = 4
+RAY_HEADER_DTYPE = np.dtype([
+    ('timestamp', 'i8'), ('azimuth_start', 'f8'), ('azimuth_stop', 'f8'),
+    ('elevation_start', 'f8'), ('elevation_stop', 'f8'), ('az_speed', 'f8')])
+
+
+def _raw_data(scan, nbins):
+    """ Return the raw UV8 values of a scan, zero is no data. """
+    raw = (np.arange(NRAYS * nbins).reshape(NRAYS, nbins) * 7 + scan) % 256
+    raw[scan % NRAYS, 1] = 0
+    return raw.astype('uint8')
+
+
+def _write_gamic(filename):
+    """
+    Write a small synthetic GAMIC volume with three scans. The first scan
+    has more bins than the others and only a reflectivity moment, the others
+    also have a velocity moment.
+    """
+    nbins_scans = [8, 5, 5]
+    with h5py.File(filename, 'w') as hfile:
+        hfile.create_group('what').attrs['sets'] = 3
+        where = hfile.create_group('where')
+        where.attrs['lat'] = 47.5
+        where.attrs['lon'] = 8.5
+        where.attrs['height'] = 500.
+        how = hfile.create_group('how')
+        how.attrs['azimuth_beam'] = 1.
+        how.attrs['elevation_beam'] = 1.
+
+        for i, nbins in enumerate(nbins_scans):
+            scan = hfile.create_group('scan%d' % i)
+            scan.create_group('what').attrs['scan_type'] = np.bytes_(b'PPI')
+            how = scan.create_group('how')
+            for attr, value in [
+                    ('ray_count', NRAYS), ('bin_count', nbins),
+                    ('range_start', 100. * (i + 1)), ('range_samples', 1),
+                    ('range_step', 250.), ('elevation', 0.5 + i),
+                    ('angle_step', 90.), ('angle_sync', 1),
+                    ('scan_speed', 24.), ('radar_wave_length', 0.05),
+                    ('pulse_width_us', 0.5 + i), ('PRF', 1000.),
+                    ('unfolding', 0), ('range', 150000.),
+                    ('time_samples', 32)]:
+                how.attrs[attr] = value
+            how.create_group('extended').attrs['nyquist_velocity'] = 8. + i
+
+            ray_header = np.zeros(NRAYS, dtype=RAY_HEADER_DTYPE)
+            ray_header['timestamp'] = (
+                1388577600 + 20 * i + np.arange(NRAYS) * 4) * 1000000
+            ray_header['azimuth_start'] = np.arange(NRAYS) * 90.
+            ray_header['azimuth_stop'] = np.arange(NRAYS) * 90. + 90.
+            ray_header['elevation_start'] = 0.5 + i
+            ray_header['elevation_stop'] = 0.5 + i
+            ray_header['az_speed'] = 24.
+            scan.create_dataset('ray_header', data=ray_header)
+
+            moments = [(b'Zh', b'dBZ', -31.5, 95.5)]
+            if i > 0:
+                moments.append((b'Vh', b'm/s', -16., 16.))
+            for j, (moment, unit, vmin, vmax) in enumerate(moments):
+                dset = scan.create_dataset(
+                    'moment_%d' % j, data=_raw_data(i + j, nbins))
+                # fixed length strings, read as bytes as in GAMIC files
+                dset.attrs['moment'] = np.bytes_(moment)
+                dset.attrs['unit'] = np.bytes_(unit)
+                dset.attrs['format'] = np.bytes_(b'UV8')
+                dset.attrs['dyn_range_min'] = vmin
+                dset.attrs['dyn_range_max'] = vmax
+
+
+def _expected_data(scans, moment, nbins, vmin, vmax):
+    data = np.ma.masked_all((NRAYS * len(scans), nbins), dtype='float32')
+    for k, scan in enumerate(scans):
+        raw = _raw_data(scan + moment, 5 if scan else 8)[:, :nbins]
+        sweep = raw * np.float32((vmax - vmin) / 255.) + np.float32(vmin)
+        data[k * NRAYS:(k + 1) * NRAYS, :raw.shape[1]] = np.ma.masked_where(
+            raw == 0, sweep)
+    return data
+
+
+def _assert_data_equal(data, expected):
+    assert data.shape == expected.shape
+    assert_array_equal(np.ma.getmaskarray(data), expected.mask)
+    assert_allclose(data.compressed(), expected.compressed(), rtol=1e-6)
+
+
+def test_read_gamic():
+    with pyart.testing.InTemporaryDirectory():
+        _write_gamic('test.h5')
+        radar = pyart.aux_io.read_gamic('test.h5')
+
+    assert radar.scan_type == 'ppi'
+    assert radar.nsweeps == 3
+    assert radar.nrays == 3 * NRAYS
+    assert radar.ngates == 8
+    assert_allclose(radar.range['data'][:2], [100., 350.])
+    assert_allclose(radar.fixed_angle['data'], [0.5, 1.5, 2.5])
+    assert_allclose(radar.azimuth['data'], np.tile([45, 135, 225, 315], 3))
+    assert_allclose(radar.time['data'][[0, 4, 8]], [0, 20, 40])
+    assert radar.time['units'] == 'seconds since 2014-01-01T12:00:00Z'
+    assert_allclose(
+        radar.instrument_parameters['pulse_width']['data'][[0, 4]],
+        [0.5e-6, 1.5e-6])
+    # only the moments of the first scan are read
+    assert list(radar.fields) == ['corrected_reflectivity']
+    assert radar.fields['corrected_reflectivity']['units'] == 'dBZ'
+    _assert_data_equal(radar.fields['corrected_reflectivity']['data'],
+                       _expected_data([0, 1, 2], 0, 8, -31.5, 95.5))
+
+
+def test_read_gamic_sweeps():
+    # parameters common to all scans are taken from the first scan read
+    with pyart.testing.InTemporaryDirectory():
+        _write_gamic('test.h5')
+        radar = pyart.aux_io.read_gamic('test.h5', sweeps=[2, 1])
+
+    assert radar.nsweeps == 2
+    assert radar.ngates == 5
+    assert_allclose(radar.range['data'][:2], [300., 550.])
+    assert_allclose(radar.fixed_angle['data'], [2.5, 1.5])
+    assert_allclose(
+        radar.instrument_parameters['nyquist_velocity']['data'][[0, 4]],
+        [10., 9.])
+    assert sorted(radar.fields) == ['corrected_reflectivity',
+                                    'corrected_velocity']
+    assert radar.fields['corrected_velocity']['units'] == 'm/s'
+    _assert_data_equal(radar.fields['corrected_reflectivity']['data'],
+                       _expected_data([2, 1], 0, 5, -31.5, 95.5))
+    _assert_data_equal(radar.fields['corrected_velocity']['data'],
+                       _expected_data([2, 1], 1, 5, -16., 16.))
+
+
+@pytest.mark.parametrize('sweeps', [None, [1], [0, 2]])
+def test_read_gamic_delay_field_loading(sweeps):
+    with pyart.testing.InTemporaryDirectory():
+        _write_gamic('test.h5')
+        radar = pyart.aux_io.read_gamic('test.h5', sweeps=sweeps)
+        lazy_radar = pyart.aux_io.read_gamic(
+            'test.h5', sweeps=sweeps, delay_field_loading=True)
+        assert list(lazy_radar.fields) == list(radar.fields)
+        for field_name, field in radar.fields.items():
+            lazy_field = lazy_radar.fields[field_name]
+            assert isinstance(lazy_field, LazyLoadDict)
+            assert_array_equal(lazy_field['data'].mask, field['data'].mask)
+            assert_array_equal(lazy_field['data'].data, field['data'].data)
@@ -0,0 +1,129 @@
+""" Unit Tests for Py-ART's aux_io/odim_h5.py and sinarame_h5.py modules. """
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+import pytest
+
+import pyart
+from pyart.lazydict import LazyLoadDict
+
+h5py = pytest.importorskip('h5py')
+
+NRAYS = 4
+NBINS = 5
+QUANTITIES = [('DBZH', 0.5, -32.), ('VRAD', 0.25, -16.)]
+
+
+def _raw_data(dataset, data):
+    """ Return raw values of a dataset, 0 is undetect and 255 is nodata. """
+    raw = np.arange(NRAYS * NBINS).reshape(NRAYS, NBINS) * 9 + dataset + data
+    raw = raw % 250 + 1
+    raw[dataset % NRAYS, 1] = 0
+    raw[dataset % NRAYS, 3] = 255
+    return raw.astype('uint8')
+
+
+def _write_odim_h5(filename, ndatasets=3):
+    """ Write a small synthetic ODIM_H5 polar volume. """
+    with h5py.File(filename, 'w') as hfile:
+        hfile.attrs['Conventions'] = np.bytes_(b'ODIM_H5/V2_2')
+        what = hfile.create_group('what')
+        what.attrs['object'] = np.bytes_(b'PVOL')
+        what.attrs['version'] = np.bytes_(b'H5rad 2.2')
+        what.attrs['source'] = np.bytes_(b'NOD:test')
+        where = hfile.create_group('where')
+        where.attrs['lat'] = 47.5
+        where.attrs['lon'] = 8.5
+        where.attrs['height'] = 500.
+
+        for i in range(ndatasets):
+            dataset = hfile.create_group('dataset%d' % (i + 1))
+            what = dataset.create_group('what')
+            what.attrs['startdate'] = np.bytes_(b'20140101')
+            what.attrs['starttime'] = np.bytes_(b'1200%02d' % (20 * i))
+            what.attrs['enddate'] = np.bytes_(b'20140101')
+            what.attrs['endtime'] = np.bytes_(b'1200%02d' % (20 * i + 12))
+            where = dataset.create_group('where')
+            where.attrs['elangle'] = 0.5 + i
+            where.attrs['nrays'] = NRAYS
+            where.attrs['nbins'] = NBINS
+            where.attrs['rstart'] = 0.
+            where.attrs['rscale'] = 250.
+            for j, (quantity, gain, offset) in enumerate(QUANTITIES):
+                data = dataset.create_group('data%d' % (j + 1))
+                data.create_dataset('data', data=_raw_data(i, j))
+                what = data.create_group('what')
+                what.attrs['quantity'] = np.bytes_(quantity.encode('ascii'))
+                what.attrs['gain'] = gain
+                what.attrs['offset'] = offset
+                what.attrs['nodata'] = 255.
+                what.attrs['undetect'] = 0.
+
+
+def _expected_data(datasets, data):
+    raw = np.concatenate([_raw_data(i, data) for i in datasets])
+    _, gain, offset = QUANTITIES[data]
+    values = raw.astype('float32') * np.float32(gain) + np.float32(offset)
+    return np.ma.masked_where((raw == 0) | (raw == 255), values)
+
+
+def _assert_data_equal(data, expected):
+    assert data.shape == expected.shape
+    assert_array_equal(np.ma.getmaskarray(data), expected.mask)
+    assert_allclose(data.compressed(), expected.compressed(), rtol=1e-6)
+
+
+READERS = [pyart.aux_io.read_odim_h5, pyart.aux_io.read_sinarame_h5]
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_read_odim_h5(reader):
+    with pyart.testing.InTemporaryDirectory():
+        _write_odim_h5('test.h5')
+        radar = reader('test.h5')
+
+    assert radar.scan_type == 'ppi'
+    assert radar.nsweeps == 3
+    assert radar.nrays == 3 * NRAYS
+    assert radar.ngates == NBINS
+    assert_allclose(radar.range['data'], [0, 250, 500, 750, 1000])
+    assert_allclose(radar.fixed_angle['data'], [0.5, 1.5, 2.5])
+    assert_allclose(radar.elevation['data'], np.repeat([0.5, 1.5, 2.5], 4))
+    assert_allclose(radar.azimuth['data'], np.tile([0, 90, 180, 270], 3))
+    assert_allclose(radar.time['data'][[0, 3, 4, 8]], [0, 12, 20, 40])
+    assert radar.time['units'] == 'seconds since 2014-01-01T12:00:00Z'
+    _assert_data_equal(radar.fields['reflectivity']['data'],
+                       _expected_data([0, 1, 2], 0))
+    _assert_data_equal(radar.fields['velocity']['data'],
+                       _expected_data([0, 1, 2], 1))
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_read_odim_h5_sweeps(reader):
+    with pyart.testing.InTemporaryDirectory():
+        _write_odim_h5('test.h5')
+        radar = reader('test.h5', sweeps=[2, 0])
+
+    assert radar.nsweeps == 2
+    assert_array_equal(radar.sweep_start_ray_index['data'], [0, NRAYS])
+    assert_allclose(radar.fixed_angle['data'], [2.5, 0.5])
+    assert_allclose(radar.time['data'][[0, 4]], [40, 0])
+    _assert_data_equal(radar.fields['reflectivity']['data'],
+                       _expected_data([2, 0], 0))
+    _assert_data_equal(radar.fields['velocity']['data'],
+                       _expected_data([2, 0], 1))
+
+
+@pytest.mark.parametrize('reader', READERS)
+@pytest.mark.parametrize('sweeps', [None, [1], [0, 2]])
+def test_read_odim_h5_delay_field_loading(reader, sweeps):
+    with pyart.testing.InTemporaryDirectory():
+        _write_odim_h5('test.h5')
+        radar = reader('test.h5', sweeps=sweeps)
+        lazy_radar = reader('test.h5', sweeps=sweeps, delay_field_loading=True)
+        assert list(lazy_radar.fields) == list(radar.fields)
+        for field_name, field in radar.fields.items():
+            lazy_field = lazy_radar.fields[field_name]
+            assert isinstance(lazy_field, LazyLoadDict)
+            assert_array_equal(lazy_field['data'].mask, field['data'].mask)
+            assert_array_equal(lazy_field['data'].data, field['data'].data)
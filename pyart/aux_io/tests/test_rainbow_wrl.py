@@ -0,0 +1,151 @@
+""" Unit Tests for Py-ART's aux_io/rainbow_wrl.py module. """
+
+import struct
+import zlib
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+import pytest
+
+import pyart
+from pyart.aux_io.rainbow_wrl import _unpack_rainbow_bits
+from pyart.lazydict import LazyLoadDict
+
+NRAYS = 4
+NBINS = 5
+DATA_MIN = -31.5
+DATA_MAX = 95.5
+
+
+def _qt_blob(blobid, array, swap_attributes=False):
+    """ Return a Qt compressed BLOB holding a big endian array. """
+    raw = array.tobytes()
+    buf = struct.pack('>I', len(raw)) + zlib.compress(raw)
+    if swap_attributes:
+        header = '<BLOB compression="qt" size="%d" blobid="%d">' % (
+            len(buf), blobid)
+    else:
+        header = '<BLOB blobid="%d" size="%d" compression="qt">' % (
+            blobid, len(buf))
+    return header.encode('ascii') + b'\n' + buf + b'\n</BLOB>\n'
+
+
+def _raw_data(sweep):
+    """ Return the raw reflectivity values of a sweep, zero is no data. """
+    raw = np.arange(NRAYS * NBINS).reshape(NRAYS, NBINS) * 10 + sweep
+    raw[sweep % NRAYS, 1] = 0
+    return raw.astype('>u1')
+
+
+def _write_rainbow_vol(filename, posangles=(0.5, 1.5, 2.5)):
+    """ Write a small synthetic RAINBOW volume file. """
+    slices = []
+    blobs = []
+    for i, posangle in enumerate(posangles):
+        start = np.arange(NRAYS) * (65536 // NRAYS)
+        blobs.append(_qt_blob(2 * i, start.astype('>u2')))
+        blobs.append(_qt_blob(2 * i + 1, _raw_data(i), swap_attributes=i))
+        if i == 0:
+            common = ('<antspeed>24</antspeed><anglestep>90</anglestep>'
+                      '<rangestep>0.5</rangestep>')
+        else:
+            common = ''
+        slices.append(
+            '<slice refid="%d">%s<posangle>%.1f</posangle>'
+            '<slicedata time="12:00:%02d" date="2014-01-01">'
+            '<rayinfo refid="startangle" blobid="%d" rays="%d" depth="16"/>'
+            '<rawdata blobid="%d" rays="%d" type="dBZ" bins="%d" '
+            'min="%.1f" max="%.1f" depth="8"/>'
+            '</slicedata></slice>' % (
+                i, common, posangle, 20 * i, 2 * i, NRAYS, 2 * i + 1, NRAYS,
+                NBINS, DATA_MIN, DATA_MAX))
+    xml = (
+        '<volume version="5.34.16" datetime="2014-01-01T12:00:00" type="vol">'
+        '<sensorinfo type="gdrx" id="TEST" name="TEST">'
+        '<lon>8.5</lon><lat>47.5</lat><alt>500.0</alt>'
+        '<wavelen>0.05</wavelen></sensorinfo>'
+        '<scan name="test.vol">%s</scan></volume>\n' % ''.join(slices))
+    with open(filename, 'wb') as fh:
+        fh.write(xml.encode('ascii') + b'<!-- END XML -->\n')
+        fh.write(b''.join(blobs))
+
+
+def _expected_reflectivity(sweeps):
+    raw = np.concatenate([_raw_data(i) for i in sweeps]).astype('float32')
+    data = raw * (DATA_MAX - DATA_MIN) / 2 ** 8 + DATA_MIN
+    return np.ma.masked_where(raw == 0, data)
+
+
+def _assert_reflectivity(radar, sweeps):
+    expected = _expected_reflectivity(sweeps)
+    data = radar.fields['reflectivity']['data']
+    assert data.shape == (NRAYS * len(sweeps), NBINS)
+    assert_array_equal(np.ma.getmaskarray(data), expected.mask)
+    assert_allclose(data.compressed(), expected.compressed(), rtol=1e-6)
+
+
+def test_read_rainbow_wrl():
+    with pyart.testing.InTemporaryDirectory():
+        _write_rainbow_vol('test.vol')
+        radar = pyart.aux_io.read_rainbow_wrl('test.vol')
+
+    assert radar.scan_type == 'ppi'
+    assert radar.nsweeps == 3
+    assert radar.nrays == 3 * NRAYS
+    assert radar.ngates == NBINS
+    assert_allclose(radar.fixed_angle['data'], [0.5, 1.5, 2.5])
+    assert_allclose(radar.elevation['data'], np.repeat([0.5, 1.5, 2.5], 4))
+    assert_allclose(radar.azimuth['data'], np.tile([45, 135, 225, 315], 3))
+    assert_allclose(radar.range['data'], [250, 750, 1250, 1750, 2250])
+    assert_allclose(radar.latitude['data'], [47.5])
+    assert_allclose(radar.instrument_parameters['frequency']['data'], [6e9])
+    assert radar.time['units'] == 'seconds since 2014-01-01T12:00:00Z'
+    assert_allclose(radar.time['data'][[0, 4, 8]], [3.75, 23.75, 43.75])
+    _assert_reflectivity(radar, [0, 1, 2])
+
+
+@pytest.mark.parametrize('delay_field_loading', [False, True])
+def test_read_rainbow_wrl_sweeps(delay_field_loading):
+    with pyart.testing.InTemporaryDirectory():
+        _write_rainbow_vol('test.vol')
+        radar = pyart.aux_io.read_rainbow_wrl(
+            'test.vol', sweeps=[2, 0], delay_field_loading=delay_field_loading)
+        field = radar.fields['reflectivity']
+        assert isinstance(field, LazyLoadDict) == delay_field_loading
+        _assert_reflectivity(radar, [2, 0])
+
+    assert radar.nsweeps == 2
+    assert_array_equal(radar.sweep_start_ray_index['data'], [0, NRAYS])
+    assert_allclose(radar.fixed_angle['data'], [2.5, 0.5])
+
+
+def test_read_rainbow_wrl_delay_field_loading():
+    with pyart.testing.InTemporaryDirectory():
+        _write_rainbow_vol('test.vol')
+        radar = pyart.aux_io.read_rainbow_wrl('test.vol')
+        lazy_radar = pyart.aux_io.read_rainbow_wrl(
+            'test.vol', delay_field_loading=True)
+        assert isinstance(lazy_radar.fields['reflectivity'], LazyLoadDict)
+        data = radar.fields['reflectivity']['data']
+        lazy_data = lazy_radar.fields['reflectivity']['data']
+    assert_array_equal(lazy_data.mask, data.mask)
+    assert_array_equal(lazy_data.data, data.data)
+
+
+def test_unpack_rainbow_bits():
+    values = np.array([1, 0, 3, 2, 1, 3, 0], dtype='uint8')
+    bits = np.unpackbits(values[:, np.newaxis], axis=1)[:, -2:]
+    buf = np.packbits(bits.ravel()).tobytes()
+    data = _unpack_rainbow_bits(buf, 2, len(values))
+    assert data.dtype == np.uint8
+    assert_array_equal(data, values)
+    # trailing padding bits do not form a value
+    assert_array_equal(_unpack_rainbow_bits(buf, 2), np.append(values, 0))
+
+    # a one bit mask
+    flags = np.array([1, 0, 0, 1, 1, 1, 0, 1, 0, 1], dtype='uint8')
+    assert_array_equal(
+        _unpack_rainbow_bits(np.packbits(flags).tobytes(), 1, 10), flags)
+
+    with pytest.raises(ValueError):
+        _unpack_rainbow_bits(buf, 2, 9)
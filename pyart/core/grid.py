@@ -16,12 +16,16 @@ An class for holding gridded Radar data.
     _point_data_factory
     _point_lon_lat_data_factory
     _point_altitude_data_factory
+    _field_array
+    _field_dask_array
+    _masked_to_nan
 
 """
 
 import numpy as np
 from netCDF4 import num2date
 import xarray
+from xarray.backends.locks import SerializableLock
 
 try:
     import pyproj
@@ -35,6 +39,10 @@ from ..lazydict import LazyLoadDict
 from .transforms import cartesian_to_geographic
 from .transforms import cartesian_vectors_to_geographic
 
+# lock shared by all dask backed fields serializing reads from grid files,
+# the netCDF and HDF5 libraries are not thread safe across files
+_NETCDF_LOCK = SerializableLock()
+
 
 class Grid(object):
     """
@@ -283,58 +291,83 @@ class Grid(object):
                    arm_time_variables=arm_time_variables,
                    arm_alt_lat_lon_variables=arm_alt_lat_lon_variables)
 
-    def to_xarray(self):
+    def to_xarray(self, fields=None, mask_to_nan=True, dask=False):
         """
-        Convert the Grid object to an xarray format.
+        Convert the Grid object to an xarray Dataset.
+
+        Field data is wrapped without copying where possible. Only fields
+        which contain masked points are copied, when these points are
+        replaced with NaN.
 
-        Attributes
+        Parameters
         ----------
-        time : dict
-            Time of the grid.
-        fields : dict of dicts
-            Moments from radars or other variables.
-        longitude, latitude : dict, 2D
-            Arrays of latitude and longitude for the grid height level.
-        x, y, z : dict, 1D
-            Distance from the grid origin for each Cartesian coordinate axis
-            in a one dimensional array.
-            
+        fields : list or None, optional
+            Fields to include in the dataset. None includes all fields.
+        mask_to_nan : bool, optional
+            True to replace masked points with NaN, promoting integer data to
+            floating point. False wraps the underlying data of all fields
+            without copying, masked points keep the values stored in the
+            arrays, typically the _FillValue of the field.
+        dask : bool, optional
+            True to back the fields with dask arrays chunked by z-level.
+            Fields of grids read with delayed field loading are then read
+            from the file only when the chunks are computed. Requires dask.
+
+        Returns
+        -------
+        ds : xarray.Dataset
+            Dataset with the fields as (time, z, y, x) variables and the
+            time, z, y, x, lat and lon coordinates.
+
         """
+        if dask:
+            try:
+                import dask.array
+            except ImportError:
+                raise MissingOptionalDependency(
+                    "dask is required to create dask backed datasets "
+                    "but it is not installed")
+        if fields is None:
+            fields = list(self.fields.keys())
+
         lon, lat = self.get_point_longitude_latitude()
-        height = self.point_z['data'][:, 0, 0]
-        time = np.array([num2date(self.time['data'][0],
-                                  self.time['units'])])
-        
-        ds = xarray.Dataset()
-        for field in list(self.fields.keys()):
-            field_data = self.fields[field]['data']
-            data = xarray.DataArray(np.ma.expand_dims(field_data, 0),
-                                    dims=('time', 'z', 'y', 'x'),
-                                    coords={'time' : (['time'], time),
-                                            'z' : (['z'], height),
-                                            'lat' : (['y', 'x'], lat),
-                                            'lon' : (['y', 'x'], lon),
-                                            'y' : (['y'], lat[:, 0]),
-                                            'x' : (['x'], lon[0, :])})
-            for meta in list(self.fields[field].keys()):
-                if meta is not 'data':
-                    data.attrs.update({meta: self.fields[field][meta]})
-
-            ds[field] = data
-            ds.lon.attrs = [('long_name', 'longitude of grid cell center'),
-                            ('units', 'degree_E'),
-                            ('standard_name', 'Longitude')]
-            ds.lat.attrs = [('long_name', 'latitude of grid cell center'),
-                            ('units', 'degree_N'),
-                            ('standard_name', 'Latitude')]
-            ds.z.attrs = [('long_name', 'height above mean sea level'),
-                          ('units', 'm'),
-                          ('standard_name', 'Height')]
-            
-            ds.z.encoding['_FillValue'] = None
-            ds.lat.encoding['_FillValue'] = None
-            ds.lon.encoding['_FillValue'] = None
-            ds.close()
+        time = np.array(num2date(
+            self.time['data'][:1], self.time['units'],
+            only_use_cftime_datetimes=False,
+            only_use_python_datetimes=True))
+        coords = {
+            'time': ('time', time),
+            'z': ('z', self.z['data'], {
+                'long_name': 'height above mean sea level',
+                'units': 'm',
+                'standard_name': 'Height'}),
+            'lat': (('y', 'x'), lat, {
+                'long_name': 'latitude of grid cell center',
+                'units': 'degree_N',
+                'standard_name': 'Latitude'}),
+            'lon': (('y', 'x'), lon, {
+                'long_name': 'longitude of grid cell center',
+                'units': 'degree_E',
+                'standard_name': 'Longitude'}),
+            'y': ('y', lat[:, 0]),
+            'x': ('x', lon[0, :])}
+
+        data_vars = {}
+        for field in fields:
+            field_dic = self.fields[field]
+            # iterate over the keys to keep lazily loaded data unloaded
+            attrs = dict((key, field_dic[key]) for key in field_dic
+                         if key != 'data')
+            if dask:
+                data = _field_dask_array(field_dic, mask_to_nan)
+            else:
+                data = _field_array(field_dic['data'], mask_to_nan)
+            data_vars[field] = (('time', 'z', 'y', 'x'), data[np.newaxis],
+                                attrs)
+
+        ds = xarray.Dataset(data_vars, coords=coords)
+        for name in ['z', 'lat', 'lon']:
+            ds[name].encoding['_FillValue'] = None
         return ds
 
     def add_field(self, field_name, field_dict, replace_existing=False):
@@ -435,3 +468,43 @@ def _point_altitude_data_factory(grid):
         """ The function which returns the point altitudes. """
         return grid.origin_altitude['data'][0] + grid.point_z['data']
     return _point_altitude_data
+
+
+def _field_array(data, mask_to_nan):
+    """
+    Return the data of a field as a ndarray, masked points replaced by NaN
+    when requested. The data is only copied when points must be replaced.
+    """
+    if mask_to_nan and np.ma.is_masked(data):
+        dtype = np.result_type(data.dtype, np.float32)
+        return np.ma.filled(data.astype(dtype), np.nan)
+    return np.ma.getdata(data)
+
+
+def _field_dask_array(field_dic, mask_to_nan):
+    """ Return the data of a field as a dask array chunked by z-level. """
+    import dask.array
+
+    source = None
+    lock = False
+    if isinstance(field_dic, LazyLoadDict):
+        # array-like loaders are read chunk by chunk by dask, reads from
+        # files are serialized as the netCDF library is not thread safe
+        loader = field_dic._lazyload.get('data')
+        if hasattr(loader, '__getitem__') and hasattr(loader, 'shape'):
+            source = loader
+            lock = _NETCDF_LOCK
+    if source is None:
+        source = field_dic['data']
+    nz, ny, nx = source.shape
+    data = dask.array.from_array(
+        source, chunks=(1, ny, nx), lock=lock, asarray=False)
+    if not mask_to_nan:
+        return data.map_blocks(np.ma.getdata, dtype=data.dtype)
+    dtype = np.result_type(data.dtype, np.float32)
+    return data.map_blocks(_masked_to_nan, dtype, dtype=dtype)
+
+
+def _masked_to_nan(block, dtype):
+    """ Return a block with masked points replaced by NaN. """
+    return np.ma.filled(np.ma.asarray(block).astype(dtype), np.nan)
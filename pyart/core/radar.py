@@ -11,6 +11,7 @@ A general central radial scanning (or dwelling) instrument class.
     _gate_data_factory
     _gate_lon_lat_data_factory
     _gate_altitude_data_factory
+    _angle_index_data_factory
 
 .. autosummary::
     :toctree: generated/
@@ -135,6 +136,12 @@ class Radar(object):
         The altitude of each radar gate as calculated from the altitude of the
         radar and the Cartesian z location of each gate. If this attribute
         is changed use :py:func:`init_gate_altitude` to reset the attribute.
+    angle_index : LazyLoadDict
+        Index of the rays sorted by angle within each sweep. The 'azimuth'
+        and 'elevation' keys contain the indices of the rays in the sweeps
+        ordered first by sweep and then by angle, azimuths are taken modulo
+        360 degrees. If the azimuth, elevation or sweep attributes are
+        changed use :py:func:`init_angle_index` to reset the attribute.
     scan_rate : dict or None
         Actual antenna scan rate. If not provided this attribute is set to
         None, indicating this parameter is not available.
@@ -246,6 +253,7 @@ class Radar(object):
         self.init_gate_x_y_z()
         self.init_gate_longitude_latitude()
         self.init_gate_altitude()
+        self.init_angle_index()
 
     def __getstate__(self):
         """ Return object's state which can be pickled. """
@@ -258,6 +266,7 @@ class Radar(object):
         del state['gate_longitude']
         del state['gate_latitude']
         del state['gate_altitude']
+        del state['angle_index']
         return state
 
     def __setstate__(self, state):
@@ -267,6 +276,7 @@ class Radar(object):
         self.init_gate_x_y_z()
         self.init_gate_longitude_latitude()
         self.init_gate_altitude()
+        self.init_angle_index()
 
     # Attribute init/reset method
     def init_rays_per_sweep(self):
@@ -307,6 +317,15 @@ class Radar(object):
         gate_altitude.set_lazy('data', _gate_altitude_data_factory(self))
         self.gate_altitude = gate_altitude
 
+    def init_angle_index(self):
+        """ Initialize or reset the angle_index attribute. """
+        angle_index = LazyLoadDict({})
+        angle_index.set_lazy(
+            'azimuth', _angle_index_data_factory(self, 'azimuth'))
+        angle_index.set_lazy(
+            'elevation', _angle_index_data_factory(self, 'elevation'))
+        self.angle_index = angle_index
+
     # private functions for checking limits, etc.
     def _check_sweep_in_range(self, sweep):
         """ Check that a sweep number is in range. """
@@ -1002,3 +1021,19 @@ def _gate_altitude_data_factory(radar):
         except ValueError:
             return np.mean(radar.altitude['data']) + radar.gate_z['data']
     return _gate_altitude_data
+
+
+def _angle_index_data_factory(radar, angle):
+    """ Return a function which returns the rays sorted by angle. """
+    def _angle_index_data():
+        """ The function which returns the rays sorted by angle. """
+        rays = np.concatenate([
+            np.arange(start, end + 1) for start, end in
+            radar.iter_start_end()]).astype('int32')
+        sweeps = np.repeat(np.arange(radar.nsweeps),
+                           radar.rays_per_sweep['data'])
+        angles = getattr(radar, angle)['data'][rays]
+        if angle == 'azimuth':
+            angles = angles % 360.
+        return rays[np.lexsort((angles, sweeps))]
+    return _angle_index_data
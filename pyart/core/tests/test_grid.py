@@ -93,6 +93,64 @@ def test_grid_to_xarray():
     assert_equal(ds.lat.data, lat)
     assert_equal(ds.time.data, time)
 
+def test_grid_to_xarray_no_copy():
+    grid = pyart.testing.make_target_grid()
+    data = grid.fields['reflectivity']['data']
+    ds = grid.to_xarray()
+    assert ds.reflectivity.shape == (1, ) + data.shape
+    assert ds.reflectivity.attrs['units'] == 'dBz'
+    assert 'data' not in ds.reflectivity.attrs
+    assert np.shares_memory(ds.reflectivity.data, data)
+
+    # masked points are replaced by NaN only when requested
+    grid.fields['reflectivity']['data'] = np.ma.masked_less(data, 10)
+    ds = grid.to_xarray()
+    assert np.isnan(ds.reflectivity.data[0, 0, 0, 0])
+    assert not np.shares_memory(ds.reflectivity.data,
+                                grid.fields['reflectivity']['data'])
+    ds = grid.to_xarray(fields=['reflectivity'], mask_to_nan=False)
+    assert list(ds.data_vars) == ['reflectivity']
+    assert ds.reflectivity.data[0, 0, 0, 0] == data[0, 0, 0]
+    assert np.shares_memory(ds.reflectivity.data,
+                            grid.fields['reflectivity']['data'])
+
+
+def test_grid_to_xarray_dask():
+    pytest.importorskip('dask')
+    grid = pyart.testing.make_target_grid()
+    data = np.ma.masked_less(grid.fields['reflectivity']['data'], 10)
+    grid.fields['reflectivity']['data'] = data
+    ds = grid.to_xarray(dask=True)
+    assert ds.reflectivity.chunks == ((1, ), (1, ) * grid.nz,
+                                      (grid.ny, ), (grid.nx, ))
+    assert_equal(ds.reflectivity.values[0], data.filled(np.nan))
+
+
+def test_grid_to_xarray_dask_lazy(monkeypatch):
+    dask_array = pytest.importorskip('dask.array')
+    # reads of all fields from all files share a single lock
+    locks = []
+    from_array = dask_array.from_array
+
+    def _from_array(*args, **kwargs):
+        locks.append(kwargs['lock'])
+        return from_array(*args, **kwargs)
+
+    monkeypatch.setattr(dask_array, 'from_array', _from_array)
+    grid = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        datasets = []
+        for filename in ['tmp_grid_0.nc', 'tmp_grid_1.nc']:
+            pyart.io.write_grid(filename, grid)
+            grid2 = pyart.io.read_grid(filename, delay_field_loading=True)
+            datasets.append(grid2.to_xarray(dask=True))
+        assert len(locks) == 2
+        assert locks[0] is locks[1] is pyart.core.grid._NETCDF_LOCK
+        for ds in datasets:
+            assert_equal(ds.reflectivity.values[0],
+                         grid.fields['reflectivity']['data'])
+
+
 def _check_dicts_similar(dic1, dic2):
     for k, v in dic1.items():
         print("Checking key:", k)
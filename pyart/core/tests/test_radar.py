@@ -61,6 +61,20 @@ def test_gate_altitude():
     assert_almost_equal(radar.gate_altitude['data'][0, 0], 150.0, 1)
 
 
+def test_angle_index():
+    radar = pyart.testing.make_empty_ppi_radar(5, 4, 2)
+    radar.azimuth['data'][:] = [270, 0, 180, 90, 90, -10, 450, 180]
+    radar.elevation['data'][:] = [0, 0, 0, 0, 10, 10, 10, 10]
+
+    assert_almost_equal(radar.angle_index['azimuth'], [1, 3, 2, 0, 4, 6, 7, 5])
+    assert_almost_equal(
+        radar.angle_index['elevation'][:4], [0, 1, 2, 3])
+
+    radar.azimuth['data'][:4] = [0, 90, 180, 270]
+    radar.init_angle_index()
+    assert_almost_equal(radar.angle_index['azimuth'][:4], [0, 1, 2, 3])
+
+
 def test_gate_x_y_z():
     radar = pyart.testing.make_empty_ppi_radar(5, 4, 2)
     radar.azimuth['data'][:] = [0, 90, 180, 270, 0, 90, 180, 270]
@@ -16,6 +16,7 @@ Velocity unfolding
     dealias_fourdd
     dealias_unwrap_phase
     dealias_region_based
+    TemporalDealiaser
 
 Other corrections
 =================
@@ -51,6 +52,7 @@ from .attenuation import calculate_attenuation_philinear
 from ..filters.gatefilter import GateFilter, moment_based_gate_filter
 from .unwrap import dealias_unwrap_phase
 from .region_dealias import dealias_region_based
+from .temporal_dealias import TemporalDealiaser
 from .despeckle import find_objects, despeckle_field
 from .bias_and_noise import correct_noise_rhohv, correct_bias
 
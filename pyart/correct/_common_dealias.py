@@ -12,6 +12,7 @@ Routines used by multiple dealiasing functions.
     _parse_gatefilter
     _parse_rays_wrap_around
     _set_limits
+    _map_sweeps
 
 """
 
@@ -78,3 +79,54 @@ def _set_limits(data, nyquist_vel, dic):
     dic['valid_min'] = float(-max_valid_velocity)
     dic['valid_max'] = float(max_valid_velocity)
     return
+
+
+def _map_sweeps(func, sweep_args, workers=None, worker_type='thread'):
+    """
+    Apply func to the arguments for each sweep, optionally using a pool.
+
+    Parameters
+    ----------
+    func : callable
+        Function to apply, must be defined at the module level when
+        worker_type is 'process'.
+    sweep_args : list of tuples
+        Arguments to pass to func for each sweep.
+    workers : int or None
+        Number of workers in the pool. None or 1 evaluates each sweep
+        serially in the calling thread.
+    worker_type : 'thread' or 'process'
+        Type of pool to dispatch sweeps to.
+
+    Returns
+    -------
+    results : list
+        Results of func for each sweep, in sweep order.
+
+    """
+    if worker_type not in ['thread', 'process']:
+        raise ValueError(
+            "Unknown worker_type parameter, must be 'thread' or 'process'.")
+    if workers is None or workers < 2 or len(sweep_args) < 2:
+        return [func(*args) for args in sweep_args]
+
+    import multiprocessing
+    import multiprocessing.pool
+    workers = min(workers, len(sweep_args))
+    if worker_type == 'thread':
+        pool = multiprocessing.pool.ThreadPool(workers)
+    else:
+        pool = multiprocessing.Pool(workers)
+    try:
+        results = pool.map(_apply_sweep_func, [(func, args) for args in
+                                               sweep_args])
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def _apply_sweep_func(func_and_args):
+    """ Apply a function to a tuple of arguments, used by _map_sweeps. """
+    func, args = func_and_args
+    return func(*args)
@@ -0,0 +1,365 @@
+"""
+pyart.correct._fast_network_reduction
+=====================================
+
+Cython routine for reducing the region network built by the region based
+dealiasing algorithm.
+
+.. autosummary::
+    :toctree: generated/
+
+    _fast_network_reduction
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _NetworkReducer
+
+"""
+
+import numpy as np
+
+cimport numpy as np
+cimport cython
+from libc.math cimport rint
+
+
+def _fast_network_reduction(node_size, node_alpha, node_beta, sum_diff,
+                            weight):
+    """
+    Reduce a region network returning the number of unwraps for each region.
+
+    The network is reduced by repeatedly merging the two nodes joined by
+    the edge with the largest weight, exactly as is done by the
+    :py:class:`pyart.correct.region_dealias._RegionTracker` and
+    :py:class:`pyart.correct.region_dealias._EdgeTracker` objects, but
+    using a union-find structure to track the regions in each node and a
+    priority queue (binary heap) to locate the edge with the largest weight.
+
+    Parameters
+    ----------
+    node_size : 1D array
+        Number of gates in each node (region). Element 0 is the masked
+        region and should be 0.
+    node_alpha, node_beta : 1D array
+        Node numbers on either side of each edge.
+    sum_diff : 1D array
+        Sum of velocity differences, in units of the Nyquist interval,
+        across each edge in the direction of node alpha to node beta.
+    weight : 1D array
+        Number of connections making up each edge.
+
+    Returns
+    -------
+    unwrap_number : 1D array
+        Number of Nyquist intervals to add to each region to unfold it.
+
+    """
+    reducer = _NetworkReducer(
+        np.array(node_size, dtype=np.int32),
+        np.array(node_alpha, dtype=np.int32),
+        np.array(node_beta, dtype=np.int32),
+        np.array(sum_diff, dtype=np.float32),
+        np.array(weight, dtype=np.int32))
+    reducer.reduce()
+    return reducer.unwrap_number()
+
+
+cdef class _NetworkReducer:
+    """
+    Class for performing a dynamic network reduction.
+
+    Node membership is tracked using a union-find (disjoint set) forest where
+    each node stores the number of unwraps relative to its parent. Edges in
+    each node are tracked using doubly linked lists of edge ends, edge end
+    2*e is the end of edge e initially in node alpha and 2*e+1 is the end
+    initially in node beta. Edges are ordered by a binary heap keyed on the
+    weight and edge number, stale heap entries are skipped when popped.
+
+    """
+
+    cdef int nnodes, nedges
+    cdef int[::1] node_size, node_alpha, node_beta, weight
+    cdef float[::1] sum_diff
+
+    # union-find
+    cdef int[::1] parent, delta
+
+    # linked lists of edge ends in each node
+    cdef int[::1] head, next_end, prev_end, owner
+
+    # fast finding of edges shared between the base and merge nodes
+    cdef int[::1] common_stamp, common_index
+    cdef int stamp, last_base_node
+
+    # priority queue
+    cdef int[::1] heap_weight, heap_edge
+    cdef int heap_size
+
+    def __init__(self, node_size, node_alpha, node_beta, sum_diff, weight):
+        """ initialize. """
+        cdef int edge, end, node
+        self.nnodes = len(node_size)
+        self.nedges = len(weight)
+        self.node_size = node_size
+        self.node_alpha = node_alpha
+        self.node_beta = node_beta
+        self.sum_diff = sum_diff
+        self.weight = weight
+
+        self.parent = np.arange(self.nnodes, dtype=np.int32)
+        self.delta = np.zeros(self.nnodes, dtype=np.int32)
+
+        self.head = np.full(self.nnodes, -1, dtype=np.int32)
+        self.next_end = np.full(2 * self.nedges, -1, dtype=np.int32)
+        self.prev_end = np.full(2 * self.nedges, -1, dtype=np.int32)
+        self.owner = np.zeros(2 * self.nedges, dtype=np.int32)
+        for edge in range(self.nedges):
+            self._link(2 * edge, self.node_alpha[edge])
+            self._link(2 * edge + 1, self.node_beta[edge])
+
+        self.common_stamp = np.zeros(self.nnodes, dtype=np.int32)
+        self.common_index = np.zeros(self.nnodes, dtype=np.int32)
+        self.stamp = 0
+        self.last_base_node = -1
+
+        # each combined edge adds a single entry to the heap
+        self.heap_weight = np.zeros(2 * self.nedges + 1, dtype=np.int32)
+        self.heap_edge = np.zeros(2 * self.nedges + 1, dtype=np.int32)
+        self.heap_size = self.nedges
+        for edge in range(self.nedges):
+            self.heap_weight[edge] = self.weight[edge]
+            self.heap_edge[edge] = edge
+        for end in range(self.nedges // 2 - 1, -1, -1):
+            self._sift_down(end)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def reduce(self):
+        """ Reduce the network until no edges remain. """
+        cdef int edge, node1, node2, base_node, merge_node, rdiff
+        cdef double diff
+        while self.heap_size > 0:
+            edge = self._pop()
+            if edge == -1:
+                continue
+            node1 = self.node_alpha[edge]
+            node2 = self.node_beta[edge]
+            diff = <double>self.sum_diff[edge] / <double>self.weight[edge]
+            rdiff = <int>rint(diff)
+
+            # determine which nodes should be merged
+            if self.node_size[node1] > self.node_size[node2]:
+                base_node, merge_node = node1, node2
+            else:
+                base_node, merge_node = node2, node1
+                rdiff = -rdiff
+
+            # unwrap merge_node
+            if rdiff != 0:
+                self.delta[merge_node] += rdiff
+                self._unwrap_edges(merge_node, rdiff)
+
+            # merge nodes
+            self.parent[merge_node] = base_node
+            self.delta[merge_node] -= self.delta[base_node]
+            self.node_size[base_node] += self.node_size[merge_node]
+            self.node_size[merge_node] = 0
+            self._merge_edges(base_node, merge_node, edge)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def unwrap_number(self):
+        """ Return the number of unwraps for each region. """
+        cdef int region, node, total
+        unwrap_number = np.zeros(self.nnodes, dtype=np.int32)
+        cdef int[::1] unwrap_view = unwrap_number
+        for region in range(self.nnodes):
+            node = region
+            total = self.delta[node]
+            while self.parent[node] != node:
+                node = self.parent[node]
+                total += self.delta[node]
+            unwrap_view[region] = total
+        return unwrap_number
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _unwrap_edges(self, int node, int nwrap):
+        """ Add weight * nwrap to the sum of each edge in node. """
+        cdef int end, edge
+        cdef double change
+        end = self.head[node]
+        while end != -1:
+            edge = end >> 1
+            change = <double>self.weight[edge] * nwrap
+            if node == self.node_alpha[edge]:
+                self.sum_diff[edge] = <float>(self.sum_diff[edge] + change)
+            else:
+                self.sum_diff[edge] = <float>(self.sum_diff[edge] - change)
+            end = self.next_end[end]
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _merge_edges(self, int base_node, int merge_node,
+                           int foo_edge):
+        """ Move all edges from merge_node to base_node. """
+        cdef int end, next_end, edge, neighbor, base_edge
+
+        # remove edge between base and merge nodes
+        self.weight[foo_edge] = -999
+        self._unlink(2 * foo_edge)
+        self._unlink(2 * foo_edge + 1)
+        self.common_stamp[merge_node] = 0
+
+        # find all neighbors of base_node if last base_node was different
+        if self.last_base_node != base_node:
+            self.stamp += 1
+            end = self.head[base_node]
+            while end != -1:
+                edge = end >> 1
+                if self.node_beta[edge] == base_node:
+                    self._reverse_edge_direction(edge)
+                neighbor = self.node_beta[edge]
+                self.common_stamp[neighbor] = self.stamp
+                self.common_index[neighbor] = edge
+                end = self.next_end[end]
+
+        # update the edges in merge_node to point to base_node
+        end = self.head[merge_node]
+        while end != -1:
+            next_end = self.next_end[end]
+            edge = end >> 1
+            if self.node_beta[edge] == merge_node:
+                self._reverse_edge_direction(edge)
+            self.node_alpha[edge] = base_node
+
+            # if base_node also has an edge with the neighbor combine them
+            neighbor = self.node_beta[edge]
+            if self.common_stamp[neighbor] == self.stamp:
+                base_edge = self.common_index[neighbor]
+                self.weight[base_edge] += self.weight[edge]
+                self.weight[edge] = -999
+                self.sum_diff[base_edge] = (
+                    self.sum_diff[base_edge] + self.sum_diff[edge])
+                self._unlink(2 * edge)
+                self._unlink(2 * edge + 1)
+                self._push(self.weight[base_edge], base_edge)
+            else:
+                self.common_stamp[neighbor] = self.stamp
+                self.common_index[neighbor] = edge
+            end = next_end
+
+        # move the remaining edge ends from merge_node to base_node
+        end = self.head[merge_node]
+        while end != -1:
+            next_end = self.next_end[end]
+            self._unlink(end)
+            self._link(end, base_node)
+            end = next_end
+        self.last_base_node = base_node
+
+    cdef void _reverse_edge_direction(self, int edge):
+        """ Reverse an edges direction, change alpha and beta. """
+        cdef int old_alpha = self.node_alpha[edge]
+        self.node_alpha[edge] = self.node_beta[edge]
+        self.node_beta[edge] = old_alpha
+        self.sum_diff[edge] = -self.sum_diff[edge]
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _link(self, int end, int node):
+        """ Add an edge end to the front of a node's list. """
+        cdef int old_head = self.head[node]
+        self.owner[end] = node
+        self.prev_end[end] = -1
+        self.next_end[end] = old_head
+        if old_head != -1:
+            self.prev_end[old_head] = end
+        self.head[node] = end
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _unlink(self, int end):
+        """ Remove an edge end from its node's list. """
+        cdef int prev = self.prev_end[end]
+        cdef int next = self.next_end[end]
+        if prev == -1:
+            self.head[self.owner[end]] = next
+        else:
+            self.next_end[prev] = next
+        if next != -1:
+            self.prev_end[next] = prev
+        self.prev_end[end] = -1
+        self.next_end[end] = -1
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _pop(self):
+        """
+        Pop the edge with the largest weight from the priority queue.
+        Returns -1 if the popped entry is stale.
+        """
+        cdef int edge = self.heap_edge[0]
+        cdef int edge_weight = self.heap_weight[0]
+        self.heap_size -= 1
+        if self.heap_size > 0:
+            self.heap_weight[0] = self.heap_weight[self.heap_size]
+            self.heap_edge[0] = self.heap_edge[self.heap_size]
+            self._sift_down(0)
+        if self.weight[edge] != edge_weight:
+            return -1
+        return edge
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _push(self, int edge_weight, int edge):
+        """ Push an edge onto the priority queue. """
+        cdef int pos = self.heap_size
+        cdef int parent
+        self.heap_size += 1
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if not self._before(edge_weight, edge, self.heap_weight[parent],
+                                self.heap_edge[parent]):
+                break
+            self.heap_weight[pos] = self.heap_weight[parent]
+            self.heap_edge[pos] = self.heap_edge[parent]
+            pos = parent
+        self.heap_weight[pos] = edge_weight
+        self.heap_edge[pos] = edge
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _sift_down(self, int pos):
+        """ Move the heap entry at pos down to its proper location. """
+        cdef int edge_weight = self.heap_weight[pos]
+        cdef int edge = self.heap_edge[pos]
+        cdef int child
+        while True:
+            child = 2 * pos + 1
+            if child >= self.heap_size:
+                break
+            if (child + 1 < self.heap_size and self._before(
+                    self.heap_weight[child + 1], self.heap_edge[child + 1],
+                    self.heap_weight[child], self.heap_edge[child])):
+                child += 1
+            if not self._before(self.heap_weight[child],
+                                self.heap_edge[child], edge_weight, edge):
+                break
+            self.heap_weight[pos] = self.heap_weight[child]
+            self.heap_edge[pos] = self.heap_edge[child]
+            pos = child
+        self.heap_weight[pos] = edge_weight
+        self.heap_edge[pos] = edge
+
+    cdef inline int _before(self, int weight_a, int edge_a, int weight_b,
+                            int edge_b):
+        """
+        True when entry a should be popped before entry b, largest weight
+        first, ties broken by the lowest edge number to match np.argmax.
+        """
+        if weight_a != weight_b:
+            return weight_a > weight_b
+        return edge_a < edge_b
@@ -9,14 +9,13 @@ Find contiguous objects in scans and despeckle away ones that are too small.
 
     despeckle_field
     find_objects
-    _adjust_for_periodic_boundary
-    _append_labels
     _check_for_360
     _check_sweeps
     _check_threshold
     _generate_dict
     _get_data
     _get_labels
+    _label_volume
     _smooth_data
 
 """
@@ -24,6 +23,8 @@ Find contiguous objects in scans and despeckle away ones that are too small.
 from __future__ import division
 import numpy as np
 from scipy.ndimage import label
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.signal import convolve2d
 
 from ..config import get_fillvalue
@@ -31,8 +32,6 @@ from ..filters.gatefilter import GateFilter
 
 BAD = get_fillvalue() # Get default fill value.
 DELTA = 5.0  # deg, allowable gap between PPI edges to be considered full 360
-# To do:
-# Testing
 
 
 def find_objects(radar, field, threshold, sweeps=None, smooth=None,
@@ -43,6 +42,9 @@ def find_objects(radar, field, threshold, sweeps=None, smooth=None,
     In addition, periodic boundaries are accounted for if they exist
     (e.g., 360-deg PPIs). Requires scipy to be installed.
 
+    All requested sweeps are labeled in a single call, see
+    :py:func:`_label_volume` for details.
+
     Parameters
     ----------
     radar : pyart.core.Radar object
@@ -81,27 +83,16 @@ def find_objects(radar, field, threshold, sweeps=None, smooth=None,
         raise KeyError('Failed -', field, 'field not found in Radar object.')
     sweeps = _check_sweeps(sweeps, radar)
     tlo, thi = _check_threshold(threshold)
-    objcnt = 0
-    label_storage = []
-    for iswp in sweeps:
-        data = _get_data(radar, iswp, field, tlo, thi, smooth,
-                         gatefilter=gatefilter)
-        az = radar.get_azimuth(iswp, copy=False)
-        if _check_for_360(az, delta):
-            # If 360 or close, account for the periodic boundary
-            labels, nobj = _adjust_for_periodic_boundary(data)
-        else:
-            labels, nobj = _get_labels(data)
-        labels[labels != 0] += objcnt
-        objcnt += nobj
-        label_storage = _append_labels(labels, label_storage)
+    label_storage, _ = _label_volume(radar, field, tlo, thi, sweeps, smooth,
+                                     gatefilter, delta)
     label_storage = np.ma.masked_where(
         label_storage == 0, label_storage)
     return _generate_dict(label_storage)
 
 
 def despeckle_field(radar, field, label_dict=None, threshold=-100,
-                    size=10, gatefilter=None, delta=DELTA):
+                    size=10, gatefilter=None, delta=DELTA,
+                    return_mask=False):
     """
     Despeckle a radar volume by identifying small objects in each scan and
     masking them out. User can define which field to investigate, as well as
@@ -119,7 +110,8 @@ def despeckle_field(radar, field, label_dict=None, threshold=-100,
     ----------------
     label_dict : dict or None, optional
         Dictionary that is produced by find_objects.
-        If None, find_objects will be called to produce it.
+        If None, the objects in all sweeps of the volume will be labeled
+        directly without building the dictionary.
     threshold : int or float, or 2-element tuple of ints or floats
         Threshold values above (if single value) or between (if tuple)
         for objects to be identified. Default value assumes reflectivity.
@@ -132,113 +124,51 @@ def despeckle_field(radar, field, label_dict=None, threshold=-100,
     delta : int or float, optional
         Size of allowable gap near PPI edges, in deg, to consider it full 360.
         If gap is small, then PPI edges will be checked for matching objects.
+    return_mask : bool, optional
+        True to return the exclusion mask rather than a GateFilter. In this
+        case gatefilter, if provided, is not modified.
 
     Returns
     -------
     gatefilter : pyart.filters.GateFilter object
-        Py-ART GateFilter object that includes the despeckling mask
+        Py-ART GateFilter object that includes the despeckling mask. When
+        return_mask is True a boolean array with shape (nrays, ngates) which
+        is True for gates which would be excluded is returned instead.
 
     """
     if field not in radar.fields.keys():
         raise KeyError('Failed -', field, 'field not found in Radar object.')
     if label_dict is None:
         # Label everything in the radar object's field
-        label_dict = find_objects(radar, field, threshold,
-                                  gatefilter=gatefilter, delta=delta)
-    if gatefilter is None:
-        gatefilter = GateFilter(radar)
-    labels = label_dict['data']
+        tlo, thi = _check_threshold(threshold)
+        sweeps = _check_sweeps(None, radar)
+        labf, _ = _label_volume(radar, field, tlo, thi, sweeps, None,
+                                gatefilter, delta)
+    else:
+        labf = np.ma.filled(label_dict['data'], 0)
 
     # Get a copy of the field in the volume
-    data = 1.0 * radar.fields[field]['data']
-    mask_filter = gatefilter.gate_excluded
-    data = np.ma.masked_array(data, mask_filter)
+    data = np.ma.masked_array(1.0 * radar.fields[field]['data'])
+    if gatefilter is not None:
+        data = np.ma.masked_array(data, gatefilter.gate_excluded)
     data = data.filled(fill_value=BAD)
-    labf = labels.filled(fill_value=0)
 
-    # First reduce array size to speed up processing
+    # Count the valid gates in each object, objects with too few gates
+    # are the speckles
     cond1 = np.logical_and(data != BAD, labf > 0)
-    labr = labf[cond1]
-    data_r = data[cond1]
-
-    # Now loop thru all objects in volume, mask ones that are too small
-    # These are the speckles
-    iterarray = np.unique(labr)
-    for i, lab in enumerate(iterarray):
-        cond = labr == lab
-        if np.size(labr[cond]) < size:
-            data_r[cond] = BAD
-    data[cond1] = data_r
-    data = np.ma.masked_where(data == BAD, data)
-    gatefilter.exclude_gates(data.mask)
+    counts = np.bincount(labf[cond1], minlength=np.max(labf) + 1)
+    speckle = counts < size
+    speckle[0] = False
+    data[np.logical_and(cond1, speckle[labf])] = BAD
+    mask = data == BAD
+    if return_mask:
+        return mask
+    if gatefilter is None:
+        gatefilter = GateFilter(radar)
+    gatefilter.exclude_gates(mask)
     return gatefilter
 
 
-def _adjust_for_periodic_boundary(data):
-    """
-    Identify all the contiguous objects in a sweep, accounting for the
-    periodic boundary in a 360-deg PPI. Contiguous means corners or sides
-    of gates touch. The algorithm appends the sweep to itself, then looks
-    for contiguous objects near the original PPI edges and relabels them.
-    Then, the extra sweep is discarded before returning all the labels.
-
-    Parameters
-    ----------
-    data : 2D array of ints
-        Sweep that will be checked for objects. Sweep has already been
-        converted to binary 0s/1s based on user-supplied thresholds.
-
-    Returns
-    -------
-    labels : 2D array of ints
-        Numeric object labels, corrected for the periodic boundary.
-        Zero values mean no object at that location.
-    nobj : int
-        Number of distinct objects identified in sweep.
-
-    """
-    data = np.append(data, data, axis=0)
-    labels, nobj = _get_labels(data)
-    i1 = 0
-    # i2 = int(np.shape(labels)[0] / 2)
-    i2 = labels.shape[0] // 2
-    old_labs = np.unique(labels[i2][labels[i2] > 0])
-    for i, lab in enumerate(old_labs):
-        cond = labels == lab
-        indices = np.where(labels[i2] == lab)
-        new_lab = np.unique(labels[i1][indices[0]])[0]
-        labels[labels == lab] = new_lab
-    labels = labels[0:i2]
-    nobj = len(np.unique(labels)) - 1  # labels == 0 doesnt count
-    return labels, nobj
-
-
-def _append_labels(labels, label_storage):
-    """
-    Appends consecutive sweeps of labels, creating a multi-sweep 2D array.
-    Typically called iteratively.
-
-    Parameters
-    ----------
-    labels : 2D array of ints
-        Sweep containing object labels.
-    label_storage : Empty list or 2D array of ints
-        Array to append new sweep of labels to.
-
-    Returns
-    -------
-    label_storage : 2D array of ints
-        Updated array of object labels.
-
-    """
-    if len(label_storage) == 0:
-        label_storage.append(labels)
-        label_storage = np.array(label_storage[0])
-    else:
-        label_storage = np.append(label_storage, labels, axis=0)
-    return label_storage
-
-
 def _check_for_360(az, delta):
     """
     Check if an array of azimuths indicates the sweep is a full 360 PPI.
@@ -369,9 +299,9 @@ def _generate_dict(label_storage):
     return label_dict
 
 
-def _get_data(radar, iswp, field, tlo, thi, window, gatefilter=None):
+def _get_data(radar, rays, field, tlo, thi, window, gatefilter=None):
     """
-    Get data for a field from a given sweep in a Radar object.
+    Get data for a field from a set of rays in a Radar object.
     Data are smoothed if desired, then converted to binary 0s/1s based
     on whether valid values are present.
 
@@ -379,8 +309,9 @@ def _get_data(radar, iswp, field, tlo, thi, window, gatefilter=None):
     ----------
     radar : pyart.core.Radar object
         Radar object to query.
-    iswp : int
-        Sweep number to query.
+    rays : array of ints
+        Indices of the rays to query, typically all rays in one or more
+        sweeps.
     field : str
         Name of field to investigate for speckles.
     tlo : int or float
@@ -402,13 +333,12 @@ def _get_data(radar, iswp, field, tlo, thi, window, gatefilter=None):
     Returns
     -------
     data : 2D array of ints
-        Sweep as array of binary 0s/1s based on whether valid values exist.
+        Rays as array of binary 0s/1s based on whether valid values exist.
 
     """
-    data = radar.get_field(iswp, field, copy=True)
+    data = radar.fields[field]['data'][rays]
     if gatefilter is not None:
-        start, end = radar.get_start_end(iswp)
-        mask_filter = gatefilter.gate_excluded[start:end+1]
+        mask_filter = gatefilter.gate_excluded[rays]
         data = np.ma.masked_array(data, mask_filter)
     else:
         data = np.ma.masked_array(data)
@@ -449,6 +379,97 @@ def _get_labels(data):
     return labels, nobj
 
 
+def _label_volume(radar, field, tlo, thi, sweeps, smooth, gatefilter, delta):
+    """
+    Identify all the contiguous objects in one or more sweeps with a single
+    call to scipy.ndimage.label.
+
+    The binary data from all sweeps is stacked into one array with a row of
+    zeros separating consecutive sweeps so objects never span sweeps. For
+    360-deg PPIs the first ray of the sweep is repeated after the last ray,
+    objects touching this extra ray are merged with the objects in the first
+    ray, accounting for the periodic boundary.
+
+    Parameters
+    ----------
+    radar : pyart.core.Radar object
+        Radar object to query.
+    field : str
+        Name of field to investigate for objects.
+    tlo : int or float
+        Lower bound for the threshold.
+    thi : int or float or None
+        Upper bound for the threshold, None means no upper bound.
+    sweeps : array of ints
+        Sweep numbers to examine.
+    smooth : int or None
+        Number of gates included in a smoothing box filter along a ray.
+    gatefilter : None or pyart.filters.GateFilter object
+        Py-ART GateFilter object to apply before labeling objects.
+    delta : int or float
+        Size of allowable gap near PPI edges, in deg, to consider it full 360.
+
+    Returns
+    -------
+    labels : 2D array of ints
+        Numeric object labels for the rays in the examined sweeps, numbered
+        consecutively from 1. Zero values mean no object at that location.
+    nobj : int
+        Number of distinct objects identified.
+
+    """
+    starts = radar.sweep_start_ray_index['data'][sweeps]
+    ends = radar.sweep_end_ray_index['data'][sweeps]
+    rays = np.concatenate(
+        [np.arange(start, end + 1) for start, end in zip(starts, ends)])
+    data = _get_data(radar, rays, field, tlo, thi, smooth,
+                     gatefilter=gatefilter) > 0
+
+    # row in data used for each row of the padded array, -1 for padding
+    src = []
+    first_rows = []
+    wrap_rows = []
+    offset = 0
+    nrows = 0
+    for iswp, start, end in zip(sweeps, starts, ends):
+        nsweep_rays = end - start + 1
+        src.append(np.arange(offset, offset + nsweep_rays))
+        if _check_for_360(radar.get_azimuth(iswp, copy=False), delta):
+            src.append([offset])
+            first_rows.append(nrows)
+            wrap_rows.append(nrows + nsweep_rays)
+            nrows += 1
+        src.append([-1])
+        nrows += nsweep_rays + 1
+        offset += nsweep_rays
+    src = np.concatenate(src).astype(np.intp)
+    padded = data[src]
+    padded[src == -1] = False
+
+    labels, nobj = _get_labels(padded)
+
+    if len(wrap_rows) > 0:
+        # merge objects touching the repeated ray with those in the first ray
+        wrap_labels = labels[wrap_rows].ravel()
+        first_labels = labels[first_rows].ravel()
+        valid = wrap_labels > 0
+        graph = coo_matrix(
+            (np.ones(np.count_nonzero(valid), dtype='int8'),
+             (wrap_labels[valid], first_labels[valid])),
+            shape=(nobj + 1, nobj + 1))
+        ncomponents, relabel = connected_components(graph, directed=False)
+        # background is the first node so remains as component 0
+        labels = relabel.astype(labels.dtype)[labels]
+        nobj = ncomponents - 1
+
+    # remove the padding and repeated rays
+    keep = np.ones(len(src), dtype=bool)
+    keep[src == -1] = False
+    keep[wrap_rows] = False
+    labels = labels[keep]
+    return labels, nobj
+
+
 def _smooth_data(data, window):
     """
     Perform box filtering along each ray of a sweep, and return the
@@ -471,7 +492,7 @@ def _smooth_data(data, window):
     """
     if window is not None:
         return np.ma.masked_array(convolve2d(
-            data, np.ones((1, window))/np.float(window),
+            data, np.ones((1, window))/float(window),
             mode='same', boundary='symm'))
     else:
         return data
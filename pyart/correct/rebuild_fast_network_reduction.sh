@@ -0,0 +1,4 @@
+# remove and rebuild the _fast_network_reduction.so module
+rm  _fast_network_reduction.so
+cython _fast_network_reduction.pyx
+python setup.py build_ext -i
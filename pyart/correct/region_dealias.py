@@ -8,8 +8,11 @@ Region based dealiasing using a dynamic network reduction for region joining.
     :toctree: generated/
 
     dealias_region_based
+    _dealias_sweep
     _find_regions
     _find_sweep_interval_splits
+    _find_unwrap_number
+    _region_means
     _combine_regions
     _edge_sum_and_count
     _cost_function
@@ -34,7 +37,9 @@ from scipy.optimize import fmin_l_bfgs_b
 from ..config import get_metadata, get_fillvalue
 from ._common_dealias import _parse_fields, _parse_gatefilter, _set_limits
 from ._common_dealias import _parse_rays_wrap_around, _parse_nyquist_vel
+from ._common_dealias import _map_sweeps
 from ._fast_edge_finder import _fast_edge_finder
+from ._fast_network_reduction import _fast_network_reduction
 
 
 # Possible future improvements to the region based dealiasing algorithm:
@@ -50,8 +55,6 @@ from ._fast_edge_finder import _fast_edge_finder
 #   excluded by the filter are unfolded using a more elemenary approach.  In
 #   this manner the filter could define only "good" gates which establish the
 #   folding pattern which is then applied to all gates.
-# * Improve perfornace by implementing a priority queue in the _EdgeTracker
-#   object. See comments in the class for details.
 
 
 def dealias_region_based(
@@ -59,7 +62,8 @@ def dealias_region_based(
         skip_between_rays=100, skip_along_ray=100, centered=True,
         nyquist_vel=None, check_nyquist_uniform=True, gatefilter=False,
         rays_wrap_around=None, keep_original=False, set_limits=True,
-        vel_field=None, corr_vel_field=None, **kwargs):
+        vel_field=None, corr_vel_field=None, workers=None,
+        worker_type='thread', **kwargs):
     """
     Dealias Doppler velocities using a region based algorithm.
 
@@ -136,6 +140,16 @@ def dealias_region_based(
     corr_vel_field : str, optional
         Name to use for the dealiased Doppler velocity field metadata. None
         will use the default field name from the Py-ART configuration file.
+    workers : int or None, optional
+        Number of workers used to dealias sweeps in parallel. None or 1, the
+        default, dealiases the sweeps serially. The results are identical to
+        those from a serial run. When ref_vel_field is set the anchoring
+        against the reference velocities is performed serially after the
+        sweeps are dealiased.
+    worker_type : 'thread' or 'process', optional
+        Type of worker pool to use when workers is larger than 1. Much of the
+        region finding and joining holds the GIL so 'process' typically
+        gives the largest speed up for volumes with many sweeps.
 
     Returns
     -------
@@ -165,67 +179,30 @@ def dealias_region_based(
     vdata = radar.fields[vel_field]['data'].view(np.ndarray)
     data = vdata.copy()     # dealiased velocities
 
+    # dealias each sweep, optionally using a pool of workers
+    sweep_args = [
+        (vdata[sweep_slice], gfilter[sweep_slice], nyquist_vel[nsweep],
+         nsweep, interval_splits, interval_limits, rays_wrap_around,
+         skip_between_rays, skip_along_ray, centered)
+        for nsweep, sweep_slice in enumerate(radar.iter_slice())]
+    results = _map_sweeps(_dealias_sweep, sweep_args, workers, worker_type)
+
     # loop over sweeps
     for nsweep, sweep_slice in enumerate(radar.iter_slice()):
 
-        # extract sweep data
-        sdata = vdata[sweep_slice].copy()   # is a copy needed here?
+        # skip sweeps which did not require unfolding
+        if results[nsweep] is None:
+            continue
+        data[sweep_slice], labels = results[nsweep]
         scorr = data[sweep_slice]
         sfilter = gfilter[sweep_slice]
-
-        # find nyquist velocity and interval segmentation limits
         nyquist_interval = nyquist_vel[nsweep] * 2.
-        if interval_limits is None:
-            nvel = nyquist_vel[nsweep]
-            valid_sdata = sdata[~sfilter]
-            s_interval_limits = _find_sweep_interval_splits(
-                nvel, interval_splits, valid_sdata, nsweep)
-        else:
-            s_interval_limits = interval_limits
-
-        # find regions in original data
-        labels, nfeatures = _find_regions(sdata, sfilter, s_interval_limits)
-        # skip sweep if all gates are masked or only a single region
-        if nfeatures < 2:
-            continue
-        bincount = np.bincount(labels.ravel())
-        num_masked_gates = bincount[0]
-        region_sizes = bincount[1:]
-
-        # find all edges between regions
-        indices, edge_count, velos = _edge_sum_and_count(
-            labels, num_masked_gates, sdata, rays_wrap_around,
-            skip_between_rays, skip_along_ray)
-
-        # no unfolding required if no edges exist between regions
-        if len(edge_count) == 0:
-            continue
-
-        # find the number of folds in the regions
-        region_tracker = _RegionTracker(region_sizes)
-        edge_tracker = _EdgeTracker(indices, edge_count, velos,
-                                    nyquist_interval, nfeatures+1)
-        while True:
-            if _combine_regions(region_tracker, edge_tracker):
-                break
-
-        # center sweep if requested, determine a global sweep unfold number
-        # so that the average number of gate folds is zero.
-        if centered:
-            gates_dealiased = region_sizes.sum()
-            total_folds = np.sum(
-                region_sizes * region_tracker.unwrap_number[1:])
-            sweep_offset = int(round(float(total_folds) / gates_dealiased))
-            if sweep_offset != 0:
-                region_tracker.unwrap_number -= sweep_offset
-
-        # dealias the data using the fold numbers
-        nwrap = np.take(region_tracker.unwrap_number, labels)
-        scorr += nwrap * nyquist_interval
 
         # anchor unfolded velocities against reference velocity
         if ref_vdata is not None:
             sref = ref_vdata[sweep_slice]
+            if np.ma.count(sref) == 0:
+                continue    # no reference velocities available in sweep
             gfold = (sref-scorr).mean()/nyquist_interval
             gfold = round(gfold)
 
@@ -238,11 +215,8 @@ def dealias_region_based(
 
             bounds_list = [(x, y) for (x, y) in zip(-6*np.ones(nfeatures_corr),
                                                     5*np.ones(nfeatures_corr))]
-            scorr_means = np.zeros(nfeatures_corr)
-            sref_means = np.zeros(nfeatures_corr)
-            for reg in range(1, nfeatures_corr+1):
-                scorr_means[reg-1] = np.ma.mean(scorr[labels_corr == reg])
-                sref_means[reg-1] = np.ma.mean(sref[labels_corr == reg])
+            scorr_means, sref_means = _region_means(
+                labels_corr, nfeatures_corr, scorr, sref)
 
             def cost_function(x):
                 return _cost_function(x, scorr_means, sref_means,
@@ -257,11 +231,12 @@ def dealias_region_based(
                 fprime=gradient, bounds=bounds_list, maxiter=200,
                 )
 
-            i = 0
-            for reg in range(1, nfeatures_corr):
-                scorr[labels == reg] += (nyquist_interval *
-                                         np.round(nyq_adjustments[0][i]))
-                i = i + 1
+            # adjust the velocities in each region in a single pass
+            nadjust = min(nfeatures_corr - 1, labels.max())
+            adjustments = np.zeros(labels.max() + 1, dtype=scorr.dtype)
+            adjustments[1:nadjust+1] = (
+                nyquist_interval * np.round(nyq_adjustments[0][:nadjust]))
+            scorr += adjustments[labels]
 
     # fill_value from the velocity dictionary if present
     fill_value = radar.fields[vel_field].get('_FillValue', get_fillvalue())
@@ -286,6 +261,87 @@ def dealias_region_based(
     return corr_vel
 
 
+def _dealias_sweep(sdata, sfilter, nyquist_vel, nsweep, interval_splits,
+                   interval_limits, rays_wrap_around, skip_between_rays,
+                   skip_along_ray, centered):
+    """
+    Dealias a single sweep.
+
+    Returns a tuple of the dealiased velocities and region labels or None
+    when no unfolding was performed on the sweep.
+    """
+    # find nyquist velocity and interval segmentation limits
+    nyquist_interval = nyquist_vel * 2.
+    if interval_limits is None:
+        valid_sdata = sdata[~sfilter]
+        interval_limits = _find_sweep_interval_splits(
+            nyquist_vel, interval_splits, valid_sdata, nsweep)
+
+    # find regions in original data
+    labels, nfeatures = _find_regions(sdata, sfilter, interval_limits)
+    # skip sweep if all gates are masked or only a single region
+    if nfeatures < 2:
+        return None
+    bincount = np.bincount(labels.ravel())
+    num_masked_gates = bincount[0]
+    region_sizes = bincount[1:]
+
+    # find all edges between regions
+    indices, edge_count, velos = _edge_sum_and_count(
+        labels, num_masked_gates, sdata, rays_wrap_around,
+        skip_between_rays, skip_along_ray)
+
+    # no unfolding required if no edges exist between regions
+    if len(edge_count) == 0:
+        return None
+
+    # find the number of folds in the regions
+    unwrap_number = _find_unwrap_number(
+        region_sizes, indices, edge_count, velos, nyquist_interval)
+
+    # center sweep if requested, determine a global sweep unfold number
+    # so that the average number of gate folds is zero.
+    if centered:
+        gates_dealiased = region_sizes.sum()
+        total_folds = np.sum(region_sizes * unwrap_number[1:])
+        sweep_offset = int(round(float(total_folds) / gates_dealiased))
+        if sweep_offset != 0:
+            unwrap_number -= sweep_offset
+
+    # dealias the data using the fold numbers
+    nwrap = np.take(unwrap_number, labels)
+    scorr = sdata.copy()
+    scorr += nwrap * nyquist_interval
+    return scorr, labels
+
+
+def _region_means(labels, nfeatures, scorr, sref):
+    """
+    Return the mean corrected and reference velocities in each region.
+
+    Means are found for all regions in a single pass using np.bincount,
+    masked reference velocities are excluded from the reference means.
+    Regions with no valid velocities have a mean of NaN.
+    """
+    labels = labels.ravel()
+    sref_mask = np.ma.getmaskarray(sref).ravel()
+    sref_data = np.ma.getdata(sref).ravel()
+    minlength = nfeatures + 1
+
+    counts = np.bincount(labels, minlength=minlength)[1:]
+    sums = np.bincount(labels, weights=scorr.ravel(),
+                       minlength=minlength)[1:]
+    ref_counts = np.bincount(labels, weights=~sref_mask,
+                             minlength=minlength)[1:]
+    ref_sums = np.bincount(labels, weights=np.where(sref_mask, 0, sref_data),
+                           minlength=minlength)[1:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scorr_means = sums / counts
+        sref_means = ref_sums / ref_counts
+    return scorr_means, sref_means
+
+
 def _find_sweep_interval_splits(nyquist, interval_splits, velocities, nsweep):
     """ Return the interval limits for a given sweep. """
     # The Nyquist interval is split into interval_splits  equal sized areas.
@@ -405,6 +461,29 @@ def _edge_sum_and_count(labels, num_masked_gates, data,
     return (index1, index2), count, (vel1, vel2)
 
 
+def _find_unwrap_number(region_sizes, indices, edge_count, velocities,
+                        nyquist_interval):
+    """
+    Find the number of unwraps for each region by reducing the network.
+
+    The network reduction is performed by the compiled
+    :py:func:`_fast_network_reduction` routine which produces results
+    identical to repeatedly calling :py:func:`_combine_regions` with a
+    :py:class:`_RegionTracker` and :py:class:`_EdgeTracker`.
+    """
+    node_size = np.zeros(len(region_sizes) + 1, dtype=np.int32)
+    node_size[1:] = region_sizes[:]
+
+    # edges are stored in both directions, keep a single direction as is
+    # done in the _EdgeTracker object
+    index1, index2 = indices
+    vel1, vel2 = velocities
+    keep = index1 >= index2
+    sum_diff = (vel1[keep] - vel2[keep]) / nyquist_interval
+    return _fast_network_reduction(
+        node_size, index1[keep], index2[keep], sum_diff, edge_count[keep])
+
+
 def _combine_regions(region_tracker, edge_tracker):
     """ Returns True when done. """
     # Edge parameters from edge with largest weight
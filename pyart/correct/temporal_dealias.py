@@ -0,0 +1,244 @@
+"""
+pyart.correct.temporal_dealias
+==============================
+
+Dealiasing of a time ordered stream of radar volumes using the previously
+dealiased volume as a reference.
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    TemporalDealiaser
+
+.. autosummary::
+    :toctree: generated/
+
+    _map_reference_to_radar
+    _nearest_index
+
+"""
+
+import numpy as np
+
+from ..config import get_field_name
+from ..util.datetime_utils import datetime_from_radar
+from .region_dealias import dealias_region_based
+
+
+class TemporalDealiaser(object):
+    """
+    A class for dealiasing a stream of radar volumes using the previous
+    dealiased volume as a reference.
+
+    Each volume is dealiased using :py:func:`dealias_region_based`. After
+    the first volume the dealiased velocities from the previous volume,
+    mapped to the geometry of the current volume, are used as the reference
+    velocity field which anchors the unfolded velocities. This produces
+    more consistent results than dealiasing each volume independently.
+
+    Parameters
+    ----------
+    max_time_gap : float or None, optional
+        Maximum time in seconds between the start of consecutive volumes for
+        the previous volume to be used as a reference. When this gap is
+        exceeded the volume is dealiased without a reference. None disables
+        this check.
+    max_angle_diff : float, optional
+        Maximum difference in degrees between the fixed angles of a sweep
+        and the closest sweep in the previous volume for the previous sweep
+        to be used as a reference. Sweeps with no matching sweep have no
+        reference velocities.
+    vel_field : str, optional
+        Field in radar to use as the Doppler velocities during dealiasing.
+        None will use the default field name from the Py-ART configuration
+        file.
+    corr_vel_field : str, optional
+        Name to use for the dealiased Doppler velocity field metadata. None
+        will use the default field name from the Py-ART configuration file.
+    kwargs : dict, optional
+        Additional keyword arguments passed to
+        :py:func:`dealias_region_based` when dealiasing each volume.
+
+    Attributes
+    ----------
+    reference : dict or None
+        Geometry and dealiased velocities of the previous volume, None
+        when no volumes have been dealiased or after a call to reset.
+
+    Examples
+    --------
+    >>> import pyart
+    >>> dealiaser = pyart.correct.TemporalDealiaser(max_time_gap=900)
+    >>> for filename in filenames:
+    ...     radar = pyart.io.read(filename)
+    ...     corr_vel = dealiaser.dealias(radar)
+    ...     radar.add_field('corrected_velocity', corr_vel)
+
+    """
+
+    def __init__(self, max_time_gap=None, max_angle_diff=0.5,
+                 vel_field=None, corr_vel_field=None, **kwargs):
+        """ initialize. """
+        if vel_field is None:
+            vel_field = get_field_name('velocity')
+        if corr_vel_field is None:
+            corr_vel_field = get_field_name('corrected_velocity')
+        self.max_time_gap = max_time_gap
+        self.max_angle_diff = max_angle_diff
+        self.vel_field = vel_field
+        self.corr_vel_field = corr_vel_field
+        self.kwargs = kwargs
+        self.reference = None
+
+    def reset(self):
+        """ Discard the reference volume. """
+        self.reference = None
+
+    def dealias(self, radar, **kwargs):
+        """
+        Dealias the velocities in a radar volume.
+
+        Parameters
+        ----------
+        radar : Radar
+            Radar object containing Doppler velocities to dealias. Volumes
+            should be provided in time order.
+        kwargs : dict, optional
+            Additional keyword arguments passed to
+            :py:func:`dealias_region_based`, these override those provided
+            when the object was created.
+
+        Returns
+        -------
+        corr_vel : dict
+            Field dictionary containing dealiased Doppler velocities.
+            Dealiased array is stored under the 'data' key.
+
+        """
+        dealias_kwargs = dict(self.kwargs)
+        dealias_kwargs.update(kwargs)
+        start_time = datetime_from_radar(radar)
+
+        ref_data = None
+        if self._reference_valid(start_time):
+            ref_data = _map_reference_to_radar(
+                self.reference, radar, self.max_angle_diff)
+
+        if ref_data is None or np.ma.count(ref_data) == 0:
+            corr_vel = dealias_region_based(
+                radar, vel_field=self.vel_field,
+                corr_vel_field=self.corr_vel_field, **dealias_kwargs)
+        else:
+            # temporarily add the reference velocities to the radar
+            ref_field = '_temporal_dealias_reference_velocity'
+            radar.fields[ref_field] = {'data': ref_data}
+            try:
+                corr_vel = dealias_region_based(
+                    radar, ref_vel_field=ref_field, vel_field=self.vel_field,
+                    corr_vel_field=self.corr_vel_field, **dealias_kwargs)
+            finally:
+                del radar.fields[ref_field]
+
+        self.reference = {
+            'time': start_time,
+            'scan_type': radar.scan_type,
+            'fixed_angle': np.array(radar.fixed_angle['data']),
+            'sweep_start_ray_index': np.array(
+                radar.sweep_start_ray_index['data']),
+            'sweep_end_ray_index': np.array(
+                radar.sweep_end_ray_index['data']),
+            'azimuth': np.array(radar.azimuth['data']),
+            'elevation': np.array(radar.elevation['data']),
+            'range': np.array(radar.range['data']),
+            'data': np.ma.array(corr_vel['data'], copy=True),
+        }
+        return corr_vel
+
+    def _reference_valid(self, start_time):
+        """ True when the reference volume can be used at start_time. """
+        if self.reference is None:
+            return False
+        if self.max_time_gap is None:
+            return True
+        gap = (start_time - self.reference['time']).total_seconds()
+        return 0 <= gap <= self.max_time_gap
+
+
+def _map_reference_to_radar(reference, radar, max_angle_diff):
+    """
+    Map reference velocities to the geometry of a radar.
+
+    Each sweep in the radar is matched to the sweep in the reference with
+    the closest fixed angle, within each sweep the nearest ray (by azimuth
+    for PPI scans, elevation otherwise) and nearest gate are used. Gates
+    which can not be matched are masked.
+
+    Returns a masked array with shape (radar.nrays, radar.ngates) or None
+    if the scan types of the radar and reference do not agree.
+    """
+    if reference['scan_type'] != radar.scan_type:
+        return None
+    if radar.scan_type == 'ppi':
+        angle_key, circular = 'azimuth', True
+    else:
+        angle_key, circular = 'elevation', False
+
+    ref_data = reference['data']
+    ref_mask = np.ma.getmaskarray(ref_data)
+    ref_values = np.ma.getdata(ref_data)
+    data = np.zeros((radar.nrays, radar.ngates), dtype=ref_values.dtype)
+    mask = np.ones((radar.nrays, radar.ngates), dtype=bool)
+
+    # nearest gate in the reference for each gate in the radar
+    ref_range = reference['range']
+    rng = radar.range['data']
+    gate_idx = _nearest_index(ref_range, rng, False)
+    if len(ref_range) > 1:
+        spacing = np.abs(ref_range[1] - ref_range[0])
+        gate_valid = ((rng >= ref_range.min() - spacing) &
+                      (rng <= ref_range.max() + spacing))
+    else:
+        gate_valid = np.ones(rng.shape, dtype=bool)
+
+    ref_fixed_angle = reference['fixed_angle']
+    for nsweep, sweep_slice in enumerate(radar.iter_slice()):
+        angle_diff = np.abs(ref_fixed_angle - radar.fixed_angle['data'][nsweep])
+        ref_sweep = np.argmin(angle_diff)
+        if angle_diff[ref_sweep] > max_angle_diff:
+            continue
+        start = reference['sweep_start_ray_index'][ref_sweep]
+        end = reference['sweep_end_ray_index'][ref_sweep]
+        ray_idx = start + _nearest_index(
+            reference[angle_key][start:end+1],
+            getattr(radar, angle_key)['data'][sweep_slice], circular)
+        index = (ray_idx[:, np.newaxis], gate_idx[np.newaxis, :])
+        data[sweep_slice] = ref_values[index]
+        mask[sweep_slice] = ref_mask[index] | ~gate_valid
+
+    return np.ma.array(data, mask=mask)
+
+
+def _nearest_index(ref_values, values, circular):
+    """
+    Return the index of the nearest reference value for each value.
+
+    When circular is True values are angles compared modulo 360 degrees.
+    """
+    order = np.argsort(ref_values)
+    sorted_values = ref_values[order]
+    nvalues = len(sorted_values)
+    right = np.searchsorted(sorted_values, values)
+    if circular:
+        right = right % nvalues
+        left = (right - 1) % nvalues
+    else:
+        right = np.minimum(right, nvalues - 1)
+        left = np.maximum(right - 1, 0)
+    left_diff = np.abs(values - sorted_values[left])
+    right_diff = np.abs(sorted_values[right] - values)
+    if circular:
+        left_diff = np.minimum(left_diff % 360., 360. - left_diff % 360.)
+        right_diff = np.minimum(right_diff % 360., 360. - right_diff % 360.)
+    nearest = np.where(left_diff < right_diff, left, right)
+    return order[nearest]
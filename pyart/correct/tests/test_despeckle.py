@@ -0,0 +1,86 @@
+""" Unit Tests for Py-ART's correct/despeckle.py module. """
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import pyart
+
+
+def make_speckle_radar():
+    """ Create a two sweep radar with objects of known sizes. """
+    radar = pyart.testing.make_empty_ppi_radar(20, 360, 2)
+    radar.azimuth['data'][:] = np.tile(np.arange(360, dtype='float32'), 2)
+    data = np.ma.zeros((720, 20), dtype='float32')
+    data[:] = np.ma.masked
+    # first sweep, 6 gate object crossing the periodic boundary
+    data[358:360, 5:7] = 30.
+    data[0, 5:7] = 30.
+    # first sweep, single gate speckle
+    data[100, 10] = 30.
+    # second sweep, 4 gate object touching the first ray
+    data[360:362, 2:4] = 30.
+    # second sweep, 20 gate object
+    data[500:504, 10:15] = 30.
+    radar.add_field('reflectivity', {'data': data})
+    return radar
+
+
+def test_find_objects():
+    radar = make_speckle_radar()
+    label_dict = pyart.correct.find_objects(radar, 'reflectivity', 10)
+    labels = label_dict['data']
+    assert labels.shape == (720, 20)
+    assert label_dict['valid_max'] == 4
+
+    # object crossing the periodic boundary has a single label
+    assert labels[358, 5] == labels[0, 5]
+    assert np.count_nonzero(labels == labels[0, 5]) == 6
+    assert np.count_nonzero(labels == labels[100, 10]) == 1
+    assert np.count_nonzero(labels == labels[360, 2]) == 4
+    assert np.count_nonzero(labels == labels[500, 10]) == 20
+    assert_array_equal(np.unique(labels.compressed()), [1, 2, 3, 4])
+    assert labels.mask[200, 0]
+
+
+def test_find_objects_no_wraparound():
+    radar = make_speckle_radar()
+    # sector scan, objects on the first and last rays are distinct
+    radar.azimuth['data'][:] = np.tile(
+        np.linspace(0, 90, 360, dtype='float32'), 2)
+    label_dict = pyart.correct.find_objects(radar, 'reflectivity', 10)
+    labels = label_dict['data']
+    assert labels[358, 5] != labels[0, 5]
+    assert label_dict['valid_max'] == 5
+
+
+def test_find_objects_sweeps():
+    radar = make_speckle_radar()
+    label_dict = pyart.correct.find_objects(
+        radar, 'reflectivity', 10, sweeps=1)
+    labels = label_dict['data']
+    assert labels.shape == (360, 20)
+    assert label_dict['valid_max'] == 2
+    assert labels[0, 2] == 1
+    assert labels[140, 10] == 2
+
+
+def test_despeckle_field():
+    radar = make_speckle_radar()
+    gatefilter = pyart.correct.despeckle_field(radar, 'reflectivity', size=5)
+    excluded = gatefilter.gate_excluded
+    assert not excluded[0, 5]
+    assert not excluded[358, 5]
+    assert excluded[100, 10]
+    assert excluded[360, 2]
+    assert not excluded[500, 10]
+
+
+def test_despeckle_field_return_mask():
+    radar = make_speckle_radar()
+    label_dict = pyart.correct.find_objects(radar, 'reflectivity', 10)
+    gatefilter = pyart.correct.despeckle_field(
+        radar, 'reflectivity', label_dict=label_dict, size=5)
+    mask = pyart.correct.despeckle_field(
+        radar, 'reflectivity', size=5, return_mask=True)
+    assert mask.dtype == bool
+    assert_array_equal(mask, gatefilter.gate_excluded)
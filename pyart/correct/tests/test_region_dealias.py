@@ -10,6 +10,7 @@ import warnings
 
 import pyart
 import numpy as np
+import pytest
 from numpy.testing import assert_allclose, assert_almost_equal
 
 REF_DATA = [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5, 9.5, 10.5, 11.5,
@@ -176,6 +177,62 @@ def test_fillvalue(**kwargs):
     assert dealias_vel['data'].fill_value == 8888.0
 
 
+def test_find_unwrap_number_matches_trackers():
+    # the compiled network reduction should match the pure Python
+    # _RegionTracker and _EdgeTracker reduction exactly
+    region_dealias = pyart.correct.region_dealias
+    random_state = np.random.RandomState(42)
+    vel = random_state.uniform(-3, 3, (120, 80)).astype('float32')
+    vel = (np.cumsum(vel, axis=1) + 10.) % 20. - 10.
+    gfilter = random_state.rand(120, 80) < 0.2
+    labels, nfeatures = region_dealias._find_regions(
+        vel, gfilter, np.linspace(-10, 10, 6))
+    bincount = np.bincount(labels.ravel())
+    region_sizes = bincount[1:]
+    indices, edge_count, velos = region_dealias._edge_sum_and_count(
+        labels, bincount[0], vel, True, 3, 3)
+
+    region_tracker = region_dealias._RegionTracker(region_sizes)
+    edge_tracker = region_dealias._EdgeTracker(
+        indices, edge_count, velos, 20., nfeatures + 1)
+    while True:
+        if region_dealias._combine_regions(region_tracker, edge_tracker):
+            break
+
+    unwrap_number = region_dealias._find_unwrap_number(
+        region_sizes, indices, edge_count, velos, 20.)
+    assert nfeatures > 100
+    assert np.array_equal(unwrap_number, region_tracker.unwrap_number)
+
+
+def _make_multi_sweep_aliased_radar():
+    """ Return a radar with three distinct aliased sweeps. """
+    radar = pyart.testing.make_empty_ppi_radar(50, 360, 3)
+    single = pyart.testing.make_velocity_aliased_radar()
+    vdata = single.fields['velocity']['data']
+    radar.instrument_parameters = {
+        'nyquist_velocity': {'data': np.array([10.0] * 1080)}}
+    radar.fields = {'velocity': single.fields['velocity']}
+    radar.fields['velocity']['data'] = np.concatenate(
+        [vdata, np.roll(vdata, 90, axis=0), np.roll(vdata, 5, axis=1)])
+    return radar
+
+
+def test_dealias_region_based_workers():
+    radar = _make_multi_sweep_aliased_radar()
+    serial = pyart.correct.dealias_region_based(radar)
+    for worker_type in ['thread', 'process']:
+        parallel = pyart.correct.dealias_region_based(
+            radar, workers=2, worker_type=worker_type)
+        assert np.array_equal(parallel['data'], serial['data'])
+
+
+def test_dealias_region_based_bad_worker_type():
+    radar = pyart.testing.make_velocity_aliased_radar()
+    pytest.raises(ValueError, pyart.correct.dealias_region_based, radar,
+                  workers=2, worker_type='foo')
+
+
 def main():
 
     radar, dealias_vel = perform_dealias()
@@ -0,0 +1,75 @@
+""" Unit Tests for Py-ART's correct/temporal_dealias.py module. """
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+import pyart
+from pyart.correct.temporal_dealias import _nearest_index
+
+REF_DATA = [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5, 9.5, 10.5, 11.5,
+            12.5, 13.5, 12.5, 11.5, 10.5, 9.5, 8.5, 7.5, 6.5, 5.5, 4.5, 3.5,
+            2.5, 1.5, 0.5]
+
+
+def test_temporal_dealiaser_first_volume():
+    # the first volume is dealiased without a reference
+    radar = pyart.testing.make_velocity_aliased_radar()
+    dealiaser = pyart.correct.TemporalDealiaser()
+    assert dealiaser.reference is None
+    corr_vel = dealiaser.dealias(radar)
+    expected = pyart.correct.dealias_region_based(radar)
+    assert_allclose(corr_vel['data'], expected['data'])
+    assert dealiaser.reference is not None
+    assert '_temporal_dealias_reference_velocity' not in radar.fields
+
+
+def test_temporal_dealiaser_uses_previous_volume():
+    # the second volume is anchored to the previous dealiased volume which
+    # is offset by a Nyquist interval
+    radar = pyart.testing.make_velocity_aliased_radar()
+    dealiaser = pyart.correct.TemporalDealiaser()
+    dealiaser.dealias(radar)
+    dealiaser.reference['data'] = dealiaser.reference['data'] + 20.
+
+    radar2 = pyart.testing.make_velocity_aliased_radar()
+    radar2.azimuth['data'] = (radar2.azimuth['data'] + 0.3) % 360.
+    corr_vel = dealiaser.dealias(radar2)
+    assert_allclose(corr_vel['data'][13, :27], np.array(REF_DATA) + 20.)
+    assert '_temporal_dealias_reference_velocity' not in radar2.fields
+
+
+def test_temporal_dealiaser_time_gap():
+    radar = pyart.testing.make_velocity_aliased_radar()
+    dealiaser = pyart.correct.TemporalDealiaser(max_time_gap=60)
+    dealiaser.dealias(radar)
+    dealiaser.reference['data'] = dealiaser.reference['data'] + 20.
+
+    # volume more than max_time_gap after the previous is not anchored
+    radar2 = pyart.testing.make_velocity_aliased_radar()
+    radar2.time['data'] = radar2.time['data'] + 3600.
+    corr_vel = dealiaser.dealias(radar2)
+    assert_allclose(corr_vel['data'][13, :27], REF_DATA)
+
+    dealiaser.reset()
+    assert dealiaser.reference is None
+
+
+def test_nearest_index():
+    ref = np.array([0., 90., 180., 270.])
+    idx = _nearest_index(ref, np.array([359., 1., 100., 250.]), True)
+    assert np.array_equal(idx, [0, 0, 1, 3])
+    idx = _nearest_index(ref, np.array([-10., 500., 130.]), False)
+    assert np.array_equal(idx, [0, 3, 1])
+
+
+def test_region_means():
+    region_dealias = pyart.correct.region_dealias
+    labels = np.array([[0, 1, 1], [2, 2, 3]])
+    scorr = np.array([[5., 1., 3.], [2., 4., 7.]])
+    sref = np.ma.array([[5., 1., 9.], [2., 4., 7.]],
+                       mask=[[0, 0, 1], [0, 0, 1]])
+    scorr_means, sref_means = region_dealias._region_means(
+        labels, 3, scorr, sref)
+    assert_allclose(scorr_means, [2., 3., 7.])
+    assert_allclose(sref_means[:2], [1., 3.])
+    assert np.isnan(sref_means[2])
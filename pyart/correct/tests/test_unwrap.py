@@ -203,6 +203,25 @@ def test_dealias_unwrap_phase_raises():
     pytest.raises(ValueError, pyart.correct.dealias_unwrap_phase, radar)
 
 
+def test_dealias_unwrap_phase_workers():
+    radar = pyart.testing.make_empty_ppi_radar(50, 360, 3)
+    single = pyart.testing.make_velocity_aliased_radar()
+    vdata = single.fields['velocity']['data']
+    radar.instrument_parameters = {
+        'nyquist_velocity': {'data': np.array([10.0] * 1080)}}
+    radar.fields = {'velocity': single.fields['velocity']}
+    radar.fields['velocity']['data'] = np.concatenate(
+        [vdata, np.roll(vdata, 90, axis=0), np.roll(vdata, 5, axis=1)])
+    for unwrap_unit in ['ray', 'sweep']:
+        serial = pyart.correct.dealias_unwrap_phase(
+            radar, unwrap_unit=unwrap_unit)
+        for worker_type in ['thread', 'process']:
+            parallel = pyart.correct.dealias_unwrap_phase(
+                radar, unwrap_unit=unwrap_unit, workers=3,
+                worker_type=worker_type)
+            assert np.array_equal(parallel['data'], serial['data'])
+
+
 def perform_dealias(unwrap_unit='sweep', **kwargs):
     """ Perform velocity dealiasing on reference data. """
     radar = pyart.testing.make_velocity_aliased_radar()
@@ -11,6 +11,8 @@ Dealias using multidimensional phase unwrapping algorithms.
     _dealias_unwrap_3d
     _dealias_unwrap_2d
     _dealias_unwrap_1d
+    _unwrap_rays
+    _unwrap_sweep
     _verify_unwrap_unit
     _is_radar_cubic
     _is_radar_sweep_aligned
@@ -26,6 +28,7 @@ import numpy as np
 from ..config import get_metadata, get_fillvalue
 from ._common_dealias import _parse_fields, _parse_gatefilter, _set_limits
 from ._common_dealias import _parse_rays_wrap_around, _parse_nyquist_vel
+from ._common_dealias import _map_sweeps
 
 from ._unwrap_1d import unwrap_1d
 from ._unwrap_2d import unwrap_2d
@@ -36,7 +39,8 @@ def dealias_unwrap_phase(
         radar, unwrap_unit='sweep', nyquist_vel=None,
         check_nyquist_uniform=True, gatefilter=False,
         rays_wrap_around=None, keep_original=False, set_limits=True,
-        vel_field=None, corr_vel_field=None, skip_checks=False, **kwargs):
+        vel_field=None, corr_vel_field=None, skip_checks=False,
+        workers=None, worker_type='thread', **kwargs):
     """
     Dealias Doppler velocities using multi-dimensional phase unwrapping.
 
@@ -93,6 +97,14 @@ def dealias_unwrap_phase(
         True to skip checks verifing that an appropiate unwrap_unit is
         selected, False retains these checked. Setting this parameter to True
         is not recommended and is only offered as an option for extreme cases.
+    workers : int or None, optional
+        Number of workers used to dealias sweeps in parallel when unwrap_unit
+        is 'ray' or 'sweep'. None or 1, the default, dealiases the sweeps
+        serially. The results are identical to those from a serial run.
+    worker_type : 'thread' or 'process', optional
+        Type of worker pool to use when workers is larger than 1. The phase
+        unwrapping routines release the GIL so 'thread', the default, is
+        typically sufficient.
 
     Returns
     -------
@@ -134,10 +146,12 @@ def dealias_unwrap_phase(
         # 1D unwrapping does not use the gate filter nor respect
         # masked gates in the rays.  No information from the radar object is
         # needed for the unfolding
-        data = _dealias_unwrap_1d(vdata, nyquist_vel)
+        data = _dealias_unwrap_1d(
+            radar, vdata, nyquist_vel, workers, worker_type)
     elif unwrap_unit == 'sweep':
         data = _dealias_unwrap_2d(
-            radar, vdata, nyquist_vel, gfilter, rays_wrap_around)
+            radar, vdata, nyquist_vel, gfilter, rays_wrap_around, workers,
+            worker_type)
     elif unwrap_unit == 'volume':
         data = _dealias_unwrap_3d(
             radar, vdata, nyquist_vel, gfilter, rays_wrap_around)
@@ -191,11 +205,23 @@ def _dealias_unwrap_3d(radar, vdata, nyquist_vel, gfilter, rays_wrap_around):
     return unwrapped_volume
 
 
-def _dealias_unwrap_1d(vdata, nyquist_vel):
+def _dealias_unwrap_1d(radar, vdata, nyquist_vel, workers=None,
+                       worker_type='thread'):
     """ Dealias using 1D phase unwrapping (ray-by-ray). """
     # nyquist_vel is only available sweep by sweep which has been lost at
     # this point.  Metioned in the documentation
     nyquist_vel = nyquist_vel[0]
+    sweep_args = [(vdata[sweep_slice], nyquist_vel)
+                  for sweep_slice in radar.iter_slice()]
+    results = _map_sweeps(_unwrap_rays, sweep_args, workers, worker_type)
+    data = np.empty_like(vdata)
+    for sweep_slice, sweep_data in zip(radar.iter_slice(), results):
+        data[sweep_slice] = sweep_data
+    return data
+
+
+def _unwrap_rays(vdata, nyquist_vel):
+    """ Unwrap each ray in a block of rays. """
     data = np.empty_like(vdata)
     for i, ray in enumerate(vdata):
         # extract ray and scale to phase units
@@ -211,24 +237,34 @@ def _dealias_unwrap_1d(vdata, nyquist_vel):
     return data
 
 
-def _dealias_unwrap_2d(radar, vdata, nyquist_vel, gfilter, rays_wrap_around):
+def _dealias_unwrap_2d(radar, vdata, nyquist_vel, gfilter, rays_wrap_around,
+                       workers=None, worker_type='thread'):
     """ Dealias using 2D phase unwrapping (sweep-by-sweep). """
+    sweep_args = [
+        (vdata[sweep_slice], nyquist_vel[nsweep], gfilter[sweep_slice],
+         rays_wrap_around)
+        for nsweep, sweep_slice in enumerate(radar.iter_slice())]
+    results = _map_sweeps(_unwrap_sweep, sweep_args, workers, worker_type)
     data = np.zeros_like(vdata)
-    for nsweep, sweep_slice in enumerate(radar.iter_slice()):
-        # extract sweep and scale to phase units
-        sweep_nyquist_vel = nyquist_vel[nsweep]
-        scaled_sweep = vdata[sweep_slice] * np.pi / sweep_nyquist_vel
-        sweep_mask = gfilter[sweep_slice]
+    for sweep_slice, sweep_data in zip(radar.iter_slice(), results):
+        data[sweep_slice, :] = sweep_data
+    return data
 
-        # perform unwrapping
-        wrapped = np.require(scaled_sweep, np.float64, ['C'])
-        mask = np.require(sweep_mask, np.uint8, ['C'])
-        unwrapped = np.empty_like(wrapped, dtype=np.float64, order='C')
-        unwrap_2d(wrapped, mask, unwrapped, [rays_wrap_around, False])
 
-        # scale back into velocity units and store
-        data[sweep_slice, :] = unwrapped * sweep_nyquist_vel / np.pi
-    return data
+def _unwrap_sweep(sweep_vdata, sweep_nyquist_vel, sweep_mask,
+                  rays_wrap_around):
+    """ Unwrap a single sweep. """
+    # extract sweep and scale to phase units
+    scaled_sweep = sweep_vdata * np.pi / sweep_nyquist_vel
+
+    # perform unwrapping
+    wrapped = np.require(scaled_sweep, np.float64, ['C'])
+    mask = np.require(sweep_mask, np.uint8, ['C'])
+    unwrapped = np.empty_like(wrapped, dtype=np.float64, order='C')
+    unwrap_2d(wrapped, mask, unwrapped, [rays_wrap_around, False])
+
+    # scale back into velocity units
+    return unwrapped * sweep_nyquist_vel / np.pi
 
 
 def _verify_unwrap_unit(radar, unwrap_unit):
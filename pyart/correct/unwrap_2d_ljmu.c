@@ -143,6 +143,15 @@ void quicker_sort(EDGE *left, EDGE *right)
 }
 //--------------end quicker_sort algorithm -----------------------------------
 
+//deterministic pseudo random number generator used in place of rand(),
+//rand() shares state between callers which makes the results depend on
+//previous calls and on any other thread unwrapping at the same time
+static int unwrap_rand(unsigned int *state)
+{
+  *state = *state * 1103515245u + 12345u;
+  return (int)((*state / 65536u) % 32768u);
+}
+
 //--------------------start initialize pixels ----------------------------------
 //initialize pixels. See the explination of the pixel class above.
 //initially every pixel is assumed to belong to a group consisting of only itself
@@ -152,6 +161,7 @@ void  initialisePIXELs(double *wrapped_image, unsigned char *input_mask, unsigne
   double *wrapped_image_pointer = wrapped_image;
   unsigned char *input_mask_pointer = input_mask;
   unsigned char *extended_mask_pointer = extended_mask;
+  unsigned int seed = 1;
   int i, j;
 
   for (i=0; i < image_height; i++)
@@ -161,7 +171,7 @@ void  initialisePIXELs(double *wrapped_image, unsigned char *input_mask, unsigne
 	  pixel_pointer->increment = 0;
 	  pixel_pointer->number_of_pixels_in_group = 1;
 	  pixel_pointer->value = *wrapped_image_pointer;
-	  pixel_pointer->reliability = 9999999. + rand();
+	  pixel_pointer->reliability = 9999999. + unwrap_rand(&seed);
 	  pixel_pointer->input_mask = *input_mask_pointer;
 	  pixel_pointer->extended_mask = *extended_mask_pointer;
 	  pixel_pointer->head = pixel_pointer;
@@ -145,6 +145,15 @@ void quicker_sort(EDGE *left, EDGE *right)
 
 //--------------end quicker_sort algorithm -----------------------------------
 
+//deterministic pseudo random number generator used in place of rand(),
+//rand() shares state between callers which makes the results depend on
+//previous calls and on any other thread unwrapping at the same time
+static int unwrap_rand(unsigned int *state)
+{
+  *state = *state * 1103515245u + 12345u;
+  return (int)((*state / 65536u) % 32768u);
+}
+
 //--------------------start initialize voxels ----------------------------------
 //initiale voxels. See the explanation of the voxel class above.
 //initially every voxel is assumed to belong to a group consisting of only itself
@@ -154,6 +163,7 @@ void  initialiseVOXELs(double *WrappedVolume, unsigned char *input_mask, unsigne
   double *wrapped_volume_pointer = WrappedVolume;
   unsigned char *input_mask_pointer = input_mask;
   unsigned char *extended_mask_pointer = extended_mask;
+  unsigned int seed = 1;
   int n, i, j;
 
   for (n=0; n < volume_depth; n++)
@@ -165,7 +175,7 @@ void  initialiseVOXELs(double *WrappedVolume, unsigned char *input_mask, unsigne
 	      voxel_pointer->increment = 0;
 	      voxel_pointer->number_of_voxels_in_group = 1;
 	      voxel_pointer->value = *wrapped_volume_pointer;
-	      voxel_pointer->reliability = 9999999 + rand();
+	      voxel_pointer->reliability = 9999999 + unwrap_rand(&seed);
 	      voxel_pointer->input_mask = *input_mask_pointer;
 	      voxel_pointer->extended_mask = *extended_mask_pointer;
 	      voxel_pointer->head = voxel_pointer;
@@ -80,7 +80,9 @@ linear_depolarization_ratio_v = 'linear_depolarization_ratio_v'
 signal_to_noise_ratio = 'signal_to_noise_ratio'
 rain_rate = 'rain_rate'
 radar_estimated_rain_rate = 'radar_estimated_rain_rate'
+rainfall_accumulation = 'rainfall_accumulation'
 radar_echo_classification = 'radar_echo_classification'
+hydroclass_entropy = 'hydroclass_entropy'
 specific_attenuation = 'specific_attenuation'
 specific_differential_attenuation = 'specific_differential_attenuation'
 
@@ -170,7 +172,9 @@ DEFAULT_FIELD_NAMES = {
     'signal_to_noise_ratio': signal_to_noise_ratio,
     'rain_rate': rain_rate,
     'radar_estimated_rain_rate': radar_estimated_rain_rate,
+    'rainfall_accumulation': rainfall_accumulation,
     'radar_echo_classification': radar_echo_classification,
+    'hydroclass_entropy': hydroclass_entropy,
     'specific_attenuation': specific_attenuation,
     'differential_phase_texture': differential_phase_texture,
     'eastward_wind_component': eastward_wind_component,
@@ -602,12 +606,25 @@ DEFAULT_METADATA = {
         'long_name': 'Radar estimated rain rate',
         'coordinates': 'elevation azimuth range'},
 
+    rainfall_accumulation: {
+        'units': 'mm',
+        'standard_name': 'rainfall_accumulation',
+        'long_name': 'Radar estimated rainfall accumulation'},
+
     radar_echo_classification: {
         'units': 'legend',
         'standard_name': 'radar_echo_classification',
         'long_name': 'Radar Echo classification',
         'coordinates': 'elevation azimuth range'},
 
+    hydroclass_entropy: {
+        'units': '-',
+        'standard_name': 'hydroclass_entropy',
+        'long_name': 'Semi-supervised hydrometeor classification entropy',
+        'valid_min': 0.,
+        'valid_max': 1.,
+        'coordinates': 'elevation azimuth range'},
+
     specific_attenuation: {
         'units': 'dB/km',
         'standard_name': 'specific_attenuation',
@@ -27,6 +27,14 @@ Plotting grid data
     GridMapDisplay
     GridMapDisplayBasemap
 
+Batch image products
+====================
+
+.. autosummary::
+    :toctree: generated/
+
+    generate_products
+
 """
 
 from .radardisplay import RadarDisplay
@@ -37,5 +45,6 @@ from .gridmapdisplay import GridMapDisplay
 from .gridmapdisplay_basemap import GridMapDisplayBasemap
 from .radarmapdisplay import RadarMapDisplay
 from .radarmapdisplay_basemap import RadarMapDisplayBasemap
+from .products import generate_products
 
 __all__ = [s for s in dir() if not s.startswith('_')]
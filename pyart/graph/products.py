@@ -0,0 +1,378 @@
+"""
+pyart.graph.products
+====================
+
+Batch generation of image products from radar volumes and grids.
+
+.. autosummary::
+    :toctree: generated/
+
+    generate_products
+    _parse_product
+    _render_group
+    _init_worker
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _ProductRenderer
+
+"""
+
+from collections import OrderedDict
+import multiprocessing
+import time
+
+import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize
+
+from . import common
+from .radardisplay import RadarDisplay, _mask_outside
+
+# plotting method used for each product type
+_RADAR_PRODUCTS = {
+    'ppi': 'plot_ppi',
+    'rhi': 'plot_rhi',
+    'ppi_map': 'plot_ppi_map',
+}
+_GRID_PRODUCTS = {
+    'grid': 'plot_grid',
+}
+
+# plotting parameters which can be changed by updating the data, colormap
+# and labels of an existing mesh, all others require new artists
+_UPDATABLE_KWARGS = [
+    'vmin', 'vmax', 'norm', 'cmap', 'mask_outside', 'mask_tuple',
+    'gatefilter', 'title', 'title_datetime_format', 'title_use_sweep_time',
+    'colorbar_label']
+
+# renderer of a worker process, reused by all tasks run in the worker
+_WORKER_RENDERER = None
+
+
+def generate_products(products, processes=None, figsize=(10, 8), dpi=100,
+                      savefig_kwargs=None):
+    """
+    Render a list of image products, optionally across a process pool.
+
+    Products which share a source are rendered by the same worker, which
+    reads the source once and reuses a single figure. Consecutive PPI and
+    RHI products of the same sweep with the same plot layout update the
+    data, colormap and labels of the existing mesh rather than creating
+    new artists.
+
+    Parameters
+    ----------
+    products : list of dict
+        Products to render. Each dictionary describes one image with the
+        following keys:
+
+        * 'source' : Radar, Grid or str. Radar or grid to plot, a filename
+          is read with :py:func:`pyart.io.read` for radar products or
+          :py:func:`pyart.io.read_grid` for grid products. Using filenames
+          avoids transferring the data to the worker processes.
+        * 'field' : str. Field to plot.
+        * 'filename' : str. Name of the image file to create.
+        * 'product' : str, optional. One of 'ppi' (the default) or 'rhi',
+          plotted with :py:class:`RadarDisplay`, 'ppi_map', plotted with
+          :py:class:`RadarMapDisplay` or 'grid' plotted with
+          :py:class:`GridMapDisplay`.
+        * 'sweep' : int, optional. Sweep to plot for radar products.
+        * 'level' : int, optional. Level to plot for grid products.
+        * 'kwargs' : dict, optional. Additional parameters passed to the
+          plotting method of the display.
+
+    processes : int, optional
+        Number of worker processes. None will use the number of CPUs, 1
+        renders all products in the calling process.
+    figsize : (float, float), optional
+        Size of the figure in inches.
+    dpi : float, optional
+        Resolution of the images in dots per inch.
+    savefig_kwargs : dict, optional
+        Additional parameters passed to Matplotlib's savefig function.
+
+    Returns
+    -------
+    results : list of dict
+        Result for each product in the order given with the 'filename',
+        'time' (seconds spent rendering and saving the image), 'reused'
+        (True when an existing mesh was updated) and 'error' (None or a
+        description of the exception raised) keys.
+
+    Examples
+    --------
+    >>> products = [
+    ...     {'source': 'volume.nc', 'field': field, 'sweep': sweep,
+    ...      'filename': '%s_%02d.png' % (field, sweep)}
+    ...     for field in ['reflectivity', 'velocity'] for sweep in range(3)]
+    >>> results = pyart.graph.generate_products(products, processes=4)
+
+    """
+    products = [_parse_product(product) for product in products]
+    if savefig_kwargs is None:
+        savefig_kwargs = {}
+
+    # group the products by source, preserving the order of the products
+    groups = OrderedDict()
+    for index, product in enumerate(products):
+        source = product['source']
+        key = source if isinstance(source, str) else id(source)
+        groups.setdefault(key, []).append((index, product))
+    tasks = [(group, figsize, dpi, savefig_kwargs)
+             for group in groups.values()]
+
+    if processes == 1:
+        renderer = _ProductRenderer(figsize, dpi)
+        try:
+            group_results = [_render_group(task, renderer) for task in tasks]
+        finally:
+            renderer.close()
+    else:
+        pool = multiprocessing.Pool(processes, initializer=_init_worker)
+        try:
+            group_results = pool.map(_render_group, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    results = [None] * len(products)
+    for group_result in group_results:
+        for index, result in group_result:
+            results[index] = result
+    return results
+
+
+def _parse_product(product):
+    """ Check a product description and fill in the default values. """
+    product = dict(product)
+    for key in ['source', 'field', 'filename']:
+        if key not in product:
+            raise ValueError('Product is missing the %s key' % (key))
+    product.setdefault('product', 'ppi')
+    product.setdefault('sweep', 0)
+    product.setdefault('level', 0)
+    product.setdefault('kwargs', {})
+    kind = product['product']
+    if kind not in _RADAR_PRODUCTS and kind not in _GRID_PRODUCTS:
+        raise ValueError('Unknown product type: %s' % (kind))
+    return product
+
+
+def _init_worker():
+    """ Initialize a worker process to render with the Agg backend. """
+    plt.switch_backend('agg')
+
+
+def _render_group(task, renderer=None):
+    """ Render a group of products which share a source. """
+    global _WORKER_RENDERER
+    group, figsize, dpi, savefig_kwargs = task
+    if renderer is None:
+        if (_WORKER_RENDERER is None or
+                _WORKER_RENDERER.figsize != tuple(figsize) or
+                _WORKER_RENDERER.dpi != dpi):
+            if _WORKER_RENDERER is not None:
+                _WORKER_RENDERER.close()
+            _WORKER_RENDERER = _ProductRenderer(figsize, dpi)
+        renderer = _WORKER_RENDERER
+    return [(index, renderer.render(product, savefig_kwargs))
+            for index, product in group]
+
+
+class _ProductRenderer(object):
+    """
+    A class for rendering products with a single reused figure.
+
+    Parameters
+    ----------
+    figsize : (float, float)
+        Size of the figure in inches.
+    dpi : float
+        Resolution of the images in dots per inch.
+
+    """
+
+    def __init__(self, figsize, dpi):
+        """ initalize the object. """
+        self.figsize = tuple(figsize)
+        self.dpi = dpi
+        self.fig = plt.figure(figsize=figsize, dpi=dpi)
+
+        self._source = None
+        self._source_key = None
+        self._display = None
+        self._mesh_key = None
+        self._mesh = None
+        self._colorbar = None
+
+    def close(self):
+        """ Close the figure of the renderer. """
+        plt.close(self.fig)
+
+    def render(self, product, savefig_kwargs):
+        """ Render and save a product, returning its result. """
+        start = time.time()
+        try:
+            reused = self._render(product)
+            self.fig.savefig(product['filename'], dpi=self.dpi,
+                             **savefig_kwargs)
+            error = None
+        except Exception as exc:
+            # start from new artists after a failure
+            self._mesh_key = None
+            reused = False
+            error = '%s: %s' % (type(exc).__name__, exc)
+        return {'filename': product['filename'],
+                'time': time.time() - start,
+                'reused': reused,
+                'error': error}
+
+    def _render(self, product):
+        """ Draw a product on the figure, return True if a mesh was reused.
+        """
+        display = self._get_display(product)
+        kind = product['product']
+        kwargs = dict(product['kwargs'])
+
+        if kind not in ['ppi', 'rhi']:
+            self._mesh_key = None
+            self._render_map(display, product, kwargs)
+            return False
+
+        mesh_key = (self._source_key, kind, product['sweep'],
+                    _layout_key(kwargs))
+        if mesh_key == self._mesh_key:
+            self._update_mesh(display, product, kwargs)
+            return True
+
+        self._clear_figure(display)
+        ax = self.fig.add_subplot(111)
+        ncolorbars = len(display.cbs)
+        plot = getattr(display, _RADAR_PRODUCTS[kind])
+        plot(product['field'], product['sweep'], ax=ax, fig=self.fig,
+             **kwargs)
+        self._mesh = display.plots[-1]
+        if len(display.cbs) > ncolorbars:
+            self._colorbar = display.cbs[-1]
+        else:
+            self._colorbar = None
+        self._mesh_key = mesh_key
+        return False
+
+    def _render_map(self, display, product, kwargs):
+        """ Draw a product which uses a map display on a new axes. """
+        import cartopy
+
+        projection = kwargs.pop('projection', None)
+        if projection is None:
+            if product['product'] == 'ppi_map':
+                projection = cartopy.crs.LambertConformal(
+                    central_latitude=display.loc[0],
+                    central_longitude=display.loc[1])
+            else:
+                projection = cartopy.crs.Mercator()
+        self._clear_figure(display)
+        ax = self.fig.add_subplot(111, projection=projection)
+        plt.sca(ax)
+        if product['product'] == 'ppi_map':
+            display.plot_ppi_map(
+                product['field'], product['sweep'], ax=ax, fig=self.fig,
+                **kwargs)
+        else:
+            display.plot_grid(
+                product['field'], product['level'], ax=ax, fig=self.fig,
+                **kwargs)
+
+    def _clear_figure(self, display):
+        """
+        Clear the figure and the artists the display keeps of it, so that
+        the display does not hold every plot drawn on the reused figure.
+        """
+        self.fig.clf()
+        if hasattr(display, 'plots'):
+            display.plots = []
+            display.plot_vars = []
+            display.cbs = []
+
+    def _update_mesh(self, display, product, kwargs):
+        """ Update the data, colormap and labels of the current mesh. """
+        field = product['field']
+        sweep = product['sweep']
+        radar = display._radar
+        filter_transitions = kwargs.get('filter_transitions', True)
+
+        vmin, vmax = common.parse_vmin_vmax(
+            radar, field, kwargs.get('vmin'), kwargs.get('vmax'))
+        cmap = common.parse_cmap(kwargs.get('cmap'), field)
+        data = display._get_data(
+            field, sweep, kwargs.get('mask_tuple'), filter_transitions,
+            kwargs.get('gatefilter'))
+        data = _mask_outside(kwargs.get('mask_outside', False), data,
+                             vmin, vmax)
+        ax = self._mesh.axes
+        if kwargs.get('imshow', False):
+            data, _ = display._get_ppi_image(
+                data, sweep, filter_transitions, kwargs.get('imshow_shape'),
+                ax)
+
+        norm = kwargs.get('norm')
+        if norm is None:
+            norm = Normalize(vmin=vmin, vmax=vmax)
+        self._mesh.set_array(data)
+        self._mesh.set_cmap(cmap)
+        self._mesh.set_norm(norm)
+
+        if kwargs.get('title_flag', True):
+            display._set_title(
+                field, sweep, kwargs.get('title'), ax,
+                datetime_format=kwargs.get('title_datetime_format'),
+                use_sweep_time=kwargs.get('title_use_sweep_time', True))
+        if self._colorbar is not None:
+            label = kwargs.get('colorbar_label')
+            if label is None:
+                label = display._get_colorbar_label(field)
+            self._colorbar.update_normal(self._mesh)
+            self._colorbar.set_label(label)
+
+    def _get_display(self, product):
+        """ Return the display for the source of a product. """
+        source = product['source']
+        is_grid = product['product'] in _GRID_PRODUCTS
+        key = (source if isinstance(source, str) else id(source),
+               product['product'] == 'ppi_map', is_grid)
+        if key == self._source_key:
+            return self._display
+
+        if isinstance(source, str):
+            if self._source_key is not None and self._source_key[0] == key[0]:
+                source = self._source
+            else:
+                from ..io import read, read_grid
+                if is_grid:
+                    source = read_grid(source)
+                else:
+                    source = read(source)
+
+        if is_grid:
+            from .gridmapdisplay import GridMapDisplay
+            display = GridMapDisplay(source)
+        elif product['product'] == 'ppi_map':
+            from .radarmapdisplay import RadarMapDisplay
+            display = RadarMapDisplay(source)
+        else:
+            display = RadarDisplay(source)
+
+        self._source = source
+        self._source_key = key
+        self._display = display
+        self._mesh_key = None
+        return display
+
+
+def _layout_key(kwargs):
+    """ Return a key of the plotting parameters which change the layout. """
+    return tuple(sorted(
+        (key, repr(value)) for key, value in kwargs.items()
+        if key not in _UPDATABLE_KWARGS))
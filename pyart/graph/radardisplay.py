@@ -23,6 +23,7 @@ from . import common
 from ..core.transforms import antenna_to_cartesian
 from ..core.transforms import antenna_vectors_to_cartesian
 from ..core.transforms import geographic_to_cartesian_aeqd
+from ..core.transforms import _interpolate_range_edges
 from ..util.datetime_utils import datetimes_from_radar
 
 
@@ -67,6 +68,12 @@ class RadarDisplay(object):
         Antenna transition flag (1 in transition, 0 in transition) or None
         if no antenna transition.
 
+    Notes
+    -----
+    Gate coordinates and image lookup tables are cached per sweep and
+    reused by all plots of the display. Use :py:func:`clear_cache` if the
+    coordinates of the underlying radar are modified.
+
     """
 
     def __init__(self, radar, shift=(0.0, 0.0)):
@@ -115,6 +122,15 @@ class RadarDisplay(object):
         self.plot_vars = []
         self.cbs = []
 
+        # cached gate coordinates and image lookup tables
+        self._mesh_cache = {}
+        self._image_cache = {}
+
+    def clear_cache(self):
+        """ Clear the cached gate coordinates and image lookup tables. """
+        self._mesh_cache = {}
+        self._image_cache = {}
+
     ####################
     # Plotting methods #
     ####################
@@ -235,11 +251,13 @@ class RadarDisplay(object):
             colorbar_orient='vertical', edges=True, gatefilter=None,
             filter_transitions=True, ax=None, fig=None,
             ticks=None, ticklabs=None, raster=False,
-            title_datetime_format=None, title_use_sweep_time=True, **kwargs):
+            title_datetime_format=None, title_use_sweep_time=True,
+            imshow=False, imshow_shape=None, **kwargs):
         """
         Plot a PPI.
 
-        Additional arguments are passed to Matplotlib's pcolormesh function.
+        Additional arguments are passed to Matplotlib's pcolormesh function,
+        or imshow function when imshow is True.
 
         Parameters
         ----------
@@ -324,6 +342,16 @@ class RadarDisplay(object):
             high resolution data over large areas.  Be sure to set the dpi
             of the plot for your application if you save it as a vector format
             (i.e., pdf, eps, svg).
+        imshow : bool
+            True to bin the gates onto a Cartesian image and draw it with
+            Matplotlib's imshow function, which is much faster than
+            pcolormesh for large sweeps. Each pixel takes the value of the
+            gate containing its center. The gate to pixel lookup table is
+            cached and reused for other fields of the same sweep. False, the
+            default, draws every gate with pcolormesh.
+        imshow_shape : (int, int)
+            Number of rows and columns of the image when imshow is True. None
+            will use the size of the axis in pixels.
 
         """
         # parse parameters
@@ -334,7 +362,6 @@ class RadarDisplay(object):
         # get data for the plot
         data = self._get_data(
             field, sweep, mask_tuple, filter_transitions, gatefilter)
-        x, y = self._get_x_y(sweep, edges, filter_transitions)
 
         # mask the data where outside the limits
         data = _mask_outside(mask_outside, data, vmin, vmax)
@@ -342,8 +369,19 @@ class RadarDisplay(object):
         # plot the data
         if norm is not None:  # if norm is set do not override with vmin/vmax
             vmin = vmax = None
-        pm = ax.pcolormesh(
-            x, y, data, vmin=vmin, vmax=vmax, cmap=cmap, norm=norm, **kwargs)
+        if imshow:
+            image, extent = self._get_ppi_image(
+                data, sweep, filter_transitions, imshow_shape, ax)
+            kwargs.setdefault('interpolation', 'nearest')
+            kwargs.setdefault('aspect', 'auto')
+            pm = ax.imshow(
+                image, origin='lower', extent=extent, vmin=vmin, vmax=vmax,
+                cmap=cmap, norm=norm, **kwargs)
+        else:
+            x, y = self._get_x_y(sweep, edges, filter_transitions)
+            pm = ax.pcolormesh(
+                x, y, data, vmin=vmin, vmax=vmax, cmap=cmap, norm=norm,
+                **kwargs)
 
         if raster:
             pm.set_rasterized(True)
@@ -1408,14 +1446,98 @@ class RadarDisplay(object):
 
     def _get_x_y_z(self, sweep, edges, filter_transitions):
         """ Retrieve and return x, y, and z coordinate in km. """
+        key = (sweep, edges, filter_transitions, tuple(self.shift))
+        if key in self._mesh_cache:
+            return self._mesh_cache[key]
+
         x, y, z = self._radar.get_gate_x_y_z(
             sweep, edges=edges, filter_transitions=filter_transitions)
         # add shift and convert to km
         x = (x + self.shift[0]) / 1000.0
         y = (y + self.shift[1]) / 1000.0
         z = z / 1000.0
+        # cached arrays are shared between plots, prevent modification
+        for coord in (x, y, z):
+            coord.setflags(write=False)
+        self._mesh_cache[key] = (x, y, z)
         return x, y, z
 
+    def _get_ppi_image(self, data, sweep, filter_transitions, shape, ax):
+        """ Retrieve and return sweep data binned onto an image. """
+        if shape is None:
+            bbox = ax.get_window_extent()
+            shape = (max(int(round(bbox.height)), 1),
+                     max(int(round(bbox.width)), 1))
+        x, y, _ = self._get_x_y_z(sweep, True, filter_transitions)
+        extent = (float(x.min()), float(x.max()),
+                  float(y.min()), float(y.max()))
+
+        key = (sweep, filter_transitions, tuple(shape), extent)
+        if key not in self._image_cache:
+            self._image_cache[key] = self._ppi_image_lookup(
+                sweep, filter_transitions, shape, extent)
+        index, outside = self._image_cache[key]
+
+        flat_data = np.ma.getdata(data).ravel()
+        flat_mask = np.ma.getmaskarray(data).ravel()
+        image = np.ma.masked_array(
+            flat_data[index], mask=flat_mask[index] | outside)
+        return image, extent
+
+    def _ppi_image_lookup(self, sweep, filter_transitions, shape, extent):
+        """
+        Return the index of the sweep gate containing the center of each
+        pixel of an image and a mask of pixels outside of the sweep.
+        """
+        sweep_slice = self._radar.get_slice(sweep)
+        azimuths = self.azimuths[sweep_slice]
+        elevations = self.elevations[sweep_slice]
+        if filter_transitions and self.antenna_transition is not None:
+            in_trans = self.antenna_transition[sweep_slice]
+            azimuths = azimuths[in_trans == 0]
+            elevations = elevations[in_trans == 0]
+        ngates = len(self.ranges)
+
+        # azimuth and ground distance of the pixel centers in meters
+        nrows, ncols = shape
+        xmin, xmax, ymin, ymax = extent
+        pixel_x = xmin + (np.arange(ncols) + 0.5) * (xmax - xmin) / ncols
+        pixel_y = ymin + (np.arange(nrows) + 0.5) * (ymax - ymin) / nrows
+        pixel_x = pixel_x * 1000. - self.shift[0]
+        pixel_y = pixel_y * 1000. - self.shift[1]
+        pixel_az = np.rad2deg(np.arctan2(
+            pixel_x[np.newaxis, :], pixel_y[:, np.newaxis])) % 360.
+        pixel_dist = np.hypot(pixel_x[np.newaxis, :], pixel_y[:, np.newaxis])
+
+        # nearest ray, azimuths wrap around at 360 degrees
+        order = np.argsort(azimuths % 360.)
+        sorted_az = azimuths[order].astype('float64') % 360.
+        wrapped_az = np.concatenate(
+            [sorted_az[-1:] - 360., sorted_az, sorted_az[:1] + 360.])
+        wrapped_order = np.concatenate([order[-1:], order, order[:1]])
+        above = np.searchsorted(wrapped_az, pixel_az)
+        d_below = pixel_az - wrapped_az[above - 1]
+        d_above = wrapped_az[above] - pixel_az
+        use_below = d_below <= d_above
+        ray = np.where(use_below, wrapped_order[above - 1],
+                       wrapped_order[above])
+        if len(sorted_az) > 1:
+            ray_spacing = np.median(np.diff(sorted_az))
+        else:
+            ray_spacing = 360.
+        outside = np.minimum(d_below, d_above) > ray_spacing
+
+        # gate from the ground distance of the gate edges
+        range_edges = _interpolate_range_edges(self.ranges)
+        _, edge_dist, _ = antenna_to_cartesian(
+            range_edges / 1000., 0., np.median(elevations))
+        gate = np.searchsorted(edge_dist, pixel_dist) - 1
+        outside |= (gate < 0) | (gate >= ngates)
+
+        index = ray * ngates + np.clip(gate, 0, ngates - 1)
+        index[outside] = 0
+        return index, outside
+
     def _get_colorbar_label(self, field):
         """ Return a colorbar label for a given field. """
         last_field_dict = self.fields[field]
@@ -0,0 +1,105 @@
+""" Unit Tests for Py-ART's graph/products.py module. """
+
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import pyart
+
+
+def make_products(source, tmpdir, fields, sweeps=(0, ), **kwargs):
+    """ Return a list of PPI products for a source. """
+    return [{'source': source, 'field': field, 'sweep': sweep,
+             'filename': str(tmpdir.join('%s_%d.png' % (field, sweep))),
+             'kwargs': kwargs}
+            for sweep in sweeps for field in fields]
+
+
+def test_generate_products_serial(tmpdir):
+    radar = pyart.testing.make_target_radar()
+    radar.add_field_like('reflectivity', 'reflectivity_copy',
+                         radar.fields['reflectivity']['data'] * 2.)
+    products = make_products(
+        radar, tmpdir, ['reflectivity', 'reflectivity_copy'],
+        vmin=0, vmax=80)
+    nfigures = len(plt.get_fignums())
+    results = pyart.graph.generate_products(products, processes=1)
+
+    assert len(results) == 2
+    for product, result in zip(products, results):
+        assert result['error'] is None
+        assert result['filename'] == product['filename']
+        assert result['time'] > 0
+        assert os.path.isfile(product['filename'])
+    # the second field updates the mesh of the first
+    assert not results[0]['reused']
+    assert results[1]['reused']
+    assert len(plt.get_fignums()) == nfigures
+
+
+def test_generate_products_release_artists(tmpdir):
+    # redrawing the figure does not keep the previous meshes and colorbars
+    radar = pyart.testing.make_target_radar()
+    products = make_products(radar, tmpdir, ['reflectivity'],
+                             sweeps=(0, ) * 3)
+    for product, orient in zip(products, ['vertical', 'horizontal'] * 2):
+        product['kwargs'] = {'colorbar_orient': orient}
+    products = [pyart.graph.products._parse_product(product)
+                for product in products]
+    renderer = pyart.graph.products._ProductRenderer((4, 4), 50)
+    try:
+        for product in products:
+            result = renderer.render(product, {})
+            assert result['error'] is None
+            assert not result['reused']
+        display = renderer._display
+        assert len(display.plots) == 1
+        assert len(display.cbs) == 1
+        assert display.plots[0] is renderer._mesh
+    finally:
+        renderer.close()
+
+
+def test_generate_products_updated_image(tmpdir):
+    # an image with updated mesh data matches an image drawn from scratch
+    radar = pyart.testing.make_target_radar()
+    radar.add_field_like('reflectivity', 'reflectivity_copy',
+                         radar.fields['reflectivity']['data'][::-1].copy())
+    products = make_products(
+        radar, tmpdir, ['reflectivity', 'reflectivity_copy'],
+        title='PPI', colorbar_label='dBZ')
+    pyart.graph.generate_products(products, processes=1)
+    reference = make_products(radar, tmpdir.mkdir('reference'),
+                              ['reflectivity_copy'], title='PPI',
+                              colorbar_label='dBZ')
+    pyart.graph.generate_products(reference, processes=1)
+    updated = plt.imread(products[1]['filename'])
+    expected = plt.imread(reference[0]['filename'])
+    assert np.allclose(updated, expected)
+
+
+def test_generate_products_pool(tmpdir):
+    radar = pyart.testing.make_target_radar()
+    radar2 = pyart.testing.make_target_radar()
+    products = make_products(radar, tmpdir, ['reflectivity'])
+    products += [{'source': radar2, 'field': 'reflectivity',
+                  'product': 'rhi',
+                  'filename': str(tmpdir.join('rhi.png'))},
+                 {'source': radar2, 'field': 'not_a_field',
+                  'filename': str(tmpdir.join('missing.png'))}]
+    results = pyart.graph.generate_products(products, processes=2)
+    assert results[0]['error'] is None
+    assert results[1]['error'] is None
+    assert os.path.isfile(products[1]['filename'])
+    assert 'KeyError' in results[2]['error']
+
+
+def test_generate_products_errors(tmpdir):
+    radar = pyart.testing.make_target_radar()
+    pytest.raises(ValueError, pyart.graph.generate_products,
+                  [{'source': radar, 'field': 'reflectivity'}])
+    pytest.raises(ValueError, pyart.graph.generate_products,
+                  [{'source': radar, 'field': 'reflectivity',
+                    'filename': 'foo.png', 'product': 'vpt'}])
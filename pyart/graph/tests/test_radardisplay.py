@@ -115,9 +115,50 @@ def test_radardisplay_azimuth_to_rhi(outfile=None):
         fig.savefig(outfile)
     plt.close()
 
+
+def test_radardisplay_ppi_imshow(outfile=None):
+    radar = pyart.testing.make_target_radar()
+    display = pyart.graph.RadarDisplay(radar)
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    display.plot_ppi('reflectivity', 0, ax=ax, imshow=True,
+                     imshow_shape=(200, 200))
+    if outfile:
+        fig.savefig(outfile)
+
+    image = display.plots[0].get_array()
+    assert image.shape == (200, 200)
+    # target rings of the reflectivity field, 10 dBZ every 200 m in range
+    assert_almost_equal(image[100, 100], 0.)
+    assert_almost_equal(image[100, 150], 20.)
+    assert_almost_equal(image[180, 100], 40.)
+    # corners are outside of the sweep
+    assert image.mask[0, 0]
+    assert image.mask[199, 199]
+
+    # lookup tables and meshes are reused between fields
+    display.plot_ppi('reflectivity', 0, ax=ax, imshow=True,
+                     imshow_shape=(200, 200))
+    assert len(display._image_cache) == 1
+    assert len(display._mesh_cache) == 1
+    display.clear_cache()
+    assert len(display._image_cache) == 0
+    plt.close()
+
 # Tests of methods, these tests do not generate figures
 
 
+def test_radardisplay_mesh_cache():
+    radar = pyart.testing.make_target_radar()
+    display = pyart.graph.RadarDisplay(radar)
+    x, y = display._get_x_y(0, True, True)
+    x2, y2 = display._get_x_y(0, True, True)
+    assert x is x2
+    assert not x.flags.writeable
+    x3, _ = display._get_x_y(0, False, True)
+    assert x3.shape == (360, 50)
+
+
 def test_radardisplay_init():
     # test that a display object can be created with and without
     radar = pyart.io.read_cfradial(pyart.testing.CFRADIAL_PPI_FILE)
@@ -291,3 +332,4 @@ if __name__ == "__main__":
     test_radardisplay_ppi('figure_radar_display_ppi.png')
     test_radardisplay_ray('figure_radar_display_ray.png')
     test_radardisplay_vpt('figure_radar_display_vpt.png')
+    test_radardisplay_ppi_imshow('figure_radar_display_ppi_imshow.png')
@@ -27,8 +27,26 @@ for the format in question should be used.
     read_nexrad_archive
     read_nexrad_cdm
     read_nexrad_level3
+    read_nexrad_level3_batch
     read_uf
 
+Additional formats can be detected and read by :py:func:`pyart.io.read` by
+registering a sniffer and reader for the format.
+
+.. autosummary::
+    :toctree: generated/
+
+    register_format
+
+Many files can be read in parallel, either all at once in time order or
+lazily as a collection whose members are read when accessed.
+
+.. autosummary::
+    :toctree: generated/
+
+    read_many
+    RadarCollection
+
 Writing radar data
 ==================
 
@@ -38,6 +56,20 @@ Writing radar data
     write_cfradial
     write_uf
 
+Caching radar data
+==================
+
+Radar objects can be stored in a memory-mappable Py-ART radar cache file
+which is much faster to read than the original file. :py:func:`read` can
+maintain a directory of cache files transparently using the cache_dir
+parameter.
+
+.. autosummary::
+    :toctree: generated/
+
+    write_cache
+    read_cache
+
 Reading grid data
 =================
 
@@ -45,6 +77,7 @@ Reading grid data
     :toctree: generated/
 
     read_grid
+    read_grids_xarray
     read_grid_mdv
 
 Writing grid data
@@ -54,8 +87,10 @@ Writing grid data
     :toctree: generated/
 
     write_grid
+    append_grid
     write_grid_mdv
     write_grid_geotiff
+    write_grid_cog
 
 Reading Sonde data
 ==================
@@ -83,12 +118,14 @@ from .chl import read_chl
 from .cfradial import read_cfradial, write_cfradial
 from .nexrad_archive import read_nexrad_archive
 from .nexrad_cdm import read_nexrad_cdm
-from .nexradl3_read import read_nexrad_level3
+from .nexradl3_read import read_nexrad_level3, read_nexrad_level3_batch
 from .uf import read_uf
 from .uf_write import write_uf
-from .grid_io import read_grid, write_grid
-from .output_to_geotiff import write_grid_geotiff
-from .auto_read import read
+from .grid_io import read_grid, read_grids_xarray, write_grid, append_grid
+from .output_to_geotiff import write_grid_geotiff, write_grid_cog
+from .auto_read import read, register_format
+from .multi_read import read_many, RadarCollection
+from .radar_cache import write_cache, read_cache
 from .mdv_grid import write_grid_mdv, read_grid_mdv
 from .common import prepare_for_read
 from .arm_sonde import read_arm_sonde_vap, read_arm_sonde
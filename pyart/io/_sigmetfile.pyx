@@ -9,6 +9,8 @@ A class and supporting functions for reading Sigmet (raw format) files.
 
     SigmetFile
     convert_sigmet_data
+    _decode_sweep
+    _apply_lut
     bin2_to_angle
     bin4_to_angle
     _data_types_from_mask
@@ -28,6 +30,7 @@ from __future__ import print_function
 import struct
 import datetime
 import warnings
+import multiprocessing.pool
 
 import numpy as np
 cimport numpy as np
@@ -72,10 +75,7 @@ cdef class SigmetFile:
     cdef public debug, product_hdr, ingest_header, ingest_data_headers, \
         data_types, data_type_names, ndata_types,
     cdef public _fh, _raw_product_bhdrs
-
-    cdef np.ndarray _rbuf
-    cdef np.int16_t * _rbuf_p   # hack for fast indexing of _rbuf
-    cdef public int _rbuf_pos, _record_number
+    cdef public int _record_number
 
     def __init__(self, filename, debug=False):
         """ initalize the object. """
@@ -118,10 +118,16 @@ cdef class SigmetFile:
         """ Close the file. """
         self._fh.close()
 
-    def read_data(self, full_xhdr=False):
+    def read_data(self, full_xhdr=False, workers=None):
         """
         Read all data from the file.
 
+        The remaining records of the file are read into memory and the lead
+        record of each sweep is located from the raw_prod_bhdr sweep
+        numbers. The compressed rays of each sweep are then decoded with the
+        GIL released, optionally in a pool of threads, and each data type is
+        converted in a single pass over all sweeps.
+
         Parameters
         ----------
         full_xhdr : bool
@@ -129,6 +135,9 @@ cdef class SigmetFile:
             ones.  False will return a length 1 extended header converted to
             int32.  This is useful when the file contains a customer specified
             extended header (for example aircraft radar).
+        workers : int or None
+            Number of threads used to decode sweeps in parallel. None or 1
+            decodes the sweeps serially in the calling thread.
 
         Returns
         -------
@@ -149,65 +158,111 @@ cdef class SigmetFile:
         nbins = self.product_hdr['product_end']['number_bins']
         nrays = self.ingest_header['ingest_configuration'][
             'number_rays_sweep']
-
-        # create empty outputs
-        shape = (nsweeps, nrays, nbins)
-        data = dict([(name, np.ma.empty(shape, dtype='float32'))
-                    for name in self.data_type_names])
-        if 'XHDR' in self.data_type_names:
-            if full_xhdr:
-                data['XHDR'] = np.ones(shape, dtype='int16')
-            else:
-                data['XHDR'] = np.ones((nsweeps, nrays, 1), dtype='int32')
-
-        metadata = {}
-        for name in self.data_type_names:
-            header_dic = {
-                'azimuth_0': np.empty((nsweeps, nrays), dtype='float32'),
-                'elevation_0': np.empty((nsweeps, nrays), dtype='float32'),
-                'azimuth_1': np.empty((nsweeps, nrays), dtype='float32'),
-                'elevation_1': np.empty((nsweeps, nrays), dtype='float32'),
-                'nbins': np.empty((nsweeps, nrays), dtype='int16'),
-                'time': np.empty((nsweeps, nrays), dtype='uint16'),
-                'prf_flag': np.empty((nsweeps, nrays), dtype='int16')}
-            metadata[name] = header_dic
+        ndata_types = self.ndata_types
+
+        # read the remaining records and locate the lead record of each
+        # sweep, where the sweep number in the raw_prod_bhdr changes
+        buf = self._fh.read()
+        nrecords = len(buf) // RECORD_SIZE
+        records = np.frombuffer(
+            buf, dtype='int16', count=nrecords * RECORD_SIZE // 2).reshape(
+                nrecords, RECORD_SIZE // 2)
+        leads = np.flatnonzero(np.diff(records[:, 1])) + 1
+        leads = np.append([0], leads)[:min(nsweeps, nrecords)]
 
         self.ingest_data_headers = dict([(name, []) for name in
                                          self.data_type_names])
-
         self._raw_product_bhdrs = []
 
-        # read in data sweep by sweep
-        for i in xrange(nsweeps):
-            ingest_data_hdrs, sweep_data, sweep_metadata = self._get_sweep(
-                full_xhdr=full_xhdr)
-
-            # check for a truncated file, return sweep(s) read up until error
-            if ingest_data_hdrs is None:
-
-                mess = ('File truncated or corrupt, %i of %i sweeps read' %
-                        (i, nsweeps))
-                warnings.warn(mess)
-
-                for name in self.data_type_names:
-                    data[name] = data[name][:i]
-                    for k in metadata[name]:
-                        metadata[name][k] = metadata[name][k][:i]
-                return data, metadata
-
+        # decode the rays of the sweeps starting at the lead records, rays
+        # of the data types are interleaved in the file. Data is set
+        # initially to ones so that missing data can be better seen when
+        # debugging
+        raw_data = np.ones((nsweeps, nrays * ndata_types, nbins + 6),
+                           dtype='int16')
+        first_pos = int((12 + 76 * ndata_types) / 2) - 1
+        sweep_args = [(records, lead, first_pos, raw_data[i])
+                      for i, lead in enumerate(leads)]
+        if workers is None or workers < 2 or len(sweep_args) < 2:
+            last_records = [_decode_sweep(*args) for args in sweep_args]
+        else:
+            pool = multiprocessing.pool.ThreadPool(
+                min(workers, len(sweep_args)))
+            try:
+                last_records = pool.starmap(_decode_sweep, sweep_args)
+            finally:
+                pool.close()
+                pool.join()
+
+        # walk the sweeps in file order, each sweep begins in the record
+        # following the last record of the previous sweep.  Sweeps which
+        # were not located from the raw_prod_bhdrs are decoded here.
+        nsweeps_read = 0
+        lead = 0
+        while nsweeps_read < nsweeps and lead < nrecords:
+            if nsweeps_read < len(leads) and leads[nsweeps_read] == lead:
+                last_record = last_records[nsweeps_read]
+            else:
+                last_record = _decode_sweep(
+                    records, lead, first_pos, raw_data[nsweeps_read])
+
+            # check for a truncated file, keep sweep(s) read up until error
+            lead_record = buf[lead * RECORD_SIZE:(lead + 1) * RECORD_SIZE]
+            ingest_data_hdrs = _unpack_ingest_data_headers(
+                lead_record, ndata_types)
+            if ingest_data_hdrs is None or last_record == -1:
+                break
+            nrays_file = sum([d['number_rays_file_expected']
+                              for d in ingest_data_hdrs])
+            if nrays_file != nrays * ndata_types:
+                raise ValueError(
+                    'Number of rays in sweep does not match the number of '
+                    'rays per sweep in the ingest header')
+
+            self._raw_product_bhdrs.append([
+                _unpack_raw_prod_bhdr(
+                    buf[record * RECORD_SIZE:(record + 1) * RECORD_SIZE])
+                for record in range(lead, last_record + 1)])
             for j, name in enumerate(self.data_type_names):
-                temp = sweep_metadata[j]
-                (az0, el0, az1, el1, ray_nbins, ray_time, prf_flag) = temp
-
-                data[name][i] = sweep_data[j]
-                metadata[name]['azimuth_0'][i] = az0
-                metadata[name]['azimuth_1'][i] = az1
-                metadata[name]['elevation_0'][i] = el0
-                metadata[name]['elevation_1'][i] = el1
-                metadata[name]['nbins'][i] = ray_nbins
-                metadata[name]['time'][i] = ray_time
-                metadata[name]['prf_flag'][i] = prf_flag
                 self.ingest_data_headers[name].append(ingest_data_hdrs[j])
+            nsweeps_read += 1
+            lead = last_record + 1
+        self._record_number = 2 + lead
+
+        if nsweeps_read != nsweeps:
+            mess = ('File truncated or corrupt, %i of %i sweeps read' %
+                    (nsweeps_read, nsweeps))
+            warnings.warn(mess)
+
+        # convert the data and parse the metadata of each data type in a
+        # single pass over all sweeps
+        rays = raw_data[:nsweeps_read].reshape(-1, nbins + 6)
+        shape = (nsweeps_read, nrays)
+        data = {}
+        metadata = {}
+        for i, (data_type, name) in enumerate(
+                zip(self.data_types, self.data_type_names)):
+            type_rays = rays[i::ndata_types]
+            if data_type == 0 and full_xhdr:
+                data[name] = type_rays[:, 6:].reshape(shape + (nbins, ))
+            else:
+                converted = convert_sigmet_data(
+                    data_type, type_rays[:, 6:], type_rays[:, 4])
+                if np.ma.isMaskedArray(converted):
+                    # use the default fill value of masked float32 arrays
+                    converted.fill_value = None
+                data[name] = converted.reshape(shape + converted.shape[1:])
+
+            (az0, el0, az1, el1, ray_nbins, ray_time, prf_flag) = (
+                _parse_ray_headers(type_rays[:, :6]))
+            metadata[name] = {
+                'azimuth_0': az0.astype('float32').reshape(shape),
+                'elevation_0': el0.astype('float32').reshape(shape),
+                'azimuth_1': az1.astype('float32').reshape(shape),
+                'elevation_1': el1.astype('float32').reshape(shape),
+                'nbins': ray_nbins.reshape(shape),
+                'time': ray_time.reshape(shape),
+                'prf_flag': prf_flag.astype('int16').reshape(shape)}
 
         # scale 1-byte velocity by the Nyquist (section 4.3.29)
         # this conversion is kept in this method so that the
@@ -238,187 +293,105 @@ cdef class SigmetFile:
 
         return data, metadata
 
-    def _get_sweep(self, full_xhdr=False, raw_data=False):
-        """
-        Get the data and metadata from the next sweep.
-
-        If the file ends early None is returned for all values.
-
-        Parameters
-        ----------
-        full_xhdr : bool
-            True to return the full extended headers if they exist padded with
-            ones.  False will return a length 1 extended header converted to
-            int32.  This is useful when the file contains a customer specified
-            extended header (for example aircraft radar).
-        raw_data : bool, optional
-            True to return the raw_data for the given sweep, False to
-            convert the data to floating point representation.
-
-        Returns
-        -------
-        ingest_data_headers : list of dict
-            List of ingest_data_header structures for each data type.
-        sweep_data : list of arrays
-            Sweep data for each data types in the order they appear in the
-            file.
-        sweep_metadata : list of tuples
-            Sweep metadata for each data type in the same order as sweep_data.
-
-        """
-
-        # get the next record
-        lead_record = self._fh.read(RECORD_SIZE)
-        self._record_number += 1
-
-        # check if the file ended early, if so return Nones
-        if len(lead_record) != RECORD_SIZE:
-            return None, None, None
+# functions used by the SigmetFile class
 
-        # unpack structures
-        raw_prod_bhdr = _unpack_raw_prod_bhdr(lead_record)
-        self._raw_product_bhdrs.append([raw_prod_bhdr])
-        ingest_data_headers = _unpack_ingest_data_headers(
-            lead_record, self.ndata_types)
-        if ingest_data_headers is None:
-            return None, None, None
 
-        # determine size of data
-        nray_data_types = [d['number_rays_file_expected']
-                           for d in ingest_data_headers]
-        nrays = sum(nray_data_types)    # total rays
-        nbins = self.product_hdr['product_end']['number_bins']
+def _decode_sweep(records, lead, pos, out):
+    """
+    Decode the compressed rays of a sweep, releasing the GIL.
 
-        # prepare to read rays
-        self._rbuf = np.frombuffer(lead_record, dtype='int16')
-        self._rbuf_p = <np.int16_t*>self._rbuf.data
-        self._rbuf_pos = int((12 + 76 * self.ndata_types) / 2) - 1
-        # set data initially to ones so that missing data can be better
-        # seen when debugging
-        raw_sweep_data = np.ones((nrays, nbins + 6), dtype='int16')
-
-        # get the raw data ray-by-ray
-        for ray_i in xrange(nrays):
-            if self.debug:
-                print("Reading ray: %i of %i" % (ray_i, nrays), end='')
-                print("self._rbuf_pos is", self._rbuf_pos)
-            if self._get_ray(nbins, raw_sweep_data[ray_i]):
-                return None, None, None
-
-        # return raw data if requested
-        if raw_data:
-            return ingest_data_headers, raw_sweep_data
-
-        # convert the data and parse the metadata
-        sweep_data = []
-        sweep_metadata = []
-        for i, data_type in enumerate(self.data_types):
-            if data_type == 0 and full_xhdr:
-                sweep_data.append(raw_sweep_data[i::self.ndata_types, 6:])
-            else:
-                sweep_data.append(convert_sigmet_data(
-                    data_type, raw_sweep_data[i::self.ndata_types, 6:],
-                    raw_sweep_data[i::self.ndata_types, 4]))
-            sweep_metadata.append(_parse_ray_headers(
-                raw_sweep_data[i::self.ndata_types, :6]))
-        return ingest_data_headers, sweep_data, sweep_metadata
-
-    @cython.wraparound(False)
-    cdef int _get_ray(self, int nbins, np.ndarray[np.int16_t, ndim=1] out):
-        """
-        Get the next ray, loading new records as needed.
+    Parameters
+    ----------
+    records : array, shape=(nrecords, 3072)
+        Records of the file following the headers as int16 words.
+    lead : int
+        Index of the lead record of the sweep in records.
+    pos : int
+        Position of the word before the first ray in the lead record.
+    out : array, shape=(nrays, nbins + 6)
+        Array to decode the rays of the sweep into.
 
-        Parameters
-        ----------
-        nbins : int
-            Number of bins in the ray.
-        out : ndarray
-            Array to load ray data into.
+    Returns
+    -------
+    last_record : int
+        Index of the last record containing data from the sweep, -1 if the
+        file ended early or is corrupt.
 
-        Returns
-        -------
-        status : int
-            0 on success, -1 if failed.
+    """
+    cdef const np.int16_t[:, ::1] records_view = records
+    cdef np.int16_t[:, ::1] out_view = out
+    cdef Py_ssize_t c_lead = lead
+    cdef Py_ssize_t c_pos = pos
+    cdef Py_ssize_t last_record
+    with nogil:
+        last_record = _decode_sweep_rays(records_view, c_lead, c_pos, out_view)
+    return last_record
 
-        """
-        cdef short compression_code
-        cdef int words, remain, out_pos, first_end, i
 
-        if self._incr_rbuf_pos():
-            return -1   # failed read
-        compression_code = self._rbuf_p[self._rbuf_pos]
-        out_pos = 0
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _decode_sweep_rays(
+        const np.int16_t[:, ::1] records, Py_ssize_t record, Py_ssize_t pos,
+        np.int16_t[:, ::1] out) nogil:
+    """ Decode the rays of a sweep, see _decode_sweep. """
+    cdef Py_ssize_t nrecords = records.shape[0]
+    cdef Py_ssize_t record_words = records.shape[1]
+    cdef Py_ssize_t nrays = out.shape[0]
+    cdef Py_ssize_t width = out.shape[1]
+    cdef Py_ssize_t ray, out_pos, words, n, i
+    cdef np.int16_t compression_code
+
+    for ray in range(nrays):
+        # advance to the compression code of the ray, the first 6 words of
+        # each record are the raw_prod_bhdr
+        pos += 1
+        if pos >= record_words:
+            record += 1
+            pos = 6
+            if record >= nrecords:
+                return -1   # failed read
+        compression_code = records[record, pos]
 
         if compression_code == 1:
             # mark ray as missing by setting numbers of bins to -1
-            out[4] = -1
-            return 0
+            out[ray, 4] = -1
+            continue
 
+        out_pos = 0
         while compression_code != 1:
-
-            if self._incr_rbuf_pos():
-                return -1   # failed read
+            pos += 1
+            if pos >= record_words:
+                record += 1
+                pos = 6
+                if record >= nrecords:
+                    return -1   # failed read
             if compression_code < 0:
-                words = compression_code + 32768    # last 7 bits give size
-                if self._rbuf_pos + words <= 3072:
-                    # all compressed data is in the current record
-                    for i in range(words):
-                        out[out_pos + i] = self._rbuf_p[self._rbuf_pos + i]
-                    if self._incr_rbuf_pos(words):
-                        return -1   # failed read
-                    out_pos += words
-                else:
-                    # data is split between current and next record
-                    # store data from current record
-                    remain = words - (3072 - self._rbuf_pos)
-                    first_end = out_pos + words - remain
-                    for i in range(first_end - out_pos):
-                        out[out_pos + i] = self._rbuf_p[self._rbuf_pos + i]
-
-                    # read data from next record and store
-                    self._load_record()
-                    for i in range(out_pos + words - first_end):
-                        out[first_end + i] = self._rbuf_p[self._rbuf_pos + i]
-
-                    if self._incr_rbuf_pos(remain):
-                        return -1   # failed read
-                    out_pos += words
+                # last 15 bits give the number of data words which follow,
+                # these may be split between records
+                words = compression_code + 32768
+                if out_pos + words > width:
+                    return -1   # file is corrupt
+                while words > 0:
+                    n = min(words, record_words - pos)
+                    for i in range(n):
+                        out[ray, out_pos + i] = records[record, pos + i]
+                    out_pos += n
+                    words -= n
+                    pos += n
+                    if pos >= record_words:
+                        record += 1
+                        pos = 6
+                        if record >= nrecords:
+                            return -1   # failed read
             else:
                 # add zeros to out
-                if compression_code + out_pos > nbins + 6:
+                if compression_code + out_pos > width:
                     return -1   # file is corrupt
                 for i in range(compression_code):
-                    out[out_pos + i] = 0
+                    out[ray, out_pos + i] = 0
                 out_pos += compression_code
-            compression_code = self._rbuf_p[self._rbuf_pos]
-
-        return 0
-
-    cdef int _incr_rbuf_pos(self, int incr=1):
-        """
-        Increment the record buffer position, load a new record if needed.
-        """
-        self._rbuf_pos += incr
-        if self._rbuf_pos >= 3072:
-            if self._load_record():
-                return -1   # failed read
-        return 0
-
-    cdef int _load_record(self):
-        """ Load the next record. returns -1 on fail, 0 if success. """
-        record = self._fh.read(RECORD_SIZE)
-        if len(record) != RECORD_SIZE:
-            return -1   # failed read
-        self._record_number += 1
-        if self.debug:
-            print("Finished loading record:", self._record_number)
-        self._raw_product_bhdrs[-1].append(_unpack_raw_prod_bhdr(record))
-        self._rbuf = np.frombuffer(record, dtype='int16')
-        self._rbuf_pos = 6
-        self._rbuf_p = <np.int16_t*>self._rbuf.data
-        return 0
-
-# functions used by the SigmetFile class
+            compression_code = records[record, pos]
+    return record
 
 
 def _data_types_from_mask(word0, word1, word2, word3):
@@ -665,136 +638,172 @@ def convert_sigmet_data(data_type, data, nbins):
         'DBZE8',    # Clutter corrected reflectivity enhanced, 1-byte
     ]
 
+    two_byte = [
+        'WIDTH2',   # 2-byte Width Format, section 4.3.36
+        'PHIDP2',   # 2-byte PhiDP format, section 4.3.19
+        'HCLASS2',  # 2-byte HydroClass Format, section 4.3.9
+    ]
+
+    if data_type_name == 'XHDR':
+        # Extended Headers, 0
+        # extended_header_v0, _v1, _v2, section 4.2.8-4.2.10
+        # Here we return an array with the times in milliseconds.
+        return data[..., :2].copy().view('i4')
+
+    # The conversions are evaluated for each of the possible values, ndata,
+    # creating look up tables which are then applied to the raw data.
+    if (data_type_name in like_dbt2 or data_type_name in like_sqi2 or
+            data_type_name in two_byte or data_type_name[-1] == '2'):
+        # two byte data types
+        raw_ndata = data.view('uint16')
+        ndata = np.arange(65536, dtype='uint16')
+    else:
+        # one byte data types
+        # make a view of left half of the data as uint8,
+        # this is the actual ray data collected, the right half is blank.
+        nrays, nbin = data.shape
+        raw_ndata = data.view('(2,) uint8').reshape(nrays, -1)[:, :nbin]
+        ndata = np.arange(256, dtype='uint8')
+    if not raw_ndata.flags.writeable:
+        raw_ndata = raw_ndata.copy()
+    lut = np.empty(len(ndata), dtype='float32')
+    lut_mask = np.zeros(len(ndata), dtype=np.bool8)
+
     if data_type_name in like_dbt2:
         # value = (N - 32768) / 100.
         # 0 : no data available (mask)
         # 65535 Reserved for area not scanned in product file (nothing)
-        out[:] = (data.view('uint16') - 32768.) / 100.
-        mask[data.view('uint16') == 0] = True
+        lut[:] = (ndata - 32768.) / 100.
+        lut_mask[ndata == 0] = True
 
     elif data_type_name in like_sqi2:
         # value = (N - 1) / 65533
         # 0 : no data available (mask)
         # 65535 Area not scanned
-        out[:] = (data.view('uint16') - 1.) / 65533.
-        mask[data.view('uint16') == 0] = True
+        lut[:] = (ndata - 1.) / 65533.
+        lut_mask[ndata == 0] = True
 
     elif data_type_name == 'WIDTH2':
         # DB_WIDTH2, 11, Width (2 byte)
         # 2-byte Width Format, section 4.3.36
-        out[:] = data.view('uint16') / 100.
-        mask[data.view('uint16') == 0] = True
+        lut[:] = ndata / 100.
+        lut_mask[ndata == 0] = True
 
     elif data_type_name == 'PHIDP2':
         # DB_PHIDP2, 24, PhiDP (Differential Phase) (2 byte)
         # 2-byte PhiDP format, section 4.3.19
-        out[:] = 360. * (data.view('uint16') - 1.) / 65534.
-        mask[data.view('uint16') == 0] = True
+        lut[:] = 360. * (ndata - 1.) / 65534.
+        lut_mask[ndata == 0] = True
 
     elif data_type_name == 'HCLASS2':
         # DB_HCLASS2, 56, Hydrometeor class (2 byte)
         # 2-byte HydroClass Format, section 4.3.9
-        out[:] = data.view('uint16')
+        lut[:] = ndata
 
-    elif data_type_name == 'XHDR':
-        # Extended Headers, 0
-        # extended_header_v0, _v1, _v2, section 4.2.8-4.2.10
-        # Here we return an array with the times in milliseconds.
-        return data[..., :2].copy().view('i4')
+    elif data_type_name in like_dbt:
+        # DB_DBT, 1, Total Power (1 byte)
+        # 1-byte Reflectivity Format, section 4.3.3
+        lut[:] = (ndata - 64.) / 2.
+        lut_mask[ndata == 0] = True
 
-    # one byte data types
-    elif data_type_name[-1] != '2':
-        # make a view of left half of the data as uint8,
-        # this is the actual ray data collected, the right half is blank.
-        nrays, nbin = data.shape
-        ndata = data.view('(2,) uint8').reshape(nrays, -1)[:, :nbin]
-
-        if data_type_name in like_dbt:
-            # DB_DBT, 1, Total Power (1 byte)
-            # 1-byte Reflectivity Format, section 4.3.3
-            out[:] = (ndata - 64.) / 2.
-            mask[ndata == 0] = True
-
-        elif data_type_name in like_sqi:
-            # value = sqrt((N - 1) / 253)
-            # 0 : no data available (mask)
-            # 255 Area not scanned
-            out[:] = np.sqrt((ndata - 1.) / 253.)
-            mask[ndata == 0] = True
-            mask[ndata == 255] = True
-
-        elif data_type_name == 'VEL':
-            # VEL, 3, Velocity (1 byte)
-            # 1-byte Velocity Format, section 4.3.29
-            # Note that this data should be multiplied by Nyquist,
-            # this is done in the get_data method of the SigmetFile class.
-            out[:] = (ndata - 128.) / 127.
-            mask[ndata == 0] = True
-
-        elif data_type_name == 'WIDTH':
-            # WIDTH, 4, Width (1 byte)
-            # 1-byte Width format, section 4.3.25
-            # Note that this data should be multiplied by the unambiguous
-            # velocity
-            out[:] = ndata / 256.
-            mask[ndata == 0] = True
-
-        elif data_type_name == 'ZDR':
-            # ZDR, 5, Differential reflectivity (1 byte)
-            # 1-byte ZDR format, section 4.3.37
-            out[:] = (ndata - 128.) / 16.
-            mask[ndata == 0] = True
-
-        elif data_type_name == 'KDP':
-            # KDP, 14, KDP (Differential phase) (1 byte)
-            # 1-byte KDP format, section 4.3.12
-            # Note that this data should be divided by the wavelength in cm
-            # as is the units are deg * cm / km
-
-            # above 128 use positive value equation
-            exp = np.power(600., (ndata[ndata > 128] - 129.) / 126.)
-            out[ndata > 128] = 0.25 * exp
-            # below 128, use negative value equation
-            exp = np.power(600., (127. - ndata[ndata < 128]) / 126.)
-            out[ndata < 128] = -0.25 * exp
-            # equal to 128, zero
-            out[ndata == 128] = 0
-
-            mask[ndata == 0] = True
-            mask[ndata == 255] = True
-
-        elif data_type_name == 'PHIDP':
-            # PHIDP, 16, PhiDP(Differential phase) (1 byte)
-            # 1-byte PhiDP format, section 4.3.18
-            out[:] = 180. * ((ndata - 1.) / 254.)
-            mask[ndata == 0] = True
-            mask[ndata == 255] = True
-
-        elif data_type_name == "HCLASS":
-            # HCLASS, 55, Hydrometeor class (1 byte)
-            # 1-byte HydroClass format, section 4.3.8
-            out[:] = ndata[:]
-            mask[ndata == 0] = True     # No data available
-            mask[ndata == 255] = True   # Area not scanned
+    elif data_type_name in like_sqi:
+        # value = sqrt((N - 1) / 253)
+        # 0 : no data available (mask)
+        # 255 Area not scanned
+        lut[:] = np.sqrt((ndata - 1.) / 253.)
+        lut_mask[ndata == 0] = True
+        lut_mask[ndata == 255] = True
+
+    elif data_type_name == 'VEL':
+        # VEL, 3, Velocity (1 byte)
+        # 1-byte Velocity Format, section 4.3.29
+        # Note that this data should be multiplied by Nyquist,
+        # this is done in the get_data method of the SigmetFile class.
+        lut[:] = (ndata - 128.) / 127.
+        lut_mask[ndata == 0] = True
+
+    elif data_type_name == 'WIDTH':
+        # WIDTH, 4, Width (1 byte)
+        # 1-byte Width format, section 4.3.25
+        # Note that this data should be multiplied by the unambiguous
+        # velocity
+        lut[:] = ndata / 256.
+        lut_mask[ndata == 0] = True
+
+    elif data_type_name == 'ZDR':
+        # ZDR, 5, Differential reflectivity (1 byte)
+        # 1-byte ZDR format, section 4.3.37
+        lut[:] = (ndata - 128.) / 16.
+        lut_mask[ndata == 0] = True
+
+    elif data_type_name == 'KDP':
+        # KDP, 14, KDP (Differential phase) (1 byte)
+        # 1-byte KDP format, section 4.3.12
+        # Note that this data should be divided by the wavelength in cm
+        # as is the units are deg * cm / km
+
+        # above 128 use positive value equation
+        exp = np.power(600., (ndata[ndata > 128] - 129.) / 126.)
+        lut[ndata > 128] = 0.25 * exp
+        # below 128, use negative value equation
+        exp = np.power(600., (127. - ndata[ndata < 128]) / 126.)
+        lut[ndata < 128] = -0.25 * exp
+        # equal to 128, zero
+        lut[ndata == 128] = 0
+
+        lut_mask[ndata == 0] = True
+        lut_mask[ndata == 255] = True
+
+    elif data_type_name == 'PHIDP':
+        # PHIDP, 16, PhiDP(Differential phase) (1 byte)
+        # 1-byte PhiDP format, section 4.3.18
+        lut[:] = 180. * ((ndata - 1.) / 254.)
+        lut_mask[ndata == 0] = True
+        lut_mask[ndata == 255] = True
+
+    elif data_type_name == "HCLASS":
+        # HCLASS, 55, Hydrometeor class (1 byte)
+        # 1-byte HydroClass format, section 4.3.8
+        lut[:] = ndata[:]
+        lut_mask[ndata == 0] = True     # No data available
+        lut_mask[ndata == 255] = True   # Area not scanned
 
-        else:
-            # TODO implement conversions for addition 1-byte formats
-            warnings.warn('Unknown type: %s, returning raw data' % data_type)
-            out[:] = np.ma.masked_array(data)
-            return out
     else:
         # TODO implement conversions for additional formats.
         warnings.warn('Unknown type: %s, returning raw data' % data_type)
         out[:] = data
         return np.ma.masked_array(out)
 
-    # mask any gates which are beyond the number of gates in that ray.
+    # apply the look up tables and mask any gates which are beyond the
+    # number of gates in that ray.
+    _apply_lut(raw_ndata, lut, lut_mask.view(np.uint8), out,
+               mask.view(np.uint8))
     _mask_gates_not_collected(mask.view(np.uint8), nbins)
 
     return np.ma.masked_array(out, mask=mask, fill_value=-9999.0,
                               shrink=False)
 
 
+ctypedef fused raw_t:
+    np.uint8_t
+    np.uint16_t
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _apply_lut(
+        raw_t[:, :] raw, const float[::1] lut,
+        const np.uint8_t[::1] lut_mask, float[:, :] out,
+        np.uint8_t[:, :] mask):
+    """ Convert raw data using a look up table of values and masks. """
+    cdef Py_ssize_t i, j
+    with nogil:
+        for i in range(raw.shape[0]):
+            for j in range(raw.shape[1]):
+                out[i, j] = lut[raw[i, j]]
+                mask[i, j] = lut_mask[raw[i, j]]
+
+
 @cython.boundscheck(False)
 cdef _mask_gates_not_collected(
         np.ndarray[np.uint8_t, ndim=2] mask,
@@ -4,20 +4,35 @@ pyart.io.auto_read
 
 Automatic reading of radar files by detecting format.
 
+The format of a file is determined by a registry of sniffers which examine
+the first bytes of the file. Each format is registered with a reader which is
+passed the already opened (and if needed decompressed) file, additional
+formats can be added using :py:func:`register_format`.
+
 .. autosummary::
     :toctree: generated/
 
     read
     determine_filetype
+    register_format
+    _sniff_signatures
+    _sniff
+    _read_cached
+    _read_netcdf
+    _read_rsl
 
 """
 
 import bz2
 import gzip
-import pathlib
+import io
+import os
+import warnings
 
 import netCDF4
 
+from ..core.radar import Radar
+
 from .rsl import read_rsl, _RSL_AVAILABLE
 from .mdv_radar import read_mdv
 from .cfradial import read_cfradial
@@ -30,9 +45,26 @@ from .chl import read_chl
 from .common import radar_format
 from .sband_archive import read_sband_archive
 from .c98d_archive import C98DRadFile
+from .radar_cache import read_cache, write_cache, cache_filename
+
+# Number of bytes from the beginning of a file passed to the sniffers.
+_HEADER_SIZE = 512
+
+# Registered formats as (name, sniffer, reader) tuples in the order in which
+# they are examined, populated at the bottom of this module.
+_FORMATS = []
 
+# Compressed files, the contents are decompressed once into memory.
+_COMPRESSIONS = [
+    ('BZ2', b'BZh', bz2.decompress, 'Bzip'),
+    ('GZ', b'\x1f\x8b', gzip.decompress, 'Gzip'),
+]
 
-def read(filename, use_rsl=False, **kwargs):
+# Formats which are read by RSL when use_rsl is True.
+_RSL_NATIVE_FORMATS = ['SIGMET', 'UF']
+
+
+def read(filename, use_rsl=False, cache_dir=None, **kwargs):
     """
     Read a radar file and return a radar object.
 
@@ -40,13 +72,21 @@ def read(filename, use_rsl=False, **kwargs):
 
     Parameters
     ----------
-    filename : str
-        Name of radar file to read.
+    filename : str or file-like object
+        Name of radar file to read or a file-like object opened for reading
+        in binary mode.
     use_rsl : bool
         True will use the TRMM RSL library to read files which are supported
         both natively and by RSL. False will choose the native read function.
         RSL will always be used to read a file if it is not supported
         natively.
+    cache_dir : str or None
+        Directory in which to keep Py-ART radar cache files of the files
+        read, see :py:func:`write_cache`. When the file has been read before
+        with the same parameters and has not been modified since, the radar
+        is read from the cache file, otherwise the file is read and a cache
+        file is written. None, the default, disables caching. Only used when
+        filename is the name of a file.
 
     Other Parameters
     -------------------
@@ -83,69 +123,60 @@ def read(filename, use_rsl=False, **kwargs):
         Radar object. A TypeError is raised if the format cannot be
         determined.
 
-    """
-    filetype = determine_filetype(filename)
+    Notes
+    -----
+    The file is opened once, the first bytes are examined by the registered
+    sniffers and the open file is passed to the reader of the matching
+    format. Bzip and Gzip compressed files are decompressed into memory once
+    and the decompressed data is examined and read in the same manner.
 
-    # Bzip, uncompress and see if we can determine the type
-    if filetype == 'BZ2':
-        bzfile = bz2.BZ2File(filename)
+    """
+    if cache_dir is not None and not hasattr(filename, 'read'):
+        return _read_cached(filename, use_rsl, cache_dir, kwargs)
+
+    if hasattr(filename, 'read'):
+        fh = filename
+    else:
+        fh = open(filename, 'rb')
+
+    header = fh.read(_HEADER_SIZE)
+    fh.seek(-len(header), 1)
+    filetype, reader = _sniff(header)
+
+    # compressed, decompress once and read the contents
+    for name, _, decompress, description in _COMPRESSIONS:
+        if filetype != name:
+            continue
         try:
-            radar = read(bzfile, use_rsl, **kwargs)
-        except:
-            raise ValueError(
-                'Bzip file cannot be read compressed, '
-                'uncompress and try again')
+            buf = io.BytesIO(decompress(fh.read()))
         finally:
-            bzfile.close()
-        return radar
-
-    # Gzip, uncompress and see if we can determine the type
-    if filetype == 'GZ':
-        gzfile = gzip.open(filename, 'rb')
+            if fh is not filename:
+                fh.close()
         try:
-            radar = read(gzfile, use_rsl, **kwargs)
-        except:
+            return read(buf, use_rsl, **kwargs)
+        except Exception:
             raise ValueError(
-                'Gzip file cannot be read compressed, '
-                'uncompress and try again')
-        finally:
-            gzfile.close()
-        return radar
-
-    # Py-ART only supported formats
-    if filetype == "MDV":
-        return read_mdv(filename, **kwargs)
-    if filetype == "NETCDF3" or filetype == "NETCDF4":
-        dset = netCDF4.Dataset(filename)
-        if 'cdm_data_type' in dset.ncattrs():   # NEXRAD CDM
-            dset.close()
-            return read_nexrad_cdm(filename, **kwargs)
-        else:
-            dset.close()
-            return read_cfradial(filename, **kwargs)    # CF/Radial
-    if filetype == 'WSR88D':
-        return read_nexrad_archive(filename, **kwargs)
-    if filetype == 'CHL':
-        return read_chl(filename, **kwargs)
-    if filetype == 'NEXRADL3':
-        return read_nexrad_level3(filename, **kwargs)
+                '%s file cannot be read compressed, '
+                'uncompress and try again' % description)
 
     # RSL supported formats which are also supported natively in Py-ART
-    if filetype == "SIGMET":
-        if use_rsl:
-            return read_rsl(filename, **kwargs)
-        else:
-            return read_sigmet(filename, **kwargs)
-    if filetype == "UF":
-        if use_rsl:
-            return read_rsl(filename, **kwargs)
-        else:
-            return read_uf(filename, **kwargs)
-
-    # RSL only supported file formats
-    rsl_formats = ['HDF4', 'RSL', 'DORAD', 'LASSEN']
-    if filetype in rsl_formats and _RSL_AVAILABLE:
-        return read_rsl(filename, **kwargs)
+    if use_rsl and filetype in _RSL_NATIVE_FORMATS:
+        reader = _read_rsl
+
+    if reader is not None:
+        try:
+            radar = reader(fh, **kwargs)
+        except Exception:
+            if fh is not filename:
+                fh.close()
+            raise
+        # readers which do not close the open file leave it to us
+        if reader in _NON_CLOSING_READERS and fh is not filename:
+            fh.close()
+        return radar
+
+    if fh is not filename:
+        fh.close()
 
     cn_radar = radar_format(filename)
 
@@ -164,6 +195,7 @@ def determine_filetype(filename):
     The following filetypes are detected:
 
     * 'MDV'
+    * 'CHL'
     * 'NETCDF3'
     * 'NETCDF4'
     * 'WSR88D'
@@ -171,13 +203,16 @@ def determine_filetype(filename):
     * 'UF'
     * 'HDF4'
     * 'RSL'
-    * 'DORAD'
+    * 'DORADE'
     * 'SIGMET'
     * 'LASSEN'
+    * 'PYART_CACHE'
     * 'BZ2'
     * 'GZ'
     * 'UNKNOWN'
 
+    as well as any formats added with :py:func:`register_format`.
+
     Parameters
     ----------
     filename : str
@@ -189,104 +224,215 @@ def determine_filetype(filename):
         Type of file.
 
     """
-    # TODO
-    # detect the following formats, those supported by RSL
-    # 'RADTEC', the SPANDAR radar at Wallops Island, VA
-    # 'MCGILL', McGill S-band
-    # 'TOGA', DYNAMO project's radar
-    # 'RAPIC', Berrimah Australia
-    # 'RAINBOW'
-
-    # read the first 12 bytes from the file
+    # read the first bytes from the file
     try:
         f = open(filename, 'rb')
-        begin = f.read(12)
+        begin = f.read(_HEADER_SIZE)
         f.close()
     except TypeError:
         f = filename
-        begin = f.read(12)
-        f.seek(-12, 1)
+        begin = f.read(_HEADER_SIZE)
+        f.seek(-len(begin), 1)
+    return _sniff(begin)[0]
+
+
+def register_format(name, sniffer, reader=None):
+    """
+    Register a file format for use by read and determine_filetype.
+
+    Formats are examined in the reverse order of registration, a format
+    registered with this function is examined before all built-in formats.
+    Registering a format with the name of an existing format replaces it.
+
+    Parameters
+    ----------
+    name : str
+        Name of the format, this is the filetype returned by
+        :py:func:`determine_filetype`.
+    sniffer : function
+        Function which is passed the first bytes (up to 512) of a file and
+        returns True if the file is of this format. Sniffers should only
+        examine these bytes, they are evaluated for every file read.
+    reader : function or None
+        Function which reads the format and returns a Radar object, called
+        as ``reader(fh, **kwargs)`` where fh is a file-like object opened in
+        binary mode positioned at the beginning of the file, kwargs are the
+        additional parameters passed to :py:func:`read`. The reader takes
+        ownership of fh and should close it when no longer needed. None will
+        register a format which is detected but cannot be read.
+
+    """
+    _FORMATS[:] = [fmt for fmt in _FORMATS if fmt[0] != name]
+    _FORMATS.insert(0, (name, sniffer, reader))
+
+
+def _sniff(header):
+    """
+    Return the filetype and reader of the first matching registered format.
+    """
+    for name, sniffer, reader in _FORMATS:
+        if sniffer(header):
+            return name, reader
+    for name, signature, _, _ in _COMPRESSIONS:
+        if header.startswith(signature):
+            return name, None
+    # Cannot determine filetype
+    return 'UNKNOWN', None
+
+
+def _sniff_signatures(*signatures):
+    """
+    Return a sniffer which matches files containing any of the given
+    (offset, signature) byte strings.
+    """
+    def sniffer(header):
+        """ Return True if the header contains any of the signatures. """
+        for offset, signature in signatures:
+            if header[offset:offset + len(signature)] == signature:
+                return True
+        return False
+    return sniffer
+
 
+def _read_cached(filename, use_rsl, cache_dir, kwargs):
+    """
+    Read a radar file using a cache file in cache_dir when one exists for
+    the file and parameters, otherwise read the file and write a cache file.
+    """
+    delay_field_loading = kwargs.get('delay_field_loading', False)
+    key_kwargs = dict(kwargs, use_rsl=use_rsl)
+    key_kwargs.pop('delay_field_loading', None)
+    cache_file = cache_filename(cache_dir, filename, **key_kwargs)
+    if os.path.exists(cache_file):
+        try:
+            return read_cache(
+                cache_file, delay_field_loading=delay_field_loading)
+        except (ValueError, KeyError):
+            pass    # damaged or outdated cache file, replace it
+
+    radar = read(filename, use_rsl, **kwargs)
+    if not isinstance(radar, Radar):
+        return radar
+    # write to a temporary file so that other processes never see a
+    # partially written cache file
+    tmp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        write_cache(radar, tmp_file)
+        os.replace(tmp_file, cache_file)
+    except (TypeError, OSError) as error:
+        warnings.warn('Radar cache file not written: %s' % error)
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return radar
+
+
+def _read_netcdf(fh, **kwargs):
+    """
+    Read a NetCDF file using read_nexrad_cdm or read_cfradial.
+
+    The netCDF4 Dataset is opened once, from disk by name or from memory
+    when fh is not a file on disk, and passed to the reader. fh is not
+    closed.
+    """
+    if isinstance(fh, io.BufferedReader):
+        dset = netCDF4.Dataset(fh.name)
+    else:
+        dset = netCDF4.Dataset('memory', memory=fh.read())
+    if 'cdm_data_type' in dset.ncattrs():   # NEXRAD CDM
+        return read_nexrad_cdm(dset, **kwargs)
+    else:
+        return read_cfradial(dset, **kwargs)    # CF/Radial
+
+
+def _read_rsl(fh, **kwargs):
+    """ Read a file on disk by name using RSL, fh is not closed. """
+    if not isinstance(fh, io.BufferedReader):
+        raise ValueError('RSL can only read uncompressed files on disk')
+    return read_rsl(fh.name, **kwargs)
+
+
+# Readers which do not close the open file passed to them, files on disk
+# are read by name.
+_NON_CLOSING_READERS = (_read_netcdf, _read_rsl, read_cache)
+
+
+# TODO
+# detect the following formats, those supported by RSL
+# 'RADTEC', the SPANDAR radar at Wallops Island, VA
+# 'MCGILL', McGill S-band
+# 'TOGA', DYNAMO project's radar
+# 'RAPIC', Berrimah Australia
+# 'RAINBOW'
+
+# RSL only supported file formats are detected but only read if RSL is
+# available.
+if _RSL_AVAILABLE:
+    _rsl_reader = _read_rsl
+else:
+    _rsl_reader = None
+
+# built-in formats, registered last to first so that they are examined in
+# the order given here.
+_BUILTIN_FORMATS = [
     # MDV, read with read_mdv
     # MDV format signature from MDV FORMAT Interface Control Document (ICD)
     # recond_len1, struct_id, revision_number
     # 1016, 14142, 1
     # import struct
     # mdv_signature = struct.pack('>3i', 1016, 14142, 1)
-    mdv_signature = b'\x00\x00\x03\xf8\x00\x007>\x00\x00\x00\x01'
-    if begin[:12] == mdv_signature:
-        return "MDV"
+    ('MDV', _sniff_signatures(
+        (0, b'\x00\x00\x03\xf8\x00\x007>\x00\x00\x00\x01')), read_mdv),
 
     # CSU-CHILL
     # begins with ARCH_ID_FILE_HDR = 0x5aa80004
     # import struct
     # struct.pack('<i', 0x5aa80004)
-    chl_signature = b'\x04\x00\xa8Z'
-    if begin[:4] == chl_signature:
-        return "CHL"
+    ('CHL', _sniff_signatures((0, b'\x04\x00\xa8Z')), read_chl),
 
-    # NetCDF3, read with read_cfradial
-    if begin[:3] == b"CDF":
-        return "NETCDF3"
+    # NetCDF3, read with read_cfradial or read_nexrad_cdm
+    ('NETCDF3', _sniff_signatures((0, b'CDF')), _read_netcdf),
 
     # NetCDF4, read with read_cfradial, contained in a HDF5 container
     # HDF5 format signature from HDF5 specification documentation
-    hdf5_signature = b'\x89\x48\x44\x46\x0d\x0a\x1a\x0a'
-    if begin[:8] == hdf5_signature:
-        return "NETCDF4"
-
-    # NEXRAD LEVEL 3 begin with SDUSXX KXXX
-    nexrad_l3_signature = b'SDUS'
-    if begin[:4] == nexrad_l3_signature:
-        return "NEXRADL3"
+    ('NETCDF4', _sniff_signatures((0, b'\x89\x48\x44\x46\x0d\x0a\x1a\x0a')),
+     _read_netcdf),
 
-    # NEXRAD LEVEL 3 with NOAAPORT record seperator
-    # Start of heading (x01) \r\r\nXXX \r\r\nSDUSXX KXXX
-    if begin[:4] == b'\x01\r\r\n':
-        return "NEXRADL3"
+    # NEXRAD LEVEL 3 begin with SDUSXX KXXX or with a NOAAPORT record
+    # seperator, Start of heading (x01) \r\r\nXXX \r\r\nSDUSXX KXXX
+    ('NEXRADL3', _sniff_signatures((0, b'SDUS'), (0, b'\x01\r\r\n')),
+     read_nexrad_level3),
 
-    # Other files should be read with read_rsl
     # WSR-88D begin with ARCHIVE2. or AR2V000
-    if begin[:9] == b'ARCHIVE2.' or begin[:7] == b'AR2V000':
-        return "WSR88D"
+    ('WSR88D', _sniff_signatures((0, b'ARCHIVE2.'), (0, b'AR2V000')),
+     read_nexrad_archive),
 
     # Universal format has UF in bytes 0,1 or 2,3 or 4,5
-    if begin[:2] == b"UF" or begin[2:4] == b"UF" or begin[4:6] == b"UF":
-        return "UF"
+    ('UF', _sniff_signatures((0, b'UF'), (2, b'UF'), (4, b'UF')), read_uf),
 
     # DORADE files
-    if begin[:4] == b"SSWB" or begin[:4] == b"VOLD" or begin[:4] == b"COMM":
-        return "DORADE"
+    ('DORADE', _sniff_signatures((0, b'SSWB'), (0, b'VOLD'), (0, b'COMM')),
+     _rsl_reader),
 
     # LASSEN
-    if begin[4:11] == b'SUNRISE':
-        return "LASSEN"
+    ('LASSEN', _sniff_signatures((4, b'SUNRISE')), _rsl_reader),
 
     # RSL file
-    if begin[:3] == b"RSL":
-        return "RSL"
+    ('RSL', _sniff_signatures((0, b'RSL')), _rsl_reader),
 
     # HDF4 file
     # HDF4 format signature from HDF4 specification documentation
-    hdf4_signature = b'\x0e\x03\x13\x01'
-    if begin[:4] == hdf4_signature:
-        return "HDF4"
+    ('HDF4', _sniff_signatures((0, b'\x0e\x03\x13\x01')), _rsl_reader),
 
     # SIGMET files
     # SIGMET format is a structure_header with a Product configuration
     # indicator (see section 4.2.47)
-    # sigmet_signature = chr(27)
-    sigmet_signature = b'\x1b'
-    if begin[0:1] == sigmet_signature:
-        return "SIGMET"
-
-    # bzip2 compressed files
-    bzip2_signature = b'BZh'
-    if begin[:3] == bzip2_signature:
-        return 'BZ2'
-
-    gzip_signature = b'\x1f\x8b'
-    if begin[:2] == gzip_signature:
-        return 'GZ'
-    # Cannot determine filetype
-    return "UNKNOWN"
+    ('SIGMET', _sniff_signatures((0, b'\x1b')), read_sigmet),
+
+    # Py-ART radar cache files, written by write_cache
+    ('PYART_CACHE', _sniff_signatures((0, b'PYARTRC\x00')), read_cache),
+]
+
+for _name, _sniffer, _reader in _BUILTIN_FORMATS[::-1]:
+    register_format(_name, _sniffer, _reader)
@@ -76,8 +76,10 @@ def read_cfradial(filename, field_names=None, additional_metadata=None,
 
     Parameters
     ----------
-    filename : str
-        Name of CF/Radial netCDF file to read data from.
+    filename : str or netCDF4.Dataset
+        Name of CF/Radial netCDF file to read data from or an open
+        netCDF4 Dataset of such a file, which is closed by this function
+        unless delay_field_loading is True.
     field_names : dict, optional
         Dictionary mapping field names in the file names to radar field names.
         Unlike other read functions, fields not in this dictionary or having a
@@ -124,7 +126,10 @@ def read_cfradial(filename, field_names=None, additional_metadata=None,
                                 file_field_names, exclude_fields)
 
     # read the data
-    ncobj = netCDF4.Dataset(filename)
+    if isinstance(filename, netCDF4.Dataset):
+        ncobj = filename
+    else:
+        ncobj = netCDF4.Dataset(filename)
     ncvars = ncobj.variables
 
     # 4.1 Global attribute -> move to metadata dictionary
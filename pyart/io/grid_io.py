@@ -8,23 +8,43 @@ Reading and writing Grid objects.
     :toctree: generated/
 
     read_grid
+    read_grids_xarray
     write_grid
+    append_grid
     _make_coordinatesystem_dict
 
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _GridFieldDataExtractor
+
 """
 
+import copy
 import datetime
+import os
 import warnings
 
 import netCDF4
 import numpy as np
+import xarray
+try:
+    import dask.array
+    _DASK_AVAILABLE = True
+except ImportError:
+    _DASK_AVAILABLE = False
 
 from ..core.grid import Grid
+from ..lazydict import LazyLoadDict
 from .cfradial import _ncvar_to_dict, _create_ncvar
+from .cfradial import _NetCDFVariableDataExtractor
 from .common import _test_arguments
 
 
-def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
+def read_grid(filename, exclude_fields=None, include_fields=None,
+              delay_field_loading=False, time_index=None, levels=None,
+              **kwargs):
     """
     Read a netCDF grid file produced by Py-ART.
 
@@ -44,6 +64,22 @@ def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
         List of fields to include from the radar object. This is applied
         after the `file_field_names` and `field_names` parameters. Set
         to None to include all fields not specified by exclude_fields.
+    delay_field_loading : bool
+        True to delay loading of field data from the file until the 'data'
+        key in a particular field dictionary is accessed. In this case
+        the field attribute of the returned Grid object will contain
+        LazyLoadDict objects not dict objects. Dask backed datasets created
+        from such a grid with :py:func:`Grid.to_xarray` read the field data
+        one z-level at a time.
+    time_index : int or None, optional
+        Index of the time step to read from a file containing a time series
+        of grids, such as those written by :py:func:`append_grid`. Negative
+        indices count from the last time step. None, the default, reads the
+        first time step.
+    levels : int, list, slice or None, optional
+        Indices of the z-levels to read. Only these levels of the fields are
+        read from the file and the z attribute of the grid is reduced to
+        match. None, the default, reads all levels.
 
     Returns
     -------
@@ -91,10 +127,23 @@ def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
     # read in the fields
     fields = {}
 
-    # fields in the file has a shape of (1, nz, ny, nx) with the leading 1
-    # indicating time but should shaped (nz, ny, nx) in the Grid object
+    # fields in the file has a shape of (ntime, nz, ny, nx), a single time
+    # step is read as a (nz, ny, nx) array in the Grid object
+    ntime = len(dset.dimensions['time'])
     field_shape = tuple([len(dset.dimensions[d]) for d in ['z', 'y', 'x']])
-    field_shape_with_time = (1, ) + field_shape
+    field_shape_with_time = (ntime, ) + field_shape
+
+    # select the time step and levels, raising IndexError when out of range
+    if time_index is None:
+        time_index = 0
+    time_index = range(ntime)[time_index]
+    if ntime > 1:
+        for dic in [time, origin_latitude, origin_longitude, origin_altitude]:
+            if len(dic['data']) == ntime:
+                dic['data'] = dic['data'][time_index:time_index + 1]
+    if levels is not None:
+        levels = np.atleast_1d(np.arange(field_shape[0])[levels])
+        z['data'] = z['data'][levels]
 
     # check all non-reserved variables, those with the correct shape
     # are added to the field dictionary, if a wrong sized field is
@@ -106,15 +155,21 @@ def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
         if include_fields is not None:
             if field not in include_fields:
                 continue
-        field_dic = _ncvar_to_dict(dset.variables[field])
-        if field_dic['data'].shape == field_shape_with_time:
-            field_dic['data'].shape = field_shape
-            fields[field] = field_dic
-        else:
-            bad_shape = field_dic['data'].shape
+        ncvar = dset.variables[field]
+        if ncvar.shape != field_shape_with_time:
             warnings.warn(
                 'Field %s skipped due to incorrect shape %s'
-                % (field, bad_shape))
+                % (field, ncvar.shape))
+            continue
+        field_dic = dict((k, getattr(ncvar, k)) for k in ncvar.ncattrs()
+                         if k not in ['scale_factor', 'add_offset'])
+        data_extractor = _GridFieldDataExtractor(ncvar, time_index, levels)
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', data_extractor)
+        else:
+            field_dic['data'] = data_extractor()
+        fields[field] = field_dic
 
     # radar_ variables
     if 'radar_latitude' in dset.variables:
@@ -142,7 +197,9 @@ def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
     else:
         radar_time = None
 
-    dset.close()
+    # do not close file if field loading is delayed
+    if not delay_field_loading:
+        dset.close()
 
     return Grid(
         time, fields, metadata,
@@ -153,6 +210,54 @@ def read_grid(filename, exclude_fields=None, include_fields=None, **kwargs):
         radar_time=radar_time)
 
 
+def read_grids_xarray(filenames, fields=None, mask_to_nan=True, dask=None):
+    """
+    Read a time series of netCDF grid files into a single xarray Dataset.
+
+    The grids must share the same coordinates. When dask is used the fields
+    are backed by dask arrays chunked by time and z-level which are read from
+    the files only when computed, allowing time series larger than memory to
+    be processed.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Filenames of the netCDF grid files to read in time order, each
+        produced by :py:func:`write_grid` or having an identical layout.
+
+    Other Parameters
+    ----------------
+    fields : list or None, optional
+        Fields to include in the dataset. None includes all fields.
+    mask_to_nan : bool, optional
+        True to replace masked points with NaN, False to keep the values
+        stored in the files. See :py:func:`Grid.to_xarray`.
+    dask : bool or None, optional
+        True to back the fields with dask arrays, requires dask. False reads
+        all fields into memory. None, the default, uses dask arrays when dask
+        is installed.
+
+    Returns
+    -------
+    ds : xarray.Dataset
+        Dataset with the fields of all grids concatenated along the time
+        dimension.
+
+    """
+    if len(filenames) == 0:
+        raise ValueError('At least one filename must be given')
+    if dask is None:
+        dask = _DASK_AVAILABLE
+    datasets = []
+    for filename in filenames:
+        grid = read_grid(filename, include_fields=fields,
+                         delay_field_loading=dask)
+        datasets.append(grid.to_xarray(
+            fields=fields, mask_to_nan=mask_to_nan, dask=dask))
+    return xarray.concat(datasets, dim='time', data_vars='minimal',
+                         coords='minimal', compat='override')
+
+
 def write_grid(filename, grid, format='NETCDF4',
                write_proj_coord_sys=True, proj_coord_sys=None,
                arm_time_variables=False, arm_alt_lat_lon_variables=False,
@@ -362,6 +467,101 @@ def write_grid(filename, grid, format='NETCDF4',
     return
 
 
+def append_grid(filename, grid, zlib=True, complevel=4, chunksizes=None,
+                **kwargs):
+    """
+    Append a Grid object to a time series of grids in a netCDF4 file.
+
+    When the file does not exist it is created by :py:func:`write_grid` with
+    compressed and chunked field variables, otherwise the grid is added as
+    the next step along the unlimited time dimension. Single time steps and
+    levels can be read back using the time_index and levels parameters of
+    :py:func:`read_grid`.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the netCDF4 grid time series file.
+    grid : Grid
+        Grid object to append. Appended grids must have the same x, y and z
+        coordinates as those already in the file.
+    zlib : bool, optional
+        True to compress the field variables with zlib and the shuffle
+        filter. Only used when the file is created.
+    complevel : int, optional
+        zlib compression level between 1 and 9. Only used when the file is
+        created.
+    chunksizes : tuple or None, optional
+        Chunk shape (time, z, y, x) of the field variables. None, the
+        default, stores each time step as a single (1, nz, ny, nx) chunk,
+        (1, 1, ny, nx) chunks allow single levels to be read without
+        decompressing the rest of the time step. Only used when the file is
+        created.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Additional parameters passed to :py:func:`write_grid` when the file
+        is created.
+
+    Notes
+    -----
+    Settings given by the _Zlib, _DeflateLevel, _Shuffle and _ChunkSizes
+    keys of the field dictionaries take precedence over the parameters.
+    Fields in the file which are missing from an appended grid are filled
+    with missing values, fields of an appended grid which are not in the
+    file are skipped with a warning.
+
+    """
+    if not os.path.exists(filename):
+        if chunksizes is None:
+            chunksizes = (1, grid.nz, grid.ny, grid.nx)
+        settings = {'_Zlib': zlib, '_DeflateLevel': complevel,
+                    '_Shuffle': zlib, '_ChunkSizes': chunksizes}
+        grid = copy.copy(grid)
+        grid.fields = dict(
+            (field, dict(settings, **field_dic))
+            for field, field_dic in grid.fields.items())
+        write_grid(filename, grid, format='NETCDF4', **kwargs)
+        return
+
+    dset = netCDF4.Dataset(filename, mode='a')
+    try:
+        for dim in ['x', 'y', 'z']:
+            values = dset.variables[dim][:]
+            if (values.shape != getattr(grid, dim)['data'].shape or
+                    not np.allclose(values, getattr(grid, dim)['data'])):
+                raise ValueError(
+                    'Grid %s coordinates do not match those in %s'
+                    % (dim, filename))
+        index = len(dset.dimensions['time'])
+
+        # time variables are converted to the units of the file
+        grid_time = netCDF4.num2date(
+            grid.time['data'][0], grid.time['units'],
+            grid.time.get('calendar', 'standard'))
+        for name in ['time', 'time_offset']:
+            if name in dset.variables:
+                ncvar = dset.variables[name]
+                ncvar[index] = netCDF4.date2num(
+                    grid_time, ncvar.units,
+                    getattr(ncvar, 'calendar', 'standard'))
+
+        for name in ['origin_latitude', 'origin_longitude',
+                     'origin_altitude']:
+            dset.variables[name][index] = getattr(grid, name)['data'][0]
+
+        for field, field_dic in grid.fields.items():
+            if field not in dset.variables:
+                warnings.warn(
+                    'Field %s is not in %s and was skipped' % (
+                        field, filename))
+                continue
+            dset.variables[field][index] = field_dic['data']
+    finally:
+        dset.close()
+
+
 def _make_coordinatesystem_dict(grid):
     """
     Return a dictionary containing parameters for a coordinate transform.
@@ -430,3 +630,56 @@ def _make_coordinatesystem_dict(grid):
         cdm_transform = None
 
     return cdm_transform
+
+
+class _GridFieldDataExtractor(_NetCDFVariableDataExtractor):
+    """
+    Class facilitating on demand extraction of field data from a grid file.
+
+    A single time step of the variable is extracted, optionally restricted
+    to a selection of levels. The object can be sliced like the resulting
+    (nz, ny, nx) field array, reading only the requested part of the
+    variable.
+
+    Parameters
+    ----------
+    ncvar : netCDF4.Variable
+        NetCDF Variable with dimensions (time, z, y, x) from which data will
+        be extracted.
+    time_index : int, optional
+        Index of the time step to extract.
+    levels : array or None, optional
+        Indices of the z-levels to extract, None extracts all levels.
+
+    """
+
+    def __init__(self, ncvar, time_index=0, levels=None):
+        """ initialize the object. """
+        super(_GridFieldDataExtractor, self).__init__(ncvar)
+        self.time_index = time_index
+        self.levels = levels
+        self.shape = ncvar.shape[1:]
+        if levels is not None:
+            self.shape = (len(levels), ) + self.shape[1:]
+        self.ndim = len(self.shape)
+        # packed variables are unpacked to the type of the scaling parameters
+        scaling = [getattr(ncvar, k) for k in ['scale_factor', 'add_offset']
+                   if k in ncvar.ncattrs()]
+        if len(scaling):
+            self.dtype = np.result_type(*scaling)
+        else:
+            self.dtype = ncvar.dtype
+
+    def __call__(self):
+        """ Return an array containing the field data. """
+        if self.levels is None:
+            return self.ncvar[self.time_index]
+        return self.ncvar[self.time_index, self.levels]
+
+    def __getitem__(self, key):
+        """ Return a slice of the field data. """
+        if not isinstance(key, tuple):
+            key = (key, )
+        if self.levels is not None and len(key):
+            key = (self.levels[key[0]], ) + key[1:]
+        return self.ncvar[(self.time_index, ) + key]
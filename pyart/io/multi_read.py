@@ -0,0 +1,347 @@
+"""
+pyart.io.multi_read
+===================
+
+Reading of many radar files in parallel.
+
+.. autosummary::
+    :toctree: generated/
+
+    read_many
+    _read_many_unordered
+    _start_pool
+    _read_in_pool
+    _read_shared
+    _unpack_shared
+    _radar_nbytes
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    RadarCollection
+
+"""
+
+import collections
+import multiprocessing
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+    _SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    _SHARED_MEMORY_AVAILABLE = False
+
+from ..util.datetime_utils import datetime_from_radar
+from .auto_read import read
+
+
+def read_many(filenames, workers=None, **kwargs):
+    """
+    Read many radar files, yielding Radar objects in time order.
+
+    Each file is read with :py:func:`read`. When more than one worker is
+    requested the files are read in a pool of worker processes and the field
+    data is transferred to the calling process through shared memory rather
+    than being pickled.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the radar files to read.
+    workers : int, optional
+        Number of worker processes. None or 1 reads all files in the calling
+        process.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Additional parameters passed to :py:func:`read`.
+
+    Yields
+    ------
+    radar : Radar
+        Radar objects ordered by the time of their first ray, radars with
+        equal times are yielded in the order of filenames.
+
+    Notes
+    -----
+    All files are read before the first radar is yielded so that they can be
+    ordered by time. Use :py:class:`RadarCollection` to work with more files
+    than fit in memory.
+
+    """
+    radars = list(_read_many_unordered(filenames, workers, kwargs))
+    radars.sort(key=lambda item: (datetime_from_radar(item[1]), item[0]))
+    # release each radar once it has been yielded
+    radars.reverse()
+    while radars:
+        yield radars.pop()[1]
+
+
+class RadarCollection(object):
+    """
+    A lazily loaded collection of radar volumes stored in many files.
+
+    Members are read when accessed and are kept in memory until the total
+    size of their field data exceeds a memory budget, at which point the
+    least recently accessed members are released and will be read again if
+    accessed later.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of the radar files in the collection, these should be given in
+        time order.
+    memory_budget : int, optional
+        Maximum number of bytes of field data to keep in memory. The most
+        recently accessed member is always kept. None keeps all members which
+        have been read.
+    workers : int, optional
+        Number of worker processes used to read ahead when iterating over the
+        collection, see :py:func:`read_many`. None or 1 reads members one at a
+        time in the calling process.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Additional parameters passed to :py:func:`read`.
+
+    Attributes
+    ----------
+    filenames : list of str
+        Names of the radar files in the collection.
+    memory_budget : int or None
+        Maximum number of bytes of field data kept in memory.
+    workers : int or None
+        Number of worker processes used when iterating.
+    nbytes : int
+        Number of bytes of field data currently held in memory.
+
+    """
+
+    def __init__(self, filenames, memory_budget=None, workers=None,
+                 **kwargs):
+        """ Initialize the object. """
+        self.filenames = list(filenames)
+        self.memory_budget = memory_budget
+        self.workers = workers
+        self.nbytes = 0
+        self._kwargs = kwargs
+        # index -> (radar, nbytes) in least to most recently accessed order
+        self._loaded = collections.OrderedDict()
+
+    def __len__(self):
+        """ Return the number of members in the collection. """
+        return len(self.filenames)
+
+    def __getitem__(self, index):
+        """ Return a member of the collection, reading it if needed. """
+        if index < 0:
+            index += len(self.filenames)
+        if index < 0 or index >= len(self.filenames):
+            raise IndexError('RadarCollection index out of range')
+        if index in self._loaded:
+            self._loaded.move_to_end(index)
+            return self._loaded[index][0]
+        radar = read(self.filenames[index], **self._kwargs)
+        self._store(index, radar)
+        return radar
+
+    def __iter__(self):
+        """ Iterate over the members, reading ahead in parallel. """
+        if self.workers is None or self.workers == 1:
+            for index in range(len(self.filenames)):
+                yield self[index]
+            return
+
+        # read the members not in memory in batches of workers files
+        pool = _start_pool(self.workers)
+        try:
+            index = 0
+            while index < len(self.filenames):
+                # members of the batch are held here until yielded so that
+                # those released from memory while the batch is yielded, by
+                # the memory budget or by access between yields, are not lost
+                batch = {}
+                missing = []
+                stop = index
+                while (stop < len(self.filenames) and
+                       len(missing) < self.workers):
+                    if stop in self._loaded:
+                        batch[stop] = self._loaded[stop][0]
+                    else:
+                        missing.append(stop)
+                    stop += 1
+                filenames = [self.filenames[i] for i in missing]
+                for j, radar in _read_in_pool(pool, filenames, self._kwargs):
+                    batch[missing[j]] = radar
+                for i in range(index, stop):
+                    radar = batch.pop(i)
+                    if i in self._loaded:
+                        self._loaded.move_to_end(i)
+                    else:
+                        self._store(i, radar)
+                    yield radar
+                index = stop
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def is_loaded(self, index):
+        """ Return True if a member is currently held in memory. """
+        if index < 0:
+            index += len(self.filenames)
+        return index in self._loaded
+
+    def release(self):
+        """ Release all members held in memory. """
+        self._loaded.clear()
+        self.nbytes = 0
+
+    def _store(self, index, radar):
+        """ Keep a member in memory, releasing others over the budget. """
+        nbytes = _radar_nbytes(radar)
+        self._loaded[index] = (radar, nbytes)
+        self.nbytes += nbytes
+        if self.memory_budget is None:
+            return
+        while self.nbytes > self.memory_budget and len(self._loaded) > 1:
+            _, (_, released) = self._loaded.popitem(last=False)
+            self.nbytes -= released
+
+
+def _read_many_unordered(filenames, workers, kwargs):
+    """
+    Yield (index, radar) tuples for each file in the order they are read.
+    """
+    if workers is None or workers == 1:
+        for index, filename in enumerate(filenames):
+            yield index, read(filename, **kwargs)
+        return
+
+    pool = _start_pool(workers)
+    try:
+        for item in _read_in_pool(pool, filenames, kwargs):
+            yield item
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _start_pool(workers):
+    """ Return a pool of worker processes for reading files. """
+    if _SHARED_MEMORY_AVAILABLE:
+        # workers share the resource tracker of this process which unlinks
+        # any shared memory blocks which are not received when reading is
+        # abandoned
+        resource_tracker.ensure_running()
+    return multiprocessing.Pool(workers)
+
+
+def _read_in_pool(pool, filenames, kwargs):
+    """
+    Yield (index, radar) tuples for each file read by a pool of worker
+    processes in the order they are read.
+    """
+    tasks = [(index, filename, kwargs)
+             for index, filename in enumerate(filenames)]
+    for result in pool.imap_unordered(_read_shared, tasks):
+        yield _unpack_shared(*result)
+
+
+def _read_shared(task):
+    """
+    Read a file in a worker process, placing the field data in a block of
+    shared memory.
+
+    Returns a (index, radar, shm_name, layout) tuple where radar is the radar
+    with the field data removed and layout lists the (field_name, dtype,
+    shape, offset, mask_offset, fill_value) of each field in the shared memory
+    block named shm_name. None is returned for shm_name when the fields were
+    pickled with the radar.
+    """
+    index, filename, kwargs = task
+    radar = read(filename, **kwargs)
+    fields = getattr(radar, 'fields', None)
+    if not _SHARED_MEMORY_AVAILABLE or not fields:
+        return index, radar, None, []
+
+    # plain dictionaries with the data loaded and placed in contiguous arrays
+    layout = []
+    arrays = []
+    offset = 0
+    for field_name in list(fields):
+        field = dict(fields[field_name])
+        data = np.ma.asarray(field['data'])
+        field['data'] = None
+        fields[field_name] = field
+        values = np.ascontiguousarray(data.data)
+        values_offset = offset
+        arrays.append((values_offset, values))
+        offset += values.nbytes
+        mask = np.ma.getmask(data)
+        if mask is np.ma.nomask:
+            mask_offset = None
+        else:
+            mask = np.ascontiguousarray(mask)
+            mask_offset = offset
+            arrays.append((mask_offset, mask))
+            offset += mask.nbytes
+        layout.append((field_name, values.dtype.str, values.shape,
+                       values_offset, mask_offset, data._fill_value))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for array_offset, array in arrays:
+            shm.buf[array_offset:array_offset + array.nbytes] = (
+                array.reshape(-1).view(np.uint8))
+    finally:
+        shm.close()
+    return index, radar, shm.name, layout
+
+
+def _unpack_shared(index, radar, shm_name, layout):
+    """
+    Restore the field data of a radar read by :py:func:`_read_shared`,
+    releasing the shared memory block. Returns a (index, radar) tuple.
+    """
+    if shm_name is None:
+        return index, radar
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        for field_name, dtype, shape, offset, mask_offset, fill in layout:
+            dtype = np.dtype(dtype)
+            size = int(np.prod(shape))
+            values = np.frombuffer(
+                shm.buf, dtype, size, offset).reshape(shape).copy()
+            if mask_offset is None:
+                mask = np.ma.nomask
+            else:
+                mask = np.frombuffer(
+                    shm.buf, np.bool_, size, mask_offset).reshape(shape).copy()
+            data = np.ma.MaskedArray(values, mask)
+            data._fill_value = fill
+            radar.fields[field_name]['data'] = data
+    finally:
+        shm.close()
+        shm.unlink()
+    return index, radar
+
+
+def _radar_nbytes(radar):
+    """ Return the number of bytes of field data loaded in a radar. """
+    nbytes = 0
+    for field in getattr(radar, 'fields', {}).values():
+        if getattr(field, '_lazyload', {}).get('data') is not None:
+            continue    # not yet loaded
+        data = field.get('data')
+        if data is None:
+            continue
+        nbytes += data.nbytes
+        mask = np.ma.getmask(data)
+        if mask is not np.ma.nomask:
+            nbytes += mask.nbytes
+    return nbytes
@@ -34,12 +34,13 @@ def read_nexrad_cdm(filename, field_names=None, additional_metadata=None,
 
     Parameters
     ----------
-    filename : str
+    filename : str or netCDF4.Dataset
         File name or URL of a Common Data Model (CDM) NEXRAD Level 2 file.
         File of in this format can be created using the NetCDF Java Library
         tools [1]_. A URL of a OPeNDAP file on the UCAR THREDDS Data
         Server [2]_ is also accepted the netCDF4 library has been compiled
-        with OPeNDAP support.
+        with OPeNDAP support. An open netCDF4 Dataset of such a file can
+        also be provided, it is closed by this function.
     field_names : dict, optional
         Dictionary mapping NEXRAD moments to radar field names. If a
         data type found in the file does not appear in this dictionary or has
@@ -94,7 +95,10 @@ def read_nexrad_cdm(filename, field_names=None, additional_metadata=None,
                                 exclude_fields, include_fields)
 
     # open the file
-    dataset = netCDF4.Dataset(filename)
+    if isinstance(filename, netCDF4.Dataset):
+        dataset = filename
+    else:
+        dataset = netCDF4.Dataset(filename)
     dattrs = dataset.ncattrs()
     dvars = dataset.variables
     if 'cdm_data_type' not in dattrs or dataset.cdm_data_type != 'RADIAL':
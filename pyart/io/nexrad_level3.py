@@ -15,7 +15,10 @@ Class for reading data from NEXRAD Level 3 files.
 
     nexrad_level3_message_code
     _datetime_from_mdate_mtime
+    _decode_digital_radials
+    _decode_rle_radials
     _structure_size
+    _structure_to_dtype
     _unpack_from_buf
     _unpack_structure
     _int16_to_float16
@@ -101,8 +104,8 @@ class NEXRADLevel3File(object):
         Symbology header.
     packet_header : dict
         Radial data array packet header.
-    radial_headers : list of dicts
-        List of radials headers.
+    radial_headers : structured array
+        Radial headers, one record per radial.
     raw_data : array
         Raw unscaled, unmasked data.
     data : array
@@ -164,31 +167,18 @@ class NEXRADLevel3File(object):
         packet_code = struct.unpack('>h', buf2[16:18])[0]
         assert packet_code in SUPPORTED_PACKET_CODES
         self.packet_header = _unpack_from_buf(buf2, 16, RADIAL_PACKET_HEADER)
-        self.radial_headers = []
         nbins = self.packet_header['nbins']
         nradials = self.packet_header['nradials']
         nbytes = _unpack_from_buf(buf2, 30, RADIAL_HEADER)['nbytes']
-        if packet_code == 16 and nbytes != nbins:
-            nbins = nbytes  # sometimes these do not match, use nbytes
-        self.raw_data = np.empty((nradials, nbins), dtype='uint8')
-        pos = 30
-
-        for radial in self.raw_data:
-            radial_header = _unpack_from_buf(buf2, pos, RADIAL_HEADER)
-            pos += 6
-            if packet_code == 16:
-                radial[:] = np.frombuffer(buf2[pos:pos+nbins], '>u1')
-                pos += radial_header['nbytes']
-            else:
-                assert packet_code == AF1F
-                # decode run length encoding
-                rle_size = radial_header['nbytes'] * 2
-                rle = np.frombuffer(buf2[pos:pos+rle_size], dtype='>u1')
-                colors = np.bitwise_and(rle, 0b00001111)
-                runs = np.bitwise_and(rle, 0b11110000) // 16
-                radial[:] = np.repeat(colors, runs)
-                pos += rle_size
-            self.radial_headers.append(radial_header)
+        if packet_code == 16:
+            if nbytes != nbins:
+                nbins = nbytes  # sometimes these do not match, use nbytes
+            self.radial_headers, self.raw_data = _decode_digital_radials(
+                buf2, 30, nradials, nbins)
+        else:
+            assert packet_code == AF1F
+            self.radial_headers, self.raw_data = _decode_rle_radials(
+                buf2, 30, nradials, nbins)
 
     def get_location(self):
         """ Return the latitude, longitude and height of the radar. """
@@ -199,8 +189,8 @@ class NEXRADLevel3File(object):
 
     def get_azimuth(self):
         """ Return an array of starting azimuth angles in degrees. """
-        azimuths = [d['angle_start'] for d in self.radial_headers]
-        return np.array(azimuths, dtype='float32') * 0.1
+        azimuths = self.radial_headers['angle_start']
+        return azimuths.astype('float32') * 0.1
 
     def get_range(self):
         """ Return an array of gate range spacing in meters. """
@@ -291,7 +281,7 @@ class NEXRADLevel3File(object):
         data_levels = values * sign * scale
         data_levels[bad] = -999 # sentinal for bad data points
 
-        data = np.choose(self.raw_data, data_levels)
+        data = data_levels[self.raw_data]
         mdata = np.ma.masked_equal(data, -999)
         return mdata
 
@@ -315,6 +305,68 @@ class NEXRADLevel3File(object):
         return mdata
 
 
+def _decode_digital_radials(buf, pos, nradials, nbins):
+    """
+    Decode the radials of a digital radial data array packet (code 16).
+
+    Returns the radial headers as a structured array and the raw data. When
+    all radials have the same size they are decoded with a single strided
+    view of the buffer.
+    """
+    header_dtype = _structure_to_dtype(RADIAL_HEADER)
+    nbytes = struct.unpack_from('>h', buf, pos)[0]
+    if nbytes >= nbins and len(buf) >= pos + nradials * (6 + nbytes):
+        record_dtype = np.dtype(
+            [('header', header_dtype), ('data', 'u1', (nbytes, ))])
+        records = np.frombuffer(buf, record_dtype, nradials, pos)
+        if np.all(records['header']['nbytes'] == nbytes):
+            return records['header'].copy(), records['data'][:, :nbins].copy()
+
+    # radials of varying size are read one at a time
+    radial_headers = np.empty(nradials, dtype=header_dtype)
+    raw_data = np.empty((nradials, nbins), dtype='uint8')
+    for i in range(nradials):
+        radial_headers[i] = struct.unpack_from('>hhh', buf, pos)
+        raw_data[i] = np.frombuffer(buf, 'u1', nbins, pos + 6)
+        pos += 6 + radial_headers[i]['nbytes']
+    return radial_headers, raw_data
+
+
+def _decode_rle_radials(buf, pos, nradials, nbins):
+    """
+    Decode the radials of a run length encoded radial data packet (AF1F).
+
+    Returns the radial headers as a structured array and the raw data. The
+    run length encoded bytes of all radials are gathered and expanded in a
+    single operation.
+    """
+    radial_headers = np.empty(nradials, dtype=_structure_to_dtype(
+        RADIAL_HEADER))
+    starts = np.empty(nradials, dtype=np.intp)
+    for i in range(nradials):
+        radial_headers[i] = struct.unpack_from('>hhh', buf, pos)
+        starts[i] = pos + 6
+        pos += 6 + radial_headers[i]['nbytes'] * 2
+
+    # gather the encoded bytes of all radials, each byte holds a 4 bit run
+    # length and a 4 bit color code
+    sizes = radial_headers['nbytes'].astype(np.intp) * 2
+    offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+    rle = np.frombuffer(buf, dtype='u1')[np.arange(sizes.sum()) + offsets]
+    runs = rle >> 4
+    # bins decoded in each radial, from the cumulative run lengths at the
+    # radial boundaries, which also handles radials without any bytes
+    cum_runs = np.concatenate(([0], np.cumsum(runs, dtype=np.intp)))
+    ends = np.cumsum(sizes)
+    radial_nbins = cum_runs[ends] - cum_runs[ends - sizes]
+    if np.any(radial_nbins != nbins):
+        bad = np.flatnonzero(radial_nbins != nbins)[0]
+        raise ValueError('Run length encoded radial %d contains %d bins, '
+                         'expected %d' % (bad, radial_nbins[bad], nbins))
+    raw_data = np.repeat(rle & 0b00001111, runs)
+    return radial_headers, raw_data.reshape(nradials, nbins)
+
+
 def _datetime_from_mdate_mtime(mdate, mtime):
     """ Returns a datetime for a given message date and time. """
     epoch = datetime.utcfromtimestamp(0)
@@ -326,6 +378,11 @@ def _structure_size(structure):
     return struct.calcsize('>' + ''.join([i[1] for i in structure]))
 
 
+def _structure_to_dtype(structure):
+    """ Return a big-endian NumPy dtype matching a structure. """
+    return np.dtype([(name, '>' + fmt) for name, fmt in structure])
+
+
 def _unpack_from_buf(buf, pos, structure):
     """ Unpack a structure from a buffer. """
     size = _structure_size(structure)
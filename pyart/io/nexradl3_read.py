@@ -8,9 +8,14 @@ Functions for reading NEXRAD Level 3 products.
     :toctree: generated/
 
     read_nexrad_level3
+    read_nexrad_level3_batch
+    _read_nexrad_level3_product
+    _nexrad_level3_radar
 
 """
 
+import multiprocessing
+
 import numpy as np
 
 from ..config import FileMetadata, get_fillvalue
@@ -80,32 +85,141 @@ def read_nexrad_level3(filename, field_names=None, additional_metadata=None,
                                 additional_metadata, file_field_names,
                                 exclude_fields, include_fields)
 
-    # open the file
+    product = _read_nexrad_level3_product(filename, filemetadata)
+    return _nexrad_level3_radar([product], filemetadata)
+
+
+def read_nexrad_level3_batch(filenames, processes=None, field_names=None,
+                             additional_metadata=None, file_field_names=False,
+                             exclude_fields=None, include_fields=None,
+                             **kwargs):
+    """
+    Read many NEXRAD Level 3 products, stacking those with equal geometry.
+
+    The products are decoded in a pool of worker processes. Products of the
+    same type from the same radar, elevation and range gates are stacked in
+    time order into a single Radar object in which each product is a sweep
+    and the time of the rays is the volume start time of the product.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Filenames of the NEXRAD Level 3 product files.
+    processes : int, optional
+        Number of worker processes. None will use the number of CPUs, 1
+        decodes all products in the calling process.
+    field_names, additional_metadata, file_field_names, exclude_fields,
+    include_fields : optional
+        See :py:func:`read_nexrad_level3`.
+
+    Returns
+    -------
+    radars : list of Radar
+        Radar objects for each group of products with equal geometry,
+        ordered by the time of their first product.
+
+    """
+    # test for non empty kwargs
+    _test_arguments(kwargs)
+
+    # create metadata retrieval object
+    filemetadata = FileMetadata('nexrad_level3', field_names,
+                                additional_metadata, file_field_names,
+                                exclude_fields, include_fields)
+
+    tasks = [(filename, filemetadata) for filename in filenames]
+    if processes == 1:
+        products = [_read_nexrad_level3_product(*task) for task in tasks]
+    else:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        chunksize = max(1, len(tasks) // (4 * processes))
+        pool = multiprocessing.Pool(processes)
+        try:
+            products = pool.starmap(
+                _read_nexrad_level3_product, tasks, chunksize=chunksize)
+        finally:
+            pool.close()
+            pool.join()
+
+    # group products with equal geometry, the sort is stable so products
+    # with the same start time remain in the order given
+    products.sort(key=lambda product: product['start'])
+    groups = {}
+    for product in products:
+        _range = product['range']
+        key = (product['msg_code'], product['location'],
+               product['elevation'], len(_range), _range[0], _range[-1])
+        groups.setdefault(key, []).append(product)
+    return [_nexrad_level3_radar(group, filemetadata)
+            for group in groups.values()]
+
+
+def _read_nexrad_level3_product(filename, filemetadata):
+    """
+    Decode a NEXRAD Level 3 product into a dictionary of arrays.
+
+    The field data is only decoded when the product is mapped to a field.
+    """
     nfile = NEXRADLevel3File(prepare_for_read(filename))
-    nradials = nfile.packet_header['nradials']
     msg_code = nfile.msg_header['code']
+    if filemetadata.get_field_name(msg_code) is None:
+        data = None
+    else:
+        data = nfile.get_data()
+    product = {
+        'msg_code': msg_code,
+        'start': nfile.get_volume_start_datetime(),
+        'location': nfile.get_location(),
+        'range': nfile.get_range(),
+        'azimuth': nfile.get_azimuth(),
+        'elevation': nfile.get_elevation(),
+        'data': data,
+    }
+    nfile.close()
+    return product
+
+
+def _nexrad_level3_radar(products, filemetadata):
+    """
+    Create a Radar from decoded NEXRAD Level 3 products, one per sweep.
+
+    All products must have the same type, location and range gates.
+    """
+    nsweeps = len(products)
+    rays_per_sweep = np.array(
+        [len(product['azimuth']) for product in products], dtype='int32')
+    nradials = rays_per_sweep.sum()
+    first = products[0]
 
     # time
     time = filemetadata('time')
-    time_start = nfile.get_volume_start_datetime()
+    time_start = first['start']
     time['units'] = make_time_unit_str(time_start)
-    time['data'] = np.zeros((nradials, ), dtype='float64')
+    offsets = [(product['start'] - time_start).total_seconds()
+               for product in products]
+    time['data'] = np.repeat(
+        np.array(offsets, dtype='float64'), rays_per_sweep)
 
     # range
     _range = filemetadata('range')
-    _range['data'] = nfile.get_range()
+    _range['data'] = first['range']
     _range['meters_to_center_of_first_gate'] = _range['data'][0]
     _range['meters_between_gates'] = _range['data'][1] - _range['data'][0]
 
     # fields
     fields = {}
-    field_name = filemetadata.get_field_name(msg_code)
+    field_name = filemetadata.get_field_name(first['msg_code'])
     if field_name is None:
         fields = {}
     else:
         dic = filemetadata(field_name)
         dic['_FillValue'] = get_fillvalue()
-        dic['data'] = nfile.get_data()
+        if nsweeps == 1:
+            dic['data'] = first['data']
+        else:
+            dic['data'] = np.ma.concatenate(
+                [product['data'] for product in products])
         fields = {field_name: dic}
 
     # metadata
@@ -120,7 +234,7 @@ def read_nexrad_level3(filename, field_names=None, additional_metadata=None,
     longitude = filemetadata('longitude')
     altitude = filemetadata('altitude')
 
-    lat, lon, height = nfile.get_location()
+    lat, lon, height = first['location']
     latitude['data'] = np.array([lat], dtype='float64')
     longitude['data'] = np.array([lon], dtype='float64')
     altitude['data'] = np.array([height], dtype='float64')
@@ -132,22 +246,25 @@ def read_nexrad_level3(filename, field_names=None, additional_metadata=None,
     sweep_start_ray_index = filemetadata('sweep_start_ray_index')
     sweep_end_ray_index = filemetadata('sweep_end_ray_index')
 
-    sweep_number['data'] = np.array([0], dtype='int32')
-    sweep_mode['data'] = np.array(1 * ['azimuth_surveillance'], dtype='S')
+    sweep_number['data'] = np.arange(nsweeps, dtype='int32')
+    sweep_mode['data'] = np.array(
+        nsweeps * ['azimuth_surveillance'], dtype='S')
 
-    sweep_start_ray_index['data'] = np.array([0], dtype='int32')
-    sweep_end_ray_index['data'] = np.array([nradials - 1], dtype='int32')
+    ray_index = np.cumsum(rays_per_sweep, dtype='int32')
+    sweep_start_ray_index['data'] = ray_index - rays_per_sweep
+    sweep_end_ray_index['data'] = ray_index - 1
 
     # azimuth, elevation, fixed_angle
     azimuth = filemetadata('azimuth')
     elevation = filemetadata('elevation')
     fixed_angle = filemetadata('fixed_angle')
-    azimuth['data'] = nfile.get_azimuth()
-    elev = nfile.get_elevation()
-    elevation['data'] = np.ones((nradials, ), dtype='float32') * elev
-    fixed_angle['data'] = np.array([elev], dtype='float32')
+    azimuth['data'] = np.concatenate(
+        [product['azimuth'] for product in products])
+    elevs = np.array(
+        [product['elevation'] for product in products], dtype='float32')
+    elevation['data'] = np.repeat(elevs, rays_per_sweep)
+    fixed_angle['data'] = elevs
 
-    nfile.close()
     return Radar(
         time, _range, fields, metadata, scan_type,
         latitude, longitude, altitude,
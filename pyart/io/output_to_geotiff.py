@@ -8,7 +8,13 @@ Write a Py-ART Grid object to a GeoTIFF file.
     :toctree: generated/
 
     write_grid_geotiff
+    write_grid_cog
     _get_rgb_values
+    _get_rgb_lut
+    _composite_or_level
+    _build_overviews
+    _tile_image
+    _write_tiled_tiff
     _create_sld
 
 """
@@ -17,6 +23,8 @@ from __future__ import division
 
 import os
 import shutil
+import struct
+import zlib
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -215,32 +223,384 @@ def _get_rgb_values(data, vmin, vmax, color_levels, cmap):
         Green channel indices (range = 0-255).
 
     """
-    frac = (data - vmin) / np.float(vmax-vmin)
+    lut = _get_rgb_lut(cmap).astype('float64')
+    index = _get_color_index(data, vmin, vmax, color_levels)
+    missing = index < 0
+    rgb = lut[np.where(missing, 0, index)]
+    rgb[missing] = np.nan
+    return rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+
+def _get_rgb_lut(cmap):
+    """
+    Return a (256, 3) uint8 lookup table with the RGB values of the first 256
+    color indices of a colormap.
+    """
+    cmap = plt.cm.get_cmap(cmap)
+    lut = cmap(np.arange(256))[:, :3]
+    return np.round(lut * 255).astype('uint8')
+
+
+def _get_color_index(data, vmin, vmax, color_levels):
+    """
+    Return the colormap index of each value, -1 for missing values.
+    Out-of-bounds values are given the lowest/highest colors.
+    """
     if color_levels is None:
         color_levels = 255
-    index = (frac * color_levels).ravel()
-    # Out-of-bounds values will be lowest/highest colors
-    index[index < 0] = 0
-    index[index > 255] = 255
-    rarr = []
-    garr = []
-    barr = []
-    cmap = plt.cm.get_cmap(cmap)
-    for val in index:
-        if not np.isnan(val):
-            ind = np.int(np.round(val))
-            r, g, b, t = cmap(ind)
-            rarr.append(np.int(np.round(r * 255)))
-            garr.append(np.int(np.round(g * 255)))
-            barr.append(np.int(np.round(b * 255)))
+    with np.errstate(invalid='ignore'):
+        frac = (data - vmin) / float(vmax - vmin)
+        index = np.clip(frac * color_levels, 0, 255)
+    missing = np.isnan(index)
+    index = np.round(np.where(missing, 0, index)).astype('int32')
+    index[missing] = -1
+    return index
+
+
+def write_grid_cog(grid, filename, fields, levels=None, rgb=False,
+                   cmap='viridis', vmin=0, vmax=75, color_levels=None,
+                   tile_size=256, overviews=None, resampling=None,
+                   compress=True):
+    """
+    Write fields and levels of a Py-ART Grid to a tiled GeoTIFF.
+
+    The GeoTIFF is internally tiled, deflate compressed and contains
+    reduced resolution overviews. All headers are written at the start of
+    the file followed by the overview and full resolution tiles, following
+    the layout of a Cloud Optimized GeoTIFF. Each requested field and level
+    is written as a float32 band in a single pass, or a single field and
+    level is written as RGBA bytes using a vectorized colormap lookup table.
+    The file is written with NumPy and zlib, GDAL is not required.
+
+    The rasters use the Azimuthal Equidistant projection centered at the
+    origin of the grid, which is described with GeoTIFF keys.
+
+    Parameters
+    ----------
+    grid : pyart.core.Grid object
+        Grid object to write to file.
+    filename : str
+        Filename for the GeoTIFF.
+    fields : str or list of str
+        Field names to output to file.
+
+    Other Parameters
+    ----------------
+    levels : int, None or list, optional
+        Indices of the z-axis planes to output for each field. None gives
+        composite values (i.e., max in each vertical column). A list can
+        contain both indices and None. Bands are ordered by field and then
+        by level.
+    rgb : bool, optional
+        True to output a four band RGBA byte GeoTIFF colored using cmap,
+        vmin, vmax and color_levels, which requires a single field and
+        level. Missing values are transparent. False, the default, outputs
+        float32 bands with NaN as the no data value.
+    cmap : str or matplotlib.colors.Colormap object, optional
+        Colormap to use for RGB output.
+    vmin : int or float, optional
+        Minimum value to color for RGB output.
+    vmax : int or float, optional
+        Maximum value to color for RGB output.
+    color_levels : int or None, optional
+        Number of color levels in cmap. Useful for categorical colormaps
+        with steps << 255 (e.g., hydrometeor ID).
+    tile_size : int, optional
+        Width and height of the tiles in pixels, must be a multiple of 16.
+    overviews : list of int or None, optional
+        Decimation factors of the overviews, each a power of 2. None will
+        halve the resolution until the overview fits in a single tile.
+        An empty list writes no overviews.
+    resampling : str or None, optional
+        Overview resampling method, 'average' (NaN aware) or 'nearest'.
+        None uses 'nearest' for RGB output and 'average' otherwise.
+    compress : bool, optional
+        True to deflate compress the tiles, False to store them
+        uncompressed.
+
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    if levels is None or np.ndim(levels) == 0:
+        levels = [levels]
+    for field in fields:
+        if field not in grid.fields:
+            raise KeyError('Failed -', field, 'field not found in Grid object.')
+    if tile_size % 16 != 0 or tile_size <= 0:
+        raise ValueError('tile_size must be a positive multiple of 16')
+    if grid.nx < 2 or grid.ny < 2:
+        # the pixel size is the spacing of the first two points
+        raise ValueError(
+            'Grid must have at least 2 points in x and y to determine '
+            'the pixel size')
+    if resampling is None:
+        resampling = 'nearest' if rgb else 'average'
+    if resampling not in ['average', 'nearest']:
+        raise ValueError('Unknown resampling method: ' + str(resampling))
+
+    bands = []
+    descriptions = []
+    for field in fields:
+        field_data = grid.fields[field]['data']
+        for level in levels:
+            bands.append(_composite_or_level(field_data, level))
+            if level is None:
+                descriptions.append(field + ' composite')
+            else:
+                descriptions.append(field + ' level ' + str(level))
+
+    if rgb:
+        if len(bands) != 1:
+            raise ValueError(
+                'RGB output requires a single field and level')
+        index = _get_color_index(bands[0], vmin, vmax, color_levels)
+        image = np.empty(index.shape + (4, ), dtype='uint8')
+        image[..., :3] = _get_rgb_lut(cmap)[np.where(index < 0, 0, index)]
+        image[..., 3] = np.where(index < 0, 0, 255)
+        fill_value = 0
+        nodata = None
+    else:
+        image = np.stack(bands, axis=-1).astype('float32')
+        fill_value = np.nan
+        nodata = 'nan'
+    # rows are written from north to south
+    image = image[::-1]
+
+    ny, nx = image.shape[:2]
+    if overviews is None:
+        overviews = []
+        factor = 2
+        while max(ny, nx) > tile_size * factor // 2:
+            overviews.append(factor)
+            factor *= 2
+    for factor in overviews:
+        if factor < 2 or factor & (factor - 1):
+            raise ValueError('Overview factors must be powers of 2')
+    images = [image] + _build_overviews(image, overviews, resampling)
+
+    # georeferencing, pixel corners of the top left pixel
+    dx = float(grid.x['data'][1] - grid.x['data'][0])
+    dy = float(grid.y['data'][1] - grid.y['data'][0])
+    x_corner = float(grid.x['data'][0]) - dx / 2.
+    y_corner = float(grid.y['data'][-1]) + dy / 2.
+    lat = float(grid.origin_latitude['data'][0])
+    lon = float(grid.origin_longitude['data'][0])
+    geo_tags = _aeqd_geotiff_tags(lat, lon, dx, dy, x_corner, y_corner)
+
+    metadata = '<GDALMetadata>'
+    for sample, description in enumerate(descriptions):
+        metadata += ('<Item name="DESCRIPTION" sample="%d" '
+                     'role="description">%s</Item>' % (sample, description))
+    metadata += '</GDALMetadata>'
+    geo_tags.append((42112, 2, metadata))
+    if nodata is not None:
+        geo_tags.append((42113, 2, nodata))
+
+    _write_tiled_tiff(filename, images, tile_size, compress, fill_value,
+                      rgb, geo_tags)
+
+
+def _composite_or_level(data, level):
+    """ Return a level or the column maximum of 3D data as float64. """
+    data = np.ma.filled(np.ma.asarray(data).astype('float64'), np.nan)
+    if level is None:
+        # column maximum ignoring missing values
+        return np.fmax.reduce(data, axis=0)
+    return data[level]
+
+
+def _build_overviews(image, factors, resampling):
+    """
+    Return overviews of an image, each decimated by a factor relative to the
+    full resolution image.
+    """
+    overviews = []
+    current = image
+    current_factor = 1
+    for factor in sorted(factors):
+        while current_factor < factor:
+            ny, nx = current.shape[:2]
+            if resampling == 'nearest':
+                current = current[::2, ::2]
+            else:
+                # NaN aware 2 x 2 block average, padding odd edges
+                pad = ((0, ny % 2), (0, nx % 2), (0, 0))
+                padded = np.pad(current.astype('float64'), pad,
+                                mode='constant', constant_values=np.nan)
+                blocks = padded.reshape(
+                    (ny + ny % 2) // 2, 2, (nx + nx % 2) // 2, 2, -1)
+                valid = ~np.isnan(blocks)
+                count = valid.sum(axis=(1, 3))
+                total = np.where(valid, blocks, 0).sum(axis=(1, 3))
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    current = (total / count).astype(image.dtype)
+            current_factor *= 2
+        overviews.append(current)
+    return overviews
+
+
+def _tile_image(image, tile_size, fill_value, compress):
+    """ Return the encoded tiles of an image in row major order. """
+    ny, nx, nsamples = image.shape
+    ntiles_y = -(-ny // tile_size)
+    ntiles_x = -(-nx // tile_size)
+    padded = np.full((ntiles_y * tile_size, ntiles_x * tile_size, nsamples),
+                     fill_value, dtype=image.dtype.newbyteorder('<'))
+    padded[:ny, :nx] = image
+    tiles = padded.reshape(ntiles_y, tile_size, ntiles_x, tile_size,
+                           nsamples).swapaxes(1, 2)
+    encoded = []
+    for tile in tiles.reshape(-1, tile_size, tile_size, nsamples):
+        tile_bytes = np.ascontiguousarray(tile).tobytes()
+        if compress:
+            tile_bytes = zlib.compress(tile_bytes, 6)
+        encoded.append(tile_bytes)
+    return encoded
+
+
+def _write_tiled_tiff(filename, images, tile_size, compress, fill_value,
+                      rgb, geo_tags):
+    """
+    Write a little endian tiled TIFF with the full resolution image followed
+    by overviews. Geo tags are only added to the first image file directory.
+    All directories are written before the tile data, and the tiles of the
+    overviews are written before those of the full resolution image.
+    """
+    nsamples = images[0].shape[2]
+    dtype = images[0].dtype
+    sample_format = 3 if dtype.kind == 'f' else 1
+
+    tiles = [_tile_image(image, tile_size, fill_value, compress)
+             for image in images]
+
+    def directory_tags(i, offsets):
+        """ Tags of the image file directory of image i. """
+        ny, nx = images[i].shape[:2]
+        tags = [
+            (254, 4, [0 if i == 0 else 1]),
+            (256, 4, [nx]),
+            (257, 4, [ny]),
+            (258, 3, [dtype.itemsize * 8] * nsamples),
+            (259, 3, [8 if compress else 1]),
+            (262, 3, [2 if rgb else 1]),
+            (277, 3, [nsamples]),
+            (284, 3, [1]),
+            (322, 3, [tile_size]),
+            (323, 3, [tile_size]),
+            (324, 4, offsets),
+            (325, 4, [len(tile) for tile in tiles[i]]),
+            (339, 3, [sample_format] * nsamples),
+        ]
+        nextra = nsamples - 3 if rgb else nsamples - 1
+        if nextra > 0:
+            # RGB images have an unassociated alpha band
+            tags.append((338, 3, [2 if rgb else 0] * nextra))
+        if i == 0:
+            tags.extend(geo_tags)
+        return sorted(tags, key=lambda tag: tag[0])
+
+    # directories, sized with placeholder tile offsets
+    placeholder = [directory_tags(i, [0] * len(tiles[i]))
+                   for i in range(len(images))]
+    ifd_offsets = []
+    offset = 8
+    for tags in placeholder:
+        ifd_offsets.append(offset)
+        offset += len(_encode_ifd(tags, offset, 0))
+
+    # tile data, smallest overview first
+    tile_offsets = [None] * len(images)
+    for i in reversed(range(len(images))):
+        tile_offsets[i] = []
+        for tile in tiles[i]:
+            tile_offsets[i].append(offset)
+            offset += len(tile)
+    if offset >= 2**32:
+        raise ValueError('GeoTIFF larger than 4 GB, BigTIFF is not supported')
+
+    with open(filename, 'wb') as fh:
+        fh.write(b'II' + struct.pack('<HI', 42, 8))
+        for i in range(len(images)):
+            if i + 1 < len(images):
+                next_offset = ifd_offsets[i + 1]
+            else:
+                next_offset = 0
+            fh.write(_encode_ifd(directory_tags(i, tile_offsets[i]),
+                                 ifd_offsets[i], next_offset))
+        for i in reversed(range(len(images))):
+            for tile in tiles[i]:
+                fh.write(tile)
+
+
+# struct format and size of the TIFF field types used
+_TIFF_TYPES = {2: ('s', 1), 3: ('H', 2), 4: ('I', 4), 12: ('d', 8)}
+
+
+def _encode_ifd(tags, ifd_offset, next_offset):
+    """
+    Encode an image file directory followed by the values which do not fit
+    in the entries.
+    """
+    entries = struct.pack('<H', len(tags))
+    values = b''
+    values_offset = ifd_offset + 2 + 12 * len(tags) + 4
+    for code, tiff_type, value in tags:
+        char, size = _TIFF_TYPES[tiff_type]
+        if tiff_type == 2:
+            data = value.encode('ascii') + b'\x00'
+            count = len(data)
         else:
-            rarr.append(np.nan)
-            garr.append(np.nan)
-            barr.append(np.nan)
-    rarr = np.reshape(rarr, data.shape)
-    garr = np.reshape(garr, data.shape)
-    barr = np.reshape(barr, data.shape)
-    return rarr, garr, barr
+            count = len(value)
+            data = struct.pack('<%d%s' % (count, char), *value)
+        if len(data) <= 4:
+            entries += struct.pack('<HHI', code, tiff_type, count)
+            entries += data.ljust(4, b'\x00')
+        else:
+            entries += struct.pack('<HHII', code, tiff_type, count,
+                                   values_offset + len(values))
+            values += data
+            # keep values word aligned
+            if len(values) % 2:
+                values += b'\x00'
+    entries += struct.pack('<I', next_offset)
+    return entries + values
+
+
+def _aeqd_geotiff_tags(lat, lon, dx, dy, x_corner, y_corner):
+    """
+    Return GeoTIFF tags describing an Azimuthal Equidistant projection on
+    the WGS84 datum and the location of the raster.
+    """
+    citation = 'Azimuthal Equidistant centered at %g, %g|' % (lat, lon)
+    geokeys = [
+        # GTModelType: projected, GTRasterType: pixel is area
+        (1024, 0, 1, 1),
+        (1025, 0, 1, 1),
+        (1026, 34737, len(citation), 0),
+        # GeographicType: WGS 84
+        (2048, 0, 1, 4326),
+        # user defined projected coordinate system and projection
+        (3072, 0, 1, 32767),
+        (3074, 0, 1, 32767),
+        # ProjCoordTrans: CT_AzimuthalEquidistant, linear units metre
+        (3075, 0, 1, 12),
+        (3076, 0, 1, 9001),
+        # false easting, northing, center longitude and latitude
+        (3082, 34736, 1, 0),
+        (3083, 34736, 1, 1),
+        (3088, 34736, 1, 2),
+        (3089, 34736, 1, 3),
+    ]
+    directory = [1, 1, 0, len(geokeys)]
+    for key in geokeys:
+        directory.extend(key)
+    return [
+        (33550, 12, [dx, dy, 0.]),
+        (33922, 12, [0., 0., 0., x_corner, y_corner, 0.]),
+        (34735, 3, directory),
+        (34736, 12, [0., 0., lon, lat]),
+        (34737, 2, citation),
+    ]
 
 
 def _create_sld(cmap, vmin, vmax, filename, color_levels=None):
@@ -0,0 +1,333 @@
+"""
+pyart.io.radar_cache
+====================
+
+Reading and writing of Py-ART radar cache files.
+
+A radar cache file stores a Radar object as a small JSON header describing
+all attributes and fields followed by the arrays as raw little-endian data,
+each aligned to a 64 byte boundary so that the file can be memory-mapped.
+
+.. autosummary::
+    :toctree: generated/
+
+    write_cache
+    read_cache
+    cache_filename
+    _encode
+    _decode
+    _read_header
+    _select_rays
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _FieldDataLoader
+
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+
+import numpy as np
+
+from ..core.radar import Radar
+from ..lazydict import LazyLoadDict
+from .common import _test_arguments
+
+# magic bytes, format version and length of the JSON header
+_MAGIC = b'PYARTRC\x00'
+_VERSION = 1
+_PREFIX = struct.Struct('<8sIIQ')
+
+# alignment in bytes of the header end and each array
+_ALIGNMENT = 64
+
+# Radar attributes stored in the header, in Radar.__init__ order
+_RADAR_ATTRIBUTES = [
+    'time', 'range', 'metadata', 'scan_type', 'latitude', 'longitude',
+    'altitude', 'sweep_number', 'sweep_mode', 'fixed_angle',
+    'sweep_start_ray_index', 'sweep_end_ray_index', 'azimuth', 'elevation',
+    'altitude_agl', 'target_scan_rate', 'rays_are_indexed', 'ray_angle_res',
+    'scan_rate', 'antenna_transition', 'instrument_parameters',
+    'radar_calibration', 'rotation', 'tilt', 'roll', 'drift', 'heading',
+    'pitch', 'georefs_applied']
+
+
+def write_cache(radar, filename):
+    """
+    Write a Radar object to a Py-ART radar cache file.
+
+    Parameters
+    ----------
+    radar : Radar
+        Radar object to write.
+    filename : str
+        Filename of the cache file to create.
+
+    Notes
+    -----
+    The arrays of all attributes and fields, including field masks and
+    arrays in metadata, are stored without compression. Values which are
+    not arrays, strings, numbers, lists or dictionaries with string keys,
+    such as arrays of Python objects or tuples, cannot be stored without
+    changing their type and raise a TypeError.
+
+    """
+    arrays = []
+    attributes = {}
+    for attr in _RADAR_ATTRIBUTES:
+        attributes[attr] = _encode(getattr(radar, attr), arrays)
+    fields = {}
+    for field_name, field in radar.fields.items():
+        fields[field_name] = _encode(dict(field), arrays)
+    header = json.dumps({
+        'attributes': attributes, 'fields': fields}).encode('utf-8')
+
+    with open(filename, 'wb') as fh:
+        fh.write(_PREFIX.pack(_MAGIC, _VERSION, 0, len(header)))
+        fh.write(header)
+        fh.write(b'\x00' * (-fh.tell() % _ALIGNMENT))
+        data_start = fh.tell()
+        for offset, array in arrays:
+            fh.write(b'\x00' * (data_start + offset - fh.tell()))
+            fh.write(array.tobytes())
+
+
+def read_cache(filename, delay_field_loading=False, sweeps=None, mmap=True,
+               **kwargs):
+    """
+    Read a Py-ART radar cache file.
+
+    Parameters
+    ----------
+    filename : str or file-like object
+        Name of the cache file to read or a file-like object opened for
+        reading in binary mode, which is not closed.
+    delay_field_loading : bool, optional
+        True to delay creating the data of each field until the 'data' key in
+        a particular field dictionary is accessed. In this case the field
+        attribute of the returned Radar object will contain LazyLoadDict
+        objects not dict objects.
+    sweeps : list or None, optional
+        Indices of the sweeps to read. None (the default) will read all
+        sweeps.
+    mmap : bool, optional
+        True to memory-map the file, the arrays are then copy-on-write views
+        of the file and data is only read from disk when accessed, so
+        accessing a single sweep of a field only reads that sweep. False
+        reads the entire file into memory. File-like objects which are not
+        files on disk are always read into memory.
+
+    Returns
+    -------
+    radar : Radar
+        Radar object.
+
+    """
+    # test for non empty kwargs
+    _test_arguments(kwargs)
+
+    # file-like objects are not closed, files on disk are mapped by name
+    if hasattr(filename, 'read'):
+        if mmap and isinstance(filename, io.BufferedReader):
+            filename = filename.name
+        else:
+            buf = np.frombuffer(bytearray(filename.read()), dtype=np.uint8)
+    if not hasattr(filename, 'read'):
+        if mmap:
+            # plain ndarray views of the map, which remains open as their base
+            buf = np.memmap(filename, dtype=np.uint8, mode='c').view(
+                np.ndarray)
+        else:
+            buf = np.fromfile(filename, dtype=np.uint8)
+    header, data = _read_header(buf)
+
+    attributes = {}
+    for attr in _RADAR_ATTRIBUTES:
+        attributes[attr] = _decode(header['attributes'][attr], data)
+    attributes['_range'] = attributes.pop('range')
+    radar = Radar(fields={}, **attributes)
+
+    rays = None
+    if sweeps is not None:
+        rays = _select_rays(radar, sweeps)
+        radar = radar.extract_sweeps(sweeps)
+
+    for field_name, encoded in header['fields'].items():
+        encoded = dict(encoded)
+        encoded_data = encoded.pop('data')
+        field_dic = _decode(encoded, data)
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', _FieldDataLoader(
+                encoded_data, data, rays))
+        else:
+            field_dic['data'] = _FieldDataLoader(encoded_data, data, rays)()
+        radar.fields[field_name] = field_dic
+    return radar
+
+
+def cache_filename(cache_dir, filename, **kwargs):
+    """
+    Return the name of the cache file for a radar file read with the given
+    keyword arguments.
+
+    The name is a hash of the absolute path, modification time and size of
+    the file together with the keyword arguments so that the cache file is
+    not used when the file changes or is read with different arguments.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory containing cache files.
+    filename : str
+        Name of the radar file.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments used to read the file.
+
+    Returns
+    -------
+    cache_file : str
+        Name of the cache file in cache_dir.
+
+    """
+    stat = os.stat(filename)
+    key = repr((os.path.abspath(filename), stat.st_mtime_ns, stat.st_size,
+                sorted(kwargs.items())))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, digest + '.pyrc')
+
+
+class _FieldDataLoader(object):
+    """
+    Callable which creates the data of a field from the cache file arrays,
+    optionally selecting rays.
+    """
+
+    def __init__(self, encoded, data, rays):
+        self.encoded = encoded
+        self.data = data
+        self.rays = rays
+
+    def __call__(self):
+        """ Return the field data. """
+        field_data = _decode(self.encoded, self.data)
+        if self.rays is not None:
+            field_data = field_data[self.rays]
+        return field_data
+
+
+def _encode(value, arrays):
+    """
+    Return a JSON serializable representation of a value, arrays are
+    appended to arrays as (offset, little-endian array) tuples.
+    """
+    if isinstance(value, np.generic):
+        return {'__scalar__': [value.dtype.str, value.item()]}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        # JSON would convert other keys to strings
+        for k in value:
+            if not isinstance(k, str):
+                raise TypeError(
+                    'dictionaries with keys of type %s cannot be cached' %
+                    type(k))
+        return dict((k, _encode(v, arrays)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, bytes):
+        return {'__bytes__': value.decode('latin-1')}
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError('arrays of Python objects cannot be cached')
+        array = np.asarray(
+            value, dtype=value.dtype.newbyteorder('<'), order='C')
+        if arrays:
+            offset, last = arrays[-1]
+            offset += last.nbytes
+            offset += -offset % _ALIGNMENT
+        else:
+            offset = 0
+        arrays.append((offset, array))
+        encoded = {'__array__': [array.dtype.str, list(array.shape), offset]}
+        if isinstance(value, np.ma.MaskedArray):
+            encoded['fill_value'] = _encode(value._fill_value, arrays)
+            mask = np.ma.getmask(value)
+            if mask is not np.ma.nomask:
+                encoded['mask'] = _encode(mask, arrays)
+        return encoded
+    raise TypeError('values of type %s cannot be cached' % type(value))
+
+
+def _decode(value, data):
+    """
+    Return the value represented by an encoded value, arrays are views of
+    data, a uint8 array containing the arrays section of a cache file.
+    """
+    if isinstance(value, list):
+        return [_decode(v, data) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '__array__' in value:
+        dtype, shape, offset = value['__array__']
+        dtype = np.dtype(dtype)
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        array = data[offset:offset + nbytes].view(dtype).reshape(tuple(shape))
+        if 'fill_value' not in value:
+            return array
+        if 'mask' in value:
+            array = np.ma.MaskedArray(array, _decode(value['mask'], data))
+        else:
+            array = np.ma.MaskedArray(array)
+        array._fill_value = _decode(value['fill_value'], data)
+        return array
+    if '__scalar__' in value:
+        dtype, item = value['__scalar__']
+        return np.dtype(dtype).type(item)
+    if '__bytes__' in value:
+        return value['__bytes__'].encode('latin-1')
+    return dict((k, _decode(v, data)) for k, v in value.items())
+
+
+def _read_header(buf):
+    """
+    Return the decoded JSON header and the arrays section of a cache file
+    in the uint8 array buf.
+    """
+    if len(buf) < _PREFIX.size:
+        raise ValueError('file is not a Py-ART radar cache file')
+    magic, version, _, header_size = _PREFIX.unpack(
+        buf[:_PREFIX.size].tobytes())
+    if magic != _MAGIC:
+        raise ValueError('file is not a Py-ART radar cache file')
+    if version != _VERSION:
+        raise ValueError('unsupported radar cache version: %d' % version)
+    header_end = _PREFIX.size + header_size
+    header = json.loads(buf[_PREFIX.size:header_end].tobytes())
+    data_start = header_end + (-header_end % _ALIGNMENT)
+    return header, buf[data_start:]
+
+
+def _select_rays(radar, sweeps):
+    """
+    Return a slice or an array selecting the rays in the given sweeps.
+    """
+    sweeps = np.asarray(sweeps, dtype='int32')
+    if np.any(sweeps >= radar.nsweeps) or np.any(sweeps < 0):
+        raise ValueError('invalid sweeps indices in sweeps parameter')
+    starts = radar.sweep_start_ray_index['data'][sweeps]
+    ends = radar.sweep_end_ray_index['data'][sweeps] + 1
+    if np.all(starts[1:] == ends[:-1]):
+        # consecutive sweeps, a slice gives a view of the file
+        return slice(int(starts[0]), int(ends[-1]))
+    return np.concatenate(
+        [np.arange(start, end) for start, end in zip(starts, ends)])
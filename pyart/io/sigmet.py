@@ -12,9 +12,9 @@ Reading and writing of Sigmet (raw format) files
     _is_time_ordered_by_reversal
     _is_time_ordered_by_roll
     _is_time_ordered_by_reverse_roll
-    _time_order_data_and_metadata_roll
-    _time_order_data_and_metadata_reverse
-    _time_order_data_and_metadata_full
+    _time_order_index_roll
+    _time_order_index_reverse
+    _time_order_index_full
 
 """
 
@@ -38,7 +38,7 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
                 file_field_names=False, exclude_fields=None,
                 include_fields=None, time_ordered='none', full_xhdr=None,
                 noaa_hh_hdr=None, debug=False, ignore_xhdr=False,
-                ignore_sweep_start_ms=None, **kwargs):
+                ignore_sweep_start_ms=None, workers=None, **kwargs):
     """
     Read a Sigmet (IRIS) product file.
 
@@ -111,6 +111,10 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
         When there are not extended headers ignoring the millisecond sweep
         times provides time data which is always prior to the actual
         collection time with an error from 0 to 2 seconds.
+    workers : int or None, optional
+        Number of threads used to decode the sweeps in the file. The sweep
+        decoding releases the GIL so multiple sweeps are decoded concurrently
+        when this is larger than 1. None or 1 decodes the sweeps serially.
     debug : bool, optional
         Print debug information during read.
 
@@ -144,7 +148,8 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
             full_xhdr = False
 
     # read data
-    sigmet_data, sigmet_metadata = sigmetfile.read_data(full_xhdr=full_xhdr)
+    sigmet_data, sigmet_metadata = sigmetfile.read_data(
+        full_xhdr=full_xhdr, workers=workers)
     first_data_type = sigmetfile.data_type_names[0]
     if first_data_type == 'XHDR':   # don't use XHDR as the first data type
         first_data_type = sigmetfile.data_type_names[1]
@@ -173,15 +178,19 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
             xhdr_metadata[key] = sigmet_metadata['XHDR'][key].copy()
         sigmet_metadata['XHDR_FULL'] = xhdr_metadata
 
-    # remove missing rays from the data
+    # remove missing rays from the data, rays are then selected by an index
+    # into the flattened (nsweeps * nrays) arrays
     good_rays = (sigmet_metadata[first_data_type]['nbins'] != -1)
     rays_missing = (sigmet_metadata[first_data_type]['nbins'] == -1).sum()
-    for field_name in sigmet_data.keys():
-        sigmet_data[field_name] = sigmet_data[field_name][good_rays]
-        field_metadata = sigmet_metadata[field_name]
-        for key in field_metadata.keys():
-            field_metadata[key] = field_metadata[key][good_rays]
     rays_per_sweep = good_rays.sum(axis=1)
+    ray_index = np.flatnonzero(good_rays)
+
+    # reference times used to time order the rays
+    if 'XHDR' in sigmet_data:
+        ref_time = sigmet_data['XHDR'].reshape(-1)[ray_index]
+    else:
+        ref_time = sigmet_metadata[first_data_type]['time'].astype('int32')
+        ref_time = ref_time.reshape(-1)[ray_index]
 
     # time order
     if time_ordered == 'sequential':
@@ -190,39 +199,39 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
         # If it does not issue a warning and perform no time ordering
         if task_config['task_scan_info']['antenna_scan_mode'] == 2:
             # RHI scan
-            if _is_time_ordered_by_reversal(
-                    sigmet_data, sigmet_metadata, rays_per_sweep):
+            if _is_time_ordered_by_reversal(ref_time, rays_per_sweep):
                 time_ordered = 'reverse'
             else:
                 warnings.warn('Rays not collected sequentially in time.')
                 time_ordered = 'none'
         else:
             # PPI scan
-            if _is_time_ordered_by_roll(
-                    sigmet_data, sigmet_metadata, rays_per_sweep):
+            if _is_time_ordered_by_roll(ref_time, rays_per_sweep):
                 time_ordered = 'roll'
-            elif _is_time_ordered_by_reverse_roll(
-                    sigmet_data, sigmet_metadata, rays_per_sweep):
+            elif _is_time_ordered_by_reverse_roll(ref_time, rays_per_sweep):
                 time_ordered = 'reverse_and_roll'
             else:
                 warnings.warn('Rays not collected sequentially in time.')
                 time_ordered = 'none'
 
     if time_ordered == 'full':
-        _time_order_data_and_metadata_full(
-            sigmet_data, sigmet_metadata, rays_per_sweep)
-    if time_ordered == 'reverse':
-        _time_order_data_and_metadata_reverse(
-            sigmet_data, sigmet_metadata, rays_per_sweep)
-    if time_ordered == 'roll':
-        _time_order_data_and_metadata_roll(
-            sigmet_data, sigmet_metadata, rays_per_sweep)
-    if time_ordered == 'reverse_and_roll':
-        # reverse followed by roll
-        _time_order_data_and_metadata_reverse(
-            sigmet_data, sigmet_metadata, rays_per_sweep)
-        _time_order_data_and_metadata_roll(
-            sigmet_data, sigmet_metadata, rays_per_sweep)
+        ray_index = ray_index[_time_order_index_full(ref_time, rays_per_sweep)]
+    if time_ordered in ['reverse', 'reverse_and_roll']:
+        # reverse, followed by roll for 'reverse_and_roll'
+        index = _time_order_index_reverse(ref_time, rays_per_sweep)
+        ray_index = ray_index[index]
+        ref_time = ref_time[index]
+    if time_ordered in ['roll', 'reverse_and_roll']:
+        ray_index = ray_index[_time_order_index_roll(ref_time, rays_per_sweep)]
+
+    # select the rays of each field and their metadata in a single pass
+    for field_name in sigmet_data.keys():
+        field_data = sigmet_data[field_name]
+        field_data = field_data.reshape(nsweeps * nrays, -1)
+        sigmet_data[field_name] = field_data[ray_index]
+        field_metadata = sigmet_metadata[field_name]
+        for key in field_metadata.keys():
+            field_metadata[key] = field_metadata[key].reshape(-1)[ray_index]
 
     # sweep_start_ray_index and sweep_end_ray_index
     ray_count = good_rays.sum(axis=1)
@@ -471,22 +480,17 @@ def read_sigmet(filename, field_names=None, additional_metadata=None,
         **extended_header_params)
 
 
-def _is_time_ordered_by_reversal(data, metadata, rays_per_sweep):
+def _is_time_ordered_by_reversal(ref_time, rays_per_sweep):
     """
     Returns if volume can be time ordered by reversing some or all sweeps.
     True if the volume can be time ordered, False if not.
     """
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
     start = 0
     for nrays in rays_per_sweep:
-        if nrays == 0 or nrays == 1:
-            continue    # Do not attempt to order sweeps with no rays
         s = slice(start, start + nrays)     # slice which selects sweep
         start += nrays
+        if nrays == 0 or nrays == 1:
+            continue    # Do not attempt to order sweeps with no rays
         sweep_time_diff = np.diff(ref_time[s])
         if np.all(sweep_time_diff >= 0) or np.all(sweep_time_diff <= 0):
             continue
@@ -495,24 +499,19 @@ def _is_time_ordered_by_reversal(data, metadata, rays_per_sweep):
     return True
 
 
-def _is_time_ordered_by_roll(data, metadata, rays_per_sweep):
+def _is_time_ordered_by_roll(ref_time, rays_per_sweep):
     """
     Returns if volume can be time ordered by rolling some or all sweeps.
     True if the volume can be time ordered, False if not.
     """
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
     start = 0
     for nrays in rays_per_sweep:
-        if nrays == 0 or nrays == 1:
-            continue    # Do not attempt to order sweeps with no rays
         s = slice(start, start + nrays)     # slice which selects sweep
-        first = ref_time[start]
-        last = ref_time[start + nrays - 1]
         start += nrays
+        if nrays == 0 or nrays == 1:
+            continue    # Do not attempt to order sweeps with no rays
+        first = ref_time[s][0]
+        last = ref_time[s][-1]
         sweep_time_diff = np.diff(ref_time[s])
         count = np.count_nonzero(sweep_time_diff < 0)
         # compare the first and last times for continuity
@@ -523,24 +522,19 @@ def _is_time_ordered_by_roll(data, metadata, rays_per_sweep):
     return True
 
 
-def _is_time_ordered_by_reverse_roll(data, metadata, rays_per_sweep):
+def _is_time_ordered_by_reverse_roll(ref_time, rays_per_sweep):
     """
     Returns if volume can be time ordered by reversing and rolling some or all
     sweeps. True if the volume can be time ordered, False if not.
     """
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
     start = 0
     for nrays in rays_per_sweep:
-        if nrays == 0 or nrays == 1:
-            continue    # Do not attempt to order sweeps with no rays
         s = slice(start, start + nrays)     # slice which selects sweep
-        first = ref_time[start]
-        last = ref_time[start + nrays - 1]
         start += nrays
+        if nrays == 0 or nrays == 1:
+            continue    # Do not attempt to order sweeps with no rays
+        first = ref_time[s][0]
+        last = ref_time[s][-1]
         sweep_time_diff = np.diff(ref_time[s])
         if sweep_time_diff.min() < 0:   # optional reverse
             sweep_time_diff = np.diff(ref_time[s][::-1])
@@ -554,10 +548,10 @@ def _is_time_ordered_by_reverse_roll(data, metadata, rays_per_sweep):
     return True
 
 
-def _time_order_data_and_metadata_roll(data, metadata, rays_per_sweep):
+def _time_order_index_roll(ref_time, rays_per_sweep):
     """
-    Put Sigmet data and metadata in time increasing order using a roll
-    operation.
+    Return the ray indices which put Sigmet data in time increasing order
+    using a roll operation.
     """
     # Sigmet data is stored by sweep in azimuth or elevation increasing order.
     # Time ordering PPI scans can typically be achieved by rolling the
@@ -565,76 +559,52 @@ def _time_order_data_and_metadata_roll(data, metadata, rays_per_sweep):
     # here.  Perfect time ordering is achieved if the rays within the sweep
     # were collected sequentially in a clockwise manner from 0 to 360 degrees
     # regardless of the first azimuth collected.
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
-
+    index = np.arange(len(ref_time))
     start = 0
     for nrays in rays_per_sweep:
+        s = slice(start, start + nrays)     # slice which selects sweep
+        start += nrays
         if nrays == 0 or nrays == 1:
             continue    # Do not attempt to order sweeps with no rays
 
-        s = slice(start, start + nrays)     # slice which selects sweep
-        start += nrays
         # determine the number of place by which elements should be shifted.
-        sweep_time = ref_time[s]
-        sweep_time_diff = np.diff(sweep_time)
+        sweep_time_diff = np.diff(ref_time[s])
         if sweep_time_diff.min() >= 0:
             continue    # already time ordered
         shift = -(sweep_time_diff.argmin() + 1)
-
-        # roll the data and metadata for each field
-        for field in data.keys():
-            data[field][s] = np.roll(data[field][s], shift, axis=0)
-            field_metadata = metadata[field]
-            for key in field_metadata.keys():
-                field_metadata[key][s] = np.roll(field_metadata[key][s], shift)
-    return
+        index[s] = s.start + (np.arange(nrays) - shift) % nrays
+    return index
 
 
-def _time_order_data_and_metadata_reverse(data, metadata, rays_per_sweep):
+def _time_order_index_reverse(ref_time, rays_per_sweep):
     """
-    Put Sigmet data and metadata in time increasing order by reverse sweep in
-    time reversed order.
+    Return the ray indices which put Sigmet data in time increasing order by
+    reversing sweeps in time reversed order.
     """
     # Sigmet data is stored by sweep in azimuth or elevation increasing order.
     # Time ordering RHI scans can typically be achieved by reversing the
     # ray order of sweep collected in time from 180 to 0 degrees.
     # Perfect time ordering is achieved if the rays within all sweeps
     # were collected sequentially from 0 to 180 degree or 180 to 0 degrees.
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
-
+    index = np.arange(len(ref_time))
     start = 0
     for nrays in rays_per_sweep:
+        s = slice(start, start + nrays)     # slice which selects sweep
+        start += nrays
         if nrays == 0 or nrays == 1:
             continue    # Do not attempt to order sweeps with to few rays
 
-        s = slice(start, start + nrays)     # slice which selects sweep
-        start += nrays
-        # determine the number of place by which elements should be shifted.
-        sweep_time = ref_time[s]
-        sweep_time_diff = np.diff(sweep_time)
+        sweep_time_diff = np.diff(ref_time[s])
         if sweep_time_diff.min() >= 0:
             continue    # already time ordered, no reversal needed
-        # reverse the data and metadata for each field
-        for field in data.keys():
-            data[field][s] = data[field][s][::-1]
-            field_metadata = metadata[field]
-            for key in field_metadata.keys():
-                field_metadata[key][s] = field_metadata[key][s][::-1]
-    return
+        index[s] = index[s][::-1]
+    return index
 
 
-def _time_order_data_and_metadata_full(data, metadata, rays_per_sweep):
+def _time_order_index_full(ref_time, rays_per_sweep):
     """
-    Put Sigmet data and metadata in time increasing order by sorting the
-    times.
+    Return the ray indices which put Sigmet data in time increasing order by
+    sorting the times.
     """
     # Sigmet data is stored by sweep in azimuth or elevation increasing order.
     # When rays within the sweeps are collected non-sequentially or in a
@@ -643,34 +613,21 @@ def _time_order_data_and_metadata_full(data, metadata, rays_per_sweep):
     # This ordering method should only be used as a last resort when perfect
     # time ordering is required in the output and other ordering operations
     # (roll, reverse, reverse-roll) will not order the rays correctly.
-    if 'XHDR' in data:
-        ref_time = data['XHDR'].copy()
-        ref_time.shape = ref_time.shape[:-1]
-    else:
-        ref_time = metadata[metadata.keys()[0]]['time'].astype('int32')
-
+    index = np.arange(len(ref_time))
     start = 0
     for nrays in rays_per_sweep:
+        s = slice(start, start + nrays)     # slice which selects sweep
+        start += nrays
         if nrays == 0 or nrays == 1:
             continue    # Do not attempt to order sweeps with no rays
 
-        s = slice(start, start + nrays)     # slice which selects sweep
-        start += nrays
         # determine the indices which sort the sweep time using a stable
         # sorting algorithm to prevent excessive azimuth scrambling.
-        sweep_time = ref_time[s]
         sweep_time_diff = np.diff(ref_time[s])
         if sweep_time_diff.min() >= 0:
             continue    # already time ordered
-        sort_idx = np.argsort(sweep_time, kind='mergesort')
-
-        # sort the data and metadata for each field
-        for field in data.keys():
-            data[field][s] = data[field][s][sort_idx]
-            field_metadata = metadata[field]
-            for key in field_metadata.keys():
-                field_metadata[key][s] = field_metadata[key][s][sort_idx]
-    return
+        index[s] = s.start + np.argsort(ref_time[s], kind='mergesort')
+    return index
 
 
 def ymds_time_to_datetime(ymds):
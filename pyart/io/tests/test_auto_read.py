@@ -1,6 +1,7 @@
 """ Unit Tests for Py-ART's io/mdv.py module. """
 
 import bz2
+import gzip
 from io import BytesIO
 
 import pytest
@@ -68,6 +69,59 @@ def test_autoread_nexrad_level3():
     assert radar.metadata['original_container'] == 'NEXRAD Level 3'
 
 
+def test_autoread_compressed():
+    with pyart.testing.InTemporaryDirectory():
+        with open(pyart.testing.CFRADIAL_PPI_FILE, 'rb') as f:
+            data = f.read()
+        with open('tmp_cfradial.nc.gz', 'wb') as f:
+            f.write(gzip.compress(data))
+        with open('tmp_cfradial.nc.bz2', 'wb') as f:
+            f.write(bz2.compress(data))
+        for filename in ['tmp_cfradial.nc.gz', 'tmp_cfradial.nc.bz2']:
+            radar = pyart.io.read(filename)
+            assert radar.metadata['comment'] == 'none'
+
+
+@pytest.mark.parametrize('delay_field_loading', [False, True])
+def test_autoread_netcdf_file_handle(delay_field_loading):
+    # open files passed by the caller are read by name and not closed
+    with open(pyart.testing.CFRADIAL_PPI_FILE, 'rb') as fh:
+        radar = pyart.io.read(fh, delay_field_loading=delay_field_loading)
+        assert not fh.closed
+        assert fh.tell() == 0
+        assert radar.metadata['comment'] == 'none'
+        assert radar.fields['reflectivity_horizontal']['data'].shape == (
+            radar.nrays, radar.ngates)
+
+
+@pytest.mark.skipif(not pyart.io.rsl._RSL_AVAILABLE,
+                    reason="TRMM RSL is not installed.")
+def test_autoread_rsl_file_handle():
+    with open(pyart.testing.SIGMET_PPI_FILE, 'rb') as fh:
+        radar = pyart.io.read(fh, use_rsl=True)
+        assert not fh.closed
+    assert radar.metadata['original_container'] == 'rsl'
+
+
+def test_register_format():
+    def sniffer(header):
+        return header[:8] == b'TESTFRMT'
+
+    def reader(fh, **kwargs):
+        fh.close()
+        return kwargs
+
+    pyart.io.register_format('TESTFRMT', sniffer, reader)
+    try:
+        f = BytesIO(b'TESTFRMT0000')
+        assert pyart.io.auto_read.determine_filetype(f) == 'TESTFRMT'
+        assert pyart.io.read(f, foo='bar') == {'foo': 'bar'}
+    finally:
+        pyart.io.auto_read._FORMATS.pop(0)
+    f = BytesIO(b'TESTFRMT0000')
+    assert pyart.io.auto_read.determine_filetype(f) == 'UNKNOWN'
+
+
 def test_autoread_raises():
     f = BytesIO(b'0000000000000000000')
     pytest.raises(TypeError, pyart.io.read, f)
@@ -81,6 +135,8 @@ headers = [
     (b'SDUS54 KBMX ', 'NEXRADL3'),
     (b'\x1b\x00\x08\x00\x00\x08\xb7\x07\x00\x00\x00\x00', 'SIGMET'),
     (b'BZh91AY&SY\xbd\x12', 'BZ2'),
+    (b'\x1f\x8b\x08\x00', 'GZ'),     # not from a real file
+    (b'\x04\x00\xa8Z', 'CHL'),
     (b'UF', 'UF'),                   # not from a real file
     (b'SSWB', 'DORADE'),             # not from a real file
     (b'RSL', 'RSL'),                 # not from a real file
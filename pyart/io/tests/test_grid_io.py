@@ -5,6 +5,7 @@ from __future__ import print_function
 import netCDF4
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_warns
+import pytest
 
 import pyart
 from pyart.io.common import stringarray_to_chararray
@@ -91,6 +92,69 @@ def _check_dicts_similar(dic1, dic2):
             assert dic2[k] == v
 
 
+def test_read_grid_delay_field_loading():
+    grid1 = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_grid.nc'
+        pyart.io.write_grid(tmpfile, grid1)
+        grid2 = pyart.io.read_grid(tmpfile, delay_field_loading=True)
+        field = grid2.fields['reflectivity']
+        assert isinstance(field, pyart.lazydict.LazyLoadDict)
+        assert 'data' in field._lazyload
+        assert field['units'] == 'dBz'
+        assert field['data'].shape == (grid1.nz, grid1.ny, grid1.nx)
+        assert_almost_equal(field['data'],
+                            grid1.fields['reflectivity']['data'])
+
+
+def test_read_grids_xarray():
+    grid = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        filenames = ['tmp_grid_0.nc', 'tmp_grid_1.nc']
+        for i, filename in enumerate(filenames):
+            grid.time['data'][0] = i * 300.
+            pyart.io.write_grid(filename, grid)
+        ds = pyart.io.read_grids_xarray(filenames, dask=False)
+        assert ds.reflectivity.shape == (2, grid.nz, grid.ny, grid.nx)
+        assert ds.lat.shape == (grid.ny, grid.nx)
+        assert (ds.time.values[1] - ds.time.values[0]) == np.timedelta64(
+            300, 's')
+        assert_almost_equal(ds.reflectivity.values[1],
+                            grid.fields['reflectivity']['data'])
+        assert pytest.raises(ValueError, pyart.io.read_grids_xarray, [])
+
+
+def test_read_grids_xarray_dask_default(monkeypatch):
+    # without dask the fields are read into memory
+    monkeypatch.setattr(pyart.io.grid_io, '_DASK_AVAILABLE', False)
+    grid = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_grid('tmp_grid.nc', grid)
+        ds = pyart.io.read_grids_xarray(['tmp_grid.nc'])
+        assert isinstance(ds.reflectivity.data, np.ndarray)
+        assert_almost_equal(ds.reflectivity.values[0],
+                            grid.fields['reflectivity']['data'])
+
+
+def test_read_grids_xarray_dask():
+    pytest.importorskip('dask')
+    grid = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        filenames = ['tmp_grid_0.nc', 'tmp_grid_1.nc']
+        for i, filename in enumerate(filenames):
+            grid.time['data'][0] = i * 300.
+            pyart.io.write_grid(filename, grid)
+        for dask in [None, True]:
+            ds = pyart.io.read_grids_xarray(filenames, dask=dask)
+            assert ds.reflectivity.chunks[:2] == ((1, 1), (1, ) * grid.nz)
+            # chunks of both files are read by several threads
+            values = ds.reflectivity.compute(scheduler='threads').values
+            assert_almost_equal(values[0],
+                                grid.fields['reflectivity']['data'])
+            assert_almost_equal(values[1],
+                                grid.fields['reflectivity']['data'])
+
+
 def test_grid_write_point_vars():
     grid1 = pyart.testing.make_target_grid()
 
@@ -323,3 +387,81 @@ def test_write_grid_empty_radar_names():
     with pyart.testing.InTemporaryDirectory():
         tmpfile = 'tmp_grid.nc'
         pyart.io.write_grid(tmpfile, grid1)
+
+
+def test_append_grid():
+    grid = pyart.testing.make_target_grid()
+    refl = grid.fields['reflectivity']['data'].copy()
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_grid_series.nc'
+        for i in range(3):
+            grid.time['data'][0] = i * 300.
+            grid.fields['reflectivity']['data'] = refl + i
+            pyart.io.append_grid(tmpfile, grid)
+
+        # a grid with a different time unit is converted to the file units
+        grid.time['units'] = grid.time['units'].replace('00:00', '00:05')
+        grid.time['data'][0] = 600.
+        grid.fields['reflectivity']['data'] = refl + 3
+        pyart.io.append_grid(tmpfile, grid)
+
+        dset = netCDF4.Dataset(tmpfile)
+        ncvar = dset.variables['reflectivity']
+        assert ncvar.shape == (4, grid.nz, grid.ny, grid.nx)
+        assert ncvar.chunking() == [1, grid.nz, grid.ny, grid.nx]
+        assert ncvar.filters()['zlib']
+        assert_almost_equal(dset.variables['time'][:], [0, 300, 600, 900])
+        dset.close()
+
+        for time_index in range(4):
+            grid2 = pyart.io.read_grid(tmpfile, time_index=time_index)
+            assert grid2.time['data'].shape == (1, )
+            assert_almost_equal(grid2.time['data'], [time_index * 300.])
+            assert grid2.origin_latitude['data'].shape == (1, )
+            assert_almost_equal(grid2.fields['reflectivity']['data'],
+                                refl + time_index)
+
+        grid2 = pyart.io.read_grid(tmpfile, time_index=-1)
+        assert_almost_equal(grid2.fields['reflectivity']['data'], refl + 3)
+        grid2 = pyart.io.read_grid(tmpfile)
+        assert_almost_equal(grid2.fields['reflectivity']['data'], refl)
+        pytest.raises(IndexError, pyart.io.read_grid, tmpfile, time_index=4)
+
+
+def test_append_grid_mismatch():
+    grid = pyart.testing.make_target_grid()
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_grid_series.nc'
+        pyart.io.append_grid(tmpfile, grid, chunksizes=(1, 1, 20, 20))
+        dset = netCDF4.Dataset(tmpfile)
+        assert dset.variables['reflectivity'].chunking() == [1, 1, 20, 20]
+        dset.close()
+
+        grid.x['data'] = grid.x['data'] + 1000.
+        pytest.raises(ValueError, pyart.io.append_grid, tmpfile, grid)
+
+        grid = pyart.testing.make_target_grid()
+        grid.add_field('other', grid.fields['reflectivity'])
+        assert_warns(UserWarning, pyart.io.append_grid, tmpfile, grid)
+
+
+def test_read_grid_levels():
+    grid1 = pyart.testing.make_target_grid()
+    grid1.fields['reflectivity']['data'] = (
+        grid1.fields['reflectivity']['data'] +
+        np.arange(grid1.nz)[:, np.newaxis, np.newaxis])
+    refl = grid1.fields['reflectivity']['data']
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_grid.nc'
+        pyart.io.write_grid(tmpfile, grid1)
+        for levels in [1, [1], [1, 0], slice(0, 2), -1]:
+            expected = np.arange(grid1.nz)[levels]
+            for delay_field_loading in [False, True]:
+                grid2 = pyart.io.read_grid(
+                    tmpfile, levels=levels,
+                    delay_field_loading=delay_field_loading)
+                assert_almost_equal(grid2.z['data'],
+                                    np.atleast_1d(grid1.z['data'][expected]))
+                data = grid2.fields['reflectivity']['data']
+                assert data.shape == (grid2.nz, grid1.ny, grid1.nx)
+                assert_almost_equal(data, refl[np.atleast_1d(expected)])
@@ -0,0 +1,120 @@
+""" Unit Tests for Py-ART's io/multi_read.py module. """
+
+import numpy as np
+from numpy.testing import assert_array_equal
+import pytest
+
+import pyart
+from pyart.io.multi_read import _radar_nbytes
+
+FILENAMES = [
+    pyart.testing.SIGMET_PPI_FILE,
+    pyart.testing.CFRADIAL_PPI_FILE,
+    pyart.testing.MDV_PPI_FILE,
+    pyart.testing.UF_FILE,
+]
+
+
+def _assert_fields_equal(radar1, radar2):
+    assert list(radar1.fields) == list(radar2.fields)
+    for field_name in radar1.fields:
+        data1 = radar1.fields[field_name]['data']
+        data2 = radar2.fields[field_name]['data']
+        assert data1.dtype == data2.dtype
+        assert data1.fill_value == data2.fill_value
+        assert_array_equal(np.ma.getmaskarray(data1),
+                           np.ma.getmaskarray(data2))
+        assert_array_equal(data1.data, data2.data)
+
+
+def test_read_many_time_order():
+    radars = list(pyart.io.read_many(FILENAMES))
+    assert len(radars) == len(FILENAMES)
+    times = [pyart.util.datetime_from_radar(radar) for radar in radars]
+    assert times == sorted(times)
+
+
+def test_read_many_workers():
+    serial = list(pyart.io.read_many(FILENAMES))
+    parallel = list(pyart.io.read_many(FILENAMES, workers=2))
+    assert len(serial) == len(parallel)
+    for radar1, radar2 in zip(serial, parallel):
+        _assert_fields_equal(radar1, radar2)
+        assert_array_equal(radar1.time['data'], radar2.time['data'])
+        assert radar1.metadata == radar2.metadata
+
+
+def test_read_many_kwargs():
+    radars = pyart.io.read_many(
+        [pyart.testing.SIGMET_PPI_FILE], workers=2,
+        exclude_fields=['reflectivity'])
+    for radar in radars:
+        assert 'reflectivity' not in radar.fields
+
+
+def test_radar_collection_lazy():
+    collection = pyart.io.RadarCollection(FILENAMES)
+    assert len(collection) == 4
+    assert collection.nbytes == 0
+    assert not any(collection.is_loaded(i) for i in range(4))
+
+    radar = collection[-1]
+    assert collection.is_loaded(3)
+    assert collection[3] is radar
+    assert collection.nbytes == _radar_nbytes(radar)
+
+    collection.release()
+    assert collection.nbytes == 0
+    assert not collection.is_loaded(3)
+
+    with pytest.raises(IndexError):
+        collection[4]
+
+
+def test_radar_collection_memory_budget():
+    sizes = [_radar_nbytes(pyart.io.read(f)) for f in FILENAMES]
+    collection = pyart.io.RadarCollection(
+        FILENAMES, memory_budget=sizes[0] + sizes[1])
+    collection[0]
+    collection[1]
+    assert collection.is_loaded(0) and collection.is_loaded(1)
+    collection[0]       # most recently accessed
+    collection[2]
+    assert collection.is_loaded(2)
+    assert not collection.is_loaded(1)
+    loaded = [i for i in range(4) if collection.is_loaded(i)]
+    assert collection.nbytes == sum(sizes[i] for i in loaded)
+
+    collection = pyart.io.RadarCollection(FILENAMES, memory_budget=0)
+    collection[0]
+    collection[1]
+    assert collection.is_loaded(1)
+    assert not collection.is_loaded(0)
+
+
+@pytest.mark.parametrize('workers', [None, 3])
+def test_radar_collection_iter(workers):
+    collection = pyart.io.RadarCollection(FILENAMES, workers=workers)
+    collection[1]
+    radars = list(collection)
+    assert len(radars) == 4
+    assert radars[1] is collection[1]
+    for filename, radar in zip(FILENAMES, radars):
+        _assert_fields_equal(pyart.io.read(filename), radar)
+
+
+def test_radar_collection_iter_memory_budget():
+    # members loaded when a batch is planned may be released before they
+    # are yielded
+    collection = pyart.io.RadarCollection(
+        [pyart.testing.SIGMET_PPI_FILE] * 4, memory_budget=1, workers=2)
+    collection[1]
+    radars = []
+    for radar in collection:
+        radars.append(radar)
+        collection[0]
+    assert len(radars) == 4
+    assert len(collection._loaded) == 1
+    expected = pyart.io.read(pyart.testing.SIGMET_PPI_FILE)
+    for radar in radars:
+        _assert_fields_equal(expected, radar)
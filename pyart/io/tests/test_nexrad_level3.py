@@ -1,7 +1,10 @@
 """ Unit Tests for Py-ART's io/nexrad_level3.py module. """
 
+import struct
+
 import numpy as np
 from numpy.ma.core import MaskedArray
+import pytest
 
 import pyart
 
@@ -139,3 +142,79 @@ def test_nexrad_level3_msg161_fileobj():
     assert radar.fields[field_name]['data'].shape == (360, 1200)
     assert type(radar.fields[field_name]['data']) is MaskedArray
     assert round(radar.fields[field_name]['data'][103, 170]) == 2.
+
+
+def test_nexrad_level3_batch():
+    filenames = [pyart.testing.NEXRAD_LEVEL3_MSG19,
+                 pyart.testing.NEXRAD_LEVEL3_MSG163,
+                 pyart.testing.NEXRAD_LEVEL3_MSG19]
+    radars = pyart.io.read_nexrad_level3_batch(filenames, processes=1)
+    assert len(radars) == 2
+
+    radar = radars[0]
+    single = pyart.io.read_nexrad_level3(pyart.testing.NEXRAD_LEVEL3_MSG19)
+    assert radar.nsweeps == 2
+    assert radar.nrays == 720
+    assert radar.ngates == 230
+    assert radar.time['units'] == single.time['units']
+    assert np.all(radar.sweep_start_ray_index['data'] == [0, 360])
+    assert np.all(radar.sweep_end_ray_index['data'] == [359, 719])
+    assert np.all(radar.sweep_mode['data'] == [b'azimuth_surveillance'] * 2)
+    assert np.allclose(radar.fixed_angle['data'], [0.5, 0.5])
+    data = radar.fields['reflectivity']['data']
+    assert type(data) is MaskedArray
+    assert data.shape == (720, 230)
+    assert np.ma.allclose(data[360:], single.fields['reflectivity']['data'])
+
+    radar = radars[1]
+    assert radar.nsweeps == 1
+    assert 'specific_differential_phase' in radar.fields
+
+
+def test_nexrad_level3_batch_pool():
+    filenames = [pyart.testing.NEXRAD_LEVEL3_MSG19,
+                 pyart.testing.NEXRAD_LEVEL3_MSG19]
+    radars = pyart.io.read_nexrad_level3_batch(filenames, processes=2)
+    assert len(radars) == 1
+    assert radars[0].nsweeps == 2
+    assert radars[0].fields['reflectivity']['data'].shape == (720, 230)
+
+
+def test_decode_rle_radials():
+    # two radials of 5 bins, the second padded with a zero length run
+    buf = (b'XX' + struct.pack('>hhh', 1, 10, 10) + bytes([0x23, 0x31]) +
+           struct.pack('>hhh', 2, 20, 10) + bytes([0x14, 0x45, 0x00, 0x00]))
+    headers, raw_data = pyart.io.nexrad_level3._decode_rle_radials(
+        buf, 2, 2, 5)
+    assert np.all(headers['angle_start'] == [10, 20])
+    assert np.all(raw_data == [[3, 3, 1, 1, 1], [4, 5, 5, 5, 5]])
+    pytest.raises(ValueError, pyart.io.nexrad_level3._decode_rle_radials,
+                  buf, 2, 2, 6)
+
+
+def test_decode_rle_radials_malformed_radial():
+    # the first radial is a bin short and the second a bin long, the total
+    # number of bins matches but the radials do not
+    buf = (struct.pack('>hhh', 1, 10, 10) + bytes([0x23, 0x21]) +
+           struct.pack('>hhh', 1, 20, 10) + bytes([0x34, 0x35]))
+    with pytest.raises(ValueError, match='radial 0 contains 4 bins'):
+        pyart.io.nexrad_level3._decode_rle_radials(buf, 0, 2, 5)
+    # a radial without any bytes
+    buf = (struct.pack('>hhh', 1, 10, 10) + bytes([0x23, 0x31]) +
+           struct.pack('>hhh', 0, 20, 10))
+    with pytest.raises(ValueError, match='radial 1 contains 0 bins'):
+        pyart.io.nexrad_level3._decode_rle_radials(buf, 0, 2, 5)
+
+
+def test_decode_digital_radials():
+    # equal and varying radial sizes
+    equal = (struct.pack('>hhh', 3, 10, 10) + bytes([1, 2, 3]) +
+             struct.pack('>hhh', 3, 20, 10) + bytes([4, 5, 6]))
+    varying = (struct.pack('>hhh', 3, 10, 10) + bytes([1, 2, 3]) +
+               struct.pack('>hhh', 4, 20, 10) + bytes([4, 5, 6, 7]))
+    for buf in [equal, varying]:
+        headers, raw_data = pyart.io.nexrad_level3._decode_digital_radials(
+            buf, 0, 2, 3)
+        assert np.all(headers['angle_start'] == [10, 20])
+        assert np.all(raw_data == [[1, 2, 3], [4, 5, 6]])
+        raw_data[0, 0] = 0  # writable
@@ -1,8 +1,12 @@
 """ Unit Tests for Py-ART's output_to_geotiff.py module. """
 
+import struct
 import warnings
+import zlib
 
+import matplotlib.pyplot as plt
 import numpy as np
+from numpy.testing import assert_almost_equal, assert_equal
 import pytest
 
 import pyart
@@ -127,3 +131,173 @@ def test_write_grid_geotiff_missing_field():
     grid = make_tiny_grid()
     pytest.raises(
         KeyError, pyart.io.write_grid_geotiff, grid, 'test.foo', 'foobar')
+
+
+def read_tiled_tiff(filename):
+    """
+    Read the image file directories and decoded images of a little endian
+    tiled TIFF file.
+    """
+    types = {2: ('s', 1), 3: ('H', 2), 4: ('I', 4), 12: ('d', 8)}
+    with open(filename, 'rb') as f:
+        buf = f.read()
+    assert buf[:4] == b'II*\x00'
+    offset = struct.unpack('<I', buf[4:8])[0]
+    directories = []
+    while offset:
+        ntags = struct.unpack('<H', buf[offset:offset + 2])[0]
+        tags = {}
+        for i in range(ntags):
+            entry = buf[offset + 2 + 12 * i:offset + 14 + 12 * i]
+            code, tiff_type, count = struct.unpack('<HHI', entry[:8])
+            char, size = types[tiff_type]
+            if count * size > 4:
+                start = struct.unpack('<I', entry[8:])[0]
+            else:
+                start = offset + 2 + 12 * i + 8
+            raw = buf[start:start + count * size]
+            if tiff_type == 2:
+                tags[code] = raw.rstrip(b'\x00').decode('ascii')
+            else:
+                tags[code] = struct.unpack('<%d%s' % (count, char), raw)
+        directories.append(tags)
+        offset = struct.unpack(
+            '<I', buf[offset + 2 + 12 * ntags:offset + 6 + 12 * ntags])[0]
+
+    images = []
+    for tags in directories:
+        nx, ny = tags[256][0], tags[257][0]
+        nsamples = tags[277][0]
+        dtype = np.dtype('<f4') if tags[339][0] == 3 else np.dtype('u1')
+        tsize = tags[322][0]
+        ntx = -(-nx // tsize)
+        nty = -(-ny // tsize)
+        image = np.empty((nty * tsize, ntx * tsize, nsamples), dtype=dtype)
+        for n, (start, count) in enumerate(zip(tags[324], tags[325])):
+            raw = buf[start:start + count]
+            if tags[259][0] == 8:
+                raw = zlib.decompress(raw)
+            tile = np.frombuffer(raw, dtype=dtype).reshape(
+                tsize, tsize, nsamples)
+            row, col = divmod(n, ntx)
+            image[row * tsize:(row + 1) * tsize,
+                  col * tsize:(col + 1) * tsize] = tile
+        images.append(image[:ny, :nx])
+    return directories, images
+
+
+def make_large_grid():
+    """ Make a grid larger than a tile with two fields. """
+    grid = pyart.testing.make_empty_grid(
+        (3, 50, 70), ((0, 2000), (-24500, 24500), (-34500, 34500)))
+    data = np.ma.arange(3 * 50 * 70, dtype='float32').reshape(3, 50, 70)
+    data[:, :5, :5] = np.ma.masked
+    data[1, 10, 10] = 1e6
+    grid.add_field('reflectivity', {'data': data})
+    grid.add_field('velocity', {'data': -data})
+    return grid
+
+
+def test_write_grid_cog_bands(tmpdir):
+    grid = make_large_grid()
+    filename = str(tmpdir.join('grid.tif'))
+    pyart.io.write_grid_cog(
+        grid, filename, ['reflectivity', 'velocity'], levels=[0, None],
+        tile_size=32)
+    directories, images = read_tiled_tiff(filename)
+
+    # full resolution image and two overviews
+    assert len(images) == 3
+    assert [image.shape for image in images] == [
+        (50, 70, 4), (25, 35, 4), (13, 18, 4)]
+    assert [tags[254][0] for tags in directories] == [0, 1, 1]
+    tags = directories[0]
+    assert tags[259][0] == 8
+    assert tags[42113] == 'nan'
+    assert 'reflectivity composite' in tags[42112]
+
+    # rows are written north to south
+    data = grid.fields['reflectivity']['data']
+    image = images[0][::-1]
+    assert_equal(image[..., 0], data[0].filled(np.nan))
+    composite = data.max(axis=0).filled(np.nan)
+    assert_equal(image[..., 1], composite)
+    assert_equal(image[..., 2], -data[0].filled(np.nan))
+    assert image[10, 10, 1] == 1e6
+
+    # geo-referencing of the top left corner
+    assert_almost_equal(tags[33550][:2], [1000., 1000.])
+    assert_almost_equal(tags[33922][3:5], [-35000., 25000.])
+    assert tags[34735][:4] == (1, 1, 0, 12)
+
+    # NaN aware averaging in the overviews
+    overview = images[1][::-1]
+    assert_almost_equal(overview[5, 5, 0], data[0, 10:12, 10:12].mean())
+    assert np.isnan(overview[0, 0, 0])
+    assert_almost_equal(overview[2, 2, 0], data[0, 4:6, 4:6].mean(), 4)
+
+    # tile data follows all of the directories, overviews first
+    first_tile = min(directories[0][324])
+    assert max(directories[2][324]) < first_tile
+    assert all(min(tags[324]) > 8 + 12 * len(tags) for tags in directories)
+
+
+def test_write_grid_cog_rgb(tmpdir):
+    grid = make_large_grid()
+    filename = str(tmpdir.join('grid_rgb.tif'))
+    pyart.io.write_grid_cog(
+        grid, filename, 'reflectivity', levels=1, rgb=True, vmin=0,
+        vmax=10000, tile_size=16, overviews=[2])
+    directories, images = read_tiled_tiff(filename)
+    assert len(images) == 2
+    image = images[0][::-1]
+    assert image.dtype == np.uint8
+    assert image.shape == (50, 70, 4)
+    assert directories[0][262][0] == 2
+    assert directories[0][338] == (2, )
+
+    data = grid.fields['reflectivity']['data'][1]
+    rarr, garr, barr = pyart.io.output_to_geotiff._get_rgb_values(
+        data.filled(np.nan), 0, 10000, None, 'viridis')
+    valid = ~data.mask
+    assert_equal(image[..., 0][valid], rarr[valid])
+    assert_equal(image[..., 2][valid], barr[valid])
+    assert np.all(image[..., 3][data.mask] == 0)
+    assert np.all(image[..., 3][valid] == 255)
+
+    # readable by an independent TIFF decoder
+    pil_image = pytest.importorskip('PIL.Image')
+    with pil_image.open(filename) as tiff:
+        assert tiff.size == (70, 50)
+        assert_equal(np.asarray(tiff.convert('RGBA')), images[0])
+
+
+def test_write_grid_cog_errors(tmpdir):
+    grid = make_large_grid()
+    filename = str(tmpdir.join('grid.tif'))
+    pytest.raises(KeyError, pyart.io.write_grid_cog, grid, filename, 'foo')
+    pytest.raises(ValueError, pyart.io.write_grid_cog, grid, filename,
+                  'reflectivity', levels=[0, 1], rgb=True)
+    pytest.raises(ValueError, pyart.io.write_grid_cog, grid, filename,
+                  'reflectivity', tile_size=20)
+    pytest.raises(ValueError, pyart.io.write_grid_cog, grid, filename,
+                  'reflectivity', overviews=[3])
+
+    # a single point in x or y has no pixel size
+    for shape in [(1, 1, 70), (1, 50, 1)]:
+        grid = pyart.testing.make_empty_grid(
+            shape, ((0, 0), (-24500, 24500), (-34500, 34500)))
+        grid.add_field('reflectivity', {'data': np.ma.zeros(shape)})
+        pytest.raises(ValueError, pyart.io.write_grid_cog, grid, filename,
+                      'reflectivity')
+
+
+def test__get_rgb_values():
+    data = np.array([-5., 0., 2.5, 5., 7.5, 10., 20., np.nan])
+    rarr, garr, barr = pyart.io.output_to_geotiff._get_rgb_values(
+        data, 0, 10, None, 'jet')
+    cmap = plt.cm.get_cmap('jet')
+    for i, value in enumerate(data[:-1]):
+        index = int(np.round(np.clip((value / 10.) * 255, 0, 255)))
+        expected = np.round(np.array(cmap(index)[:3]) * 255)
+        assert_equal([rarr[i], garr[i], barr[i]], expected)
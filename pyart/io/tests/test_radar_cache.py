@@ -0,0 +1,174 @@
+""" Unit Tests for Py-ART's io/radar_cache.py module. """
+
+import os
+import shutil
+
+import numpy as np
+from numpy.testing import assert_array_equal
+import pytest
+
+import pyart
+from pyart.io.radar_cache import _RADAR_ATTRIBUTES
+from pyart.lazydict import LazyLoadDict
+
+
+def _assert_equal(value1, value2):
+    if isinstance(value1, dict):
+        assert set(value1) == set(value2)
+        for key in value1:
+            _assert_equal(value1[key], value2[key])
+    elif isinstance(value1, np.ndarray):
+        assert isinstance(value2, np.ndarray)
+        assert value1.dtype == value2.dtype
+        assert value1.shape == value2.shape
+        assert np.ma.isMaskedArray(value1) == np.ma.isMaskedArray(value2)
+        assert_array_equal(np.ma.getmaskarray(value1),
+                           np.ma.getmaskarray(value2))
+        assert_array_equal(np.ma.getdata(value1), np.ma.getdata(value2))
+    else:
+        assert type(value1) == type(value2)
+        assert value1 == value2
+
+
+def _assert_radars_equal(radar1, radar2):
+    for attr in _RADAR_ATTRIBUTES:
+        _assert_equal(getattr(radar1, attr), getattr(radar2, attr))
+    _assert_equal(radar1.fields, radar2.fields)
+
+
+@pytest.mark.parametrize('filename', [
+    pyart.testing.SIGMET_PPI_FILE,
+    pyart.testing.CFRADIAL_PPI_FILE,
+    pyart.testing.MDV_PPI_FILE,
+    pyart.testing.CHL_RHI_FILE,
+])
+def test_write_read_cache(filename):
+    radar = pyart.io.read(filename)
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_cache(radar, 'radar.pyrc')
+        for mmap in [True, False]:
+            radar2 = pyart.io.read_cache('radar.pyrc', mmap=mmap)
+            _assert_radars_equal(radar, radar2)
+        radar2 = pyart.io.read('radar.pyrc')
+        _assert_radars_equal(radar, radar2)
+        filetype = pyart.io.auto_read.determine_filetype('radar.pyrc')
+        assert filetype == 'PYART_CACHE'
+
+
+def test_metadata_types():
+    radar = pyart.testing.make_target_radar()
+    field = radar.fields['reflectivity']
+    field['_FillValue'] = np.float32(-9999.)
+    field['flag_values'] = np.array([1, 2], dtype='>i2')
+    field['flag_meanings'] = b'one two'
+    field['valid_range'] = [0.0, np.nan]
+    field['data'] = np.ma.masked_less(field['data'], 10.)
+    field['data'].fill_value = -9999.
+    radar.metadata['nested'] = {'count': np.int64(3), 'none': None}
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_cache(radar, 'radar.pyrc')
+        radar2 = pyart.io.read_cache('radar.pyrc')
+
+    field2 = radar2.fields['reflectivity']
+    assert type(field2['_FillValue']) == np.float32
+    assert field2['flag_values'].dtype == np.dtype('<i2')
+    assert_array_equal(field2['flag_values'], [1, 2])
+    assert field2['flag_meanings'] == b'one two'
+    assert field2['valid_range'][0] == 0.0
+    assert np.isnan(field2['valid_range'][1])
+    assert field2['data'].fill_value == -9999.
+    assert_array_equal(field2['data'].mask, field['data'].mask)
+    assert radar2.metadata['nested'] == {'count': 3, 'none': None}
+    assert type(radar2.metadata['nested']['count']) == np.int64
+
+
+@pytest.mark.parametrize('value', [
+    np.array([None, 'a'], dtype=object),
+    (1, 2),
+    {1: 'a'},
+    [{'a': (1, 2)}],
+])
+def test_uncacheable_values(value):
+    # values which would be read back with a different type
+    radar = pyart.testing.make_empty_ppi_radar(10, 36, 1)
+    radar.metadata['value'] = value
+    with pyart.testing.InTemporaryDirectory():
+        with pytest.raises(TypeError):
+            pyart.io.write_cache(radar, 'radar.pyrc')
+
+
+def test_read_cache_lazy_sweeps():
+    radar = pyart.testing.make_empty_ppi_radar(20, 36, 6)
+    data = np.arange(radar.nrays * radar.ngates, dtype='float32').reshape(
+        radar.nrays, radar.ngates)
+    radar.add_field('reflectivity', {'data': np.ma.masked_less(data, 100)})
+    radar.add_field('velocity', {'data': data})
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_cache(radar, 'radar.pyrc')
+        radar2 = pyart.io.read_cache('radar.pyrc', delay_field_loading=True)
+        for field in radar2.fields.values():
+            assert isinstance(field, LazyLoadDict)
+        _assert_radars_equal(radar, radar2)
+
+        for sweeps in ([1], [2, 3], [0, 5]):
+            expected = radar.extract_sweeps(sweeps)
+            radar2 = pyart.io.read_cache(
+                'radar.pyrc', delay_field_loading=True, sweeps=sweeps)
+            assert radar2.nsweeps == len(sweeps)
+            _assert_radars_equal(expected, radar2)
+
+        with pytest.raises(ValueError):
+            pyart.io.read_cache('radar.pyrc', sweeps=[radar.nsweeps])
+
+
+def test_read_cache_file_like():
+    radar = pyart.io.read(pyart.testing.UF_FILE)
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_cache(radar, 'radar.pyrc')
+        for mmap in [True, False]:
+            with open('radar.pyrc', 'rb') as fh:
+                radar2 = pyart.io.read_cache(fh, mmap=mmap)
+                assert not fh.closed
+            _assert_radars_equal(radar, radar2)
+        with open('radar.pyrc', 'rb') as fh:
+            radar2 = pyart.io.read(fh)
+            assert not fh.closed
+        _assert_radars_equal(radar, radar2)
+
+
+def test_read_cache_invalid():
+    with pytest.raises(ValueError):
+        pyart.io.read_cache(pyart.testing.SIGMET_PPI_FILE)
+
+
+def test_read_cache_dir():
+    with pyart.testing.InTemporaryDirectory():
+        shutil.copy(pyart.testing.SIGMET_PPI_FILE, 'radar.sigmet')
+        radar = pyart.io.read('radar.sigmet', cache_dir='cache')
+        assert len(os.listdir('cache')) == 1
+
+        radar2 = pyart.io.read('radar.sigmet', cache_dir='cache')
+        _assert_radars_equal(radar, radar2)
+        radar2 = pyart.io.read(
+            'radar.sigmet', cache_dir='cache', delay_field_loading=True)
+        assert isinstance(radar2.fields['reflectivity'], LazyLoadDict)
+        assert len(os.listdir('cache')) == 1
+
+        # different parameters or a modified file use a new cache file
+        radar2 = pyart.io.read(
+            'radar.sigmet', cache_dir='cache', exclude_fields=['velocity'])
+        assert 'velocity' not in radar2.fields
+        assert len(os.listdir('cache')) == 2
+        os.utime('radar.sigmet', (0, 0))
+        pyart.io.read('radar.sigmet', cache_dir='cache')
+        assert len(os.listdir('cache')) == 3
+
+        # damaged cache files are replaced
+        cache_file = pyart.io.radar_cache.cache_filename(
+            'cache', 'radar.sigmet', use_rsl=False)
+        assert os.path.exists(cache_file)
+        with open(cache_file, 'wb') as fh:
+            fh.write(b'damaged')
+        radar2 = pyart.io.read('radar.sigmet', cache_dir='cache')
+        _assert_radars_equal(radar, radar2)
+        _assert_radars_equal(radar, pyart.io.read_cache(cache_file))
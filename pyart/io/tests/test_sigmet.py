@@ -1,5 +1,7 @@
 """ Unit Tests for Py-ART's io/sigmet.py module. """
 
+import multiprocessing.pool
+
 import numpy as np
 from numpy.testing import assert_almost_equal
 from numpy.ma.core import MaskedArray
@@ -369,3 +371,113 @@ def test_1byte_datatype():
     result = pyart.io._sigmetfile.convert_sigmet_data(data_type, data, nbins)
     assert np.all(result == -31.5)
     assert result.shape == (2, 2)
+
+
+# Test 2byte sigmet format
+def test_2byte_datatype():
+    data_type = 9   # Sigmet type for for a DBZ2 field
+    data = np.array([[0, 32918], [32518, 32768]]).astype(np.uint16)
+    nbins = np.array([2, 1], dtype=np.int16)
+    result = pyart.io._sigmetfile.convert_sigmet_data(
+        data_type, data.view(np.int16), nbins)
+    assert result[0, 0] is np.ma.masked
+    assert_almost_equal(result[0, 1], 1.5, 3)
+    assert_almost_equal(result[1, 0], -2.5, 3)
+    assert result[1, 1] is np.ma.masked
+
+
+################
+# time_ordered #
+################
+
+@pytest.mark.parametrize('time_ordered', ['sequential', 'full'])
+def test_time_ordered(time_ordered):
+    radar = pyart.io.read_sigmet(
+        pyart.testing.SIGMET_PPI_FILE, time_ordered=time_ordered)
+    assert np.all(np.diff(radar.time['data']) >= 0)
+    assert radar.nrays == 20
+    assert radar.metadata['time_ordered'] in ['roll', 'full']
+
+
+def test_time_ordered_reverse():
+    radar = pyart.io.read_sigmet(
+        pyart.testing.SIGMET_RHI_FILE, time_ordered='sequential')
+    assert radar.metadata['time_ordered'] == 'reverse'
+    assert np.all(np.diff(radar.time['data']) >= 0)
+    assert_almost_equal(
+        radar.elevation['data'], RADAR_RHI.elevation['data'])
+
+
+###########
+# workers #
+###########
+
+def _write_multi_sweep_sigmet(filename, nsweeps):
+    """
+    Write a Sigmet file with nsweeps sweeps made by duplicating the single
+    sweep record of the sample PPI file, the data values of each sweep are
+    altered so that the sweeps differ.
+    """
+    record_size = 6144
+    with open(pyart.testing.SIGMET_PPI_FILE, 'rb') as fh:
+        buf = fh.read()
+    headers = bytearray(buf[:2 * record_size])
+    # task_scan_info number_sweeps in the ingest_header
+    offset = record_size + 12 + 480 + 12 + 120 + 320 + 320 + 160 + 6
+    headers[offset:offset + 2] = np.int16(nsweeps).tobytes()
+
+    records = [bytes(headers)]
+    for sweep in range(nsweeps):
+        record = np.frombuffer(
+            buf[2 * record_size:3 * record_size], dtype='<i2').copy()
+        # raw_prod_bhdr record and sweep numbers, ingest_data_header sweep
+        # number
+        record[0] = 2 + sweep
+        record[1] = sweep + 1
+        record[6 + 12] = sweep + 1
+        # alter the values in each data run of the compressed rays
+        pos = (12 + 76) // 2
+        while pos < len(record):
+            code = record[pos]
+            pos += 1
+            if code < 0:
+                words = code + 32768
+                record[pos:pos + words] ^= 3 * sweep
+                pos += words
+        records.append(record.tobytes())
+    with open(filename, 'wb') as fh:
+        fh.write(b''.join(records))
+
+
+def test_workers(monkeypatch):
+    # count the thread pools used to decode sweeps
+    pools = []
+    thread_pool = multiprocessing.pool.ThreadPool
+
+    def _thread_pool(processes):
+        pools.append(processes)
+        return thread_pool(processes)
+
+    monkeypatch.setattr(multiprocessing.pool, 'ThreadPool', _thread_pool)
+    with pyart.testing.InTemporaryDirectory():
+        _write_multi_sweep_sigmet('multi_sweep.sigmet', 4)
+        radar_serial = pyart.io.read_sigmet('multi_sweep.sigmet', workers=1)
+        assert pools == []
+        radar_workers = pyart.io.read_sigmet('multi_sweep.sigmet', workers=3)
+        assert pools == [3]
+
+    assert radar_serial.nsweeps == 4
+    assert_almost_equal(radar_serial.sweep_number['data'], [0, 1, 2, 3])
+    data = radar_serial.fields['reflectivity']['data']
+    # the first sweep is that of the sample file, later sweeps differ
+    assert np.ma.allequal(data[:20], radar.fields['reflectivity']['data'])
+    assert not np.ma.allequal(data[20:40], data[:20])
+
+    assert np.all(radar_workers.time['data'] == radar_serial.time['data'])
+    assert np.all(radar_workers.azimuth['data'] ==
+                  radar_serial.azimuth['data'])
+    for field in radar_serial.fields:
+        data = radar_serial.fields[field]['data']
+        data_workers = radar_workers.fields[field]['data']
+        assert np.all(data_workers.mask == data.mask)
+        assert np.all(data_workers.data == data.data)
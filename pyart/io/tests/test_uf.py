@@ -11,7 +11,7 @@ from numpy.testing import assert_raises, assert_almost_equal, assert_warns
 import pytest
 
 import pyart
-from pyart.io.uffile import UFFile, UFRay
+from pyart.io.uffile import UFFile
 
 radar = pyart.io.read_uf(pyart.testing.UF_FILE, file_field_names=True)
 
@@ -106,14 +106,14 @@ def test_instrument_parameters():
 
 def test_nyquist_vel():
     ufile = UFFile(pyart.testing.UF_FILE)
-    ufile.rays[0].field_headers[1].pop('nyquist')
+    assert 'nyquist' in ufile.rays[0].field_headers[1]
+    assert_almost_equal(ufile.get_nyquists(),
+                        [ufile.rays[0].field_headers[1]['nyquist'] / 100.], 5)
+    ufile.fsi_nyquists[0, 1] = np.ma.masked
     assert ufile.get_nyquists() is None
 
     ufile = UFFile(pyart.testing.UF_FILE)
-    ray = UFRay(ufile.rays[0]._buf)
-    ray.field_headers[1].pop('nyquist')
-    ufile.rays.append(ray)
-    ufile.nrays = 2
+    ufile.fsi_nyquists[0] = np.ma.masked
     assert ufile.get_nyquists() is None
 
 
@@ -131,7 +131,7 @@ def test_datetime():
 
 def test_polarization():
     ufile = UFFile(pyart.testing.UF_FILE)
-    ufile.rays[0].field_headers[0]['polarization'] = 99
+    ufile.field_headers['polarization'][0, 0] = 99
     assert ufile.get_sweep_polarizations()[0] == 'elliptical'
 
 
@@ -144,7 +144,7 @@ def test_frequency():
     assert_almost_equal(ip['frequency']['data'][0], 9.69026150e+09, -3)
 
     # An invalid wavelength should throw a warning
-    ufile.rays[0].field_headers[0]['wavelength_cm'] = 0
+    ufile.field_headers['wavelength_cm'][0, 0] = 0
     assert_warns(UserWarning,
                  pyart.io.uf._get_instrument_parameters, ufile, filemetadata)
 
@@ -177,3 +177,69 @@ def test_range_start_nonzero():
     radar2 = pyart.io.read_uf(in_mem)
     assert_almost_equal(radar2.range['meters_to_center_of_first_gate'], 1530)
     assert_almost_equal(radar2.range['data'][0], 1530)
+
+
+def _make_multi_sweep_uf():
+    """ Return a UF file in memory with three sweeps and its radar. """
+    radar = pyart.testing.make_empty_ppi_radar(10, 36, 3)
+    radar.range['meters_between_gates'] = 1000.
+    radar.range['meters_to_center_of_first_gate'] = 500.
+    radar.time['data'] = np.arange(radar.nrays) * 10.
+    radar.azimuth['data'] = np.tile(np.arange(0, 360, 10.), 3)
+    radar.fixed_angle['data'] = np.array([0.5, 1.5, 2.5], dtype='float32')
+    data = np.ma.arange(radar.nrays * 10.).reshape(radar.nrays, 10) / 10.
+    data[5, 5] = np.ma.masked
+    radar.add_field('reflectivity', {'data': data})
+    in_mem = StringIO()
+    pyart.io.write_uf(in_mem, radar)
+    in_mem.seek(0)
+    return in_mem, radar
+
+
+def test_read_sweeps():
+    in_mem, ref_radar = _make_multi_sweep_uf()
+    radar = pyart.io.read_uf(in_mem, sweeps=[2, 0])
+    assert radar.nsweeps == 2
+    assert radar.nrays == 72
+    assert_almost_equal(radar.fixed_angle['data'], [2.5, 0.5])
+    assert list(radar.sweep_start_ray_index['data']) == [0, 36]
+    assert list(radar.sweep_end_ray_index['data']) == [35, 71]
+    data = radar.fields['reflectivity']['data']
+    assert_almost_equal(data[:36], ref_radar.fields['reflectivity']['data'][72:])
+    assert data[41, 5] is np.ma.masked
+    assert radar.time['units'] == 'seconds since 1989-01-01T00:00:01Z'
+    assert_almost_equal(radar.time['data'][36], 0)
+    assert_almost_equal(radar.time['data'][0], 720)
+
+
+def test_delay_field_loading():
+    in_mem, ref_radar = _make_multi_sweep_uf()
+    radar = pyart.io.read_uf(in_mem, delay_field_loading=True, sweeps=[1])
+    field = radar.fields['reflectivity']
+    assert isinstance(field, pyart.lazydict.LazyLoadDict)
+    assert 'data' in field._lazyload
+    assert_almost_equal(
+        field['data'], ref_radar.fields['reflectivity']['data'][36:72])
+
+
+def test_uffile_matches_rays():
+    in_mem, ref_radar = _make_multi_sweep_uf()
+    ufile = UFFile(in_mem)
+    assert ufile.nrays == 108
+    assert ufile.nsweeps == 3
+    assert list(ufile.first_ray_in_sweep) == [0, 36, 72]
+    assert list(ufile.last_ray_in_sweep) == [35, 71, 107]
+    assert list(ufile.get_ray_indices([1])) == list(range(36, 72))
+    ray = ufile.rays[40]
+    assert ray.mandatory_header['ray_number'] == 41
+    assert ufile.get_datetimes()[40] == ray.get_datetime()
+    assert_almost_equal(ufile.get_azimuths()[40],
+                        ray.mandatory_header['azimuth'] / 64.)
+
+    # strided view and gathered data agree
+    strided = ufile.get_field_data(0)
+    ufile.field_headers['nbins'][3, 0] = 5
+    gathered = ufile.get_field_data(0)
+    assert_almost_equal(gathered[4:], strided[4:])
+    assert gathered[3, 5:].mask.all()
+    assert_almost_equal(gathered[3, :5], strided[3, :5])
@@ -181,6 +181,53 @@ def test_ray_full():
     assert ref_ray == tst_ray
 
 
+def test_make_rays():
+    radar = pyart.io.read_uf(pyart.testing.UF_FILE, file_field_names=True)
+    radar.fields['PH']['_UF_scale_factor'] = 10
+    radar.instrument_parameters['polarization_mode']['data'][:] = 'circular'
+    field_write_order = ['DZ', 'VR', 'SW', 'CZ', 'ZT', 'DR', 'ZD', 'RH', 'PH',
+                         'KD', 'SQ', 'HC']
+    ufraycreator = UFRayCreator(radar, FIELD_MAPPING, field_write_order)
+    records = ufraycreator.make_rays()
+    assert records.shape == (radar.nrays, )
+    assert records.dtype.itemsize == ufraycreator.record_length * 2 + 8
+
+    pad = struct.pack(b'>i', ufraycreator.record_length * 2)
+    ref_record = pad + ufraycreator.make_ray(0) + pad
+    assert records[0].tobytes() == ref_record
+    assert records['field_1']['field_header']['polarization'][0] == 2
+    assert ufraycreator.make_rays(1, 1).shape == (0, )
+
+
+def test_make_rays_multiple_sweeps():
+    radar = pyart.testing.make_empty_ppi_radar(10, 36, 3)
+    radar.range['meters_between_gates'] = 1000.
+    radar.range['meters_to_center_of_first_gate'] = 500.
+    radar.time['data'] = np.arange(radar.nrays) * 100.
+    radar.azimuth['data'] = np.tile(np.arange(0, 360, 10.), 3)
+    data = np.ma.arange(radar.nrays * 10.).reshape(radar.nrays, 10) / 10.
+    data[5, 5] = np.ma.masked
+    radar.add_field('reflectivity', {'data': data})
+    radar.add_field('velocity', {'data': -data})
+    radar.instrument_parameters = {
+        'nyquist_velocity': {'data': np.arange(radar.nrays) / 10.}}
+    field_mapping = {'reflectivity': 'DZ', 'velocity': 'VR'}
+    ufraycreator = UFRayCreator(
+        radar, field_mapping, ['reflectivity', 'velocity'])
+
+    records = ufraycreator.make_rays(30, 80)
+    pad = struct.pack(b'>i', ufraycreator.record_length * 2)
+    ref_records = b''.join([pad + ufraycreator.make_ray(i) + pad
+                            for i in range(30, 80)])
+    assert records.tobytes() == ref_records
+    assert records['mandatory_header']['sweep_number'][-1] == 3
+    assert records['field_0']['data'][0, 0] == 3000
+
+    in_mem = StringIO()
+    write_uf(in_mem, radar, uf_field_names=field_mapping)
+    assert len(in_mem.getvalue()) == radar.nrays * records.dtype.itemsize
+
+
 def test_complete_file():
 
     with open(pyart.testing.UF_FILE, 'rb') as fh:
@@ -11,15 +11,21 @@ Reading of Universal format (UF) files.
     _get_scan_type
     _get_instrument_parameters
 
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    _UFFileStagedField
+
 """
 
 import warnings
 
 import numpy as np
-from netCDF4 import date2num
 
 from ..config import FileMetadata, get_fillvalue
 from ..core.radar import Radar
+from ..lazydict import LazyLoadDict
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from .uffile import UFFile
 
@@ -50,7 +56,8 @@ _SWEEP_MODE_STR = {
 
 def read_uf(filename, field_names=None, additional_metadata=None,
             file_field_names=False, exclude_fields=None,
-            include_fields=None, delay_field_loading=False, **kwargs):
+            include_fields=None, delay_field_loading=False, sweeps=None,
+            **kwargs):
     """
     Read a UF File.
 
@@ -83,8 +90,13 @@ def read_uf(filename, field_names=None, additional_metadata=None,
         after the `file_field_names` and `field_names` parameters. Set
         to None to include all fields not specified by exclude_fields.
     delay_field_loading : bool
-        This option is not implemented in the function but included for
-        compatibility.
+        True to delay loading of field data from the file until the 'data'
+        key in a particular field dictionary is accessed. In this case
+        the field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects.
+    sweeps : list or None, optional
+        Read only specified sweeps from the file. None (the default) will read
+        all sweeps.
 
     Returns
     -------
@@ -102,14 +114,18 @@ def read_uf(filename, field_names=None, additional_metadata=None,
 
     # Open UF file and get handle
     ufile = UFFile(prepare_for_read(filename))
-    first_ray = ufile.rays[0]
+    if sweeps is None:
+        first_ray = ufile.get_ray(0)
+        nsweeps = ufile.nsweeps
+    else:
+        first_ray = ufile.get_ray(ufile.first_ray_in_sweep[sweeps[0]])
+        nsweeps = len(sweeps)
 
     # time
-    dts = ufile.get_datetimes()
-    units = make_time_unit_str(min(dts))
+    time_start, _time = ufile.get_times(sweeps)
     time = filemetadata('time')
-    time['units'] = units
-    time['data'] = date2num(dts, units).astype('float32')
+    time['units'] = make_time_unit_str(time_start)
+    time['data'] = _time.astype('float32')
 
     # range
     _range = filemetadata('range')
@@ -143,12 +159,19 @@ def read_uf(filename, field_names=None, additional_metadata=None,
     # sweep_start_ray_index, sweep_end_ray_index
     sweep_start_ray_index = filemetadata('sweep_start_ray_index')
     sweep_end_ray_index = filemetadata('sweep_end_ray_index')
-    sweep_start_ray_index['data'] = ufile.first_ray_in_sweep
-    sweep_end_ray_index['data'] = ufile.last_ray_in_sweep
+    if sweeps is None:
+        sweep_start_ray_index['data'] = ufile.first_ray_in_sweep
+        sweep_end_ray_index['data'] = ufile.last_ray_in_sweep
+    else:
+        rays_per_sweep = (ufile.last_ray_in_sweep[sweeps] -
+                          ufile.first_ray_in_sweep[sweeps] + 1)
+        ends = np.cumsum(rays_per_sweep).astype('int32')
+        sweep_start_ray_index['data'] = ends - rays_per_sweep
+        sweep_end_ray_index['data'] = ends - 1
 
     # sweep number
     sweep_number = filemetadata('sweep_number')
-    sweep_number['data'] = np.arange(ufile.nsweeps, dtype='int32')
+    sweep_number['data'] = np.arange(nsweeps, dtype='int32')
 
     # scan_type
     scan_type = _get_scan_type(first_ray)
@@ -156,19 +179,19 @@ def read_uf(filename, field_names=None, additional_metadata=None,
     # sweep_mode
     sweep_mode = filemetadata('sweep_mode')
     sweep_mode['data'] = np.array(
-        ufile.nsweeps * [_SWEEP_MODE_STR[scan_type]], dtype='S')
+        nsweeps * [_SWEEP_MODE_STR[scan_type]], dtype='S')
 
     # elevation
     elevation = filemetadata('elevation')
-    elevation['data'] = ufile.get_elevations()
+    elevation['data'] = ufile.get_elevations(sweeps)
 
     # azimuth
     azimuth = filemetadata('azimuth')
-    azimuth['data'] = ufile.get_azimuths()
+    azimuth['data'] = ufile.get_azimuths(sweeps)
 
     # fixed_angle
     fixed_angle = filemetadata('fixed_angle')
-    fixed_angle['data'] = ufile.get_sweep_fixed_angles()
+    fixed_angle['data'] = ufile.get_sweep_fixed_angles(sweeps)
 
     # fields
     fields = {}
@@ -178,16 +201,22 @@ def read_uf(filename, field_names=None, additional_metadata=None,
         if field_name is None:
             continue
         field_dic = filemetadata(field_name)
-        field_dic['data'] = ufile.get_field_data(uf_field_number)
         field_dic['_FillValue'] = get_fillvalue()
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            data_call = _UFFileStagedField(ufile, uf_field_number, sweeps)
+            field_dic.set_lazy('data', data_call)
+        else:
+            field_dic['data'] = ufile.get_field_data(uf_field_number, sweeps)
         fields[field_name] = field_dic
 
     # instrument_parameters
-    instrument_parameters = _get_instrument_parameters(ufile, filemetadata)
+    instrument_parameters = _get_instrument_parameters(
+        ufile, filemetadata, sweeps)
 
     # scan rate
     scan_rate = filemetadata('scan_rate')
-    scan_rate['data'] = ufile.get_sweep_rates()
+    scan_rate['data'] = ufile.get_sweep_rates(sweeps)
 
     ufile.close()
     return Radar(
@@ -210,17 +239,17 @@ def _get_scan_type(ufray):
         return 'ppi'
 
 
-def _get_instrument_parameters(ufile, filemetadata):
+def _get_instrument_parameters(ufile, filemetadata, sweeps=None):
     """ Return a dictionary containing instrument parameters. """
 
     # pulse width
     pulse_width = filemetadata('pulse_width')
-    pulse_width['data'] = ufile.get_pulse_widths() / _LIGHT_SPEED  # m->sec
+    pulse_width['data'] = (
+        ufile.get_pulse_widths(sweeps) / _LIGHT_SPEED)  # m->sec
 
     # assume that the parameters in the first ray represent the beam widths,
     # bandwidth and frequency in the entire volume
-    first_ray = ufile.rays[0]
-    field_header = first_ray.field_headers[0]
+    field_header = ufile.field_headers[0, 0]
     beam_width_h = field_header['beam_width_h'] / 64.
     beam_width_v = field_header['beam_width_v'] / 64.
     bandwidth = field_header['bandwidth'] / 16. * 1.e6
@@ -245,7 +274,7 @@ def _get_instrument_parameters(ufile, filemetadata):
 
     # polarization_mode
     polarization_mode = filemetadata('polarization_mode')
-    polarization_mode['data'] = ufile.get_sweep_polarizations()
+    polarization_mode['data'] = ufile.get_sweep_polarizations(sweeps)
 
     # frequency
     frequency = filemetadata('frequency')
@@ -253,7 +282,7 @@ def _get_instrument_parameters(ufile, filemetadata):
 
     # prt
     prt = filemetadata('prt')
-    prt['data'] = ufile.get_prts() / 1e6  # us->sec
+    prt['data'] = ufile.get_prts(sweeps) / 1e6  # us->sec
 
     instrument_parameters = {
         'pulse_width': pulse_width,
@@ -267,8 +296,24 @@ def _get_instrument_parameters(ufile, filemetadata):
 
     # nyquist velocity if defined
     nyquist_velocity = filemetadata('nyquist_velocity')
-    nyquist_velocity['data'] = ufile.get_nyquists()
+    nyquist_velocity['data'] = ufile.get_nyquists(sweeps)
     if nyquist_velocity['data'] is not None:
         instrument_parameters['nyquist_velocity'] = nyquist_velocity
 
     return instrument_parameters
+
+
+class _UFFileStagedField(object):
+    """
+    A class to facilitate on demand loading of field data from a UF file.
+    """
+
+    def __init__(self, ufile, field_number, sweeps):
+        """ initialize. """
+        self.ufile = ufile
+        self.field_number = field_number
+        self.sweeps = sweeps
+
+    def __call__(self):
+        """ Return the array containing the field data. """
+        return self.ufile.get_field_data(self.field_number, self.sweeps)
@@ -37,6 +37,7 @@ from .uffile import UF_FIELD_POSITION
 from .uffile import UF_FIELD_HEADER
 from .uffile import UF_FSI_VEL
 from .uffile import POLARIZATION_STR
+from .uffile import _structure_to_dtype
 
 
 def write_uf(filename, radar, uf_field_names=None, radar_field_names=False,
@@ -116,14 +117,9 @@ def write_uf(filename, radar, uf_field_names=None, radar_field_names=False,
         radar, field_mapping, field_write_order, volume_start=volume_start,
         templates_extra=templates_extra)
 
-    for ray_num in range(radar.nrays):
-
-        ray_bytes = raycreator.make_ray(ray_num)
-        pad = struct.pack(b'>i', raycreator.record_length * 2)
-
-        fhandle.write(pad)
-        fhandle.write(ray_bytes)
-        fhandle.write(pad)
+    # records are assembled and written one sweep at a time
+    for start, end in radar.iter_start_end():
+        fhandle.write(raycreator.make_rays(start, end + 1))
 
     if close:
         fhandle.close()
@@ -187,6 +183,8 @@ class UFRayCreator(object):
         self.record_length = self._calc_record_length(
             radar, field_mapping, field_write_order)
         self.ray_num_to_sweep_num = self._calc_ray_num_to_sweep_num(radar)
+        self.record_dtype = self._calc_record_dtype(
+            radar, field_mapping, field_write_order)
 
         self.mandatory_header_template = UF_MANDATORY_HEADER_TEMPLATE.copy()
         self.optional_header_template = UF_OPTIONAL_HEADER_TEMPLATE.copy()
@@ -227,6 +225,27 @@ class UFRayCreator(object):
             [data_type in UF_VEL_DATA_TYPES for data_type in data_types])
         return 45+14+3 + (radar.ngates+2+19)*nfields + 2*nvel
 
+    @staticmethod
+    def _calc_record_dtype(radar, field_mapping, field_write_order):
+        """ Return the dtype of a record including the record lengths. """
+        field_header = _structure_to_dtype(UF_FIELD_HEADER)
+        fsi_vel = _structure_to_dtype(UF_FSI_VEL)
+        record = [
+            ('record_length_start', '>i4'),
+            ('mandatory_header', _structure_to_dtype(UF_MANDATORY_HEADER)),
+            ('optional_header', _structure_to_dtype(UF_OPTIONAL_HEADER)),
+            ('data_header', _structure_to_dtype(UF_DATA_HEADER)),
+            ('field_position', _structure_to_dtype(UF_FIELD_POSITION),
+             (len(field_write_order), ))]
+        for i, radar_field in enumerate(field_write_order):
+            field = [('field_header', field_header)]
+            if field_mapping[radar_field].encode('ascii') in UF_VEL_DATA_TYPES:
+                field.append(('fsi_vel', fsi_vel))
+            field.append(('data', '>i2', (radar.ngates, )))
+            record.append(('field_%d' % (i), field))
+        record.append(('record_length_end', '>i4'))
+        return np.dtype(record)
+
     def _set_optional_header_time(self, volume_start):
         """ Populate the optional header template with the volume start. """
         header = self.optional_header_template
@@ -315,6 +334,139 @@ class UFRayCreator(object):
 
         return
 
+    def make_rays(self, start=0, stop=None):
+        """
+        Return an array holding the complete UF records of a range of rays.
+
+        Headers which do not vary between rays are packed once, the ray
+        dependent header elements are set and the fields of all rays are
+        scaled in single array operations. The records, each surrounded by
+        its length in bytes, occupy a single contiguous buffer which can be
+        written to a file with one call.
+
+        Parameters
+        ----------
+        start : int, optional
+            First ray to include.
+        stop : int or None, optional
+            Ray after the last ray to include, None for the last ray in the
+            radar.
+
+        Returns
+        -------
+        records : array
+            Structured array with one element per ray using the
+            `record_dtype` attribute of the object.
+
+        """
+        if stop is None:
+            stop = self.radar.nrays
+        if stop <= start:
+            return np.empty((0, ), dtype=self.record_dtype)
+
+        # template record containing all ray invariant elements
+        pad = struct.pack(b'>i', self.record_length * 2)
+        template = np.frombuffer(
+            pad + self.make_ray(start) + pad, dtype=self.record_dtype)
+        records = np.empty((stop - start, ), dtype=self.record_dtype)
+        records[:] = template
+
+        sweeps = self.ray_num_to_sweep_num[start:stop]
+        self._set_mandatory_headers(records['mandatory_header'], start, stop)
+
+        # field header elements shared by all fields
+        iparams = self.radar.instrument_parameters
+        if iparams is not None and 'pulse_width' in iparams:
+            pulse_width = iparams['pulse_width']['data'][start:stop]
+            pulse_width_m = np.round(pulse_width * _LIGHT_SPEED)
+        else:
+            pulse_width_m = UF_MISSING_VALUE
+
+        if iparams is not None and 'prt' in iparams:
+            prt = iparams['prt']['data'][start:stop]
+            prt_ms = np.round(prt * 1.e6)
+        else:
+            prt_ms = UF_MISSING_VALUE
+
+        # default to horizontal polarization
+        polarization = np.ones((stop - start, ), dtype='int16')
+        if iparams is not None and 'polarization_mode' in iparams:
+            modes = iparams['polarization_mode']['data']
+            for sweep_num in np.unique(sweeps):
+                mode = str(modes[sweep_num])
+                if mode in POLARIZATION_STR:
+                    polarization[sweeps == sweep_num] = (
+                        POLARIZATION_STR.index(mode))
+
+        if iparams is not None and 'nyquist_velocity' in iparams:
+            nyquist = iparams['nyquist_velocity']['data'][start:stop]
+        else:
+            nyquist = None
+
+        for i, radar_field in enumerate(self.field_write_order):
+            field = records['field_%d' % (i)]
+            field_dic = self.radar.fields[radar_field]
+            scale = field_dic.get('_UF_scale_factor', UF_DEFAULT_SCALE_FACTOR)
+
+            field_header = field['field_header']
+            field_header['pulse_width_m'] = pulse_width_m
+            field_header['prt_ms'] = prt_ms
+            field_header['polarization'] = polarization
+
+            if 'fsi_vel' in field.dtype.names:
+                if nyquist is not None:
+                    field['fsi_vel']['nyquist'] = np.round(nyquist * scale)
+                else:
+                    field['fsi_vel']['nyquist'] = UF_MISSING_VALUE
+
+            data = np.round(field_dic['data'][start:stop] * scale)
+            field['data'] = np.ma.filled(data, UF_MISSING_VALUE)
+        return records
+
+    def _set_mandatory_headers(self, header, start, stop):
+        """ Set the ray dependent elements of mandatory header array. """
+        rays = np.arange(start, stop)
+        sweeps = self.ray_num_to_sweep_num[start:stop]
+
+        # time parameters
+        times = num2date(self.radar.time['data'][start:stop],
+                         self.radar.time['units'],
+                         only_use_cftime_datetimes=False,
+                         only_use_python_datetimes=True)
+        times = np.array(times, dtype='datetime64[us]')
+        years = times.astype('datetime64[Y]')
+        months = times.astype('datetime64[M]')
+        days = times.astype('datetime64[D]')
+        seconds = (times - days) // np.timedelta64(1, 's')
+        header['year'] = years.astype('int64') + 1970 - 2000
+        header['month'] = (months - years).astype('int64') + 1
+        header['day'] = (days - months).astype('int64') + 1
+        header['hour'] = seconds // 3600
+        header['minute'] = seconds // 60 % 60
+        header['second'] = seconds % 60
+
+        # ray/sweep numbers
+        header['record_number'] = rays + 1
+        header['ray_number'] = rays + 1
+        header['sweep_number'] = sweeps + 1
+
+        # pointing
+        azimuth = self.radar.azimuth['data'][start:stop]
+        header['azimuth'] = np.round(azimuth * 64)
+
+        elevation = self.radar.elevation['data'][start:stop]
+        header['elevation'] = np.round(elevation * 64)
+
+        fixed_angle = self.radar.fixed_angle['data'][sweeps]
+        header['fixed_angle'] = np.round(fixed_angle * 64)
+
+        if self.radar.scan_rate is not None:
+            scan_rate = self.radar.scan_rate['data'][start:stop]
+            header['sweep_rate'] = np.round(scan_rate * 64)
+        else:
+            header['sweep_rate'] = UF_MISSING_VALUE
+        return
+
     def make_ray(self, ray_num):
         """ Return a byte string representing a complete UF ray. """
         ray = self.make_mandatory_header(ray_num)
@@ -17,6 +17,8 @@ Low level class for reading Universal Format (UF) files.
     _structure_size
     _unpack_from_buf
     _unpack_structure
+    _structure_to_dtype
+    _gather_structures
 
 """
 
@@ -85,6 +87,11 @@ class UFFile(object):
     """
     A class for reading data from Universal Format (UF) files.
 
+    The file is read into memory in one operation and the location of each
+    record is found by following the record lengths. The headers of all
+    records are then decoded at once into structured arrays and field data
+    is gathered for all rays when requested.
+
     Parameters
     ----------
     filename : str or file-like
@@ -93,9 +100,23 @@ class UFFile(object):
     Attributes
     ----------
     rays : list of UFRay objects
-        List of rays within the UF file.
-    nrays, nsweeps : int
-        Number of rays and sweep in the file.
+        List of rays within the UF file. The list is created when first
+        accessed, changes to these objects are not reflected in the values
+        returned by the methods of this class.
+    nrays, nsweeps, nfields : int
+        Number of rays, sweeps and fields in the file.
+    record_offsets : array
+        Offset in bytes of the start of each record in the file.
+    mandatory_headers : array
+        Structured array of the mandatory header of each ray.
+    field_positions : array
+        Structured array of the field positions, the data type and field
+        header offset, for each ray and field.
+    field_headers : array
+        Structured array of the field header of each ray and field.
+    fsi_nyquists : masked array
+        Raw Nyquist velocity of each ray and field from the field specific
+        velocity structure, masked where this structure is not present.
     ray_sweep_numbers : array
         Sweep number of each ray in the file.
     first_ray_in_sweep, last_ray_in_sweep : array
@@ -112,6 +133,9 @@ class UFFile(object):
         else:
             fobj = open(filename, 'rb')
         self._fh = fobj
+        buf = fobj.read()
+        self._buf = buf
+        self._buf_u1 = np.frombuffer(buf, dtype='u1')
 
         # UF files come in three 'flavors' depending upon the size of the
         # padding around each record.  True UF files contain no padding
@@ -122,35 +146,63 @@ class UFFile(object):
         # by the 'record_length' structure elements is used.
 
         # determine padding around records
-        buf = fobj.read(8)
         try:
-            padding = buf.index(b'UF')
+            padding = buf[:8].index(b'UF')
         except ValueError:
             raise IOError('file in not a valid UF file')
 
-        # read in the records, store as a list of rays
-        self.rays = []
-        while len(buf) == 8:  # read until EOF reached
-
-            # record size stored as a 2-byte int start at byte 2
-            record_size = struct.unpack('>h', buf[padding+2:padding+4])[0] * 2
-
-            # read in full record
-            bytes_read = len(buf) - padding
-            bytes_to_read = record_size - bytes_read
-            record = buf[-bytes_read:] + fobj.read(bytes_to_read)
-
-            # convert record into UFRay
-            self.rays.append(UFRay(record))
-
-            # read post record padding
-            fobj.read(padding)
-
-            # read in the first eight bytes of the next record
-            buf = fobj.read(8)
-
-        # determine volume size statistics
-        self.nrays = len(self.rays)
+        # find the offset of each record, record size stored as a 2-byte int
+        # in words starting at byte 2 of the record
+        record_offsets = []
+        pos = padding
+        while pos - padding + 8 <= len(buf):    # read until EOF reached
+            record_size = struct.unpack_from('>h', buf, pos + 2)[0] * 2
+            if record_size <= 0 or pos + record_size > len(buf):
+                break   # truncated record
+            record_offsets.append(pos)
+            pos += record_size + 2 * padding
+        self.record_offsets = np.array(record_offsets, dtype='int64')
+        self.nrays = len(record_offsets)
+        self._rays = None
+
+        # decode the mandatory and data headers of all rays
+        offsets = self.record_offsets
+        self.mandatory_headers = _gather_structures(
+            self._buf_u1, offsets, _structure_to_dtype(UF_MANDATORY_HEADER))
+        data_header_offsets = (
+            offsets + (self.mandatory_headers['offset_data_header'] - 1) * 2)
+        data_headers = _gather_structures(
+            self._buf_u1, data_header_offsets,
+            _structure_to_dtype(UF_DATA_HEADER))
+
+        # field positions and headers, the number and order of the fields
+        # are assumed to be the same in all rays
+        self.nfields = int(data_headers['record_nfields'][0])
+        field_position_offsets = (
+            data_header_offsets[:, np.newaxis] + 6 +
+            np.arange(self.nfields) * 4)
+        self.field_positions = _gather_structures(
+            self._buf_u1, field_position_offsets,
+            _structure_to_dtype(UF_FIELD_POSITION))
+        field_header_offsets = (
+            offsets[:, np.newaxis] +
+            (self.field_positions['offset_field_header'] - 1) * 2)
+        self.field_headers = _gather_structures(
+            self._buf_u1, field_header_offsets,
+            _structure_to_dtype(UF_FIELD_HEADER))
+        self._data_offsets = (
+            offsets[:, np.newaxis] +
+            (self.field_headers['data_offset'] - 1) * 2)
+
+        # field specific velocity structures
+        is_vel = np.in1d(self.field_positions['data_type'],
+                         [b'VF', b'VE', b'VR', b'VT', b'VP'])
+        has_fsi = is_vel.reshape(self.field_positions.shape) & (
+            (self._data_offsets - field_header_offsets) == 42)
+        nyquist_offsets = np.where(has_fsi, field_header_offsets + 38, 0)
+        nyquists = _gather_structures(
+            self._buf_u1, nyquist_offsets, np.dtype('>i2'))
+        self.fsi_nyquists = np.ma.masked_array(nyquists, mask=~has_fsi)
 
         # determine sweep information
         self.ray_sweep_numbers = self._get_ray_sweep_numbers()
@@ -159,126 +211,181 @@ class UFFile(object):
         self.first_ray_in_sweep = first_ray_in_sweep
         self.last_ray_in_sweep = last_ray_in_sweep
 
+    @property
+    def rays(self):
+        """ List of UFRay objects for all records in the file. """
+        if self._rays is None:
+            self._rays = [self.get_ray(i) for i in range(self.nrays)]
+        return self._rays
+
     def close(self):
         """ Close the file. """
         self._fh.close()
 
+    def get_ray(self, ray_num):
+        """ Return a UFRay object for a single record. """
+        start = self.record_offsets[ray_num]
+        size = self.mandatory_headers['record_length'][ray_num] * 2
+        return UFRay(self._buf[start:start + size])
+
+    def get_ray_indices(self, sweeps=None):
+        """ Return the indices of the rays in the given sweeps. """
+        if sweeps is None:
+            return np.arange(self.nrays)
+        return np.concatenate([
+            np.arange(self.first_ray_in_sweep[i],
+                      self.last_ray_in_sweep[i] + 1) for i in sweeps])
+
     def _get_ray_sweep_numbers(self):
         """ Return an array of the sweep_number stored in each ray. """
-        ray_sweep_numbers = np.empty((self.nrays, ), dtype='int32')
-        for i, ray in enumerate(self.rays):
-            ray_sweep_numbers[i] = ray.mandatory_header['sweep_number']
-        return ray_sweep_numbers
+        return self.mandatory_headers['sweep_number'].astype('int32')
 
     def _get_sweep_limits(self):
         """ Return arrays of indices of first and last ray in each sweep. """
-        first_ray_in_sweep = np.empty(self.nsweeps, dtype='int32')
-        last_ray_in_sweep = np.empty(self.nsweeps, dtype='int32')
-        unique_sweep_numbers = np.unique(self.ray_sweep_numbers)
-        for i, sweep_number in enumerate(unique_sweep_numbers):
-            matches = np.where(self.ray_sweep_numbers == sweep_number)
-            first_ray_in_sweep[i] = matches[0][0]
-            last_ray_in_sweep[i] = matches[0][-1]
-        return first_ray_in_sweep, last_ray_in_sweep
-
-    def get_field_data(self, field_number):
+        unique_sweep_numbers, first_ray_in_sweep = np.unique(
+            self.ray_sweep_numbers, return_index=True)
+        _, last_ray_in_sweep = np.unique(
+            self.ray_sweep_numbers[::-1], return_index=True)
+        last_ray_in_sweep = self.nrays - 1 - last_ray_in_sweep
+        return (first_ray_in_sweep.astype('int32'),
+                last_ray_in_sweep.astype('int32'))
+
+    def get_field_data(self, field_number, sweeps=None):
         """ Return a 2D array of scale/masked field data for the volume. """
         # Assumes that no rays contain more gates than the first ray and
         # that the missing_data_value and scale_factor are identical for all
         # rays.  Additional the order and number of the fields are assumed to
         # be identical between rays.
-        first_ray = self.rays[0]
-        ngates = len(first_ray.field_raw_data[field_number])
-        missing_data_value = first_ray.mandatory_header['missing_data_value']
-        scale_factor = first_ray.field_headers[field_number]['scale_factor']
-
-        raw_data = np.empty((self.nrays, ngates), 'int16')
-        for i, ray in enumerate(self.rays):
-            ray_data = ray.field_raw_data[field_number]
-            bins = len(ray_data)
-            raw_data[i, :bins] = ray.field_raw_data[field_number]
-            raw_data[i, bins:] = missing_data_value
+        rays = self.get_ray_indices(sweeps)
+        field_headers = self.field_headers[:, field_number]
+        ngates = int(field_headers['nbins'][rays[0]])
+        missing_data_value = (
+            self.mandatory_headers['missing_data_value'][rays[0]])
+        scale_factor = field_headers['scale_factor'][rays[0]]
+
+        offsets = self._data_offsets[rays, field_number]
+        nbins = field_headers['nbins'][rays]
+        steps = np.diff(offsets)
+        if (len(rays) > 1 and np.all(steps == steps[0]) and steps[0] > 0 and
+                np.all(nbins == ngates)):
+            # records of equal size, a strided view of the file
+            raw_data = np.ndarray(
+                (len(rays), ngates), dtype='>i2', buffer=self._buf,
+                offset=offsets[0], strides=(steps[0], 2))
+        else:
+            # bins past the end of short rays are replaced below
+            data_offsets = np.minimum(
+                offsets[:, np.newaxis] + np.arange(ngates) * 2,
+                len(self._buf) - 2)
+            raw_data = _gather_structures(
+                self._buf_u1, data_offsets, np.dtype('>i2'))
+            raw_data[np.arange(ngates) >= nbins[:, np.newaxis]] = (
+                missing_data_value)
 
         data = raw_data / float(scale_factor)
         mask = raw_data == missing_data_value
         return np.ma.masked_array(data, mask)
 
-    def get_azimuths(self):
+    def get_azimuths(self, sweeps=None):
         """ Return an array of azimuth angles for each ray in degrees. """
-        azimuth = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            azimuth[i] = ray.mandatory_header['azimuth'] / 64.
-        return azimuth
+        rays = self.get_ray_indices(sweeps)
+        azimuth = self.mandatory_headers['azimuth'][rays] / 64.
+        return azimuth.astype('float32')
 
-    def get_elevations(self):
+    def get_elevations(self, sweeps=None):
         """ Return an array of elevation angles for each ray in degrees. """
-        elevation = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            elevation[i] = ray.mandatory_header['elevation'] / 64.
-        return elevation
+        rays = self.get_ray_indices(sweeps)
+        elevation = self.mandatory_headers['elevation'][rays] / 64.
+        return elevation.astype('float32')
 
-    def get_sweep_rates(self):
+    def get_sweep_rates(self, sweeps=None):
         """ Return an array of sweep rates for each ray in degrees/sec. """
-        sweep_rates = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            sweep_rates[i] = ray.mandatory_header['sweep_rate'] / 64.
-        return sweep_rates
+        rays = self.get_ray_indices(sweeps)
+        sweep_rates = self.mandatory_headers['sweep_rate'][rays] / 64.
+        return sweep_rates.astype('float32')
 
-    def get_pulse_widths(self):
+    def get_pulse_widths(self, sweeps=None):
         """ Return an array of pulse widths for each ray in meters. """
-        pulse_widths = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            pulse_widths[i] = ray.field_headers[0]['pulse_width_m']
-        return pulse_widths
+        rays = self.get_ray_indices(sweeps)
+        return self.field_headers['pulse_width_m'][rays, 0].astype('float32')
 
-    def get_prts(self):
+    def get_prts(self, sweeps=None):
         """ Return an array of prts for each ray in microseconds. """
-        prts = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            prts[i] = ray.field_headers[0]['prt_ms']
-        return prts
+        rays = self.get_ray_indices(sweeps)
+        return self.field_headers['prt_ms'][rays, 0].astype('float32')
 
-    def get_nyquists(self):
+    def get_nyquists(self, sweeps=None):
         """
         Return an array of nyquist velocities for each ray in m/s.
 
         Returns None if nyquist velocities cannot be determined for all rays.
         """
-        field_headers = self.rays[0].field_headers
-        try:
-            field_idx = ['nyquist' in fh for fh in field_headers].index(True)
-        except ValueError:
-            return None  # True not in list
-        nyquist = np.empty((self.nrays, ), dtype='float32')
-        for i, ray in enumerate(self.rays):
-            scale = ray.field_headers[field_idx]['scale_factor']
-            try:
-                nyquist[i] = ray.field_headers[field_idx]['nyquist'] / scale
-            except KeyError:
-                return None  # nyquist not in field header
-        return nyquist
-
-    def get_sweep_fixed_angles(self):
+        has_fsi = ~np.ma.getmaskarray(self.fsi_nyquists[0])
+        if not np.any(has_fsi):
+            return None
+        field_idx = np.argmax(has_fsi)
+        rays = self.get_ray_indices(sweeps)
+        nyquist = self.fsi_nyquists[rays, field_idx]
+        if np.ma.is_masked(nyquist):
+            return None  # nyquist not in field header
+        scale = self.field_headers['scale_factor'][rays, field_idx]
+        return (np.ma.getdata(nyquist) / scale).astype('float32')
+
+    def get_sweep_fixed_angles(self, sweeps=None):
         """ Return an array of fixed angles for each sweep in degrees. """
-        fixed = np.empty((self.nsweeps, ), dtype='float32')
-        for i, ray_num in enumerate(self.first_ray_in_sweep):
-            fixed[i] = self.rays[ray_num].mandatory_header['fixed_angle'] / 64.
-        return fixed
+        first_rays = self._get_first_rays(sweeps)
+        fixed = self.mandatory_headers['fixed_angle'][first_rays] / 64.
+        return fixed.astype('float32')
 
-    def get_sweep_polarizations(self):
+    def get_sweep_polarizations(self, sweeps=None):
         """ Return an array of polarization modes for each sweep. """
-        modes = []
-        for ray_num in self.first_ray_in_sweep:
-            ray = self.rays[ray_num]
-            polarization = ray.field_headers[0]['polarization']
-            if polarization > 3:
-                polarization = 3
-            modes.append(POLARIZATION_STR[polarization])
-        return np.array(modes)
-
-    def get_datetimes(self):
+        first_rays = self._get_first_rays(sweeps)
+        polarizations = self.field_headers['polarization'][first_rays, 0]
+        polarizations = np.minimum(polarizations, 3)
+        return np.array([POLARIZATION_STR[i] for i in polarizations])
+
+    def _get_first_rays(self, sweeps):
+        """ Return the index of the first ray in the given sweeps. """
+        if sweeps is None:
+            return self.first_ray_in_sweep
+        return self.first_ray_in_sweep[sweeps]
+
+    def get_times(self, sweeps=None):
+        """
+        Return the start time and the time of each ray.
+
+        Returns
+        -------
+        time_start : datetime
+            Earliest time of the rays, truncated to whole seconds.
+        time : array
+            Time of each ray in seconds since time_start.
+
+        """
+        datetimes = self._get_datetime64(sweeps)
+        time_start = datetimes.min()
+        time = (datetimes - time_start) / np.timedelta64(1, 's')
+        return time_start.astype(datetime.datetime), time
+
+    def get_datetimes(self, sweeps=None):
         """ Return a list of datetimes for each ray. """
-        return [ray.get_datetime() for ray in self.rays]
+        return list(self._get_datetime64(sweeps).astype(datetime.datetime))
+
+    def _get_datetime64(self, sweeps):
+        """ Return a datetime64 array with the time of each ray. """
+        header = self.mandatory_headers[self.get_ray_indices(sweeps)]
+        year = header['year'].astype('int64')
+        year[year < 1900] += 2000   # years after 2000, 11 -> 2011
+        months = ((year - 1970).astype('datetime64[Y]').astype(
+            'datetime64[M]') + (header['month'] - 1).astype('timedelta64[M]'))
+        # Some UF writers incorrectly specify midnight as 24:00:00 rather
+        # than 00:00:00, the offset in seconds handles this case
+        day, hour, minute, second = [
+            header[k].astype('int64') for k in ['day', 'hour', 'minute',
+                                                 'second']]
+        seconds = (day - 1) * 86400 + hour * 3600 + minute * 60 + second
+        return (months.astype('datetime64[s]') +
+                seconds.astype('timedelta64[s]'))
 
 
 class UFRay(object):
@@ -421,6 +528,22 @@ def _unpack_structure(string, structure):
     return dict(zip([i[0] for i in structure], lst))
 
 
+def _gather_structures(buf, offsets, dtype):
+    """
+    Return an array of the structures starting at the given offsets in a
+    byte buffer, the array has the shape of the offsets.
+    """
+    offsets = np.asarray(offsets, dtype='int64')
+    index = offsets[..., np.newaxis] + np.arange(dtype.itemsize)
+    return buf[index].view(dtype)[..., 0]
+
+
+def _structure_to_dtype(structure):
+    """ Return a big-endian NumPy dtype with the layout of a structure. """
+    return np.dtype([(name, '>i2' if fmt == INT16 else 'S' + fmt[:-1])
+                     for name, fmt in structure])
+
+
 # The Universal file format was originally described in the report:
 #
 # Barnes, Stanley L. Report on a meeting to establish a common Doppler radar
@@ -22,6 +22,7 @@ Radar retrievals
     compute_noisedBZ
     fetch_radar_time_profile
     map_profile_to_gates
+    map_profiles_to_gates
     steiner_conv_strat
     hydroclass_semisupervised
     get_freq_band
@@ -35,15 +36,19 @@ Radar retrievals
     est_rain_rate_zkdp
     est_rain_rate_za
     est_rain_rate_hydro
+    RainAccumulator
     velocity_azimuth_display
+    vad_least_squares
     quasi_vertical_profile
+    QVPAccumulator
 
 """
 
 from .kdp_proc import kdp_maesaka, kdp_schneebeli, kdp_vulpiani
 from .echo_class import steiner_conv_strat, hydroclass_semisupervised
 from .echo_class import get_freq_band
-from .gate_id import map_profile_to_gates, fetch_radar_time_profile
+from .gate_id import map_profile_to_gates, map_profiles_to_gates
+from .gate_id import fetch_radar_time_profile
 from .simple_moment_calculations import calculate_snr_from_reflectivity
 from .simple_moment_calculations import calculate_velocity_texture
 from .simple_moment_calculations import compute_snr, compute_l, compute_cdr
@@ -52,7 +57,8 @@ from .advection import grid_displacement_pc, grid_shift
 from .qpe import est_rain_rate_zpoly, est_rain_rate_z, est_rain_rate_kdp
 from .qpe import est_rain_rate_a, est_rain_rate_zkdp, est_rain_rate_za
 from .qpe import est_rain_rate_hydro
-from .vad import velocity_azimuth_display
-from .qvp import quasi_vertical_profile
+from .rain_accumulation import RainAccumulator
+from .vad import velocity_azimuth_display, vad_least_squares
+from .qvp import quasi_vertical_profile, QVPAccumulator
 
 __all__ = [s for s in dir() if not s.startswith('_')]
@@ -198,6 +198,158 @@ def _steiner_conv_strat(refl, x, y, dx, dy, intense=42, peak_relation=0,
     return sclass
 
 
+def _steiner_conv_strat_vectorized(refl, x, y, dx, dy, intense=42,
+                                   peak_relation=0, area_relation=1,
+                                   bkg_rad=11000, use_intense=True):
+    """
+    Vectorized version of :py:func:`_steiner_conv_strat` which produces
+    identical classifications.
+
+    The mean background reflectivity of every grid point is computed at
+    once by accumulating shifted copies of the linear reflectivity, one per
+    offset in the background disk. The convective radius and peakedness are
+    then found with np.select. Grid points which are already convective when
+    visited are not considered as convective cores in the loop version, so
+    the cores are still dilated one at a time, in the same order, using a
+    disk kernel precomputed for each convective radius.
+
+    0 = Undefined
+    1 = Stratiform
+    2 = Convective
+    """
+    ny, nx = refl.shape
+    valid = ~np.isnan(refl)
+
+    # the stencils used by the loop version never include the first row or
+    # column of the grid
+    ze_lin = np.zeros(refl.shape, dtype='float64')
+    ze_lin[valid] = 10. ** (refl[valid] / 10.)
+    ze_lin[0, :] = 0
+    ze_lin[:, 0] = 0
+    nvalid = valid.astype('float64')
+    nvalid[0, :] = 0
+    nvalid[:, 0] = 0
+
+    # mean background reflectivity within the background radius
+    bkg_offsets, bkg_disk = _disk_kernel(x, y, dx, dy, bkg_rad, bkg_rad)
+    sum_ze = np.zeros(refl.shape, dtype='float64')
+    n = np.zeros(refl.shape, dtype='float64')
+    for di, dj in zip(*np.nonzero(bkg_disk.T)):
+        di += bkg_offsets[0]
+        dj += bkg_offsets[1]
+        dst, src = _shifted_slices(ny, nx, dj, di)
+        sum_ze[dst] += ze_lin[src]
+        n[dst] += nvalid[src]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ze_bkg = np.where(n == 0, np.inf, 10.0 * np.log10(sum_ze / n))
+
+    conv_rad = _convective_radius(ze_bkg, area_relation)
+    peak = _peakedness(ze_bkg, peak_relation)
+
+    # convective cores, and the kernels used to dilate each of them
+    if use_intense:
+        is_intense = valid & (refl >= intense)
+    else:
+        is_intense = np.zeros(refl.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        is_peaked = valid & ~is_intense & (refl - ze_bkg >= peak)
+    kernels = {}
+    for radius in np.unique(conv_rad[is_intense | is_peaked]):
+        # intense cores use a stencil limited to the convective radius,
+        # peaked cores use the background radius stencil
+        kernels[True, radius] = _disk_kernel(x, y, dx, dy, radius, radius)
+        kernels[False, radius] = _disk_kernel(x, y, dx, dy, radius, bkg_rad)
+
+    # dilate the cores in the order the loop version visits them
+    convective = np.zeros(refl.shape, dtype=bool)
+    core_i, core_j = np.nonzero((is_intense | is_peaked).T)
+    for i, j in zip(core_i, core_j):
+        if convective[j, i]:
+            continue
+        convective[j, i] = True
+        (di, dj), disk = kernels[is_intense[j, i], conv_rad[j, i]]
+        jmin = max(1, j + dj)
+        jmax = min(ny, j + dj + disk.shape[0])
+        imin = max(1, i + di)
+        imax = min(nx, i + di + disk.shape[1])
+        if jmin >= jmax or imin >= imax:
+            continue
+        disk = disk[jmin - j - dj:jmax - j - dj, imin - i - di:imax - i - di]
+        region = (slice(jmin, jmax), slice(imin, imax))
+        convective[region] |= disk & valid[region]
+
+    sclass = np.zeros(refl.shape, dtype=int)
+    sclass[valid] = 1
+    sclass[convective] = 2
+    return sclass
+
+
+def _disk_kernel(x, y, dx, dy, radius, window):
+    """
+    Return the offsets of the first element and a boolean disk kernel for
+    the stencil used by the loop version of the Steiner algorithm. The
+    stencil spans the grid points from int(i - window / dx) up to but not
+    including int(i + window / dx) which are within radius of the center.
+    """
+    x_lo = int(np.floor(-window / dx))
+    x_hi = int(np.floor(window / dx))
+    y_lo = int(np.floor(-window / dy))
+    y_hi = int(np.floor(window / dy))
+    x_spacing = x[1] - x[0] if len(x) > 1 else dx
+    y_spacing = y[1] - y[0] if len(y) > 1 else dy
+    x_dist = np.arange(x_lo, x_hi) * x_spacing
+    y_dist = np.arange(y_lo, y_hi) * y_spacing
+    rad = np.sqrt(x_dist[np.newaxis, :] ** 2 + y_dist[:, np.newaxis] ** 2)
+    return (x_lo, y_lo), rad <= radius
+
+
+def _shifted_slices(ny, nx, dj, di):
+    """
+    Return the destination and source slices which add the element offset
+    by (dj, di) to each element of a (ny, nx) array.
+    """
+    dst = (slice(max(0, -dj), min(ny, ny - dj)),
+           slice(max(0, -di), min(nx, nx - di)))
+    src = (slice(max(0, dj), min(ny, ny + dj)),
+           slice(max(0, di), min(nx, nx + di)))
+    return dst, src
+
+
+def _convective_radius(ze_bkg, area_relation):
+    """
+    Vectorized convective radius as a function of the mean background
+    reflectivity, see :py:func:`_steiner_conv_strat`.
+    """
+    if area_relation == 0:
+        edges, radii = [30., 35., 40., 45.], [1000., 2000., 3000., 4000.]
+        default = 5000.
+    elif area_relation == 1:
+        edges, radii = [25., 30., 35., 40.], [1000., 2000., 3000., 4000.]
+        default = 5000.
+    elif area_relation == 2:
+        edges, radii = [20., 25., 30., 35.], [1000., 2000., 3000., 4000.]
+        default = 5000.
+    else:
+        edges, radii = [40., 45., 50., 55.], [0., 1000., 2000., 6000.]
+        default = 8000.
+    condlist = [ze_bkg < edge for edge in edges]
+    return np.select(condlist, radii, default)
+
+
+def _peakedness(ze_bkg, peak_relation):
+    """
+    Vectorized peakedness as a function of the mean background reflectivity,
+    see :py:func:`_steiner_conv_strat`.
+    """
+    if peak_relation == 0:
+        low, high = 10., 0.
+    else:
+        low, high = 14., 4.
+    condlist = [ze_bkg < 0., ze_bkg < 42.43]
+    choicelist = [low, low - ze_bkg ** 2 / 180.]
+    return np.select(condlist, choicelist, high)
+
+
 def steiner_class_buff(ze, x, y, z, dx, dy, bkg_rad,
                        work_level, intense, peak_relation,
                        area_relation, use_intense):
@@ -208,9 +360,10 @@ def steiner_class_buff(ze, x, y, z, dx, dy, bkg_rad,
     area_rel = {"small": 0, "medium": 1, "large": 2, "sgp": 3}
     peak_rel = {"default": 0, "sgp": 1}
 
-    sclass = _steiner_conv_strat(refl, x, y, dx, dy, intense=intense,
-                                 peak_relation=peak_rel[peak_relation],
-                                 area_relation=area_rel[area_relation],
-                                 bkg_rad=11000, use_intense=True)
+    sclass = _steiner_conv_strat_vectorized(
+        refl, x, y, dx, dy, intense=intense,
+        peak_relation=peak_rel[peak_relation],
+        area_relation=area_rel[area_relation],
+        bkg_rad=11000, use_intense=True)
 
     return sclass
@@ -12,6 +12,7 @@ Functions for echo classification.
     get_freq_band
     _standardize
     _assign_to_class
+    _entropy_coeff
     _get_mass_centers
     _mass_centers_table
     _data_limits_table
@@ -125,7 +126,8 @@ def hydroclass_semisupervised(radar, mass_centers=None,
                               weights=np.array([1., 1., 1., 0.75, 0.5]),
                               refl_field=None, zdr_field=None, rhv_field=None,
                               kdp_field=None, temp_field=None,
-                              hydro_field=None):
+                              hydro_field=None, compute_entropy=False,
+                              entropy_field=None):
     """
     Classifies precipitation echoes following the approach by Besic et al
     (2016).
@@ -150,11 +152,23 @@ def hydroclass_semisupervised(radar, mass_centers=None,
         Output. Field name which represents the hydrometeor class field.
         A value of None will use the default field name as defined in the
         Py-ART configuration file.
+    compute_entropy : bool, optional
+        True to also compute the entropy of the class memberships of each
+        gate. Class memberships decay exponentially with the distance to
+        the centroids, the entropy is normalized to the [0, 1] interval with
+        low values indicating a confident classification.
+    entropy_field : str, optional
+        Output. Field name which represents the entropy field. A value of
+        None will use the default field name as defined in the Py-ART
+        configuration file.
 
     Returns
     -------
     hydro : dict
         Hydrometeor classification field.
+    entropy : dict
+        Entropy of the hydrometeor classification, only returned when
+        compute_entropy is True.
 
     References
     ----------
@@ -190,6 +204,8 @@ def hydroclass_semisupervised(radar, mass_centers=None,
         temp_field = get_field_name('temperature')
     if hydro_field is None:
         hydro_field = get_field_name('radar_echo_classification')
+    if entropy_field is None:
+        entropy_field = get_field_name('hydroclass_entropy')
 
     # extract fields and parameters from radar
     radar.check_field_exists(refl_field)
@@ -223,14 +239,18 @@ def hydroclass_semisupervised(radar, mass_centers=None,
     mc_std[:, 4] = _standardize(mass_centers[:, 4], 'relH')
 
     # assign to class
-    hydroclass_data, min_dist = _assign_to_class(
+    hydroclass_data, min_dist, entropy_data = _assign_to_class(
         refl_std, zdr_std, kdp_std, rhohv_std, relh_std, mc_std,
-        weights=weights)
+        weights=weights, compute_entropy=compute_entropy)
 
     # prepare output fields
     hydro = get_metadata(hydro_field)
     hydro['data'] = hydroclass_data
 
+    if compute_entropy:
+        entropy = get_metadata(entropy_field)
+        entropy['data'] = entropy_data
+        return hydro, entropy
     return hydro
 
 
@@ -282,11 +302,15 @@ def _standardize(data, field_name, mx=None, mn=None):
 
 
 def _assign_to_class(zh, zdr, kdp, rhohv, relh, mass_centers,
-                    weights=np.array([1., 1., 1., 0.75, 0.5])):
+                     weights=np.array([1., 1., 1., 0.75, 0.5]),
+                     compute_entropy=False, chunk_size=65536):
     """
     Assigns an hydrometeor class to a radar range bin computing
     the distance between the radar variables an a centroid.
 
+    Distances are computed on chunks of gates to limit the memory used
+    by the intermediate (nclasses, ngates) arrays.
+
     Parameters
     ----------
     zh, zdr, kdp, rhohv, relh : radar fields
@@ -295,6 +319,10 @@ def _assign_to_class(zh, zdr, kdp, rhohv, relh, mass_centers,
         Centroids normalized to [-1, 1] values.
     weights : array, optional
         The weight given to each variable.
+    compute_entropy : bool, optional
+        True to compute the entropy of the class memberships of each gate.
+    chunk_size : int, optional
+        Number of gates processed at once.
 
     Returns
     -------
@@ -302,43 +330,85 @@ def _assign_to_class(zh, zdr, kdp, rhohv, relh, mass_centers,
         The index corresponding to the assigned class.
     mind_dist : float array
         The minimum distance to the centroids.
+    entropy : float array or None
+        The normalized entropy of the class memberships, None when
+        compute_entropy is False.
 
     """
     # prepare data
-    nrays = zh.shape[0]
-    nbins = zdr.shape[1]
+    shape = zh.shape
+    ngates = zh.size
     nclasses = mass_centers.shape[0]
-    nvariables = mass_centers.shape[1]
-
-    data = np.ma.array([zh, zdr, kdp, rhohv, relh])
-    weights_mat = np.broadcast_to(
-        weights.reshape(nvariables, 1, 1),
-        (nvariables, nrays, nbins))
-    dist = np.ma.zeros((nclasses, nrays, nbins), dtype='float64')
-
-    # compute distance: masked entries will not contribute to the distance
-    for i in range(nclasses):
-        centroids_class = mass_centers[i, :]
-        centroids_class = np.broadcast_to(
-            centroids_class.reshape(nvariables, 1, 1),
-            (nvariables, nrays, nbins))
-        dist[i, :, :] = np.ma.sqrt(np.ma.sum(
-            ((centroids_class-data)**2.)*weights_mat, axis=0))
-
-    # use very large fill_value so that masked entries will be sorted at the
-    # end. There should not be any masked entry anyway
-    class_vec = dist.argsort(axis=0, fill_value=10e40)
-
-    # get minimum distance. Acts as a confidence value
-    dist_sorted = dist.sort(axis=0, fill_value=10e40)
-    min_dist = dist[0, :, :]
+    weights = np.asarray(weights, dtype='float64')
+
+    variables = [zh, zdr, kdp, rhohv, relh]
+    values = [np.ma.getdata(var).reshape(ngates) for var in variables]
+    valids = [~np.ma.getmaskarray(var).reshape(ngates) for var in variables]
+
+    hydroclass = np.empty(ngates, dtype=np.intp)
+    min_dist = np.empty(ngates, dtype='float64')
+    dist_mask = np.empty(ngates, dtype=bool)
+    if compute_entropy:
+        entropy = np.empty(ngates, dtype='float64')
+        coeff = _entropy_coeff(mass_centers, weights)
+
+    for start in range(0, ngates, chunk_size):
+        chunk = slice(start, start+chunk_size)
+        nchunk = len(range(*chunk.indices(ngates)))
+
+        # compute distance: masked entries will not contribute
+        dist = np.zeros((nclasses, nchunk), dtype='float64')
+        for j, (value, valid) in enumerate(zip(values, valids)):
+            value = value[chunk].astype('float64')
+            valid = valid[chunk]
+            dist += np.where(
+                valid,
+                ((mass_centers[:, j:j+1]-value)**2.)*weights[j], 0.)
+        np.sqrt(dist, out=dist)
+
+        class_chunk = np.argmin(dist, axis=0)
+        min_chunk = dist[class_chunk, np.arange(nchunk)]
+        hydroclass[chunk] = class_chunk
+        min_dist[chunk] = min_chunk
+        dist_mask[chunk] = ~np.logical_or.reduce(
+            [valid[chunk] for valid in valids])
+
+        if compute_entropy:
+            # class memberships proportional to exp(-coeff * distance)
+            dist -= min_chunk
+            dist *= -coeff
+            np.exp(dist, out=dist)
+            dist /= dist.sum(axis=0)
+            entropy[chunk] = -np.sum(
+                dist*np.log(np.maximum(dist, np.finfo('float64').tiny)),
+                axis=0)/np.log(nclasses)
 
     # Entries with non-valid reflectivity values are set to 0 (No class)
-    mask = np.ma.getmaskarray(zh)
-    hydroclass = class_vec[0, :, :]+1
-    hydroclass[mask] = 0
+    hydroclass += 1
+    hydroclass[~valids[0]] = 0
+    hydroclass = hydroclass.reshape(shape)
+    min_dist = np.ma.masked_where(dist_mask, min_dist).reshape(shape)
+    if not compute_entropy:
+        return hydroclass, min_dist, None
+    entropy = np.ma.masked_where(~valids[0], entropy).reshape(shape)
+    return hydroclass, min_dist, entropy
+
+
+def _entropy_coeff(mass_centers, weights):
+    """
+    Return the coefficient used to transform the distances to the
+    centroids into class memberships.
 
-    return hydroclass, min_dist
+    The coefficient is chosen such that a gate located on a centroid is
+    100 times more likely to belong to that class than to the class with the
+    closest centroid.
+
+    """
+    diff = mass_centers[:, np.newaxis, :]-mass_centers[np.newaxis, :, :]
+    centroid_dist = np.sqrt(np.sum(diff**2.*weights, axis=-1))
+    nclasses = mass_centers.shape[0]
+    min_centroid_dist = np.min(centroid_dist[~np.eye(nclasses, dtype=bool)])
+    return np.log(100.)/min_centroid_dist
 
 
 def _get_mass_centers(freq):
@@ -6,20 +6,19 @@ pyart.retrieve.gate_id
     :toctree: generated/
 
     map_profile_to_gates
+    map_profiles_to_gates
     fetch_radar_time_profile
 
 """
 
 try:
-    from netCDF4 import num2date, datetime
+    from netCDF4 import num2date
 except ImportError:
-    from cftime import num2date, datetime
+    from cftime import num2date
 
 import numpy as np
-from scipy import interpolate
 
-from ..config import get_fillvalue, get_metadata, get_field_name
-from ..core.transforms import antenna_to_cartesian
+from ..config import get_metadata, get_field_name
 
 
 def map_profile_to_gates(profile, heights, radar, toa=None,
@@ -51,47 +50,109 @@ def map_profile_to_gates(profile, heights, radar, toa=None,
         Field dictionaries containing the height of the gates and the profile
         interpolated onto the radar gates.
 
+    See Also
+    --------
+    map_profiles_to_gates : Map several profiles in a single pass.
+
     """
-    # retrieve the Z coordinates of the radar gates
-    rg, azg = np.meshgrid(radar.range['data'], radar.azimuth['data'])
-    rg, eleg = np.meshgrid(radar.range['data'], radar.elevation['data'])
-    _, _, z = antenna_to_cartesian(rg / 1000.0, azg, eleg)
-
-    # Check that z is not a MaskedArray
-    if isinstance(z, np.ma.MaskedArray):
-        z = z.filled(np.NaN)
-
-    # find toa is not provided
-    if toa is None:
-        ismasked = np.where(np.ma.getmaskarray(profile))[0]
-        if len(ismasked) == 0:
-            toa = None
-        else:
-            toa = ismasked.min()
+    if profile_field is None:
+        profile_field = get_field_name('interpolated_profile')
+    height_dict, profile_dicts = map_profiles_to_gates(
+        {profile_field: profile}, heights, radar, toa=toa,
+        height_field=height_field)
+    return height_dict, profile_dicts[profile_field]
 
-    # interpolate
-    f_interp = interpolate.interp1d(
-        heights[:toa], profile[:toa], bounds_error=False,
-        fill_value=get_fillvalue())
-    fld = np.ma.masked_equal(f_interp(z + radar.altitude['data'][0]),
-                             get_fillvalue())
 
-    # populate field dictionaries
+def map_profiles_to_gates(profiles, heights, radar, toa=None,
+                          height_field=None):
+    """
+    Map several profiles sharing a height axis to the gates of a radar.
+
+    The altitude of the radar gates is taken from the gate_altitude attribute
+    of the radar, which is calculated once, and the gates are located in the
+    height axis a single time. All profiles are then linearly interpolated
+    using the same indices and weights.
+
+    Parameters
+    ----------
+    profiles : dict
+        Profile arrays to map keyed by the name of the field to create. The
+        metadata of each field is taken from the Py-ART configuration file.
+    heights : array
+        Monotonically increasing heights in meters with the same shape as
+        each profile.
+    radar : Radar
+        Radar to map to.
+    toa : int, optional
+        Index of the top of the atmosphere, profiles are used up to but not
+        including this index. If None the first masked element of each
+        profile is used, if a profile has no mask the whole profile is used.
+    height_field : str, optional
+        Name to use for height field metadata. None will use the default field
+        name from the Py-ART configuration file.
+
+    Returns
+    -------
+    height_dict : dict
+        Field dictionary containing the height of the gates.
+    profile_dicts : dict
+        Field dictionaries containing the profiles interpolated onto the
+        radar gates keyed by the name of the fields.
+
+    """
+    heights = np.asarray(heights, dtype='float64')
+    z = np.ma.filled(radar.gate_altitude['data'], np.nan)
+    index, weight = _profile_index(heights, z)
+
+    profile_dicts = {}
+    for field, profile in profiles.items():
+        if len(profile) != len(heights):
+            raise ValueError(
+                'Profile ' + field + ' and heights differ in length')
+        if toa is None:
+            ismasked = np.where(np.ma.getmaskarray(profile))[0]
+            if len(ismasked) == 0:
+                nvalid = len(heights)
+            else:
+                nvalid = ismasked.min()
+        else:
+            nvalid = min(toa, len(heights))
+        values = np.ma.getdata(profile).astype('float64')
+        # repeat the top valid value so that gates at the top of the
+        # profile do not pick up values above it
+        values[nvalid:] = values[max(nvalid - 1, 0)]
+        data = values[index] * (1. - weight) + values[index + 1] * weight
+        if nvalid == 0:
+            outside = np.ones(z.shape, dtype=bool)
+        else:
+            outside = ~((z >= heights[0]) & (z <= heights[nvalid - 1]))
+        profile_dict = get_metadata(field)
+        profile_dict['data'] = np.ma.masked_array(data, mask=outside)
+        profile_dicts[field] = profile_dict
+
     if height_field is None:
         height_field = get_field_name('height')
     height_dict = get_metadata(height_field)
-    height_dict['data'] = z + radar.altitude['data'][0]
+    height_dict['data'] = radar.gate_altitude['data'].copy()
+    return height_dict, profile_dicts
 
-    if profile_field is None:
-        profile_field = get_field_name('interpolated_profile')
-    profile_dict = get_metadata(profile_field)
-    profile_dict['data'] = fld
 
-    return height_dict, profile_dict
+def _profile_index(heights, z):
+    """
+    Return the index of the height below each altitude and the weight of the
+    height above it for linear interpolation.
+    """
+    index = np.searchsorted(heights, z, side='right') - 1
+    np.clip(index, 0, len(heights) - 2, out=index)
+    lower = heights[index]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = (z - lower) / (heights[index + 1] - lower)
+    return index, weight
 
 
 def fetch_radar_time_profile(sonde_dset, radar, time_key='time',
-                             height_key='height', nvars=None):
+                             height_key='height', nvars=None,
+                             interpolate=False):
     """
     Extract the correct profile from a interpolated sonde.
 
@@ -112,6 +173,10 @@ def fetch_radar_time_profile(sonde_dset, radar, time_key='time',
     nvars : list, optional
         NetCDF variable to generated profiles for. If None (the default) all
         variables with dimension of time, height will be found in ncvars.
+    interpolate : bool, optional
+        True to linearly interpolate in time between the two profiles
+        bracketing the volume start time, False (the default) to return the
+        profile nearest in time.
 
     Returns
     -------
@@ -125,11 +190,31 @@ def fetch_radar_time_profile(sonde_dset, radar, time_key='time',
         nvars = [k for k, v in ncvars.items() if v.shape == time_height_shape]
 
     radar_start = num2date(radar.time['data'][0], radar.time['units'])
-    radar_day_start = datetime(radar_start.year, radar_start.month,
-                               radar_start.day)
-    seconds_since_start_of_day = (radar_start - radar_day_start).seconds
-    time_index = abs(ncvars[time_key][:] - seconds_since_start_of_day).argmin()
-
-    return_dic = dict([(key, ncvars[key][time_index, :]) for key in nvars])
+    seconds_since_start_of_day = (
+        radar_start.hour * 3600 + radar_start.minute * 60 +
+        radar_start.second)
+    sonde_times = ncvars[time_key][:]
+
+    if interpolate:
+        # bracketing profiles and the weight of the later one, the
+        # first or last profile is used outside of the sonde times and a
+        # single profile is returned as is
+        if len(sonde_times) == 1:
+            before = after = 0
+            weight = 0.
+        else:
+            after = np.searchsorted(sonde_times, seconds_since_start_of_day)
+            after = min(max(after, 1), len(sonde_times) - 1)
+            before = after - 1
+            weight = ((seconds_since_start_of_day - sonde_times[before]) /
+                      (sonde_times[after] - sonde_times[before]))
+            weight = min(max(weight, 0.), 1.)
+        return_dic = dict([
+            (key, ncvars[key][before, :] * (1. - weight) +
+             ncvars[key][after, :] * weight) for key in nvars])
+    else:
+        time_index = abs(sonde_times - seconds_since_start_of_day).argmin()
+        return_dic = dict(
+            [(key, ncvars[key][time_index, :]) for key in nvars])
     return_dic[height_key] = ncvars[height_key][:]
     return return_dic
@@ -8,12 +8,18 @@ Retrieval of QVPs from a radar object
     :toctree: generated/
 
     quasi_vertical_profile
+    QVPAccumulator
 
 """
 
+import os
+
 import numpy as np
+import netCDF4
 
+from ..config import get_fillvalue
 from ..core.transforms import antenna_to_cartesian
+from ..util.datetime_utils import EPOCH_UNITS, datetime_from_radar
 
 
 def quasi_vertical_profile(radar, desired_angle=None, fields=None, gatefilter=None):
@@ -71,10 +77,6 @@ def quasi_vertical_profile(radar, desired_angle=None, fields=None, gatefilter=No
     index = abs(radar.fixed_angle['data'] - desired_angle).argmin()
     radar_slice = radar.get_slice(index)
 
-    # Printing radar tilt angles and radar elevation
-    print(radar.fixed_angle['data'])
-    print(radar.elevation['data'][-1])
-
     # Setting field parameters
     # If fields is None then all radar fields pulled else defined field is used
     if fields is None:
@@ -113,3 +115,247 @@ def quasi_vertical_profile(radar, desired_angle=None, fields=None, gatefilter=No
                                    radar.fixed_angle['data'][index])
     qvp.update({'height': z})
     return qvp
+
+
+class QVPAccumulator(object):
+    """
+    A class for building quasi vertical profile time series from a stream
+    of radar volumes.
+
+    For each volume added the azimuthal means of several fields are
+    computed for the sweeps closest to several elevation angles and
+    interpolated onto a common height axis. Profiles are kept in memory or,
+    when a filename is given, appended to a chunked NetCDF file with an
+    unlimited time dimension so that an archive can grow without
+    reprocessing earlier volumes.
+
+    Parameters
+    ----------
+    fields : list of str
+        Radar fields for which profiles are computed.
+    angles : list of float
+        Elevation angles, in degrees, of the sweeps used for the profiles.
+    height : array, optional
+        Heights above the radar, in meters, of the common height axis. None
+        will result in np.arange(0, 10025, 25).
+    filename : str, optional
+        NetCDF file to which profiles are appended. When the file exists
+        profiles are appended to those already in the file, which must
+        have the same fields, angles and heights. None keeps the profiles
+        in memory.
+    max_angle_diff : float, optional
+        Maximum difference in degrees between the fixed angle of a sweep
+        and the requested angle. Profiles for angles without a matching
+        sweep are masked.
+    min_valid_fraction : float, optional
+        Minimum fraction of the rays of a sweep which must have valid data
+        at a gate for the mean at that gate to be valid.
+    time_chunk : int, optional
+        Number of volumes in each chunk of the NetCDF variables.
+
+    Examples
+    --------
+    >>> qvps = pyart.retrieve.QVPAccumulator(
+    ...     ['reflectivity', 'differential_reflectivity'], [10., 20.],
+    ...     filename='qvp_archive.nc')
+    >>> for filename in filenames:
+    ...     qvps.add(pyart.io.read(filename))
+    >>> profiles = qvps.profiles()
+
+    """
+
+    def __init__(self, fields, angles, height=None, filename=None,
+                 max_angle_diff=1.0, min_valid_fraction=0.,
+                 time_chunk=64):
+        """ initialize. """
+        if height is None:
+            height = np.arange(0, 10025, 25)
+        self.fields = list(fields)
+        self.angles = np.atleast_1d(np.asarray(angles, dtype='float64'))
+        self.height = np.asarray(height, dtype='float64')
+        self.filename = filename
+        self.max_angle_diff = max_angle_diff
+        self.min_valid_fraction = min_valid_fraction
+        self.time_chunk = time_chunk
+
+        self._times = []
+        self._fixed_angles = []
+        self._data = dict((field, []) for field in self.fields)
+        self._metadata = None
+        if filename is not None and os.path.exists(filename):
+            self._check_file()
+
+    def add(self, radar, gatefilter=None):
+        """
+        Add the profiles from a radar volume.
+
+        Parameters
+        ----------
+        radar : Radar
+            Radar volume containing the fields. Volumes are expected to be
+            added in time order.
+        gatefilter : GateFilter, optional
+            A GateFilter indicating radar gates that should be excluded
+            from the azimuthal means.
+
+        """
+        for field in self.fields:
+            radar.check_field_exists(field)
+        time = netCDF4.date2num(datetime_from_radar(radar), EPOCH_UNITS)
+
+        nfields = len(self.fields)
+        nangles = len(self.angles)
+        profiles = np.full((nfields, nangles, len(self.height)), np.nan)
+        fixed_angles = np.full(nangles, np.nan)
+        for i, angle in enumerate(self.angles):
+            angle_diff = np.abs(radar.fixed_angle['data'] - angle)
+            sweep = np.argmin(angle_diff)
+            if angle_diff[sweep] > self.max_angle_diff:
+                continue
+            fixed_angles[i] = radar.fixed_angle['data'][sweep]
+            profiles[:, i] = self._sweep_profiles(radar, sweep, gatefilter)
+
+        if self._metadata is None:
+            self._metadata = dict(
+                (field, _field_attributes(radar.fields[field]))
+                for field in self.fields)
+        if self.filename is None:
+            self._times.append(time)
+            self._fixed_angles.append(fixed_angles)
+            for field, profile in zip(self.fields, profiles):
+                self._data[field].append(profile)
+        else:
+            self._append_to_file(time, fixed_angles, profiles)
+
+    def profiles(self):
+        """
+        Return the accumulated profiles.
+
+        Returns
+        -------
+        qvp : dict
+            Dictionary with the 'time' (seconds since the Unix epoch),
+            'height', 'angles' and 'fixed_angle' (the angles of the sweeps
+            used, with shape (ntimes, nangles)) keys and a masked array with
+            shape (ntimes, nangles, nheights) for each field.
+
+        """
+        qvp = {'height': self.height, 'angles': self.angles}
+        if self.filename is None:
+            ntimes = len(self._times)
+            shape = (ntimes, len(self.angles), len(self.height))
+            qvp['time'] = np.array(self._times, dtype='float64')
+            qvp['fixed_angle'] = np.array(
+                self._fixed_angles).reshape(shape[:2])
+            for field in self.fields:
+                data = np.array(self._data[field]).reshape(shape)
+                qvp[field] = np.ma.masked_invalid(data)
+            return qvp
+
+        with netCDF4.Dataset(self.filename, 'r') as dset:
+            qvp['time'] = dset.variables['time'][:].filled(np.nan)
+            qvp['fixed_angle'] = dset.variables['fixed_angle'][:]
+            for field in self.fields:
+                qvp[field] = np.ma.masked_invalid(
+                    dset.variables[field][:].astype('float64'))
+        return qvp
+
+    def _sweep_profiles(self, radar, sweep, gatefilter):
+        """
+        Azimuthal means of all fields in a sweep interpolated onto the
+        height axis, shape (nfields, nheights).
+        """
+        sweep_slice = radar.get_slice(sweep)
+        data = np.ma.array([radar.fields[field]['data'][sweep_slice]
+                            for field in self.fields], dtype='float64')
+        valid = ~np.ma.getmaskarray(data)
+        if gatefilter is not None:
+            valid &= ~gatefilter.gate_excluded[sweep_slice]
+        values = np.ma.getdata(data)
+        valid &= np.isfinite(values)
+
+        count = valid.sum(axis=1)
+        total = np.where(valid, values, 0.).sum(axis=1)
+        min_count = max(1, self.min_valid_fraction * valid.shape[1])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(count >= min_count, total / count, np.nan)
+
+        _, _, gate_height = antenna_to_cartesian(
+            radar.range['data'] / 1000.0, 0.0,
+            radar.fixed_angle['data'][sweep])
+        order = np.argsort(gate_height)
+        gate_height = gate_height[order]
+        return np.array([
+            np.interp(self.height, gate_height, mean[order],
+                      left=np.nan, right=np.nan) for mean in means])
+
+    def _check_file(self):
+        """ Check that an existing file matches the accumulator. """
+        with netCDF4.Dataset(self.filename, 'r') as dset:
+            match = (
+                np.array_equal(dset.variables['height'][:], self.height) and
+                np.array_equal(dset.variables['angles'][:], self.angles) and
+                all(field in dset.variables for field in self.fields))
+        if not match:
+            raise ValueError(
+                'Existing file ' + self.filename + ' has different '
+                'fields, angles or heights')
+
+    def _append_to_file(self, time, fixed_angles, profiles):
+        """ Append the profiles of a volume to the NetCDF file. """
+        if not os.path.exists(self.filename):
+            self._create_file()
+        with netCDF4.Dataset(self.filename, 'a') as dset:
+            ntimes = len(dset.dimensions['time'])
+            dset.variables['time'][ntimes] = time
+            dset.variables['fixed_angle'][ntimes] = np.ma.masked_invalid(
+                fixed_angles)
+            for field, profile in zip(self.fields, profiles):
+                dset.variables[field][ntimes] = np.ma.masked_invalid(profile)
+
+    def _create_file(self):
+        """ Create the NetCDF file with an unlimited time dimension. """
+        fill_value = get_fillvalue()
+        nangles = len(self.angles)
+        nheights = len(self.height)
+        with netCDF4.Dataset(self.filename, 'w') as dset:
+            dset.Conventions = 'CF-1.6'
+            dset.title = 'Quasi vertical profiles'
+            dset.createDimension('time', None)
+            dset.createDimension('angle', nangles)
+            dset.createDimension('height', nheights)
+
+            time = dset.createVariable('time', 'f8', ('time', ))
+            time.units = EPOCH_UNITS
+            time.standard_name = 'time'
+            height = dset.createVariable('height', 'f8', ('height', ))
+            height.units = 'meters'
+            height.long_name = 'Height above the radar'
+            height[:] = self.height
+            angles = dset.createVariable('angles', 'f8', ('angle', ))
+            angles.units = 'degrees'
+            angles.long_name = 'Requested elevation angle'
+            angles[:] = self.angles
+            fixed_angle = dset.createVariable(
+                'fixed_angle', 'f8', ('time', 'angle'),
+                fill_value=fill_value)
+            fixed_angle.units = 'degrees'
+            fixed_angle.long_name = 'Fixed angle of the sweep used'
+
+            chunksizes = (self.time_chunk, nangles, nheights)
+            for field in self.fields:
+                var = dset.createVariable(
+                    field, 'f4', ('time', 'angle', 'height'), zlib=True,
+                    chunksizes=chunksizes, fill_value=fill_value)
+                metadata = self._metadata[field]
+                for key in sorted(metadata):
+                    var.setncattr(key, metadata[key])
+
+
+def _field_attributes(field_dic):
+    """ Return the NetCDF attributes from a radar field dictionary. """
+    attributes = {}
+    for key in ['units', 'standard_name', 'long_name']:
+        if key in field_dic:
+            attributes[key] = field_dic[key]
+    return attributes
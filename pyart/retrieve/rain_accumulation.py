@@ -0,0 +1,370 @@
+"""
+pyart.retrieve.rain_accumulation
+================================
+
+Streaming accumulation of rainfall from a time ordered sequence of rain
+rate estimates.
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    RainAccumulator
+
+.. autosummary::
+    :toctree: generated/
+
+    _advected_rate
+
+"""
+
+import json
+
+import numpy as np
+from scipy.ndimage import shift
+from netCDF4 import date2num
+
+from ..config import get_field_name, get_metadata
+from ..core.grid import Grid
+from ..core.radar import Radar
+from ..util.datetime_utils import EPOCH_UNITS
+from ..util.datetime_utils import datetime_from_grid, datetime_from_radar
+from .advection import grid_displacement_pc
+
+
+class RainAccumulator(object):
+    """
+    A class for accumulating rainfall from a time ordered stream of radar
+    volumes or grids.
+
+    Rain rates from consecutive scans are advected towards each other using
+    the displacement found by :py:func:`grid_displacement_pc` and integrated
+    in time into running float32 buffers, one for each accumulation period.
+    Accumulation periods are aligned to multiples of their length since the
+    Unix epoch, i.e. hourly totals end on the hour and daily totals at
+    midnight UTC. The memory used does not depend on the number of scans.
+
+    Parameters
+    ----------
+    periods : list of int, optional
+        Length of the accumulation periods in seconds. The default produces
+        1 hour, 3 hour and 24 hour totals.
+    rr_field : str, optional
+        Field containing the rain rate in mm/h. None will use the default
+        field name from the Py-ART configuration file.
+    accu_field : str, optional
+        Name of the rainfall accumulation field in the grids returned. None
+        will use the default field name from the Py-ART configuration file.
+    level : int, optional
+        Vertical level of the grids from which the rain rates are taken.
+    advection : bool, optional
+        True to advect the rain rates between scans, False to interpolate
+        linearly in time at fixed locations.
+    max_time_gap : float, optional
+        Maximum time in seconds between consecutive scans over which rain is
+        integrated. Rain is not accumulated across longer gaps.
+    max_substeps : int, optional
+        Maximum number of time steps used to integrate between two scans.
+        Without this limit a step is taken for each pixel of displacement.
+    grid_kwargs : dict, optional
+        Keyword arguments passed to :py:func:`pyart.map.grid_from_radars`
+        when mapping radar volumes to the accumulation grid. Must include
+        grid_shape and grid_limits when Radar objects are accumulated and
+        be serializable as JSON for the state to be saved to a checkpoint.
+
+    Attributes
+    ----------
+    last_time : float or None
+        Time of the last scan in seconds since the Unix epoch.
+
+    Examples
+    --------
+    >>> accumulator = pyart.retrieve.RainAccumulator(
+    ...     grid_kwargs={'grid_shape': (1, 241, 241),
+    ...                  'grid_limits': ((1000, 1000), (-120000, 120000),
+    ...                                  (-120000, 120000))})
+    >>> for filename in filenames:
+    ...     radar = pyart.io.read(filename)
+    ...     radar.add_field('radar_estimated_rain_rate',
+    ...                     pyart.retrieve.est_rain_rate_z(radar))
+    ...     for total in accumulator.add(radar):
+    ...         pyart.io.write_grid(make_name(total), total)
+    >>> accumulator.save_checkpoint('accumulator.npz')
+
+    """
+
+    def __init__(self, periods=(3600, 10800, 86400), rr_field=None,
+                 accu_field=None, level=0, advection=True,
+                 max_time_gap=1800., max_substeps=60, grid_kwargs=None):
+        """ initialize. """
+        if rr_field is None:
+            rr_field = get_field_name('radar_estimated_rain_rate')
+        if accu_field is None:
+            accu_field = get_field_name('rainfall_accumulation')
+        periods = [int(period) for period in periods]
+        if len(periods) == 0 or min(periods) <= 0:
+            raise ValueError('periods must be positive')
+        self.periods = periods
+        self.rr_field = rr_field
+        self.accu_field = accu_field
+        self.level = level
+        self.advection = advection
+        self.max_time_gap = max_time_gap
+        self.max_substeps = max_substeps
+        self.grid_kwargs = grid_kwargs
+
+        self.last_time = None
+        self._last_rate = None
+        self._geometry = None
+        self._totals = None
+        self._period_end = None
+        self._integrated = None
+
+    def add(self, obj):
+        """
+        Add a scan to the accumulation.
+
+        Parameters
+        ----------
+        obj : Radar or Grid
+            Radar volume or grid containing the rain rate field. Scans must
+            be provided in time order. Radar volumes are mapped to a
+            Cartesian grid using the grid_kwargs parameters. Gates without
+            a rain rate estimate are treated as having no rain.
+
+        Returns
+        -------
+        totals : list of Grid
+            Accumulations for the periods which were completed by this scan,
+            in order of their end time. The rainfall accumulation field
+            contains the 'accumulation_period' and 'integration_time', the
+            number of seconds of the period over which rain was integrated,
+            keys.
+
+        """
+        grid, time = self._as_grid(obj)
+        rate = grid.fields[self.rr_field]['data'][self.level]
+        rate = np.ma.filled(rate, 0).astype('float32')
+        rate[rate < 0] = 0
+
+        if self._geometry is None:
+            self._init_state(grid, rate.shape)
+        elif rate.shape != self._last_rate.shape:
+            raise ValueError('Scan does not match the accumulation grid')
+
+        completed = []
+        if self.last_time is not None:
+            if time < self.last_time:
+                raise ValueError('Scans must be added in time order')
+            if time - self.last_time <= self.max_time_gap:
+                completed = self._integrate(self.last_time, time, rate)
+        completed += self._close_periods(time)
+
+        self.last_time = time
+        self._last_rate = rate
+        return completed
+
+    def save_checkpoint(self, filename):
+        """
+        Save the state of the accumulator to a NumPy .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file to write.
+
+        """
+        config = {
+            'periods': self.periods,
+            'rr_field': self.rr_field,
+            'accu_field': self.accu_field,
+            'level': self.level,
+            'advection': self.advection,
+            'max_time_gap': self.max_time_gap,
+            'max_substeps': self.max_substeps,
+            'grid_kwargs': self.grid_kwargs,
+            'last_time': self.last_time,
+        }
+        arrays = {}
+        if self._geometry is not None:
+            geometry = dict(self._geometry)
+            for key in ['x', 'y', 'z']:
+                arrays[key] = geometry.pop(key)
+            config['geometry'] = geometry
+            config['period_end'] = self._period_end
+            config['integrated'] = self._integrated
+            arrays['last_rate'] = self._last_rate
+            arrays['totals'] = self._totals
+        np.savez(filename, config=json.dumps(config), **arrays)
+
+    @classmethod
+    def load_checkpoint(cls, filename):
+        """
+        Restore an accumulator from a file created by save_checkpoint.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the checkpoint file.
+
+        Returns
+        -------
+        accumulator : RainAccumulator
+            Accumulator in the state it was when the checkpoint was saved.
+
+        """
+        with np.load(filename) as checkpoint:
+            config = json.loads(str(checkpoint['config']))
+            accumulator = cls(
+                periods=config['periods'], rr_field=config['rr_field'],
+                accu_field=config['accu_field'], level=config['level'],
+                advection=config['advection'],
+                max_time_gap=config['max_time_gap'],
+                max_substeps=config['max_substeps'],
+                grid_kwargs=config['grid_kwargs'])
+            accumulator.last_time = config['last_time']
+            if 'geometry' in config:
+                geometry = config['geometry']
+                for key in ['x', 'y', 'z']:
+                    geometry[key] = checkpoint[key]
+                accumulator._geometry = geometry
+                accumulator._period_end = config['period_end']
+                accumulator._integrated = config['integrated']
+                accumulator._last_rate = checkpoint['last_rate']
+                accumulator._totals = checkpoint['totals']
+        return accumulator
+
+    def _as_grid(self, obj):
+        """ Return the scan as a Grid and its time in epoch seconds. """
+        if isinstance(obj, Radar):
+            if self.grid_kwargs is None:
+                raise ValueError(
+                    'grid_kwargs must be provided to accumulate radars')
+            from ..map import grid_from_radars
+            time = date2num(datetime_from_radar(obj), EPOCH_UNITS)
+            kwargs = dict(self.grid_kwargs)
+            kwargs['fields'] = [self.rr_field]
+            obj = grid_from_radars((obj, ), **kwargs)
+        else:
+            time = date2num(datetime_from_grid(obj), EPOCH_UNITS)
+        if self.rr_field not in obj.fields:
+            raise KeyError('Field not available: ' + self.rr_field)
+        return obj, float(time)
+
+    def _init_state(self, grid, shape):
+        """ Initialize the buffers using the geometry of a grid. """
+        def _value(attr):
+            return float(np.asarray(attr['data']).ravel()[0])
+
+        self._geometry = {
+            'x': np.array(grid.x['data']),
+            'y': np.array(grid.y['data']),
+            'z': np.array(grid.z['data'][self.level:self.level+1]),
+            'origin_latitude': _value(grid.origin_latitude),
+            'origin_longitude': _value(grid.origin_longitude),
+            'origin_altitude': _value(grid.origin_altitude),
+            'projection': dict(grid.projection),
+        }
+        nperiods = len(self.periods)
+        self._totals = np.zeros((nperiods, ) + shape, dtype='float32')
+        self._period_end = [None] * nperiods
+        self._integrated = [0.] * nperiods
+        self._last_rate = np.zeros(shape, dtype='float32')
+
+    def _integrate(self, start, end, rate):
+        """
+        Integrate the rain between the previous scan and rate, splitting
+        the time steps at the end of the accumulation periods.
+        """
+        motion = np.zeros(2)
+        if self.advection and self._last_rate.any() and rate.any():
+            motion = -np.array(grid_displacement_pc(
+                self._single_level_grid(self._last_rate, start, self.rr_field),
+                self._single_level_grid(rate, end, self.rr_field),
+                self.rr_field, 0), dtype='float64')
+        nsteps = int(np.ceil(np.max(np.abs(motion))))
+        nsteps = min(max(nsteps, 1), self.max_substeps)
+
+        edges = [np.linspace(start, end, nsteps + 1)]
+        for period in self.periods:
+            first = np.floor(start / period) * period + period
+            edges.append(np.arange(first, end, period))
+        edges = np.unique(np.concatenate(edges))
+
+        completed = []
+        for step_start, step_end in zip(edges[:-1], edges[1:]):
+            completed += self._close_periods(step_start)
+            frac = (0.5 * (step_start + step_end) - start) / (end - start)
+            if self.advection:
+                step_rate = _advected_rate(
+                    self._last_rate, rate, motion, frac)
+            else:
+                step_rate = (1. - frac) * self._last_rate + frac * rate
+            step_accu = step_rate * np.float32((step_end - step_start) / 3600.)
+            self._totals += step_accu
+            for i in range(len(self.periods)):
+                self._integrated[i] += step_end - step_start
+        return completed
+
+    def _close_periods(self, time):
+        """ Return the totals for the periods which end at or before time. """
+        completed = []
+        for i, period in enumerate(self.periods):
+            if self._period_end[i] is None:
+                self._period_end[i] = (np.floor(time / period) + 1) * period
+                continue
+            if time < self._period_end[i]:
+                continue
+            completed.append((self._period_end[i], i))
+            self._period_end[i] = (np.floor(time / period) + 1) * period
+        completed.sort()
+        totals = [self._accumulation_grid(i, end) for end, i in completed]
+        for end, i in completed:
+            self._totals[i] = 0
+            self._integrated[i] = 0.
+        return totals
+
+    def _accumulation_grid(self, i, end):
+        """ Return a Grid containing the total of period i. """
+        accu = get_metadata(self.accu_field)
+        accu['data'] = np.ma.masked_array(self._totals[i][np.newaxis].copy())
+        accu['accumulation_period'] = self.periods[i]
+        accu['integration_time'] = self._integrated[i]
+        return self._single_level_grid(accu, end, self.accu_field)
+
+    def _single_level_grid(self, data, time, field):
+        """ Return a Grid with a single level containing field. """
+        if not isinstance(data, dict):
+            data = {'data': data[np.newaxis]}
+        geometry = self._geometry
+        grid_time = get_metadata('grid_time')
+        grid_time['data'] = np.array([time], dtype='float64')
+        grid_time['units'] = EPOCH_UNITS
+        origin_latitude = get_metadata('origin_latitude')
+        origin_latitude['data'] = np.array([geometry['origin_latitude']])
+        origin_longitude = get_metadata('origin_longitude')
+        origin_longitude['data'] = np.array([geometry['origin_longitude']])
+        origin_altitude = get_metadata('origin_altitude')
+        origin_altitude['data'] = np.array([geometry['origin_altitude']])
+        x = get_metadata('x')
+        x['data'] = geometry['x']
+        y = get_metadata('y')
+        y['data'] = geometry['y']
+        z = get_metadata('z')
+        z['data'] = geometry['z']
+        return Grid(grid_time, {field: data}, {}, origin_latitude,
+                    origin_longitude, origin_altitude, x, y, z,
+                    projection=dict(geometry['projection']))
+
+
+def _advected_rate(rate1, rate2, motion, frac):
+    """
+    Rain rate at a fraction of the time between two scans.
+
+    The rates from both scans are moved along the motion vector, in pixels
+    from the first to the second scan, to their position at that time and
+    weighted linearly in time.
+    """
+    rate1 = shift(rate1, motion * frac, order=1, prefilter=False)
+    rate2 = shift(rate2, -motion * (1. - frac), order=1, prefilter=False)
+    return np.float32(1. - frac) * rate1 + np.float32(frac) * rate2
@@ -12,3 +12,81 @@ def test_steiner_conv_strat():
     assert np.all(eclass['data'][25] == np.array(
         [0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
          2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0]))
+
+
+def make_hydroclass_radar():
+    """ Create a radar with the fields needed for the classification. """
+    radar = pyart.testing.make_empty_ppi_radar(10, 4, 1)
+    mass_centers = pyart.retrieve.echo_class._mass_centers_table()['C']
+    # one ray per class, using the class centroids as the observations
+    for i, field in enumerate(['reflectivity', 'differential_reflectivity',
+                               'specific_differential_phase',
+                               'cross_correlation_ratio']):
+        data = np.ma.empty((4, 10), dtype='float32')
+        data[:] = mass_centers[:4, i].reshape(4, 1)
+        radar.add_field(field, {'data': data})
+    temp = np.empty((4, 10), dtype='float32')
+    temp[:] = (mass_centers[:4, 4] * -6.5 / 1000.).reshape(4, 1)
+    radar.add_field('temperature', {'data': temp})
+    radar.fields['reflectivity']['data'][0, 0] = np.ma.masked
+    radar.fields['differential_reflectivity']['data'][1, 0] = np.ma.masked
+    return radar, mass_centers
+
+
+def test_hydroclass_semisupervised():
+    radar, mass_centers = make_hydroclass_radar()
+    hydro = pyart.retrieve.hydroclass_semisupervised(
+        radar, mass_centers=mass_centers, temp_field='temperature')
+    assert hydro['data'].shape == (4, 10)
+    assert hydro['data'][0, 0] == 0
+    assert np.all(hydro['data'][0, 1:] == 1)
+    assert np.all(hydro['data'][1:, 1:] == np.array([2, 3, 4])[:, None])
+
+
+def test_hydroclass_semisupervised_entropy():
+    radar, mass_centers = make_hydroclass_radar()
+    hydro, entropy = pyart.retrieve.hydroclass_semisupervised(
+        radar, mass_centers=mass_centers, temp_field='temperature',
+        compute_entropy=True)
+    assert entropy['data'].shape == (4, 10)
+    assert entropy['data'].mask[0, 0]
+    assert np.all(entropy['data'][:, 1:] >= 0.)
+    assert np.all(entropy['data'][:, 1:] <= 1.)
+    # gates on a centroid are confidently classified
+    assert np.all(entropy['data'][:, 1:] < 0.25)
+
+
+def test_assign_to_class_chunks():
+    np.random.seed(0)
+    fields = [np.ma.masked_array(np.random.uniform(-1, 1, (20, 30)),
+                                 np.random.rand(20, 30) < 0.2)
+              for i in range(5)]
+    mass_centers = np.random.uniform(-1, 1, (9, 5))
+    assign = pyart.retrieve.echo_class._assign_to_class
+    hydro1, dist1, entropy1 = assign(*fields, mass_centers=mass_centers,
+                                     compute_entropy=True)
+    hydro2, dist2, entropy2 = assign(*fields, mass_centers=mass_centers,
+                                     compute_entropy=True, chunk_size=7)
+    assert np.all(hydro1 == hydro2)
+    assert np.ma.allclose(dist1, dist2)
+    assert np.ma.allclose(entropy1, entropy2)
+    assert np.all(hydro1[fields[0].mask] == 0)
+    assert np.all(hydro1[~fields[0].mask] > 0)
+
+
+@pytest.mark.parametrize('area_relation', [0, 1, 2, 3])
+@pytest.mark.parametrize('peak_relation', [0, 1])
+def test_steiner_conv_strat_vectorized(area_relation, peak_relation):
+    np.random.seed(0)
+    x = np.arange(30) * 1500.
+    y = np.arange(25) * 1500.
+    refl = np.random.uniform(-10, 60, (25, 30))
+    refl[np.random.rand(25, 30) < 0.1] = np.nan
+    _echo_class = pyart.retrieve._echo_class
+    kwargs = {'area_relation': area_relation,
+              'peak_relation': peak_relation}
+    sclass_loop = _echo_class._steiner_conv_strat(
+        refl, x, y, 1500., 1500., **kwargs)
+    sclass = _echo_class._steiner_conv_strat_vectorized(
+        refl, x, y, 1500., 1500., **kwargs)
+    assert np.all(sclass == sclass_loop)
@@ -2,6 +2,8 @@
 
 import numpy as np
 import netCDF4
+from numpy.testing import assert_allclose
+import pytest
 
 import pyart
 
@@ -27,3 +29,87 @@ def test_fetch_radar_time_profile():
     assert 'wspd' in dic
     assert 'height' in dic
     assert round(dic['wdir'][0]) == 185
+
+
+def test_map_profile_to_gates_interpolation():
+    test_radar = pyart.testing.make_empty_ppi_radar(100, 36, 3)
+    test_radar.range['data'] = np.arange(100, dtype='float32') * 500.
+    test_radar.init_gate_x_y_z()
+    test_radar.init_gate_altitude()
+    heights = np.linspace(0, 20000, 41)
+    temperature = np.ma.array(20. - 0.0065 * heights)
+    temperature[30:] = np.ma.masked
+
+    height_dict, temp_dict = pyart.retrieve.map_profile_to_gates(
+        temperature, heights, test_radar, profile_field='temperature')
+    altitude = test_radar.gate_altitude['data']
+    assert_allclose(height_dict['data'], altitude)
+    assert not np.shares_memory(height_dict['data'], altitude)
+    expected = 20. - 0.0065 * altitude
+    below_toa = altitude <= heights[29]
+    assert_allclose(temp_dict['data'][below_toa], expected[below_toa])
+    assert np.all(temp_dict['data'].mask == ~below_toa)
+
+
+def test_map_profiles_to_gates():
+    test_radar = pyart.testing.make_empty_ppi_radar(100, 36, 3)
+    test_radar.range['data'] = np.arange(100, dtype='float32') * 500.
+    test_radar.init_gate_x_y_z()
+    test_radar.init_gate_altitude()
+    heights = np.linspace(0, 10000, 21)
+    profiles = {
+        'temperature': 20. - 0.0065 * heights,
+        'relative_humidity': np.linspace(90, 10, 21),
+    }
+    height_dict, profile_dicts = pyart.retrieve.map_profiles_to_gates(
+        profiles, heights, test_radar, toa=15)
+    altitude = height_dict['data']
+    for field, profile in profiles.items():
+        expected = np.interp(altitude, heights[:15], profile[:15])
+        data = profile_dicts[field]['data']
+        assert data.shape == (108, 100)
+        valid = altitude <= heights[14]
+        assert_allclose(data[valid], expected[valid])
+        assert np.all(data.mask == ~valid)
+
+    # the height field does not share memory with the radar
+    height_dict['data'][:] = 0.
+    assert np.all(test_radar.gate_altitude['data'][:, 1:] > 0.)
+
+    pytest.raises(ValueError, pyart.retrieve.map_profiles_to_gates,
+                  {'temperature': np.ones(5)}, heights, test_radar)
+
+
+def test_fetch_radar_time_profile_interpolate():
+    test_radar = pyart.testing.make_empty_ppi_radar(100, 360, 5)
+    test_radar.time['units'] = 'seconds since 2011-05-10T00:00:00Z'
+    # midway between the sonde times at indices 2 and 3, 41220 and 41280 s
+    test_radar.time['data'][0] = 41250.
+
+    sonde_dset = netCDF4.Dataset(pyart.testing.INTERP_SOUNDE_FILE)
+    dic = pyart.retrieve.fetch_radar_time_profile(
+        sonde_dset, test_radar, nvars=['wspd'], interpolate=True)
+    wspd = sonde_dset.variables['wspd']
+    assert_allclose(dic['wspd'], 0.5 * (wspd[2] + wspd[3]), rtol=1e-6)
+    sonde_dset.close()
+
+
+@pytest.mark.parametrize('radar_time', [41100., 41250.])
+def test_fetch_radar_time_profile_interpolate_single_time(radar_time):
+    # the single profile is returned at and after the sonde time
+    test_radar = pyart.testing.make_empty_ppi_radar(100, 360, 5)
+    test_radar.time['units'] = 'seconds since 2011-05-10T00:00:00Z'
+    test_radar.time['data'][0] = radar_time
+
+    sonde_dset = netCDF4.Dataset('sonde.nc', 'w', diskless=True)
+    sonde_dset.createDimension('time', 1)
+    sonde_dset.createDimension('height', 3)
+    sonde_dset.createVariable('time', 'f8', ('time', ))[:] = [41100.]
+    sonde_dset.createVariable('height', 'f4', ('height', ))[:] = [0, 1, 2]
+    wspd = sonde_dset.createVariable('wspd', 'f4', ('time', 'height'))
+    wspd[:] = [[1., 2., 3.]]
+    dic = pyart.retrieve.fetch_radar_time_profile(
+        sonde_dset, test_radar, nvars=['wspd'], interpolate=True)
+    assert not np.any(np.ma.getmaskarray(dic['wspd']))
+    assert_allclose(dic['wspd'], [1., 2., 3.])
+    sonde_dset.close()
@@ -1,8 +1,11 @@
 """ Unit Tests for Py-ART's retrieve/qvp.py module. """
 
+import netCDF4
 import numpy as np
 from numpy.testing import assert_almost_equal
 
+import pytest
+
 import pyart
 
 
@@ -38,3 +41,84 @@ def test_quasi_vertical_profile():
     assert_almost_equal(qvp['height'], qvp_height, 3)
     assert_almost_equal(qvp['range'], qvp_range, 3)
     assert_almost_equal(qvp['reflectivity'], qvp_reflectivity, 3)
+
+
+def make_qvp_radar(time_offset=0.):
+    """ Create a two sweep radar with azimuthally varying fields. """
+    radar = pyart.testing.make_empty_ppi_radar(100, 36, 2)
+    radar.fixed_angle['data'] = np.array([10., 20.], dtype='float32')
+    radar.range['data'] = np.arange(100, dtype='float32') * 100.
+    radar.time['data'] += time_offset
+    azimuth = np.deg2rad(np.tile(np.arange(0, 360, 10), 2))[:, np.newaxis]
+    reflectivity = np.ma.array(
+        20. + 5. * np.cos(azimuth) + np.zeros((1, 100)))
+    reflectivity[36:] += 10.
+    reflectivity[:, 90:] = np.ma.masked
+    radar.add_field('reflectivity', {'data': reflectivity, 'units': 'dBZ'})
+    radar.add_field('velocity', {'data': np.ma.ones((72, 100))})
+    return radar
+
+
+def test_qvp_accumulator():
+    height = np.arange(0, 3000, 100.)
+    qvps = pyart.retrieve.QVPAccumulator(
+        ['reflectivity', 'velocity'], [10., 20., 45.], height=height)
+    qvps.add(make_qvp_radar())
+    qvps.add(make_qvp_radar(600.))
+    qvp = qvps.profiles()
+
+    assert qvp['reflectivity'].shape == (2, 3, 30)
+    assert_almost_equal(qvp['time'][1] - qvp['time'][0], 600.)
+    assert_almost_equal(qvp['fixed_angle'][0], [10., 20., np.nan])
+    assert_almost_equal(qvp['reflectivity'][0, 0, 0], 20.)
+    assert_almost_equal(qvp['reflectivity'][0, 1, 10], 30.)
+    assert_almost_equal(qvp['velocity'][1, 1, 5], 1.)
+    # no sweep close to 45 degrees
+    assert qvp['reflectivity'][:, 2].mask.all()
+    # heights above the highest unmasked gate are masked
+    assert qvp['reflectivity'].mask[0, 0, -1]
+    assert not qvp['velocity'].mask[0, 0, 15]
+
+
+def test_qvp_accumulator_gatefilter():
+    radar = make_qvp_radar()
+    gatefilter = pyart.correct.GateFilter(radar)
+    # exclude the rays with the largest reflectivity
+    gatefilter.exclude_above('reflectivity', 24.)
+    qvps = pyart.retrieve.QVPAccumulator(
+        ['reflectivity'], [10.], height=[0., 500.])
+    qvps.add(radar, gatefilter=gatefilter)
+    expected = radar.fields['reflectivity']['data'][:36, 0]
+    expected = expected[expected <= 24.].mean()
+    assert_almost_equal(qvps.profiles()['reflectivity'][0, 0, 0], expected)
+
+
+def test_qvp_accumulator_netcdf(tmpdir):
+    filename = str(tmpdir.join('qvp.nc'))
+    height = np.arange(0, 3000, 100.)
+    fields = ['reflectivity', 'velocity']
+    memory = pyart.retrieve.QVPAccumulator(fields, [10., 20.], height=height)
+    qvps = pyart.retrieve.QVPAccumulator(
+        fields, [10., 20.], height=height, filename=filename)
+    for time_offset in [0., 300.]:
+        memory.add(make_qvp_radar(time_offset))
+        qvps.add(make_qvp_radar(time_offset))
+
+    # reopening the file appends to the existing profiles
+    qvps = pyart.retrieve.QVPAccumulator(
+        fields, [10., 20.], height=height, filename=filename)
+    qvps.add(make_qvp_radar(600.))
+    memory.add(make_qvp_radar(600.))
+    qvp = qvps.profiles()
+    reference = memory.profiles()
+    assert qvp['reflectivity'].shape == (3, 2, 30)
+    assert_almost_equal(qvp['time'], reference['time'])
+    assert_almost_equal(qvp['reflectivity'], reference['reflectivity'], 5)
+    assert (qvp['velocity'].mask == reference['velocity'].mask).all()
+
+    with netCDF4.Dataset(filename) as dset:
+        assert dset.dimensions['time'].isunlimited()
+        assert dset.variables['reflectivity'].units == 'dBZ'
+
+    pytest.raises(ValueError, pyart.retrieve.QVPAccumulator,
+                  fields, [10.], height=height, filename=filename)
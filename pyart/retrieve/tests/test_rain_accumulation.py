@@ -0,0 +1,96 @@
+""" Unit Tests for Py-ART's retrieve/rain_accumulation.py module. """
+
+import numpy as np
+from numpy.testing import assert_allclose
+import pytest
+
+import pyart
+
+
+def make_rate_grid(time, rate, offset=0):
+    """ Create a grid with a rain rate block at a given x offset. """
+    grid = pyart.testing.make_empty_grid(
+        (1, 20, 30), ((0, 0), (-9500, 9500), (-14500, 14500)))
+    grid.time['data'] = np.array([time], dtype='float64')
+    grid.time['units'] = 'seconds since 2000-01-01T00:00:00Z'
+    data = np.ma.zeros((1, 20, 30), dtype='float32')
+    data[0, 5:15, 5+offset:15+offset] = rate
+    grid.add_field('radar_estimated_rain_rate', {'data': data})
+    return grid
+
+
+def test_rain_accumulator_constant_rate():
+    accumulator = pyart.retrieve.RainAccumulator(
+        periods=(3600, 10800), advection=False)
+    totals = []
+    for time in np.arange(0, 3 * 3600 + 1, 600):
+        totals += accumulator.add(make_rate_grid(time, 6.))
+    assert len(totals) == 4
+    periods = [total.fields['rainfall_accumulation']['accumulation_period']
+               for total in totals]
+    assert periods == [3600, 3600, 3600, 10800]
+
+    hourly = totals[0].fields['rainfall_accumulation']
+    assert hourly['data'].shape == (1, 20, 30)
+    assert hourly['integration_time'] == 3600
+    assert_allclose(hourly['data'][0, 10, 10], 6., rtol=1e-5)
+    assert hourly['data'][0, 0, 0] == 0
+    assert totals[0].time['data'][0] == 946688400.
+    three_hourly = totals[3].fields['rainfall_accumulation']
+    assert_allclose(three_hourly['data'][0, 10, 10], 18., rtol=1e-5)
+
+
+def test_rain_accumulator_advection():
+    accumulator = pyart.retrieve.RainAccumulator(periods=(3600, ))
+    totals = []
+    for i, time in enumerate(np.arange(0, 3601, 300)):
+        totals += accumulator.add(make_rate_grid(time, 12., i // 4))
+    total = totals[0].fields['rainfall_accumulation']['data'][0]
+    # total volume of rain is conserved as the block moves
+    assert_allclose(total.sum(), 12. * 100, rtol=1e-4)
+    # the area swept by the block receives rain
+    assert total[10, 16] > 0
+    assert total[10, 2] == 0
+
+
+def test_rain_accumulator_time_gap():
+    accumulator = pyart.retrieve.RainAccumulator(
+        periods=(3600, ), advection=False, max_time_gap=900)
+    accumulator.add(make_rate_grid(0, 6.))
+    accumulator.add(make_rate_grid(600, 6.))
+    totals = accumulator.add(make_rate_grid(3600, 6.))
+    accu = totals[0].fields['rainfall_accumulation']
+    assert accu['integration_time'] == 600
+    assert_allclose(accu['data'][0, 10, 10], 1., rtol=1e-5)
+
+
+def test_rain_accumulator_checkpoint(tmpdir):
+    filename = str(tmpdir.join('accumulator.npz'))
+    times = np.arange(0, 3601, 600)
+
+    accumulator = pyart.retrieve.RainAccumulator(periods=(3600, ))
+    reference = []
+    for time in times:
+        reference += accumulator.add(make_rate_grid(time, 6.))
+
+    accumulator = pyart.retrieve.RainAccumulator(periods=(3600, ))
+    for time in times[:3]:
+        accumulator.add(make_rate_grid(time, 6.))
+    accumulator.save_checkpoint(filename)
+    accumulator = pyart.retrieve.RainAccumulator.load_checkpoint(filename)
+    totals = []
+    for time in times[3:]:
+        totals += accumulator.add(make_rate_grid(time, 6.))
+
+    assert len(totals) == 1
+    assert np.all(totals[0].fields['rainfall_accumulation']['data'] ==
+                  reference[0].fields['rainfall_accumulation']['data'])
+
+
+def test_rain_accumulator_errors():
+    pytest.raises(ValueError, pyart.retrieve.RainAccumulator, periods=[])
+    accumulator = pyart.retrieve.RainAccumulator()
+    accumulator.add(make_rate_grid(600, 6.))
+    pytest.raises(ValueError, accumulator.add, make_rate_grid(0, 6.))
+    radar = pyart.testing.make_empty_ppi_radar(10, 36, 1)
+    pytest.raises(ValueError, accumulator.add, radar)
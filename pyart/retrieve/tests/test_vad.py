@@ -37,3 +37,77 @@ def test_velocity_azimuth_display():
     assert_allclose(vad.direction, vad_direction,rtol=1e-3, atol=1e-1)
     assert_allclose(vad.u_wind, u_wind, rtol=1e-3, atol=1e-1)
     assert_allclose(vad.v_wind, v_wind, rtol=1e-3, atol=1e-1)
+
+
+def make_vad_radar(u_wind, v_wind):
+    """ Create a three sweep radar with velocities from a uniform wind. """
+    radar = pyart.testing.make_empty_ppi_radar(100, 72, 3)
+    radar.range['data'] = np.linspace(0, 20000, 100).astype('float32')
+    radar.azimuth['data'] = np.tile(
+        np.arange(0, 360, 5, dtype='float32'), 3)
+    radar.fixed_angle['data'] = np.array([0.5, 2.5, 10.], dtype='float32')
+    radar.elevation['data'] = np.repeat(radar.fixed_angle['data'], 72)
+    radar.init_gate_x_y_z()
+    radar.init_gate_altitude()
+    azimuth = np.deg2rad(radar.azimuth['data'])[:, np.newaxis]
+    elevation = np.deg2rad(radar.elevation['data'])[:, np.newaxis]
+    vel = (u_wind * np.sin(azimuth) + v_wind * np.cos(azimuth)) * np.cos(
+        elevation) * np.ones((1, 100))
+    radar.add_field('velocity', {'data': np.ma.masked_array(vel)})
+    return radar
+
+
+def test_vad_least_squares():
+    radar = make_vad_radar(3., -4.)
+    z_want = np.linspace(0, 3000, 7)
+    vad = pyart.retrieve.vad_least_squares(radar, z_want=z_want)
+    assert_allclose(vad.height, z_want)
+    assert_allclose(vad.u_wind, 3., atol=1e-6)
+    assert_allclose(vad.v_wind, -4., atol=1e-6)
+    assert_allclose(vad.speed, 5., atol=1e-6)
+
+
+def test_vad_least_squares_masked():
+    radar = make_vad_radar(-2., 6.)
+    # remove a sector of each sweep and all gates beyond 10 km in one sweep
+    vel = radar.fields['velocity']['data']
+    vel[0:20] = np.ma.masked
+    vel[72:144, 50:] = np.ma.masked
+    # corrupt gates which are then excluded by the gatefilter
+    excluded = np.zeros(vel.shape, dtype=bool)
+    excluded[100:110] = True
+    vel[excluded] = 50.
+    gatefilter = pyart.filters.GateFilter(radar)
+    gatefilter.exclude_gates(excluded)
+    vad = pyart.retrieve.vad_least_squares(
+        radar, z_want=np.linspace(0, 3000, 7), gatefilter=gatefilter)
+    assert_allclose(vad.u_wind, -2., atol=1e-6)
+    assert_allclose(vad.v_wind, 6., atol=1e-6)
+
+
+def test_vad_least_squares_outliers():
+    radar = make_vad_radar(5., 5.)
+    np.random.seed(0)
+    vel = radar.fields['velocity']['data']
+    vel += np.random.normal(0, 0.5, vel.shape)
+    outliers = np.random.rand(*vel.shape) < 0.05
+    vel[outliers] += 30.
+    z_want = np.linspace(500, 2500, 3)
+
+    vad = pyart.retrieve.vad_least_squares(radar, z_want=z_want)
+    vad_clean = pyart.retrieve.vad_least_squares(
+        radar, z_want=z_want, outlier_threshold=3.)
+    error = np.abs(vad.u_wind - 5.) + np.abs(vad.v_wind - 5.)
+    error_clean = np.abs(vad_clean.u_wind - 5.) + np.abs(
+        vad_clean.v_wind - 5.)
+    assert np.all(error_clean < error)
+    assert_allclose(vad_clean.u_wind, 5., atol=0.1)
+    assert_allclose(vad_clean.v_wind, 5., atol=0.1)
+
+
+def test_vad_least_squares_no_data():
+    radar = make_vad_radar(5., 5.)
+    vad = pyart.retrieve.vad_least_squares(
+        radar, z_want=np.array([0., 50000., 100000.]))
+    assert np.isfinite(vad.u_wind[0])
+    assert np.all(np.isnan(vad.u_wind[1:]))
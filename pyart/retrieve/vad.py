@@ -5,11 +5,14 @@ pyart.retrieve.velocity_azimuth_display
 Retrieval of VADs from a radar object.
 
 .. autosummary::
-    :toctreeL generated/
+    :toctree: generated/
     :template: dev_template.rst
 
     velocity_azimuth_display
+    vad_least_squares
     _vad_calculation
+    _vad_normal_equations
+    _profile_mean
     _interval_mean
     _sd_to_uv
 
@@ -123,6 +126,177 @@ def velocity_azimuth_display(radar, vel_field=None, z_want=None,
     return vad
 
 
+def vad_least_squares(radar, vel_field=None, z_want=None, gatefilter=None,
+                      weight_field=None, outlier_threshold=None,
+                      outlier_iterations=2, min_valid_rays=10,
+                      max_elevation=80.):
+    """
+    Velocity azimuth display from a weighted least squares fit.
+
+    The harmonic model v_r = c + a sin(az) + b cos(az) is fit to the
+    Doppler velocities of every gate of every sweep with a single batched
+    solve of the normal equations. The horizontal wind components of each
+    fit, u = a / cos(el) and v = b / cos(el), are averaged into the height
+    bins of the profile.
+
+    Parameters
+    ----------
+    radar : Radar
+        Radar object used.
+    vel_field : string, optional
+        Velocity field to use for VAD calculation. None will use the default
+        field name from the Py-ART configuration file.
+    z_want : array, optional
+        Heights, relative to the radar, at which the profile is produced.
+        Fits are averaged over bins centered on these heights. None will
+        result in np.linspace(0, 1000, 100).
+    gatefilter : GateFilter, optional
+        A GateFilter indicating radar gates that should be excluded
+        from the VAD calculation.
+    weight_field : string, optional
+        Field containing the weight given to each gate in the fit, for
+        example derived from the signal to noise ratio. None gives equal
+        weight to all valid gates.
+    outlier_threshold : float, optional
+        When provided gates with residuals larger than this many times the
+        weighted root mean square residual of their fit are excluded and
+        the fit repeated. None disables outlier rejection.
+    outlier_iterations : int, optional
+        Maximum number of times outliers are rejected.
+    min_valid_rays : int, optional
+        Minimum number of valid rays required for a fit.
+    max_elevation : float, optional
+        Sweeps with fixed angles above this elevation, in degrees, are not
+        used.
+
+    Returns
+    -------
+    vad: HorizontalWindProfile
+        A velocity azimuth display object containing height, speed,
+        direction, u_wind, v_wind from a radar object. Heights without any
+        valid fits have NaN winds.
+
+    """
+    if z_want is None:
+        z_want = np.linspace(0, 1000, 100)
+    if vel_field is None:
+        vel_field = get_field_name('velocity')
+    radar.check_field_exists(vel_field)
+
+    # weights of each gate, zero for excluded gates
+    velocities = radar.fields[vel_field]['data']
+    valid = ~np.ma.getmaskarray(velocities)
+    if gatefilter is not None:
+        valid &= ~gatefilter.gate_excluded
+    vel = np.ma.getdata(velocities).astype('float64')
+    valid &= np.isfinite(vel)
+    weights = valid.astype('float64')
+    if weight_field is not None:
+        radar.check_field_exists(weight_field)
+        weights *= np.ma.filled(
+            radar.fields[weight_field]['data'], 0).astype('float64')
+    vel = np.where(valid, vel, 0.)
+
+    starts = radar.sweep_start_ray_index['data']
+    ends = radar.sweep_end_ray_index['data']
+    nrays_sweep = ends - starts + 1
+    azimuth = np.deg2rad(radar.azimuth['data']).astype('float64')
+    basis = np.array([np.ones_like(azimuth), np.sin(azimuth),
+                      np.cos(azimuth)])[:, :, np.newaxis]
+
+    for i in range(outlier_iterations + 1):
+        coeffs, nvalid = _vad_normal_equations(
+            basis, vel, weights, starts, min_valid_rays)
+        if outlier_threshold is None or i == outlier_iterations:
+            break
+        # residuals of each gate from the fit of its sweep
+        model = np.sum(basis * np.repeat(coeffs, nrays_sweep, axis=1), 0)
+        residual = np.where(weights > 0, vel - model, 0.)
+        sum_weights = np.add.reduceat(weights, starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rms = np.sqrt(np.add.reduceat(
+                weights * residual ** 2, starts, axis=0) / sum_weights)
+        limit = outlier_threshold * np.repeat(rms, nrays_sweep, axis=0)
+        limit = np.maximum(limit, 1e-6)
+        outliers = (weights > 0) & (np.abs(residual) > limit)
+        if not outliers.any():
+            break
+        weights[outliers] = 0.
+
+    # horizontal winds of each fit
+    elevation = np.deg2rad(radar.fixed_angle['data']).astype('float64')
+    cos_el = np.cos(elevation)[:, np.newaxis]
+    fit_valid = ((nvalid >= min_valid_rays) &
+                 (radar.fixed_angle['data'] <= max_elevation)[:, np.newaxis])
+    u_fit = coeffs[1] / cos_el
+    v_fit = coeffs[2] / cos_el
+    height = np.add.reduceat(
+        radar.gate_z['data'].astype('float64'), starts, axis=0)
+    height /= nrays_sweep[:, np.newaxis]
+
+    u_mean = _profile_mean(u_fit[fit_valid], height[fit_valid], z_want)
+    v_mean = _profile_mean(v_fit[fit_valid], height[fit_valid], z_want)
+    return HorizontalWindProfile.from_u_and_v(z_want, u_mean, v_mean)
+
+
+def _vad_normal_equations(basis, vel, weights, starts, min_valid_rays):
+    """
+    Solve the weighted least squares normal equations of the VAD harmonic
+    model for every gate of every sweep.
+
+    Returns the coefficients with shape (3, nsweeps, ngates), NaN for fits
+    with too few valid rays or singular equations, and the number of rays
+    with non-zero weight in each fit.
+    """
+    nbasis = len(basis)
+    nsweeps = len(starts)
+    ngates = vel.shape[1]
+    matrix = np.empty((nsweeps, ngates, nbasis, nbasis))
+    rhs = np.empty((nsweeps, ngates, nbasis))
+    for i in range(nbasis):
+        weighted = basis[i] * weights
+        rhs[..., i] = np.add.reduceat(weighted * vel, starts, axis=0)
+        for j in range(i, nbasis):
+            matrix[..., i, j] = np.add.reduceat(
+                weighted * basis[j], starts, axis=0)
+            matrix[..., j, i] = matrix[..., i, j]
+    nvalid = np.add.reduceat((weights > 0).astype('int32'), starts, axis=0)
+
+    # replace the equations which cannot be solved with the identity
+    solvable = nvalid >= max(min_valid_rays, nbasis)
+    with np.errstate(invalid='ignore'):
+        cond = np.linalg.cond(matrix[solvable])
+    solvable[solvable] = cond < 1e10
+    matrix[~solvable] = np.eye(nbasis)
+    rhs[~solvable] = 0.
+    coeffs = np.linalg.solve(matrix, rhs[..., np.newaxis])[..., 0]
+    coeffs[~solvable] = np.nan
+    nvalid[~solvable] = 0
+    return np.moveaxis(coeffs, -1, 0), nvalid
+
+
+def _profile_mean(data, height, wanted_z):
+    """
+    Mean of data in bins centered on the wanted heights, NaN for bins
+    without data.
+    """
+    wanted_z = np.asarray(wanted_z, dtype='float64')
+    if len(wanted_z) > 1:
+        edges = np.concatenate((
+            [1.5 * wanted_z[0] - 0.5 * wanted_z[1]],
+            0.5 * (wanted_z[1:] + wanted_z[:-1]),
+            [1.5 * wanted_z[-1] - 0.5 * wanted_z[-2]]))
+    else:
+        edges = np.array([-np.inf, np.inf])
+    index = np.digitize(height, edges) - 1
+    in_range = (index >= 0) & (index < len(wanted_z))
+    count = np.bincount(index[in_range], minlength=len(wanted_z))
+    total = np.bincount(index[in_range], weights=data[in_range],
+                        minlength=len(wanted_z))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
 def _vad_calculation(velocity_field, azimuth, elevation):
     """ Calculates VAD for a scan, returns speed and angle
     outdic = vad_algorithm(velocity_field, azimuth, elevation)
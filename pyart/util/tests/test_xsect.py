@@ -1,8 +1,11 @@
 """ Unit tests for the xsect.py module. """
 
-import pyart
+import warnings
+
+import numpy as np
+from numpy.testing import assert_almost_equal, assert_equal, assert_raises
 
-from numpy.testing import assert_almost_equal
+import pyart
 
 
 def test_cross_section_ppi():
@@ -25,3 +28,95 @@ def test_cross_section_ppi():
     assert_almost_equal(xsect.sweep_start_ray_index['data'][1], 1)
     assert_almost_equal(xsect.sweep_end_ray_index['data'][0], 0)
     assert_almost_equal(xsect.sweep_end_ray_index['data'][1], 1)
+
+
+def make_ppi_volume():
+    """ Three sweep PPI volume with shuffled, irregular azimuths. """
+    radar = pyart.testing.make_empty_ppi_radar(10, 90, 3)
+    radar.fixed_angle['data'] = np.array([0.5, 1.5, 2.5], dtype='float32')
+    radar.elevation['data'] = np.repeat(radar.fixed_angle['data'], 90)
+    random = np.random.RandomState(42)
+    azimuths = np.arange(0, 360, 4, dtype='float32') + 1.
+    radar.azimuth['data'] = np.concatenate(
+        [random.permutation(azimuths) + 0.1 * i for i in range(3)])
+    data = np.tile(radar.azimuth['data'][:, np.newaxis], (1, 10))
+    radar.add_field('azimuth_field', {'data': np.ma.array(data)})
+    radar.add_field('ray_number', {'data': np.tile(
+        np.arange(270, dtype='int32')[:, np.newaxis], (1, 10))})
+    return radar
+
+
+def test_cross_section_ppi_nearest():
+    radar = make_ppi_volume()
+    targets = [0., 45., 181.4, 358.9, 359.9, 720.]
+    xsect = pyart.util.cross_section_ppi(radar, targets)
+
+    assert xsect.nsweeps == 6
+    assert xsect.nrays == 18
+    assert_equal(xsect.sweep_start_ray_index['data'], np.arange(0, 18, 3))
+    assert_equal(xsect.sweep_end_ray_index['data'], np.arange(2, 18, 3))
+    expected = []
+    for target in targets:
+        for sweep_slice in radar.iter_slice():
+            azimuths = radar.azimuth['data'][sweep_slice]
+            d_az = np.abs((azimuths - target + 180.) % 360. - 180.)
+            expected.append(sweep_slice.start + np.argmin(d_az))
+    assert_equal(xsect.fields['ray_number']['data'][:, 0], expected)
+    assert_equal(xsect.elevation['data'][:3], [0.5, 1.5, 2.5])
+    # nearest ray across the 0/360 boundary
+    assert_almost_equal(xsect.azimuth['data'][12], 1.0, 4)
+
+
+def test_cross_section_ppi_tolerance():
+    radar = make_ppi_volume()
+    with warnings.catch_warnings(record=True):
+        warnings.simplefilter('ignore')
+        xsect = pyart.util.cross_section_ppi(
+            radar, [1.05, 3.], az_tol=0.06)
+    # only the first two sweeps have rays within the tolerance
+    assert xsect.nsweeps == 1
+    assert xsect.nrays == 2
+    assert_equal(xsect.sweep_end_ray_index['data'], [1])
+    assert_raises(ValueError, pyart.util.cross_section_ppi, radar, [3.],
+                  az_tol=0.01)
+
+
+def test_cross_section_ppi_interpolate():
+    radar = make_ppi_volume()
+    xsect = pyart.util.cross_section_ppi(
+        radar, [10., 359.], interpolate=True)
+    azimuth_field = xsect.fields['azimuth_field']['data'][:, 0]
+    assert_almost_equal(azimuth_field[:3], 10., 4)
+    assert_almost_equal(xsect.azimuth['data'][:3], 10., 4)
+    # the last rays interpolate between 357 and 1 degrees
+    assert_almost_equal(xsect.azimuth['data'][3], 359., 4)
+    # integer fields are not interpolated
+    assert xsect.fields['ray_number']['data'].dtype == np.int32
+
+
+def test_cross_section_rhi_interpolate():
+    radar = pyart.testing.make_target_radar()
+    radar.scan_type = 'rhi'
+    radar.elevation['data'] = np.linspace(0, 90, radar.nrays,
+                                          dtype='float32')
+    radar.init_angle_index()
+    data = np.tile(radar.elevation['data'][:, np.newaxis], (1, radar.ngates))
+    radar.add_field('elevation_field', {'data': data.astype('float64')})
+    xsect = pyart.util.cross_section_rhi(
+        radar, [10.1, 95.], interpolate=True)
+    assert_almost_equal(xsect.fields['elevation_field']['data'][0], 10.1, 4)
+    # targets outside of the scanned elevations use the last ray
+    assert_almost_equal(xsect.fields['elevation_field']['data'][1], 90., 4)
+
+
+def test_cross_section_rhi_wide_elevation_span():
+    # the elevations of each sweep are searched separately, whatever their
+    # span, the nearest ray must come from the sweep itself
+    radar = pyart.testing.make_empty_rhi_radar(5, 3, 2)
+    radar.elevation['data'] = np.array(
+        [900., 1030., 1080., 1090., 1140., 1160.], dtype='float32')
+    radar.init_angle_index()
+    data = np.tile(np.arange(6)[:, np.newaxis], (1, 5)).astype('float64')
+    radar.add_field('ray_field', {'data': data})
+    xsect = pyart.util.cross_section_rhi(radar, [50.])
+    assert_equal(xsect.fields['ray_field']['data'][:, 0], [0, 3])
@@ -22,7 +22,8 @@ import numpy as np
 from ..core import Radar
 
 
-def cross_section_ppi(radar, target_azimuths, az_tol=None):
+def cross_section_ppi(radar, target_azimuths, az_tol=None,
+                      interpolate=False):
     """
     Extract cross sections from a PPI volume along one or more azimuth angles.
 
@@ -36,6 +37,10 @@ def cross_section_ppi(radar, target_azimuths, az_tol=None):
     az_tol : float, optional
         Azimuth angle tolerance in degrees. If none the nearest angle is used.
         If valid only angles within the tolerance distance are considered.
+    interpolate : bool, optional
+        True to linearly interpolate the fields between the two rays
+        bracketing each target azimuth, False (the default) to use the
+        nearest ray. Fields with an integer data type are never interpolated.
 
     Returns
     -------
@@ -45,40 +50,20 @@ def cross_section_ppi(radar, target_azimuths, az_tol=None):
 
     """
     # determine which rays from the ppi radar make up the pseudo RHI
-    prhi_rays = []
-    valid_azimuths = []
-    for target_azimuth in target_azimuths:
-        for sweep_slice in radar.iter_slice():
-            sweep_azimuths = radar.azimuth['data'][sweep_slice]
-            d_az = np.abs(sweep_azimuths - target_azimuth)
-            if az_tol is None:
-                ray_number = np.argmin(d_az)
-                prhi_rays.append(ray_number + sweep_slice.start)
-                valid_azimuths.append(target_azimuth)
-            else:
-                d_az_min = np.min(d_az)
-                if d_az_min > az_tol:
-                    warn('WARNING: No azimuth found whithin tolerance '
-                         + 'for angle '+str(target_azimuth)
-                         + '. Minimum distance to radar azimuth '
-                         + str(d_az_min) + ' larger than tolerance '
-                         + str(az_tol))
-                else:
-                    ray_number = np.argmin(d_az)
-                    prhi_rays.append(ray_number + sweep_slice.start)
-                    valid_azimuths.append(target_azimuth)
-
-    rhi_nsweeps = len(valid_azimuths)
-    if rhi_nsweeps == 0:
+    rays, next_rays, weights, rays_per_sweep, valid_azimuths = _find_rays(
+        radar, 'azimuth', target_azimuths, az_tol, interpolate)
+    if len(valid_azimuths) == 0:
         raise ValueError('No azimuth found within tolerance')
 
     radar_rhi = _construct_xsect_radar(
-        radar, 'rhi', prhi_rays, rhi_nsweeps, valid_azimuths)
+        radar, 'rhi', rays, len(valid_azimuths), valid_azimuths,
+        rays_per_sweep, next_rays, weights)
 
     return radar_rhi
 
 
-def cross_section_rhi(radar, target_elevations, el_tol=None):
+def cross_section_rhi(radar, target_elevations, el_tol=None,
+                      interpolate=False):
     """
     Extract cross sections from an RHI volume along one or more elevation
     angles.
@@ -94,6 +79,10 @@ def cross_section_rhi(radar, target_elevations, el_tol=None):
         Elevation angle tolerance in degrees. If none the nearest angle is
         used. If valid only angles within the tolerance distance are
         considered.
+    interpolate : bool, optional
+        True to linearly interpolate the fields between the two rays
+        bracketing each target elevation, False (the default) to use the
+        nearest ray. Fields with an integer data type are never interpolated.
 
     Returns
     -------
@@ -102,43 +91,115 @@ def cross_section_rhi(radar, target_elevations, el_tol=None):
         cross sections from the original RHI volume.
 
     """
-
     # determine which rays from the rhi radar make up the pseudo PPI
-    pppi_rays = []
-    valid_elevations = []
-    for target_elevation in target_elevations:
-        for sweep_slice in radar.iter_slice():
-            sweep_elevations = radar.elevation['data'][sweep_slice]
-            d_el = np.abs(sweep_elevations - target_elevation)
-            if el_tol is None:
-                ray_number = np.argmin(d_el)
-                pppi_rays.append(ray_number + sweep_slice.start)
-                valid_elevations.append(target_elevation)
-            else:
-                d_el_min = np.min(d_el)
-                if d_el_min > el_tol:
-                    warn('WARNING: No elevation found whithin tolerance '
-                         + 'for angle '+str(target_elevation)
-                         + '. Minimum distance to radar elevation '
-                         + str(d_el_min) + ' larger than tolerance '
-                         + str(el_tol))
-                else:
-                    ray_number = np.argmin(d_el)
-                    pppi_rays.append(ray_number + sweep_slice.start)
-                    valid_elevations.append(target_elevation)
-
-    ppi_nsweeps = len(valid_elevations)
-    if ppi_nsweeps == 0:
+    rays, next_rays, weights, rays_per_sweep, valid_elevations = _find_rays(
+        radar, 'elevation', target_elevations, el_tol, interpolate)
+    if len(valid_elevations) == 0:
         raise ValueError('No elevation found within tolerance')
 
     radar_ppi = _construct_xsect_radar(
-        radar, 'ppi', pppi_rays, ppi_nsweeps, valid_elevations)
+        radar, 'ppi', rays, len(valid_elevations), valid_elevations,
+        rays_per_sweep, next_rays, weights)
 
     return radar_ppi
 
 
+def _find_rays(radar, angle, target_angles, tol, interpolate):
+    """
+    Find the rays of each sweep closest to, or bracketing, target angles.
+
+    All target angles are located in each sweep with a single searchsorted
+    call on that sweep's slice of the cached angle index of the radar.
+    Azimuths wrap around at 360 degrees, elevations do not.
+
+    Returns
+    -------
+    rays : array
+        Nearest ray, or lower bracketing ray when interpolating, for each
+        valid target angle and sweep, ordered by target angle.
+    next_rays, weights : array or None
+        Upper bracketing rays and their interpolation weights, None when not
+        interpolating.
+    rays_per_sweep : array
+        Number of rays in each cross section sweep.
+    valid_angles : list
+        Target angles for which at least one ray was found.
+
+    """
+    wrap = angle == 'azimuth'
+    target_angles = np.asarray(target_angles, dtype='float64')
+    order = radar.angle_index[angle]
+    angles = getattr(radar, angle)['data'][order].astype('float64')
+    if wrap:
+        angles %= 360.
+        targets = target_angles % 360.
+    else:
+        targets = target_angles
+
+    # search the sorted angles of each sweep for all targets
+    nrays = radar.rays_per_sweep['data']
+    start = np.cumsum(nrays) - nrays
+    end = start + nrays
+    above = np.empty((len(targets), radar.nsweeps), dtype=np.intp)
+    for i, (sweep_start, sweep_end) in enumerate(zip(start, end)):
+        above[:, i] = sweep_start + np.searchsorted(
+            angles[sweep_start:sweep_end], targets)
+    below = above - 1
+
+    # bracketing rays on either side of the start/end of a sweep
+    before_start = below < start
+    after_end = above >= end
+    below_angle = angles[np.where(before_start, start, below)]
+    above_angle = angles[np.where(after_end, end - 1, above)]
+    if wrap:
+        below = np.where(before_start, end - 1, below)
+        below_angle = np.where(before_start, angles[below] - 360.,
+                               below_angle)
+        above = np.where(after_end, start, above)
+        above_angle = np.where(after_end, angles[above] + 360., above_angle)
+    else:
+        below = np.where(before_start, start, below)
+        above = np.where(after_end, end - 1, above)
+    d_below = np.abs(targets[:, np.newaxis] - below_angle)
+    d_above = np.abs(above_angle - targets[:, np.newaxis])
+    use_below = d_below <= d_above
+    nearest = np.where(use_below, below, above)
+    distance = np.where(use_below, d_below, d_above)
+
+    if tol is None:
+        valid = np.ones(distance.shape, dtype=bool)
+    else:
+        valid = distance <= tol
+        for target_angle, min_distance in zip(
+                target_angles, distance.min(axis=1)):
+            if min_distance > tol:
+                warn('WARNING: No ' + angle + ' found whithin tolerance '
+                     + 'for angle ' + str(target_angle)
+                     + '. Minimum distance to radar ' + angle + ' '
+                     + str(min_distance) + ' larger than tolerance '
+                     + str(tol))
+
+    rays_per_sweep = valid.sum(axis=1)
+    valid_angles = list(target_angles[rays_per_sweep > 0])
+    rays_per_sweep = rays_per_sweep[rays_per_sweep > 0]
+    if not interpolate:
+        return order[nearest[valid]], None, None, rays_per_sweep, valid_angles
+
+    total = d_below + d_above
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weights = np.where(total > 0, d_below / total, 0.)
+    # targets outside of the angles of a sweep use the nearest ray
+    weights = np.where(d_below == 0, 0., weights)
+    if not wrap:
+        weights = np.where(before_start, 0., weights)
+        weights = np.where(after_end, 1., weights)
+    return (order[below[valid]], order[above[valid]], weights[valid],
+            rays_per_sweep, valid_angles)
+
+
 def _construct_xsect_radar(
-        radar, scan_type, pxsect_rays, xsect_nsweeps, target_angles):
+        radar, scan_type, pxsect_rays, xsect_nsweeps, target_angles,
+        rays_per_sweep=None, pxsect_rays_next=None, weights=None):
     """
     Constructs a new radar object that contains cross-sections at fixed angles
     of a PPI or RHI volume scan.
@@ -157,6 +218,12 @@ def _construct_xsect_radar(
         Number of sweeps in the cross-section radar.
     target_angles : array
         The target fixed angles.
+    rays_per_sweep : array, optional
+        Number of rays in each cross section sweep. None will use the number
+        of sweeps in the radar volume for all cross sections.
+    pxsect_rays_next, weights : array, optional
+        Second ray and its weight used to linearly interpolate each ray of
+        the cross sections. None will copy the rays in pxsect_rays.
 
     Returns
     -------
@@ -171,21 +238,48 @@ def _construct_xsect_radar(
     altitude = _copy_dic(radar.altitude)
     metadata = _copy_dic(radar.metadata)
 
+    pxsect_rays = np.asarray(pxsect_rays)
+    if weights is None:
+        def take(data, interpolate=True):
+            """ Take the cross section rays from a data array. """
+            return np.take(data, pxsect_rays, axis=0)
+    else:
+        def take(data, interpolate=True):
+            """ Take or interpolate the cross section rays. """
+            data_below = np.take(data, pxsect_rays, axis=0)
+            if not interpolate or data.dtype.kind != 'f':
+                return data_below
+            data_above = np.take(data, pxsect_rays_next, axis=0)
+            ray_weights = weights.reshape((-1, ) + (1, ) * (data.ndim - 1))
+            return (data_below * (1. - ray_weights) +
+                    data_above * ray_weights).astype(data.dtype)
+
     time = _copy_dic(radar.time, excluded_keys=['data'])
-    time['data'] = radar.time['data'][pxsect_rays].copy()
+    time['data'] = take(radar.time['data'])
 
     azimuth = _copy_dic(radar.azimuth, excluded_keys=['data'])
-    azimuth['data'] = radar.azimuth['data'][pxsect_rays].copy()
+    azimuth['data'] = take(radar.azimuth['data'], False)
 
     elevation = _copy_dic(radar.elevation, excluded_keys=['data'])
-    elevation['data'] = radar.elevation['data'][pxsect_rays].copy()
+    elevation['data'] = take(radar.elevation['data'])
+
+    if weights is not None:
+        # azimuths interpolated along the shortest arc
+        az_below = azimuth['data'].astype('float64')
+        az_above = np.take(radar.azimuth['data'], pxsect_rays_next)
+        d_az = (az_above - az_below + 180.) % 360. - 180.
+        azimuth['data'] = ((az_below + weights * d_az) % 360.).astype(
+            radar.azimuth['data'].dtype)
 
     fields = {}
     for field_name, orig_field_dic in radar.fields.items():
         field_dic = _copy_dic(orig_field_dic, excluded_keys=['data'])
-        field_dic['data'] = orig_field_dic['data'][pxsect_rays].copy()
+        field_dic['data'] = take(orig_field_dic['data'])
         fields[field_name] = field_dic
 
+    if rays_per_sweep is None:
+        rays_per_sweep = np.full(xsect_nsweeps, radar.nsweeps)
+
     sweep_number = _copy_dic(radar.sweep_number, excluded_keys=['data'])
     sweep_number['data'] = np.arange(xsect_nsweeps, dtype='int32')
 
@@ -197,14 +291,13 @@ def _construct_xsect_radar(
 
     sweep_start_ray_index = _copy_dic(
         radar.sweep_start_ray_index, excluded_keys=['data'])
-    ssri = np.arange(xsect_nsweeps, dtype='int32') * radar.nsweeps
-    sweep_start_ray_index['data'] = ssri
+    ssri = np.cumsum(rays_per_sweep) - rays_per_sweep
+    sweep_start_ray_index['data'] = ssri.astype('int32')
 
     sweep_end_ray_index = _copy_dic(
         radar.sweep_end_ray_index, excluded_keys=['data'])
-    seri = (np.arange(xsect_nsweeps, dtype='int32') *
-            radar.nsweeps + radar.nsweeps-1)
-    sweep_end_ray_index['data'] = seri
+    seri = np.cumsum(rays_per_sweep) - 1
+    sweep_end_ray_index['data'] = seri.astype('int32')
 
     radar_xsect = Radar(
         time, _range, fields, metadata, scan_type,